@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_embedding_server import create_server
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+
+QUERY_TEMPLATES = [
+    "학생 정보를 출력하는 함수",
+    "average grade calculation",
+    "add a student to the management system",
+    "std::vector push_back grade",
+    "display all students",
+    "class constructor with name and id",
+]
+
+def make_queries(count):
+    """벤치마크용 쿼리 목록을 만듭니다. 임베딩 캐시 영향을 받지 않도록 모두 다른 문자열입니다."""
+    return [f"{QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)]} #{i}" for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description='similarity_search 반복 호출과 similarity_search_batch 처리량 비교')
+    parser.add_argument('--project-dir', type=str, help='인덱싱할 프로젝트 디렉토리 (기본값: 저장소의 예제 파일)')
+    parser.add_argument('--queries', type=int, default=64, help='쿼리 수 (기본값: 64)')
+    parser.add_argument('--k', type=int, default=5, help='쿼리별 결과 수 (기본값: 5)')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='대체 임베딩 서버의 요청당 지연 (기본값: 20ms)')
+    parser.add_argument('--rounds', type=int, default=3, help='반복 횟수 (기본값: 3, 가장 빠른 값을 사용)')
+
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    server = create_server(port=0, latency=args.latency_ms / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    work_dir = tempfile.mkdtemp(prefix="bench_batch_query_")
+    try:
+        project_dir = args.project_dir
+        if project_dir is None:
+            project_dir = os.path.join(work_dir, "project")
+            os.makedirs(project_dir)
+            repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            for name in ("student.h", "student.cpp"):
+                shutil.copy(os.path.join(repo_dir, name), project_dir)
+
+        db_dir = os.path.join(work_dir, "db")
+        embedder = CodeEmbedder(persist_directory=db_dir, embedding_base_url=base_url, cache_path=None)
+        embedder.embed_project(project_dir, chunk_size=300, chunk_overlap=50)
+
+        # 캐시 없이 측정해 두 방식 모두 매번 임베딩 요청을 보내도록 함
+        retriever = CodeRetriever(persist_directory=db_dir, cache_path=None, embedding_base_url=base_url)
+        loop_times = []
+        batch_times = []
+        for round_index in range(args.rounds):
+            queries = make_queries(args.queries)
+
+            started = time.perf_counter()
+            loop_results = [retriever.similarity_search(query, k=args.k) for query in queries]
+            loop_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            batch_results = retriever.similarity_search_batch(queries, k=args.k)
+            batch_times.append(time.perf_counter() - started)
+
+            # 두 방식의 결과가 같은지 확인
+            for single, batch in zip(loop_results, batch_results):
+                assert [r["code"] for r in single] == [r["code"] for r in batch]
+
+        loop_best = min(loop_times)
+        batch_best = min(batch_times)
+        print(json.dumps({
+            "queries": args.queries,
+            "k": args.k,
+            "embedding_latency_ms": args.latency_ms,
+            "loop_seconds": loop_best,
+            "batch_seconds": batch_best,
+            "loop_queries_per_second": args.queries / loop_best,
+            "batch_queries_per_second": args.queries / batch_best,
+            "speedup": loop_best / batch_best,
+        }, indent=2))
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+import numpy as np
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from synthetic_project import generate_project
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+from flat_store import convert_chroma
+
+QUERIES = [
+    "compute student grade",
+    "socket packet session",
+    "render texture mesh",
+    "parser token stream",
+    "update invoice price",
+    "load config engine",
+    "reset queue stack",
+    "find graph edge node",
+]
+
+# 새 프로세스에서 저장소를 열고 첫 쿼리까지의 시간을 잽니다. (임포트 시간은 제외)
+OPEN_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, sys.argv[1])
+from retriever import CodeRetriever
+started = time.perf_counter()
+retriever = CodeRetriever(persist_directory=sys.argv[2], cache_path=None, embedder='hashing', store=sys.argv[3])
+opened = time.perf_counter() - started
+retriever.similarity_search("compute student grade", k=5)
+print(json.dumps({"open_ms": opened * 1000, "first_query_ms": (time.perf_counter() - started) * 1000}))
+"""
+
+def measure_open(db_dir, store):
+    """새 프로세스에서 저장소 열기와 첫 쿼리 시간(ms)을 측정합니다."""
+    output = subprocess.run(
+        [sys.executable, "-c", OPEN_SCRIPT, REPO_DIR, db_dir, store],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def directory_mb(path):
+    """디렉토리 전체 크기(MB)"""
+    size = 0
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return size / (1024 * 1024)
+
+def exact_top_k(vectors, ids, query_vectors, k):
+    """float32 전수 검색 결과 (정답 기준)"""
+    distances = (
+        np.einsum('ij,ij->i', vectors, vectors)[None, :]
+        - 2.0 * query_vectors @ vectors.T
+        + np.einsum('ij,ij->i', query_vectors, query_vectors)[:, None]
+    )
+    return [[ids[i] for i in np.argsort(row, kind='stable')[:k]] for row in distances]
+
+def recall(results, truth):
+    """쿼리별 상위 k 결과가 기준 결과와 겹치는 비율의 평균"""
+    total = sum(len(set(found) & set(expected)) for found, expected in zip(results, truth))
+    return total / max(1, sum(len(expected) for expected in truth))
+
+def bench_store(retriever, query_vectors, k, filter_dict):
+    """저장소 하나의 쿼리 지연 시간과 결과 ID를 측정합니다."""
+    collection = retriever.db._collection
+    results = []
+    samples = []
+    for vector in query_vectors:
+        started = time.perf_counter()
+        response = collection.query(query_embeddings=[vector.tolist()], n_results=k, include=[])
+        samples.append(time.perf_counter() - started)
+        results.append(response["ids"][0])
+    filtered = collection.query(query_embeddings=query_vectors[:1].tolist(), n_results=k, where=filter_dict, include=["metadatas"])
+    samples.sort()
+    return results, {
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[int(0.95 * (len(samples) - 1))] * 1000,
+        "queries_per_second": len(samples) / sum(samples),
+        "filter_ok": all(all(metadata.get(key) == value for key, value in filter_dict.items()) for metadata in filtered["metadatas"][0]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Chroma와 양자화 flat 저장소의 열기 시간, 크기, 검색 지연, 재현율 비교')
+    parser.add_argument('--db-dir', type=str, help='비교할 기존 Chroma DB (hashing 임베딩, 지정하지 않으면 합성 프로젝트를 인덱싱)')
+    parser.add_argument('--files', type=int, default=500, help='합성 프로젝트 헤더 파일 수 (기본값: 500)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--queries', type=int, default=200, help='검색 쿼리 수 (기본값: 200)')
+    parser.add_argument('--k', type=int, default=10, help='쿼리별 결과 수 (기본값: 10)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_flat_store_")
+    results = {"config": vars(args), "stores": {}}
+    try:
+        # 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+        with contextlib.redirect_stdout(sys.stderr):
+            db_dir = args.db_dir
+            if db_dir is None:
+                project_dir = os.path.join(work_dir, "project")
+                generate_project(project_dir, files=args.files, large_files=0, seed=args.seed)
+                db_dir = os.path.join(work_dir, "chroma")
+                CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing').embed_project(project_dir)
+
+            chroma = CodeRetriever(persist_directory=db_dir, cache_path=None, embedder='hashing', store='chroma')
+            stored = chroma.db._collection.get(include=["embeddings", "metadatas"])
+            ids = stored["ids"]
+            vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+            texts = [f"{QUERIES[i % len(QUERIES)]} {i}" for i in range(args.queries)]
+            query_vectors = np.asarray(chroma.embeddings.embed_documents(texts), dtype=np.float32)
+            # 파일 테이블이 있는 DB는 청크에 파일 ID만 있으므로 파일 ID로 필터링
+            filter_key = "file_id" if "file_id" in stored["metadatas"][0] else "file_name"
+            filter_dict = {filter_key: stored["metadatas"][0][filter_key]}
+            truth = exact_top_k(vectors, ids, query_vectors, args.k)
+
+            variants = {"chroma": (db_dir, "chroma")}
+            for name, dtype, rerank in (("flat-int8", "int8", False), ("flat-int8-rerank", "int8", True), ("flat-float16", "float16", False)):
+                variant_dir = os.path.join(work_dir, name)
+                started = time.perf_counter()
+                store = convert_chroma(db_dir, dtype, rerank, output_directory=variant_dir)
+                results["stores"][name] = {"convert_seconds": time.perf_counter() - started, **store.stats()}
+                variants[name] = (variant_dir, "flat")
+            results["stores"]["chroma"] = {
+                "count": len(ids),
+                "dim": vectors.shape[1],
+                "vector_mb": vectors.nbytes / (1024 * 1024),
+                "disk_mb": directory_mb(db_dir),
+            }
+
+            chroma_results = None
+            for name, (variant_dir, store) in variants.items():
+                retriever = chroma if store == "chroma" else CodeRetriever(persist_directory=variant_dir, cache_path=None, embedder='hashing', store=store)
+                found, timing = bench_store(retriever, query_vectors, args.k, filter_dict)
+                if name == "chroma":
+                    chroma_results = found
+                entry = results["stores"][name]
+                entry.update(timing)
+                entry.update(measure_open(variant_dir, store))
+                entry["recall_vs_exact"] = recall(found, truth)
+                entry["recall_vs_chroma"] = recall(found, chroma_results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_project import generate_project
+from cpp_chunker import create_text_splitter, extract_includes, inline_cpp_content
+from cpp_lexer import RECORD_KINDS, chunk_by_units, scan_units
+from embedding_backends import HashingEmbeddings
+
+# 렉서 도입 전의 클래스 선언 추출 (첫 '}'에서 멈춤)
+BASELINE_CLASS_PATTERN = re.compile(r'class\s+\w+\s*{[^}]*}', re.DOTALL)
+
+def baseline_chunks(header_content, cpp_content, text_splitter):
+    """렉서 도입 전 방식: 정규식으로 클래스 선언을 뽑아 인라인화한 뒤 구분자 기반으로 분할"""
+    parts = extract_includes(header_content) + ['']
+    for match in BASELINE_CLASS_PATTERN.finditer(header_content):
+        parts.extend([match.group(0), ''])
+    parts.extend(line for line in cpp_content.split('\n') if not line.strip().startswith('#include'))
+    return text_splitter.split_text('\n'.join(parts))
+
+def lexer_chunks(header_content, cpp_content, text_splitter, chunk_size, chunk_overlap):
+    """렉서 방식: 렉서로 클래스 정의 전체를 뽑아 인라인화한 뒤 코드 단위 경계로 청킹"""
+    code = inline_cpp_content(header_content, cpp_content)
+    return chunk_by_units(code, chunk_size, chunk_overlap, text_splitter)
+
+def splitter_chunks(header_content, cpp_content, text_splitter):
+    """기본(splitter) 방식: 렉서로 클래스 정의만 뽑아 인라인화한 뒤 구분자 기반으로 분할"""
+    return text_splitter.split_text(inline_cpp_content(header_content, cpp_content))
+
+def best_time(fn, repeat):
+    """repeat번 실행한 가장 짧은 시간(초)과 마지막 결과"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='큰 번역 단위에서 렉서 청킹과 정규식+구분자 분할(렉서 도입 전 방식)의 시간과 경계 품질 비교')
+    parser.add_argument('--kb', type=int, default=4096, help='헤더+소스 파일 쌍의 대략적인 크기(KB) (기본값: 4096)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='각 청크의 최대 크기 (기본값: 1000)')
+    parser.add_argument('--chunk-overlap', type=int, default=200, help='청크 간 중복 크기 (기본값: 200)')
+    parser.add_argument('--repeat', type=int, default=5, help='경우마다 반복 횟수, 가장 짧은 시간을 사용 (기본값: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_lexer_")
+    results = {"config": vars(args)}
+    try:
+        generate_project(work_dir, files=0, large_files=1, large_file_kb=args.kb, seed=args.seed)
+        stem = os.path.join(work_dir, "large", "large000")
+        with open(stem + ".h", 'r', encoding='utf-8') as f:
+            header_content = f.read()
+        with open(stem + ".cpp", 'r', encoding='utf-8') as f:
+            cpp_content = f.read()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    size_mb = (len(header_content) + len(cpp_content)) / (1024 * 1024)
+    results["file_mb"] = size_mb
+    text_splitter = create_text_splitter(args.chunk_size, args.chunk_overlap)
+
+    seconds, chunks = best_time(lambda: baseline_chunks(header_content, cpp_content, text_splitter), args.repeat)
+    results["baseline"] = {"seconds": seconds, "mb_per_second": size_mb / seconds, "chunks": len(chunks)}
+
+    seconds, chunks = best_time(lambda: splitter_chunks(header_content, cpp_content, text_splitter), args.repeat)
+    results["splitter"] = {"seconds": seconds, "mb_per_second": size_mb / seconds, "chunks": len(chunks)}
+    results["splitter_vs_baseline"] = results["splitter"]["seconds"] / results["baseline"]["seconds"]
+
+    code = inline_cpp_content(header_content, cpp_content)
+    seconds, units = best_time(lambda: scan_units(code), args.repeat)
+    results["scan_units"] = {
+        "seconds": seconds,
+        "mb_per_second": len(code) / (1024 * 1024) / seconds,
+        "units": len(units),
+        "us_per_unit": seconds / max(1, len(units)) * 1e6,
+    }
+
+    seconds, pieces = best_time(lambda: lexer_chunks(header_content, cpp_content, text_splitter, args.chunk_size, args.chunk_overlap), args.repeat)
+    results["lexer"] = {"seconds": seconds, "mb_per_second": size_mb / seconds, "chunks": len(pieces)}
+    results["lexer_vs_baseline"] = results["lexer"]["seconds"] / results["baseline"]["seconds"]
+
+    # 경계 품질: 정규식이 첫 '}'에서 잘라 낸 클래스 선언 수 (렉서가 찾은 클래스의 닫는 '}'에서 끝나지 않는 매치)
+    records = [unit for unit in scan_units(header_content) if unit.kind in RECORD_KINDS]
+    record_ends = {header_content.rfind('}', unit.start, unit.end) + 1 for unit in records}
+    matches = list(BASELINE_CLASS_PATTERN.finditer(header_content))
+    results["classes"] = len(records)
+    results["baseline_truncated_classes"] = sum(1 for match in matches if match.end() not in record_ends)
+
+    # 같은 청크를 가장 빠른(오프라인) 임베딩 백엔드로 임베딩하는 시간과 비교
+    embeddings = HashingEmbeddings()
+    texts = [piece['text'] for piece in pieces]
+    started = time.perf_counter()
+    embeddings.embed_documents(texts)
+    results["embed_hashing_seconds"] = time.perf_counter() - started
+    results["lexer_share_of_hashing_embed"] = results["lexer"]["seconds"] / results["embed_hashing_seconds"]
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
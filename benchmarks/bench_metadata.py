@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_project import generate_project
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+from chroma_store import ChromaStore
+from flat_store import STORES, FlatVectorStore
+from file_table import FILE_FIELDS, FILE_TABLE_FILE, FileTable
+from snapshot import SNAPSHOT_FILES
+
+QUERY_TEMPLATES = [
+    "student average grade",
+    "add item to the registry",
+    "compute checksum of buffer",
+    "print all records",
+    "parse configuration value",
+    "update cache entry",
+]
+
+# 한 번에 읽고 쓸 청크 수
+BATCH_SIZE = 5000
+
+def directory_mb(path):
+    """디렉토리 전체 크기(MB)"""
+    size = 0
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return size / (1024 * 1024)
+
+def metadata_mb(collection):
+    """저장된 청크 메타데이터를 JSON으로 직렬화한 크기 합(MB)"""
+    stored = collection.get(include=["metadatas"])
+    return sum(len(json.dumps(metadata or {}, ensure_ascii=False).encode('utf-8')) for metadata in stored["metadatas"]) / (1024 * 1024)
+
+def copy_index(source_dir, target_dir, store, rehydrate):
+    """
+    정규화된 DB의 청크를 같은 순서와 float32 벡터(Chroma)로 새 DB에 옮깁니다. 두 형식을 같은 방식으로 만들어
+    크기와 지연 시간 차이가 메타데이터 형식에서만 오도록 합니다.
+
+    Args:
+        source_dir (str): 정규화된 Chroma DB 디렉토리
+        target_dir (str): 만들 DB 디렉토리
+        store (str): 'chroma' 또는 'flat'
+        rehydrate (bool): True면 파일 단위 값을 청크마다 다시 채우고 파일 테이블은 복사하지 않음 (파일 테이블 도입 전 형식)
+    """
+    file_table = FileTable.load(source_dir)
+    source = ChromaStore(source_dir)._collection
+    target = FlatVectorStore(target_dir) if store == 'flat' else ChromaStore(target_dir)
+    collection = target if store == 'flat' else target._collection
+    total = source.count()
+    for offset in range(0, total, BATCH_SIZE):
+        batch = source.get(offset=offset, limit=BATCH_SIZE, include=["embeddings", "documents", "metadatas"])
+        metadatas = [file_table.rehydrate(metadata) for metadata in batch["metadatas"]] if rehydrate else batch["metadatas"]
+        collection.upsert(ids=batch["ids"], embeddings=batch["embeddings"], metadatas=metadatas, documents=batch["documents"])
+    target.persist()
+    for name in SNAPSHOT_FILES:
+        path = os.path.join(source_dir, name)
+        if not (rehydrate and name == FILE_TABLE_FILE) and os.path.exists(path):
+            shutil.copy(path, os.path.join(target_dir, name))
+
+def latency(samples):
+    """지연 시간(초) 목록의 평균/p50/p95 (ms)"""
+    samples = sorted(samples)
+    return {
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[int(0.95 * (len(samples) - 1))] * 1000,
+    }
+
+def overlap(results, reference):
+    """
+    호출별 결과가 기준 결과와 겹치는 비율의 평균. Chroma의 HNSW 색인은 같은 데이터로 만들어도
+    결과 순서가 조금씩 다르므로 순서 없이 비교합니다.
+    """
+    total = 0.0
+    for found, expected in zip(results, reference):
+        if expected:
+            total += len(set(found) & set(expected)) / len(set(expected))
+        else:
+            total += float(not found)
+    return total / max(1, len(reference))
+
+def run_cases(retriever, cases, k):
+    """경우별 (지연 시간 요약, 결과 목록). 결과는 코드와 파일 단위 값으로 비교합니다."""
+    measured = {}
+    for name, calls in cases.items():
+        samples, results = [], []
+        for call in calls:
+            started = time.perf_counter()
+            found = call(retriever, k)
+            samples.append(time.perf_counter() - started)
+            results.append([(item["code"], tuple(item["metadata"].get(field) for field in FILE_FIELDS)) for item in found])
+        measured[name] = (latency(samples), results)
+    return measured
+
+def make_cases(file_names, queries):
+    """필터 검색 경우: 파일 이름 하나/여러 개로 메타데이터 조회와 벡터 검색"""
+    def lookup(where):
+        return lambda retriever, k: retriever.search_by_metadata(where, limit=100)
+
+    def search(query, where):
+        return lambda retriever, k: retriever.similarity_search(query, k=k, filter_dict=where)
+
+    groups = [file_names[i:i + 5] for i in range(0, len(file_names), 5)]
+    return {
+        "metadata_lookup.file_name": [lookup({"file_name": name}) for name in file_names],
+        "vector_search.file_name": [search(query, {"file_name": name}) for query, name in zip(queries, file_names)],
+        "vector_search.file_name_in": [search(query, {"file_name": {"$in": group}}) for query, group in zip(queries, groups)],
+        "vector_search.type": [search(query, {"type": "header_only"}) for query in queries],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='파일 단위 메타데이터를 파일 테이블로 정규화한 인덱스와 청크마다 저장한 인덱스의 크기와 필터 검색 지연 시간 비교')
+    parser.add_argument('--files', type=int, default=500, help='합성 프로젝트의 헤더 파일 수 (기본값: 500)')
+    parser.add_argument('--queries', type=int, default=50, help='경우마다 쿼리 수 (기본값: 50)')
+    parser.add_argument('--k', type=int, default=10, help='쿼리별 결과 수 (기본값: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_metadata_")
+    results = {"config": vars(args), "stores": {}}
+    try:
+        project_dir = os.path.join(work_dir, "project")
+        results["project"] = generate_project(project_dir, files=args.files, seed=args.seed)
+
+        # 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+        with contextlib.redirect_stdout(sys.stderr):
+            source_dir = os.path.join(work_dir, "source")
+            CodeEmbedder(persist_directory=source_dir, cache_path=None, embedder='hashing', store='chroma').embed_project(project_dir)
+            databases = {}
+            for store in STORES:
+                for layout in ("legacy", "normalized"):
+                    databases[(store, layout)] = os.path.join(work_dir, f"{store}_{layout}")
+                    copy_index(source_dir, databases[(store, layout)], store, rehydrate=layout == "legacy")
+
+        file_table = FileTable.load(source_dir)
+        rng = random.Random(args.seed)
+        file_names = [rng.choice(sorted({attributes["file_name"] for attributes in file_table.files.values()})) for _ in range(args.queries)]
+        queries = [f"{QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)]} {i}" for i in range(args.queries)]
+        cases = make_cases(file_names, queries)
+        results["files"] = len(file_table)
+
+        for store in STORES:
+            layouts = {}
+            outputs = {}
+            for layout in ("legacy", "normalized"):
+                db_dir = databases[(store, layout)]
+                retriever = CodeRetriever(persist_directory=db_dir, cache_path=None, embedder='hashing', store=store)
+                # 첫 실행(파일 테이블/저장소 열기)은 측정에서 제외
+                run_cases(retriever, cases, args.k)
+                measured = run_cases(retriever, cases, args.k)
+                layouts[layout] = {
+                    "chunks": retriever.db._collection.count(),
+                    "index_mb": directory_mb(db_dir),
+                    "metadata_mb": metadata_mb(retriever.db._collection),
+                    "file_table_mb": os.path.getsize(os.path.join(db_dir, FILE_TABLE_FILE)) / (1024 * 1024) if FileTable.exists(db_dir) else 0.0,
+                    "cases": {name: summary for name, (summary, _) in measured.items()},
+                }
+                outputs[layout] = {name: found for name, (_, found) in measured.items()}
+            # 파일 단위 값까지 같은 결과의 비율 (flat은 1.0이어야 함)
+            layouts["result_overlap"] = {name: overlap(outputs["normalized"][name], outputs["legacy"][name]) for name in cases}
+            results["stores"][store] = layouts
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_project import generate_project
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+from flat_store import STORES
+from shards import load_shard_config
+
+QUERY_TEMPLATES = [
+    "student average grade",
+    "add item to the registry",
+    "compute checksum of buffer",
+    "print all records",
+    "parse configuration value",
+    "update cache entry",
+]
+
+def make_queries(count):
+    """벤치마크용 쿼리 목록을 만듭니다."""
+    return [f"{QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)]} {i}" for i in range(count)]
+
+def percentile(values, q):
+    """정렬한 값에서 q 분위수를 반환합니다."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def measure_queries(retriever, queries, k, mode):
+    """쿼리를 하나씩 실행해 지연 시간(ms) p50/p95와 결과 ID 목록을 반환합니다."""
+    latencies = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        found = retriever.similarity_search(query, k=k, mode=mode)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([(result["metadata"].get("cpp_path"), result["code"]) for result in found])
+    return {"p50_ms": percentile(latencies, 0.5), "p95_ms": percentile(latencies, 0.95)}, results
+
+def recall(results, reference):
+    """기준 결과 대비 쿼리별 top-k 겹침 비율의 평균"""
+    total = 0.0
+    for found, expected in zip(results, reference):
+        if expected:
+            total += len(set(found) & set(expected)) / len(set(expected))
+        else:
+            total += float(not found)
+    return total / max(1, len(reference))
+
+def main():
+    parser = argparse.ArgumentParser(description='샤드 수에 따른 인덱싱 시간, 검색 지연 시간, 결과 일치율, 샤드 하나 다시 만들기 시간')
+    parser.add_argument('--files', type=int, default=2000, help='합성 프로젝트의 헤더 파일 수 (기본값: 2000)')
+    parser.add_argument('--shards', type=str, default='1,2,4,8,16', help='측정할 샤드 수 목록 (기본값: 1,2,4,8,16)')
+    parser.add_argument('--store', type=str, choices=STORES, default='flat', help='벡터 저장소 (기본값: flat)')
+    parser.add_argument('--queries', type=int, default=100, help='쿼리 수 (기본값: 100)')
+    parser.add_argument('--k', type=int, default=10, help='쿼리별 결과 수 (기본값: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+
+    args = parser.parse_args()
+    shard_counts = [int(value) for value in args.shards.split(',')]
+
+    work_dir = tempfile.mkdtemp(prefix="bench_shards_")
+    results = {"config": vars(args), "runs": []}
+    try:
+        project_dir = os.path.join(work_dir, "project")
+        results["project"] = generate_project(project_dir, files=args.files, seed=args.seed)
+        queries = make_queries(args.queries)
+        reference = {}
+        for shard_count in shard_counts:
+            db_dir = os.path.join(work_dir, f"db_{shard_count}")
+            embedder = CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing', store=args.store)
+            # 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+            with contextlib.redirect_stdout(sys.stderr):
+                started = time.perf_counter()
+                embedder.embed_project(project_dir, shard_by='hash', shard_count=shard_count)
+                build_seconds = time.perf_counter() - started
+
+                # 샤드 하나만 다시 만드는 시간 (다른 샤드는 그대로)
+                target = sorted(load_shard_config(db_dir)["shards"])[0]
+                started = time.perf_counter()
+                embedder.embed_project(project_dir, rebuild_shards=[target])
+                rebuild_seconds = time.perf_counter() - started
+
+            retriever = CodeRetriever(persist_directory=db_dir, cache_path=None, embedder='hashing')
+            retriever.load_lexical_index()
+            # 첫 쿼리의 저장소 로딩 비용은 제외
+            retriever.similarity_search(queries[0], k=args.k)
+            run = {
+                "shards": shard_count,
+                "chunks": retriever.db._collection.count(),
+                "build_seconds": build_seconds,
+                "rebuild_one_shard_seconds": rebuild_seconds,
+            }
+            for mode in ("vector", "lexical"):
+                latency, found = measure_queries(retriever, queries, args.k, mode)
+                reference.setdefault(mode, found)
+                run[mode] = dict(latency, recall_vs_first=recall(found, reference[mode]))
+            results["runs"].append(run)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_project import generate_project
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+from flat_store import STORES
+
+QUERY_TEMPLATES = [
+    "student average grade",
+    "add item to the registry",
+    "compute checksum of buffer",
+    "print all records",
+    "parse configuration value",
+    "update cache entry",
+]
+
+def make_queries(count):
+    """벤치마크용 쿼리 목록을 만듭니다."""
+    return [f"{QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)]} {i}" for i in range(count)]
+
+def search_all(retriever, queries, k):
+    """쿼리별 결과 청크 목록"""
+    return [[result["code"] for result in retriever.similarity_search(query, k=k)] for query in queries]
+
+def recall(results, reference):
+    """기준 결과 대비 쿼리별 top-k 겹침 비율의 평균"""
+    total = 0.0
+    for found, expected in zip(results, reference):
+        if expected:
+            total += len(set(found) & set(expected)) / len(set(expected))
+        else:
+            total += float(not found)
+    return total / max(1, len(reference))
+
+def timed(call):
+    """call()의 (결과, 경과 시간(초))"""
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='인덱스 스냅샷 내보내기/가져오기 시간과 크기, 다시 인덱싱하는 시간과 비교')
+    parser.add_argument('--files', type=int, default=500, help='합성 프로젝트의 헤더 파일 수 (기본값: 500)')
+    parser.add_argument('--queries', type=int, default=30, help='결과 비교용 쿼리 수 (기본값: 30)')
+    parser.add_argument('--k', type=int, default=10, help='쿼리별 결과 수 (기본값: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_snapshot_")
+    results = {"config": vars(args)}
+    try:
+        project_dir = os.path.join(work_dir, "project")
+        results["project"] = generate_project(project_dir, files=args.files, seed=args.seed)
+        snapshot_path = os.path.join(work_dir, "index.snapshot.zip")
+        queries = make_queries(args.queries)
+
+        def embedder_for(name, store):
+            return CodeEmbedder(persist_directory=os.path.join(work_dir, name), cache_path=None, embedder='hashing', store=store)
+
+        # 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+        with contextlib.redirect_stdout(sys.stderr):
+            source = embedder_for("source", 'chroma')
+            _, results["index_seconds"] = timed(lambda: source.embed_project(project_dir))
+            header, results["export_seconds"] = timed(lambda: source.export_snapshot(snapshot_path))
+        results["chunks"] = header["count"]
+        results["snapshot_mb"] = os.path.getsize(snapshot_path) / (1024 * 1024)
+        reference = search_all(CodeRetriever(persist_directory=source.persist_directory, cache_path=None, embedder='hashing'), queries, args.k)
+
+        results["import"] = {}
+        for store in STORES:
+            target = embedder_for(f"import_{store}", store)
+            _, seconds = timed(lambda: target.import_snapshot(snapshot_path))
+            retriever = CodeRetriever(persist_directory=target.persist_directory, cache_path=None, embedder='hashing')
+            results["import"][store] = {"seconds": seconds, "recall_vs_source": recall(search_all(retriever, queries, args.k), reference)}
+
+        # 스냅샷을 바로 여는 경우: 처음에는 캐시에 풀고, 두 번째부터는 캐시 재사용
+        cache_dir = os.path.join(work_dir, "snapshot_cache")
+        opened = {}
+        for name in ("cold", "warm"):
+            retriever, seconds = timed(lambda: CodeRetriever(cache_path=None, embedder='hashing', snapshot=snapshot_path, snapshot_cache=cache_dir))
+            opened[f"{name}_open_seconds"] = seconds
+        opened["recall_vs_source"] = recall(search_all(retriever, queries, args.k), reference)
+        results["direct"] = opened
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from synthetic_project import generate_project
+from embedding_backends import DEFAULT_EMBEDDER
+
+# 명령행 진입점
+ENTRY_POINTS = ("cpp_chunker", "embedder", "retriever", "retrieval_server")
+
+# 검색 경우를 측정할 임베딩 백엔드 (기본 백엔드 포함)
+STARTUP_EMBEDDERS = (DEFAULT_EMBEDDER, "hashing")
+
+# 시작 시간을 크게 늘리는 무거운 패키지 (진입 경로에서 임포트되는지 기록)
+HEAVY_PACKAGES = ("langchain", "langchain_core", "langchain_community", "langchain_openai", "langchain_text_splitters", "langsmith", "chromadb", "openai")
+
+# 새 프로세스에서 코드를 실행하고 마지막 줄에 임포트된 무거운 패키지를 JSON으로 출력
+PROBE_SCRIPT = """
+import sys, json, contextlib, io
+sys.path.insert(0, {repo!r})
+with contextlib.redirect_stdout(io.StringIO()):
+{body}
+heavy = {heavy!r}
+print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules if name.split('.')[0] in heavy}})))
+"""
+
+def probe(body):
+    """PROBE_SCRIPT로 감싼 python -c 명령"""
+    code = PROBE_SCRIPT.format(repo=REPO_DIR, heavy=HEAVY_PACKAGES, body='\n'.join('    ' + line for line in body.strip().splitlines()))
+    return [sys.executable, "-c", code]
+
+def run_case(command, repeat):
+    """명령을 새 프로세스로 repeat번 실행해 경과 시간(초)의 중앙값/최솟값과 임포트된 무거운 패키지를 반환합니다."""
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    # openai 백엔드의 API 키 확인을 통과시키기 위한 값 (측정하는 경로는 API를 호출하지 않음)
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    samples = []
+    heavy = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run(command, cwd=REPO_DIR, env=env, capture_output=True, text=True)
+        samples.append(time.perf_counter() - started)
+        if completed.returncode != 0:
+            raise RuntimeError(f"실행 실패 ({' '.join(command[:3])}): {completed.stderr.strip()[-500:]}")
+        lines = completed.stdout.strip().splitlines()
+        if lines and lines[-1].startswith('['):
+            heavy = json.loads(lines[-1])
+    samples.sort()
+    result = {"median_seconds": samples[len(samples) // 2], "min_seconds": samples[0]}
+    if heavy is not None:
+        result["heavy_modules"] = heavy
+    return result
+
+def build_databases(work_dir, files):
+    """작은 합성 프로젝트를 hashing 임베딩으로 Chroma와 flat 저장소에 인덱싱합니다."""
+    from embedder import CodeEmbedder
+
+    project_dir = os.path.join(work_dir, "project")
+    generate_project(project_dir, files=files, large_files=0)
+    databases = {}
+    for store in ("chroma", "flat"):
+        databases[store] = os.path.join(work_dir, f"db_{store}")
+        embedder = CodeEmbedder(persist_directory=databases[store], cache_path=None, embedder='hashing', store=store)
+        embedder.embed_project(project_dir)
+    return project_dir, databases
+
+def compare(results, baseline, max_regression):
+    """기준 결과와 중앙값 시작 시간을 비교해 회귀 목록을 반환합니다."""
+    regressions = []
+    for case, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(case, {}).get("median_seconds")
+        if not previous:
+            continue
+        change = (current["median_seconds"] - previous) / previous
+        if change > max_regression:
+            regressions.append({"case": case, "baseline": previous, "current": current["median_seconds"], "change": change})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='진입점별 콜드 스타트 시간 (새 프로세스에서 --help, 임포트, 첫 검색/청킹)')
+    parser.add_argument('--repeat', type=int, default=5, help='경우마다 실행 횟수 (기본값: 5)')
+    parser.add_argument('--files', type=int, default=50, help='검색/청킹용 합성 프로젝트의 헤더 파일 수 (기본값: 50)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+    parser.add_argument('--baseline', type=str, help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='허용하는 시작 시간 증가 비율 (기본값: 0.2)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    results = {"python": platform.python_version(), "platform": platform.platform(), "config": vars(args), "cases": {}}
+    try:
+        # 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+        with contextlib.redirect_stdout(sys.stderr):
+            project_dir, databases = build_databases(work_dir, args.files)
+        sample_header = sorted(
+            os.path.join(root, name) for root, _, names in os.walk(project_dir) for name in names if name.endswith('.h')
+        )[0]
+
+        cases = {}
+        for name in ENTRY_POINTS:
+            cases[f"{name}.help"] = [sys.executable, f"{name}.py", "--help"]
+            cases[f"{name}.import"] = probe(f"import {name}")
+        for store, db_dir in databases.items():
+            # 임베딩 없이 끝나는 검색 (BM25, 메타데이터 조회)
+            # 기본 백엔드(openai)는 임베딩 객체 생성에 langchain 임포트가 따르므로 hashing과 함께 측정
+            for embedder in STARTUP_EMBEDDERS:
+                cases[f"retriever.lexical_query.{store}.{embedder}"] = [
+                    sys.executable, "retriever.py", "--db-dir", db_dir, "--embedder", embedder,
+                    "--no-embedding-cache", "--mode", "lexical", "--query", "compute checksum"
+                ]
+                cases[f"retriever.metadata_lookup.{store}.{embedder}"] = probe(f"""
+from retriever import CodeRetriever
+CodeRetriever({db_dir!r}, cache_path=None, embedder={embedder!r}).search_by_metadata({{"language": "cpp"}}, 5)
+""")
+        cases["cpp_chunker.chunk_file_pair"] = probe(f"""
+from cpp_chunker import chunk_file_pair
+chunk_file_pair({sample_header!r}, None)
+""")
+
+        for name, command in cases.items():
+            print(f"{name} 측정 중...", file=sys.stderr)
+            results["cases"][name] = run_case(command, args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.max_regression)
+        if results["regressions"]:
+            exit_code = 1
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import shutil
+import filecmp
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from synthetic_project import generate_project
+
+# 새 프로세스에서 프로젝트를 청킹하고 경과 시간과 최대 RSS를 잽니다.
+CHUNK_SCRIPT = """
+import sys, time, json, resource, contextlib, io
+sys.path.insert(0, sys.argv[1])
+from cpp_chunker import process_project, stream_threshold_bytes
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    process_project(sys.argv[2], sys.argv[3], output_format='jsonl', stream_threshold=stream_threshold_bytes(float(sys.argv[4])))
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+def build_amalgamation(work_dir, megabytes, seed):
+    """합성 프로젝트의 소스를 이어 붙여 megabytes 크기의 소스 파일 하나(헤더 없음)를 만듭니다."""
+    sources_dir = os.path.join(work_dir, "sources")
+    generate_project(sources_dir, files=200, large_files=0, seed=seed)
+    parts = []
+    for root, _, files in sorted(os.walk(sources_dir)):
+        for name in sorted(files):
+            if name.endswith('.cpp'):
+                with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                    parts.append(f.read())
+    text = ''.join(parts)
+    project_dir = os.path.join(work_dir, "project")
+    os.makedirs(project_dir)
+    path = os.path.join(project_dir, "amalgamation.cpp")
+    target = megabytes * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            f.write(text)
+            written += len(text)
+    return project_dir, os.path.getsize(path)
+
+def measure(project_dir, output_dir, threshold_mb):
+    """새 프로세스에서 청킹 시간과 최대 RSS를 측정합니다."""
+    output = subprocess.run(
+        [sys.executable, "-c", CHUNK_SCRIPT, REPO_DIR, project_dir, output_dir, str(threshold_mb)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='아주 큰 소스 파일의 일반 청킹과 스트리밍 청킹 비교 (시간, 최대 RSS, 결과 동일 여부)')
+    parser.add_argument('--mb', type=int, default=100, help='만들 소스 파일 크기(MB) (기본값: 100)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_streaming_")
+    results = {"config": vars(args)}
+    try:
+        # 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+        with contextlib.redirect_stdout(sys.stderr):
+            project_dir, size = build_amalgamation(work_dir, args.mb, args.seed)
+        results["file_mb"] = size / (1024 * 1024)
+        outputs = {}
+        for name, threshold_mb in (("whole", -1), ("streaming", 0)):
+            outputs[name] = os.path.join(work_dir, name)
+            results[name] = measure(project_dir, outputs[name], threshold_mb)
+        with open(os.path.join(outputs["streaming"], "chunks.jsonl"), 'rb') as f:
+            results["chunks"] = sum(1 for _ in f)
+        results["identical"] = filecmp.cmp(
+            os.path.join(outputs["whole"], "chunks.jsonl"),
+            os.path.join(outputs["streaming"], "chunks.jsonl"),
+            shallow=False
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_project import generate_project
+from cpp_chunker import CHUNKERS, inline_cpp_content, iter_chunked_pairs
+from discovery import discover_project
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+
+# 처리량 지표: 기준 결과보다 이 비율 이상 낮아지면 회귀로 판단
+THROUGHPUT_METRICS = [
+    ("discovery", "files_per_second"),
+    ("inline", "mb_per_second"),
+    ("chunking", "files_per_second"),
+    ("embedding", "chunks_per_second"),
+    ("query", "queries_per_second"),
+]
+
+QUERIES = [
+    "compute student grade",
+    "socket packet session",
+    "render texture mesh",
+    "parser token stream",
+    "update invoice price",
+    "load config engine",
+    "reset queue stack",
+    "find graph edge node",
+]
+
+def peak_rss_mb():
+    """현재 프로세스와 종료된 자식 프로세스의 최대 RSS(MB)를 반환합니다."""
+    # Linux는 KB, macOS는 바이트 단위
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return {"self": own, "children": children}
+
+def percentiles(samples):
+    """지연 시간 리스트(초)의 p50/p95/p99(밀리초)를 계산합니다."""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": ordered[-1] * 1000}
+
+def bench_discovery(project_dir, repeat):
+    """discover_project 탐색 시간을 측정합니다."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pairs, stats = discover_project(project_dir)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return pairs, {
+        "files": len(pairs),
+        "dirs": stats["dirs"],
+        "pruned_dirs": stats["pruned_dirs"],
+        "orphan_sources": stats["orphan_sources"],
+        "seconds": best,
+        "files_per_second": len(pairs) / best if best else 0.0,
+    }
+
+def bench_inline(pairs):
+    """파일 읽기와 inline_cpp_content 인라인 처리 시간을 따로 측정합니다."""
+    read_seconds = 0.0
+    inline_seconds = 0.0
+    total_bytes = 0
+    for header_path, cpp_path in pairs:
+        if header_path is None or cpp_path is None:
+            continue
+        started = time.perf_counter()
+        with open(header_path, 'r', encoding='utf-8') as f:
+            header_content = f.read()
+        with open(cpp_path, 'r', encoding='utf-8') as f:
+            cpp_content = f.read()
+        read_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        inline_cpp_content(header_content, cpp_content)
+        inline_seconds += time.perf_counter() - started
+        total_bytes += len(header_content) + len(cpp_content)
+    return {
+        "mb": total_bytes / (1024 * 1024),
+        "read_seconds": read_seconds,
+        "seconds": inline_seconds,
+        "mb_per_second": total_bytes / (1024 * 1024) / inline_seconds if inline_seconds else 0.0,
+    }
+
+def bench_chunking(pairs, chunk_size, chunk_overlap, jobs, chunker):
+    """청킹 처리량을 측정합니다."""
+    files = 0
+    chunks = 0
+    chars = 0
+    started = time.perf_counter()
+    for _, entry, error in iter_chunked_pairs(pairs, chunk_size, chunk_overlap, jobs, chunker):
+        if error is not None:
+            continue
+        files += 1
+        chunks += len(entry["chunks"])
+        chars += sum(len(chunk) for chunk in entry["chunks"])
+    elapsed = time.perf_counter() - started
+    return {
+        "chunker": chunker,
+        "jobs": jobs,
+        "files": files,
+        "chunks": chunks,
+        "seconds": elapsed,
+        "files_per_second": files / elapsed if elapsed else 0.0,
+        "chunks_per_second": chunks / elapsed if elapsed else 0.0,
+        "mb_per_second": chars / (1024 * 1024) / elapsed if elapsed else 0.0,
+    }
+
+def bench_embedding(project_dir, db_dir, chunk_size, chunk_overlap, chunker):
+    """결정적 로컬 임베딩(hashing)으로 프로젝트 전체 인덱싱 시간을 측정합니다."""
+    embedder = CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing')
+    # DB 초기화(임포트 포함) 비용은 처리량에서 제외
+    started = time.perf_counter()
+    embedder.initialize_db()
+    init_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    embedder.embed_project(project_dir, chunk_size=chunk_size, chunk_overlap=chunk_overlap, chunker=chunker)
+    elapsed = time.perf_counter() - started
+    chunks = embedder.db._collection.count()
+
+    # 바뀐 것이 없는 재실행 (증분 인덱싱 경로)
+    started = time.perf_counter()
+    embedder.embed_project(project_dir, chunk_size=chunk_size, chunk_overlap=chunk_overlap, chunker=chunker)
+    noop_elapsed = time.perf_counter() - started
+    return {
+        "embedder": "hashing",
+        "chunks": chunks,
+        "seconds": elapsed,
+        "chunks_per_second": chunks / elapsed if elapsed else 0.0,
+        "db_init_seconds": init_elapsed,
+        "noop_reindex_seconds": noop_elapsed,
+    }
+
+def bench_query(db_dir, queries, k):
+    """CodeRetriever.similarity_search 지연 시간 분포를 측정합니다."""
+    retriever = CodeRetriever(persist_directory=db_dir, cache_path=None, embedder='hashing')
+    texts = [f"{QUERIES[i % len(QUERIES)]} {i}" for i in range(queries)]
+
+    # 첫 쿼리의 초기화 비용은 따로 기록
+    started = time.perf_counter()
+    retriever.similarity_search(texts[0], k=k)
+    first_ms = (time.perf_counter() - started) * 1000
+
+    samples = []
+    started = time.perf_counter()
+    for text in texts:
+        query_started = time.perf_counter()
+        retriever.similarity_search(text, k=k)
+        samples.append(time.perf_counter() - query_started)
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    retriever.similarity_search_batch(texts, k=k)
+    batch_elapsed = time.perf_counter() - started
+
+    result = {
+        "queries": queries,
+        "k": k,
+        "first_query_ms": first_ms,
+        "queries_per_second": queries / elapsed if elapsed else 0.0,
+        "batch_queries_per_second": queries / batch_elapsed if batch_elapsed else 0.0,
+    }
+    result.update(percentiles(samples))
+    return result
+
+def compare(results, baseline, max_regression):
+    """기준 결과와 처리량을 비교해 회귀 목록을 반환합니다."""
+    regressions = []
+    for stage, metric in THROUGHPUT_METRICS:
+        current = results.get(stage, {}).get(metric)
+        previous = baseline.get(stage, {}).get(metric)
+        if not current or not previous:
+            continue
+        change = (current - previous) / previous
+        if change < -max_regression:
+            regressions.append({"stage": stage, "metric": metric, "baseline": previous, "current": current, "change": change})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='합성 C++ 프로젝트로 탐색/인라인/청킹/임베딩/검색 단계별 성능 측정')
+    parser.add_argument('--project-dir', type=str, help='측정할 프로젝트 디렉토리 (지정하지 않으면 합성 프로젝트 생성)')
+    parser.add_argument('--files', type=int, default=500, help='합성 프로젝트 헤더 파일 수 (기본값: 500)')
+    parser.add_argument('--classes-per-file', type=int, default=2, help='파일당 클래스 수 (기본값: 2)')
+    parser.add_argument('--methods-per-class', type=int, default=8, help='클래스당 메서드 수 (기본값: 8)')
+    parser.add_argument('--header-only-ratio', type=float, default=0.2, help='헤더만 있는 파일 비율 (기본값: 0.2)')
+    parser.add_argument('--large-files', type=int, default=2, help='아주 큰 파일 쌍 수 (기본값: 2)')
+    parser.add_argument('--large-file-kb', type=int, default=1024, help='큰 파일 쌍 하나의 크기(KB) (기본값: 1024)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='청크 크기 (기본값: 1000)')
+    parser.add_argument('--chunk-overlap', type=int, default=200, help='청크 중복 크기 (기본값: 200)')
+    parser.add_argument('--chunker', type=str, choices=CHUNKERS, default='splitter', help='청킹 방식 (기본값: splitter)')
+    parser.add_argument('--jobs', type=int, default=1, help='청킹 워커 프로세스 수 (기본값: 1)')
+    parser.add_argument('--queries', type=int, default=200, help='검색 쿼리 수 (기본값: 200)')
+    parser.add_argument('--k', type=int, default=5, help='쿼리별 결과 수 (기본값: 5)')
+    parser.add_argument('--repeat', type=int, default=3, help='탐색 측정 반복 횟수 (기본값: 3)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로 (기본값: 표준 출력)')
+    parser.add_argument('--baseline', type=str, help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='허용하는 처리량 감소 비율 (기본값: 0.2)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="mcp_chunk_bench_")
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+    }
+    try:
+        # 단계별 진행 메시지는 표준 에러로 보내 표준 출력에는 JSON만 남김
+        with contextlib.redirect_stdout(sys.stderr):
+            project_dir = args.project_dir
+            if project_dir is None:
+                project_dir = os.path.join(work_dir, "project")
+                started = time.perf_counter()
+                results["project"] = generate_project(
+                    project_dir,
+                    files=args.files,
+                    classes_per_file=args.classes_per_file,
+                    methods_per_class=args.methods_per_class,
+                    header_only_ratio=args.header_only_ratio,
+                    large_files=args.large_files,
+                    large_file_kb=args.large_file_kb,
+                    seed=args.seed
+                )
+                results["project"]["generate_seconds"] = time.perf_counter() - started
+
+            pairs, results["discovery"] = bench_discovery(project_dir, args.repeat)
+            results["inline"] = bench_inline(pairs)
+            results["chunking"] = bench_chunking(pairs, args.chunk_size, args.chunk_overlap, args.jobs, args.chunker)
+            results["rss_after_chunking_mb"] = peak_rss_mb()
+
+            db_dir = os.path.join(work_dir, "db")
+            results["embedding"] = bench_embedding(project_dir, db_dir, args.chunk_size, args.chunk_overlap, args.chunker)
+            results["query"] = bench_query(db_dir, args.queries, args.k)
+            results["peak_rss_mb"] = peak_rss_mb()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.max_regression)
+        if results["regressions"]:
+            exit_code = 1
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import json
+import random
+import argparse
+
+# 식별자 생성에 쓰는 단어 목록
+_WORDS = [
+    "student", "grade", "course", "teacher", "school", "record", "report", "score",
+    "buffer", "cache", "index", "node", "graph", "edge", "queue", "stack", "table",
+    "parser", "token", "stream", "config", "engine", "render", "texture", "mesh",
+    "socket", "packet", "session", "user", "account", "order", "invoice", "price",
+]
+_TYPES = ["int", "float", "double", "bool", "std::string", "std::size_t"]
+_VERBS = ["get", "set", "add", "remove", "update", "compute", "find", "load", "save", "reset"]
+
+def _pascal(words):
+    return "".join(word.capitalize() for word in words)
+
+def _camel(words):
+    return words[0] + _pascal(words[1:])
+
+def _make_class(rng, class_name, methods):
+    """클래스 선언과 메서드 정의 문자열을 만듭니다."""
+    fields = [(rng.choice(_TYPES), _camel([rng.choice(_WORDS), rng.choice(_WORDS)]) + "_") for _ in range(rng.randint(2, 6))]
+    signatures = []
+    for _ in range(methods):
+        name = _camel([rng.choice(_VERBS), rng.choice(_WORDS), rng.choice(_WORDS)])
+        return_type = rng.choice(_TYPES + ["void"])
+        params = ", ".join(f"{rng.choice(_TYPES)} {rng.choice(_WORDS)}{i}" for i in range(rng.randint(0, 3)))
+        signatures.append((return_type, name, params))
+
+    decl = [f"// {class_name} 클래스", f"class {class_name} {{", "private:"]
+    decl.extend(f"    {field_type} {field_name};" for field_type, field_name in fields)
+    decl.append("")
+    decl.append("public:")
+    decl.append(f"    {class_name}();")
+    decl.extend(f"    {return_type} {name}({params});" for return_type, name, params in signatures)
+    decl.append("};")
+
+    defs = [f"{class_name}::{class_name}() {{}}", ""]
+    for return_type, name, params in signatures:
+        body = [f"{return_type} {class_name}::{name}({params}) {{"]
+        for line in range(rng.randint(2, 12)):
+            field_type, field_name = rng.choice(fields)
+            if field_type == "std::string":
+                body.append(f'    {field_name} += "{rng.choice(_WORDS)}";')
+            elif field_type == "bool":
+                body.append(f"    {field_name} = !{field_name};")
+            else:
+                body.append(f"    {field_name} = {field_name} + {line};")
+        if rng.random() < 0.3:
+            body.append(f"    for (int i = 0; i < {rng.randint(2, 100)}; ++i) {{")
+            body.append(f"        std::cout << \"{name} \" << i << std::endl;")
+            body.append("    }")
+        if return_type == "void":
+            pass
+        elif return_type == "std::string":
+            body.append(f'    return "{name}";')
+        elif return_type == "bool":
+            body.append("    return true;")
+        else:
+            body.append(f"    return static_cast<{return_type}>(0);")
+        body.append("}")
+        defs.extend(body)
+        defs.append("")
+    return "\n".join(decl), "\n".join(defs)
+
+def _write_pair(directory, stem, rng, classes, methods, header_only):
+    """헤더(와 소스) 파일 한 쌍을 작성하고 작성한 바이트 수를 반환합니다."""
+    guard = f"{stem.upper()}_H"
+    header = [f"#ifndef {guard}", f"#define {guard}", "", "#include <iostream>", "#include <string>", "#include <vector>", ""]
+    source = [f'#include "{stem}.h"', ""]
+    for index in range(classes):
+        class_name = _pascal([rng.choice(_WORDS), rng.choice(_WORDS)]) + f"{stem.capitalize()}{index}"
+        decl, defs = _make_class(rng, class_name, methods)
+        header.append(decl)
+        header.append("")
+        if header_only:
+            header.append(defs)
+        else:
+            source.append(defs)
+    header.append(f"#endif // {guard}")
+
+    written = 0
+    header_text = "\n".join(header) + "\n"
+    with open(os.path.join(directory, f"{stem}.h"), 'w', encoding='utf-8') as f:
+        f.write(header_text)
+    written += len(header_text.encode('utf-8'))
+    if not header_only:
+        source_text = "\n".join(source) + "\n"
+        with open(os.path.join(directory, f"{stem}.cpp"), 'w', encoding='utf-8') as f:
+            f.write(source_text)
+        written += len(source_text.encode('utf-8'))
+    return written
+
+def generate_project(
+    output_dir: str,
+    files: int = 200,
+    classes_per_file: int = 2,
+    methods_per_class: int = 8,
+    header_only_ratio: float = 0.2,
+    large_files: int = 0,
+    large_file_kb: int = 512,
+    files_per_dir: int = 50,
+    seed: int = 0
+):
+    """
+    벤치마크용 합성 C++ 프로젝트를 생성합니다. 같은 인자와 seed는 항상 같은 트리를 만듭니다.
+
+    Args:
+        output_dir (str): 생성할 프로젝트 디렉토리
+        files (int): 헤더 파일 수 (소스 파일은 헤더만 있는 파일을 제외하고 하나씩)
+        classes_per_file (int): 파일당 클래스 수
+        methods_per_class (int): 클래스당 메서드 수
+        header_only_ratio (float): 헤더만 있는 파일의 비율 (0~1)
+        large_files (int): 추가로 만들 아주 큰 파일 쌍의 수
+        large_file_kb (int): 큰 파일 쌍 하나의 대략적인 크기(KB)
+        files_per_dir (int): 하위 디렉토리 하나에 넣을 파일 쌍 수
+        seed (int): 난수 시드
+
+    Returns:
+        dict: 생성한 파일 수와 총 바이트 수
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    stats = {"pairs": 0, "header_only": 0, "large_files": 0, "bytes": 0}
+
+    for index in range(files):
+        directory = os.path.join(output_dir, f"module{index // files_per_dir:03d}")
+        os.makedirs(directory, exist_ok=True)
+        header_only = rng.random() < header_only_ratio
+        stats["bytes"] += _write_pair(directory, f"unit{index:05d}", rng, classes_per_file, methods_per_class, header_only)
+        stats["pairs"] += 1
+        stats["header_only"] += int(header_only)
+
+    if large_files:
+        directory = os.path.join(output_dir, "large")
+        os.makedirs(directory, exist_ok=True)
+        # 클래스 하나(메서드 8개)가 대략 2~3KB이므로 목표 크기에 맞춰 클래스 수를 정함
+        classes = max(1, large_file_kb * 1024 // 2500)
+        for index in range(large_files):
+            stats["bytes"] += _write_pair(directory, f"large{index:03d}", rng, classes, 8, header_only=False)
+            stats["pairs"] += 1
+            stats["large_files"] += 1
+
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='벤치마크용 합성 C++ 프로젝트 생성')
+    parser.add_argument('--output-dir', type=str, required=True, help='생성할 프로젝트 디렉토리')
+    parser.add_argument('--files', type=int, default=200, help='헤더 파일 수 (기본값: 200)')
+    parser.add_argument('--classes-per-file', type=int, default=2, help='파일당 클래스 수 (기본값: 2)')
+    parser.add_argument('--methods-per-class', type=int, default=8, help='클래스당 메서드 수 (기본값: 8)')
+    parser.add_argument('--header-only-ratio', type=float, default=0.2, help='헤더만 있는 파일 비율 (기본값: 0.2)')
+    parser.add_argument('--large-files', type=int, default=0, help='아주 큰 파일 쌍 수 (기본값: 0)')
+    parser.add_argument('--large-file-kb', type=int, default=512, help='큰 파일 쌍 하나의 크기(KB) (기본값: 512)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+
+    args = parser.parse_args()
+
+    stats = generate_project(
+        args.output_dir,
+        files=args.files,
+        classes_per_file=args.classes_per_file,
+        methods_per_class=args.methods_per_class,
+        header_only_ratio=args.header_only_ratio,
+        large_files=args.large_files,
+        large_file_kb=args.large_file_kb,
+        seed=args.seed
+    )
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
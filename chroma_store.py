@@ -0,0 +1,55 @@
+import uuid
+from typing import Dict, List
+
+# langchain Chroma 래퍼가 쓰던 기본 컬렉션 이름 (기존 DB를 그대로 열 수 있도록 유지)
+CHROMA_COLLECTION = "langchain"
+
+class ChromaStore:
+    def __init__(self, persist_directory: str, embedding_function=None, collection_name: str = CHROMA_COLLECTION):
+        """
+        langchain 없이 chromadb 컬렉션을 직접 여는 Chroma 저장소
+
+        langchain Chroma 래퍼와 같은 설정(영구 클라이언트, 컬렉션 임베딩 함수 없음)으로 같은 컬렉션을 열므로
+        래퍼로 만든 기존 DB와 호환되고, 이 저장소에서 쓰는 메서드(add_texts, delete, persist)와
+        _collection을 같은 형태로 제공합니다. chromadb는 저장소를 열 때 임포트합니다.
+
+        Args:
+            persist_directory (str): Chroma DB 저장 디렉토리
+            embedding_function: 문서 임베딩 객체 (add_texts에만 사용)
+            collection_name (str): 컬렉션 이름
+        """
+        import chromadb
+        from chromadb.config import Settings
+
+        self.persist_directory = persist_directory
+        self._embedding_function = embedding_function
+        self._client = chromadb.Client(Settings(is_persistent=True, persist_directory=persist_directory))
+        self._collection = self._client.get_or_create_collection(name=collection_name, embedding_function=None)
+
+    def add_texts(self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None) -> List[str]:
+        """텍스트를 임베딩해 저장합니다. 같은 ID는 교체합니다."""
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        embeddings = self._embedding_function.embed_documents(texts) if self._embedding_function is not None else None
+        self._collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=texts)
+        return ids
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict]) -> None:
+        """
+        청크의 메타데이터를 통째로 교체합니다. (임베딩과 문서는 그대로)
+        chromadb의 update는 기존 메타데이터에 키를 합치므로, 새 메타데이터에 없는 키는 None으로 지웁니다.
+        """
+        existing = self._collection.get(ids=ids, include=["metadatas"])
+        previous = dict(zip(existing["ids"], existing["metadatas"]))
+        replaced = []
+        for chunk_id, metadata in zip(ids, metadatas):
+            stale = {key: None for key in (previous.get(chunk_id) or {}) if key not in metadata}
+            replaced.append({**stale, **metadata})
+        self._collection.update(ids=ids, metadatas=replaced)
+
+    def delete(self, ids: List[str] = None) -> None:
+        """청크를 삭제합니다."""
+        self._collection.delete(ids=ids)
+
+    def persist(self) -> None:
+        """chromadb 0.4부터는 쓰기가 바로 디스크에 반영되므로 할 일이 없습니다. (flat 저장소와 같은 인터페이스용)"""
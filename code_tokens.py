@@ -0,0 +1,48 @@
+import re
+from typing import List
+
+# 식별자 (영문자/밑줄로 시작), 숫자, 한글 단어
+_TOKEN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+|[가-힣]+")
+
+# camelCase / PascalCase / 약어 경계 분리 (예: "HTTPServerError" -> HTTP, Server, Error)
+_SUBWORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+def split_identifier(identifier: str) -> List[str]:
+    """
+    식별자를 snake_case와 camelCase 경계에서 소문자 하위 단어로 나눕니다.
+
+    Args:
+        identifier (str): 식별자 (예: "getStudentInfo", "student_id")
+
+    Returns:
+        List[str]: 하위 단어 리스트 (예: ["get", "student", "info"])
+    """
+    parts = []
+    for piece in identifier.split('_'):
+        if piece:
+            parts.extend(match.lower() for match in _SUBWORD.findall(piece))
+    return parts
+
+def tokenize_code(text: str) -> List[str]:
+    """
+    코드 텍스트를 검색/임베딩용 토큰으로 나눕니다.
+
+    식별자는 소문자 전체 형태와 하위 단어를 모두 내보내므로 "addGrade"는
+    "addgrade", "add", "grade"가 됩니다. 한 글자 토큰은 제외합니다.
+
+    Args:
+        text (str): 코드 텍스트
+
+    Returns:
+        List[str]: 토큰 리스트
+    """
+    tokens = []
+    for match in _TOKEN.findall(text):
+        lowered = match.lower()
+        if len(lowered) > 1:
+            tokens.append(lowered)
+        if match[0].isalpha() or match[0] == '_':
+            subwords = split_identifier(match)
+            if len(subwords) > 1:
+                tokens.extend(word for word in subwords if len(word) > 1)
+    return tokens
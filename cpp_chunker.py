@@ -1,40 +1,104 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 import os
 import re
 from pathlib import Path
 import json
 from datetime import datetime
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from cpp_lexer import chunk_by_units, extract_record_declarations
+from include_graph import IncludeGraph
+from discovery import discover_project, discovery_report, LAYOUTS
+from file_table import make_file_id
+from index_manifest import SourceFingerprint, read_source
+from metrics import METRICS, add_profile_arguments, finish_profiling, start_profiling
+from text_splitter import RecursiveTextSplitter
+from stream_chunker import STREAM_THRESHOLD, StreamingSplitter, iter_file_blocks, iter_inlined_blocks, pair_size
+
+# C++ 코드에 특화된 청크 구분자
+CPP_SEPARATORS = [
+    "\n\n",  # 함수/클래스 간 구분
+    "};",    # 클래스 정의 끝
+    ") {",   # 함수 정의 시작
+    "\n",    # 일반 줄바꿈
+    " ",     # 단어 구분
+    ""
+]
+
+# 이름으로 고르는 구분자 집합: 'cpp'는 C++ 구조 구분자, 'lines'는 빈 줄/줄/단어만 사용하는 일반 구분자
+SEPARATOR_SETS = {
+    'cpp': CPP_SEPARATORS,
+    'lines': ["\n\n", "\n", " ", ""],
+}
+DEFAULT_SEPARATORS = 'cpp'
+
+# 출력 형식: 'json'은 파일별 _chunks.json(청킹한 코드 한 벌 + 청크 오프셋) + 파일별 오프셋 목록만 담은 summary.json,
+# 'jsonl'은 청크마다 한 줄씩 바로 기록하는 chunks.jsonl + 개수/경로만 담은 summary.json
+OUTPUT_FORMATS = ('json', 'jsonl')
+
+# 청킹 방식: 'splitter'는 구분자 기반 분할, 'lexer'는 렉서가 찾은 네임스페이스/클래스/함수 경계 기준 분할
+CHUNKERS = ('splitter', 'lexer')
+
+def _include_lines(content):
+    """
+    앞 공백을 빼면 '#include'로 시작하는 줄의 (시작, 끝) 오프셋을 차례로 냅니다. (끝은 줄바꿈 위치 또는 len(content))
+
+    큰 파일을 줄 단위로 나누지 않고 '#include'가 나오는 위치의 줄만 확인합니다.
+    """
+    pos = content.find('#include')
+    while pos >= 0:
+        line_start = content.rfind('\n', 0, pos) + 1
+        line_end = content.find('\n', pos)
+        if line_end < 0:
+            line_end = len(content)
+        if not content[line_start:pos].strip():
+            yield line_start, line_end
+        pos = content.find('#include', line_end)
+
+def _join_without_includes(parts, content):
+    """'\n'.join(parts + [include 줄을 뺀 content의 줄들])과 같은 결과를 만듭니다."""
+    pieces = ['\n'.join(parts + [''])]
+    cursor = 0
+    for line_start, line_end in _include_lines(content):
+        pieces.append(content[cursor:line_start])
+        cursor = line_end + 1
+    if cursor <= len(content):
+        pieces.append(content[cursor:])
+        return ''.join(pieces)
+    # 마지막 줄이 include면 그 앞 줄바꿈도 뺌 (남은 줄을 '\n'으로 이은 결과와 같게)
+    joined = ''.join(pieces)
+    return joined[:-1] if joined.endswith('\n') else joined
 
 def extract_includes(content):
     """헤더 파일에서 include 문을 추출합니다."""
-    includes = []
-    for line in content.split('\n'):
-        if line.strip().startswith('#include'):
-            includes.append(line.strip())
-    return includes
+    return [content[line_start:line_end].strip() for line_start, line_end in _include_lines(content)]
 
 def extract_class_declaration(content):
-    """클래스 선언부를 추출합니다."""
-    class_pattern = r'class\s+\w+\s*{[^}]*}'
-    matches = re.finditer(class_pattern, content, re.DOTALL)
-    return [match.group(0) for match in matches]
+    """클래스/구조체 선언부 전체를 추출합니다. (인라인 메서드 본문, 중첩 타입, 템플릿 포함)"""
+    return extract_record_declarations(content)
 
-def inline_cpp_content(header_content, cpp_content):
+def inline_cpp_content(header_content, cpp_content, header_info=None):
     """
     헤더와 소스 파일 내용을 인라인화합니다.
     
     Args:
         header_content (str): 헤더 파일 내용
         cpp_content (str): 소스 파일 내용
+        header_info (HeaderInfo): include 그래프에서 이미 파싱한 헤더 정보 (선택사항, 있으면 다시 파싱하지 않음)
     
     Returns:
         str: 인라인화된 코드
     """
-    # 헤더의 include 문 추출
-    includes = extract_includes(header_content)
-    
-    # 클래스 선언 추출
-    class_declarations = extract_class_declaration(header_content)
+    if header_info is not None:
+        includes = header_info.include_lines
+        class_declarations = header_info.declarations
+    else:
+        # 헤더의 include 문 추출
+        includes = extract_includes(header_content)
+        
+        # 클래스 선언 추출
+        class_declarations = extract_class_declaration(header_content)
     
     # 인라인화된 내용 생성
     inline_content = []
@@ -49,14 +113,30 @@ def inline_cpp_content(header_content, cpp_content):
         inline_content.append('')
     
     # 3. 구현부 추가 (include 문 제외)
-    cpp_lines = cpp_content.split('\n')
-    for line in cpp_lines:
-        if not line.strip().startswith('#include'):
-            inline_content.append(line)
+    return _join_without_includes(inline_content, cpp_content)
+
+def create_text_splitter(chunk_size=1000, chunk_overlap=200, separators=DEFAULT_SEPARATORS):
+    """
+    C++ 코드용 텍스트 스플리터를 생성합니다.
+    
+    Args:
+        chunk_size (int): 각 청크의 최대 크기
+        chunk_overlap (int): 청크 간 중복 크기
+        separators (str): 구분자 집합 이름 (SEPARATOR_SETS의 키)
     
-    return '\n'.join(inline_content)
+    Returns:
+        RecursiveTextSplitter: 텍스트 스플리터
+    """
+    if separators not in SEPARATOR_SETS:
+        raise ValueError(f"알 수 없는 구분자 집합: {separators} (선택 가능: {', '.join(SEPARATOR_SETS)})")
+    return RecursiveTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=SEPARATOR_SETS[separators],
+        keep_separator=True,
+    )
 
-def chunk_cpp_code(cpp_name, chunk_size=1000, chunk_overlap=200):
+def chunk_cpp_code(cpp_name, chunk_size=1000, chunk_overlap=200, stream_threshold=STREAM_THRESHOLD):
     """
     C++ 코드를 인라인화하고 청킹하는 함수
     
@@ -64,6 +144,7 @@ def chunk_cpp_code(cpp_name, chunk_size=1000, chunk_overlap=200):
         cpp_name (str): C++ 파일 이름 (확장자 제외)
         chunk_size (int): 각 청크의 최대 크기
         chunk_overlap (int): 청크 간 중복 크기
+        stream_threshold (int): 파일 크기 합이 이보다 크면(바이트) 파일 전체를 읽지 않고 스트리밍으로 청킹
     
     Returns:
         list: 청킹된 코드 조각들
@@ -73,59 +154,540 @@ def chunk_cpp_code(cpp_name, chunk_size=1000, chunk_overlap=200):
     header_path = os.path.join(current_dir, f"{cpp_name}.h")
     cpp_path = os.path.join(current_dir, f"{cpp_name}.cpp")
     
-    # 파일 읽기
-    with open(header_path, 'r', encoding='utf-8') as f:
-        header_content = f.read()
+    # 헤더와 소스를 인라인화해 청킹 (큰 파일은 스트리밍 경로에서 같은 경계로 청킹)
+    _, entry = chunk_file_pair(header_path, cpp_path, chunk_size, chunk_overlap, stream_threshold=stream_threshold)
+    return list(entry['chunks'])
+
+def find_cpp_files(project_dir, discovery_options=None):
+    """
+    프로젝트 디렉토리에서 모든 C++ 파일을 찾습니다.
     
-    with open(cpp_path, 'r', encoding='utf-8') as f:
-        cpp_content = f.read()
+    Args:
+        project_dir (str): 프로젝트 루트 디렉토리 경로
+        discovery_options (dict): discover_project에 넘길 탐색 옵션 (excludes, use_gitignore, layouts 등)
     
-    # 인라인화
-    inlined_code = inline_cpp_content(header_content, cpp_content)
+    Returns:
+        list: (header_path, cpp_path) 튜플의 리스트. 헤더만 있으면 cpp_path, 소스만 있으면 header_path가 None
+    """
+    cpp_files, _ = discover_project(project_dir, **(discovery_options or {}))
+    return cpp_files
+
+def pair_file_name(header_path, cpp_path):
+    """파일 쌍의 이름(확장자 제외)을 반환합니다. 소스만 있는 경우 소스 파일 이름을 사용합니다."""
+    return os.path.splitext(os.path.basename(header_path or cpp_path))[0]
+
+def pair_output_name(header_path, cpp_path, project_dir):
+    """
+    파일 쌍의 출력 이름을 반환합니다. 다른 디렉토리의 같은 이름 파일(a/util.h, b/util.h)이 겹치지 않도록
+    프로젝트 기준 상대 경로(확장자 제외, '/' 구분)를 사용합니다.
+
+    Args:
+        header_path (str): 헤더 파일 경로 (없으면 None)
+        cpp_path (str): 소스 파일 경로 (없으면 None)
+        project_dir (str): 프로젝트 루트 디렉토리 경로
+
+    Returns:
+        str: 출력 이름. 프로젝트 밖의 파일은 파일 이름에 파일 ID를 붙인 이름
+    """
+    path = os.path.abspath(header_path or cpp_path)
+    relative = os.path.relpath(path, os.path.abspath(project_dir)) if project_dir else os.pardir
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep) or os.path.isabs(relative):
+        return f"{pair_file_name(header_path, cpp_path)}_{make_file_id(path)}"
+    return os.path.splitext(relative)[0].replace(os.sep, '/')
+
+def write_chunks_file(output_dir, output_name, entry):
+    """
+    파일별 청크 JSON(<출력 이름>_chunks.json)을 저장합니다. 출력 이름의 하위 디렉토리는 만들어 둡니다.
+
+    Args:
+        output_dir (str): 결과를 저장할 디렉토리 경로
+        output_name (str): pair_output_name으로 만든 출력 이름
+        entry (dict): 청킹 결과
+
+    Returns:
+        str: output_dir 기준 파일별 JSON 경로 ('/' 구분)
+    """
+    chunks_file = f"{output_name}_chunks.json"
+    output_file = os.path.join(output_dir, *chunks_file.split('/'))
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with METRICS.span("output.write"), open(output_file, 'w', encoding='utf-8') as f:
+        dump_json(entry_to_json(entry), f)
+    return chunks_file
+
+class SourceCache:
+    def __init__(self):
+        """
+        파일 쌍을 읽고 인라인화한 코드를 기억해 두는 캐시
+
+        같은 프로젝트를 여러 청킹 설정으로 인덱싱할 때(평가 스윕 등) 파일 읽기, 헤더 파싱, 인라인화,
+        의존 헤더 해석을 설정마다 반복하지 않도록 chunk_file_pair에 넘겨 공유합니다.
+        인라인화한 코드를 모두 메모리에 두므로 스트리밍으로 청킹하는 큰 파일 쌍은 캐시하지 않습니다.
+        """
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0, "bytes": 0}
+
+    def get(self, header_path: str, cpp_path: str):
+        """캐시된 (code, file_type, dependencies, fingerprint)를 반환합니다. 없으면 None"""
+        cached = self.entries.get((header_path, cpp_path))
+        if cached is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return cached
+
+    def put(self, header_path: str, cpp_path: str, code: str, file_type: str, dependencies, fingerprint: SourceFingerprint = None) -> None:
+        """파일 쌍의 인라인화 결과와 읽은 내용의 지문을 저장합니다."""
+        self.entries[(header_path, cpp_path)] = (code, file_type, dependencies, fingerprint)
+        self.stats["bytes"] += len(code)
+
+    def report(self) -> str:
+        """캐시 사용 요약 문자열을 반환합니다."""
+        return (
+            f"소스 캐시: 파일 쌍 {len(self.entries)}개 ({self.stats['bytes'] / (1024 * 1024):.1f}MB), "
+            f"재사용 {self.stats['hits']}회, 새로 읽음 {self.stats['misses']}회"
+        )
+
+class ChunkSpans(Sequence):
+    def __init__(self, source: str, spans: List[Tuple[int, int]]):
+        """
+        청킹한 코드 한 벌과 청크별 (시작, 끝) 오프셋으로 나타낸 청크 목록
+
+        겹침(chunk_overlap) 때문에 청크 문자열을 모두 만들면 같은 코드가 여러 번 복사되므로,
+        코드는 한 번만 두고 청크 텍스트는 꺼낼 때(임베딩, 출력) source[start:end]로 만듭니다.
+        청크 문자열 리스트처럼 len, 인덱싱, 슬라이싱(문자열 리스트 반환), 순회를 지원합니다.
+
+        Args:
+            source (str): 청킹한 코드 (인라인화한 코드 등)
+            spans (List[Tuple[int, int]]): 청크별 (시작, 끝) 오프셋
+        """
+        self.source = source
+        self.spans = spans
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.source[start:end] for start, end in self.spans[index]]
+        start, end = self.spans[index]
+        return self.source[start:end]
+
+    def __iter__(self):
+        for start, end in self.spans:
+            yield self.source[start:end]
+
+    def __repr__(self) -> str:
+        return f"ChunkSpans({len(self.spans)} chunks, {len(self.source)} chars)"
+
+    @property
+    def total_chars(self) -> int:
+        """청크 텍스트 길이 합 (청크 문자열을 만들지 않고 계산)"""
+        return sum(end - start for start, end in self.spans)
+
+def entry_to_json(entry):
+    """
+    청킹 결과(entry)를 파일별 청크 JSON에 쓸 dict로 바꿉니다.
+
+    청크가 ChunkSpans면 청킹한 코드(source)를 한 번만 쓰고 청크는 [시작, 끝] 오프셋 목록(spans)으로 씁니다.
+    스트리밍으로 청킹한 큰 파일은 코드 전체를 메모리에 올리지 않으므로 청크 텍스트 목록(chunks)을 그대로 씁니다.
+
+    Args:
+        entry (dict): chunk_file_pair 결과 (스트리밍 결과는 chunks를 리스트로 모은 뒤 넘김)
+
+    Returns:
+        dict: header_path, cpp_path, type, file_id(파일 테이블과 같은 파일 ID)와 source/spans 또는 chunks를 담은 dict
+    """
+    data = {
+        'header_path': entry['header_path'],
+        'cpp_path': entry['cpp_path'],
+        'type': entry['type'],
+        'file_id': make_file_id(os.path.abspath(entry['header_path'] or entry['cpp_path'])),
+    }
+    chunks = entry['chunks']
+    if isinstance(chunks, ChunkSpans):
+        data['source'] = chunks.source
+        data['spans'] = [[start, end] for start, end in chunks.spans]
+    else:
+        data['chunks'] = list(chunks)
+    for key in ('chunk_meta', 'dependencies', 'streamed'):
+        if key in entry:
+            data[key] = entry[key]
+    return data
+
+# indent로 들여 쓴 JSON에서 여러 줄로 펼쳐진 [시작, 끝] 오프셋 쌍 (JSON 문자열 안에는 실제 줄바꿈이 없으므로 코드와 섞이지 않음)
+_SPAN_PATTERN = re.compile(r'\[\n *(\d+),\n *(\d+)\n *\]')
+
+def dump_json(data, f):
+    """들여 쓴 JSON을 쓰되 오프셋 쌍은 한 줄([시작, 끝])로 씁니다."""
+    f.write(_SPAN_PATTERN.sub(r'[\1, \2]', json.dumps(data, ensure_ascii=False, indent=2)))
+
+def entry_from_json(data):
+    """
+    entry_to_json으로 쓴 dict를 청킹 결과(entry)로 되돌립니다. source/spans는 ChunkSpans로,
+    이전 형식(chunks 텍스트 목록)은 그대로 읽습니다.
+
+    Args:
+        data (dict): 파일별 청크 JSON 내용
+
+    Returns:
+        dict: chunks가 청크 목록인 청킹 결과
+    """
+    entry = {key: value for key, value in data.items() if key not in ('source', 'spans')}
+    if 'spans' in data:
+        entry['chunks'] = ChunkSpans(data['source'], [(start, end) for start, end in data['spans']])
+    return entry
+
+def load_chunks_file(path):
+    """
+    파일별 청크 JSON(_chunks.json)을 읽습니다.
+
+    Args:
+        path (str): _chunks.json 파일 경로
+
+    Returns:
+        dict: chunks가 청크 목록(ChunkSpans 또는 텍스트 리스트)인 청킹 결과
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return entry_from_json(json.load(f))
+
+def _summary_entry(entry, chunks_file):
+    """summary.json의 파일별 항목: 코드와 청크 텍스트 없이 경로, 청크 수, 오프셋 목록만 담음"""
+    data = {
+        'header_path': entry['header_path'],
+        'cpp_path': entry['cpp_path'],
+        'type': entry['type'],
+        'file_id': make_file_id(os.path.abspath(entry['header_path'] or entry['cpp_path'])),
+        'chunk_count': len(entry['chunks']),
+        'chunks_file': chunks_file,
+    }
+    if isinstance(entry['chunks'], ChunkSpans):
+        data['spans'] = [[start, end] for start, end in entry['chunks'].spans]
+    if 'dependencies' in entry:
+        data['dependencies'] = entry['dependencies']
+    return data
+
+def _read_file_pair(header_path, cpp_path, include_graph=None):
+    """
+    파일 쌍을 읽어 청킹할 코드를 만듭니다. 헤더와 소스가 모두 있으면 인라인화합니다.
+
+    Returns:
+        tuple: (code, file_type, dependencies, fingerprint). dependencies는 include_graph가 없으면 None,
+            fingerprint는 읽은 바이트로 계산한 파일 쌍 지문 (SourceFingerprint)
+    """
+    # 파일 읽기 (그래프가 있으면 이미 읽은 헤더를 재사용)
+    header_info = None
+    cpp_content = None
+    with METRICS.span("chunk.read"):
+        if header_path is None:
+            header_content = None
+            fingerprint = SourceFingerprint([None, cpp_path])
+        elif include_graph is not None:
+            header_info = include_graph.parse(header_path)
+            header_content = header_info.content
+            fingerprint = header_info.fingerprint.extend([cpp_path])
+        else:
+            fingerprint = SourceFingerprint([header_path, cpp_path])
+            header_content = read_source(header_path, fingerprint)
+        if cpp_path is not None:
+            cpp_content = read_source(cpp_path, fingerprint)
+        fingerprint.finish()
     
-    # C++ 코드에 특화된 텍스트 스플리터 설정
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=[
-            "\n\n",  # 함수/클래스 간 구분
-            "};",    # 클래스 정의 끝
-            ") {",   # 함수 정의 시작
-            "\n",    # 일반 줄바꿈
-            " ",     # 단어 구분
-            ""
-        ],
-        keep_separator=True,
-    )
+    if header_path is None:
+        # 짝이 되는 헤더가 없는 소스 파일은 소스만 청킹
+        code = cpp_content
+        file_type = 'source_only'
+    elif cpp_path is None:
+        # 헤더 파일만 있는 경우 헤더만 청킹
+        code = header_content
+        file_type = 'header_only'
+    else:
+        # 헤더와 소스 파일이 모두 있는 경우 인라인화
+        with METRICS.span("chunk.inline"):
+            code = inline_cpp_content(header_content, cpp_content, header_info)
+        file_type = 'header_and_source'
+    METRICS.count("chunk.files")
+    METRICS.count("chunk.bytes", len(header_content or '') + len(cpp_content or ''))
     
-    # 코드 청킹
-    chunks = text_splitter.split_text(inlined_code)
-    return chunks
+    dependencies = None
+    if include_graph is not None:
+        with METRICS.span("chunk.dependencies"):
+            dependencies = _pair_dependencies(header_path, cpp_path, include_graph)
+    return code, file_type, dependencies, fingerprint
 
-def find_cpp_files(project_dir):
+def chunk_file_pair(header_path, cpp_path, chunk_size=1000, chunk_overlap=200, text_splitter=None, chunker='splitter', include_graph=None, stream_threshold=None, separators=DEFAULT_SEPARATORS, source_cache=None):
     """
-    프로젝트 디렉토리에서 모든 C++ 파일을 찾습니다.
+    헤더/소스 파일 쌍 하나를 읽어 청킹합니다.
     
     Args:
-        project_dir (str): 프로젝트 루트 디렉토리 경로
+        header_path (str): 헤더 파일 경로 (소스만 있는 경우 None)
+        cpp_path (str): 소스 파일 경로 (헤더만 있는 경우 None)
+        chunk_size (int): 각 청크의 최대 크기
+        chunk_overlap (int): 청크 간 중복 크기
+        text_splitter: 재사용할 텍스트 스플리터 (선택사항)
+        chunker (str): 청킹 방식 ('splitter' 또는 'lexer')
+        include_graph (IncludeGraph): 프로젝트 include 그래프 (선택사항). 있으면 헤더를 그래프의
+            메모이즈된 파싱 결과로 읽고, 파일 쌍이 의존하는 프로젝트 헤더 목록을 dependencies에 담음
+        stream_threshold (int): 파일 크기 합이 이보다 크면(바이트) 스트리밍으로 청킹 (None이면 항상 한 번에 읽음)
+        separators (str): 구분자 집합 이름 (text_splitter가 없을 때 스플리터 생성에 사용)
+        source_cache (SourceCache): 인라인화한 코드를 재사용할 캐시 (선택사항, 같은 include 그래프 설정에서만 공유)
     
     Returns:
-        list: (header_path, cpp_path) 튜플의 리스트. cpp_path는 None일 수 있음
-    """
-    cpp_files = []
-    for root, _, files in os.walk(project_dir):
-        for file in files:
-            if file.endswith('.h'):
-                header_path = os.path.join(root, file)
-                cpp_path = os.path.join(root, file[:-2] + '.cpp')
-                if os.path.exists(cpp_path):
-                    cpp_files.append((header_path, cpp_path))
-                else:
-                    # 헤더 파일만 있는 경우
-                    cpp_files.append((header_path, None))
-    return cpp_files
+        tuple: (file_name, entry). entry는 header_path, cpp_path, chunks, type을 담은 dict.
+            chunks는 청킹한 코드 한 벌과 청크 오프셋으로 나타낸 ChunkSpans (청크 텍스트는 꺼낼 때 만듦).
+            'lexer' 방식이면 청크별 start_line, end_line, symbols를 담은 chunk_meta 리스트가 추가되고,
+            include_graph가 있으면 의존 헤더 경로 리스트 dependencies가 추가됨.
+            fingerprint는 청킹에 사용한 바이트로 계산한 파일 쌍 지문 (인덱스 매니페스트에 기록).
+            스트리밍으로 청킹하면 streamed가 True이고 chunks는 청크를 차례로 만드는 이터레이터
+            (fingerprint는 청크를 끝까지 꺼낸 뒤에 완성됨)
+    """
+    if stream_threshold is not None and pair_size(header_path, cpp_path) > stream_threshold:
+        if text_splitter is None:
+            text_splitter = create_text_splitter(chunk_size, chunk_overlap, separators)
+        return _stream_file_pair(header_path, cpp_path, text_splitter, include_graph)
+    
+    cached = source_cache.get(header_path, cpp_path) if source_cache is not None else None
+    if cached is not None:
+        code, file_type, dependencies, fingerprint = cached
+    else:
+        code, file_type, dependencies, fingerprint = _read_file_pair(header_path, cpp_path, include_graph)
+        if source_cache is not None:
+            source_cache.put(header_path, cpp_path, code, file_type, dependencies, fingerprint)
+    
+    # C++ 코드에 특화된 텍스트 스플리터 설정 (재사용할 스플리터가 없을 때만 생성)
+    if text_splitter is None:
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap, separators)
+    
+    file_name = pair_file_name(header_path, cpp_path)
+    if chunker == 'lexer':
+        # 코드 단위 경계에 맞춰 청킹 (줄 번호는 청킹한 코드 기준)
+        with METRICS.span("chunk.split"):
+            pieces = chunk_by_units(code, chunk_size, chunk_overlap, text_splitter)
+        entry = {
+            'header_path': header_path,
+            'cpp_path': cpp_path,
+            'chunks': ChunkSpans(code, [(piece['start'], piece['end']) for piece in pieces]),
+            'type': file_type,
+            'fingerprint': fingerprint,
+            'chunk_meta': [
+                {'start_line': piece['start_line'], 'end_line': piece['end_line'], 'symbols': piece['symbols']}
+                for piece in pieces
+            ]
+        }
+    else:
+        # 코드 청킹 (오프셋을 계산할 수 없는 스플리터면 청크 텍스트 리스트)
+        with METRICS.span("chunk.split"):
+            if hasattr(text_splitter, 'split_spans'):
+                chunks = ChunkSpans(code, text_splitter.split_spans(code))
+            else:
+                chunks = text_splitter.split_text(code)
+        
+        entry = {
+            'header_path': header_path,
+            'cpp_path': cpp_path,
+            'chunks': chunks,
+            'type': file_type,
+            'fingerprint': fingerprint
+        }
+    METRICS.count("chunk.chunks", len(entry['chunks']))
+    
+    if dependencies is not None:
+        entry['dependencies'] = dependencies
+    return file_name, entry
+
+def _pair_dependencies(header_path, cpp_path, include_graph, streamed=False):
+    """
+    헤더와 소스가 include하는 프로젝트 헤더 목록을 반환합니다. (자기 헤더 제외)
+    streamed면 스트리밍으로 읽는 파일(소스, 헤더만 있으면 헤더)은 내용을 그래프에 남기지 않고 전처리기 줄만 훑습니다.
+    """
+    own_header = os.path.abspath(header_path) if header_path is not None else None
+    dependencies = []
+    if header_path is not None:
+        resolve = include_graph.scan_dependencies if streamed and cpp_path is None else include_graph.dependencies
+        dependencies = [path for path in resolve(header_path) if path != own_header]
+    if cpp_path is not None:
+        resolve = include_graph.scan_dependencies if streamed else include_graph.dependencies
+        for path in resolve(cpp_path):
+            if path != own_header and path not in dependencies:
+                dependencies.append(path)
+    return dependencies
+
+def _stream_file_pair(header_path, cpp_path, text_splitter, include_graph=None):
+    """
+    큰 파일 쌍을 한 번만 훑으며 청킹합니다. 청크 경계는 일반 경로(splitter)와 같습니다.
+    
+    소스는 조각씩 읽으며 #include 줄만 빼고 넘기므로 메모리에는 읽기 블록과 병합 중인 청크만 남습니다.
+    헤더와 소스가 함께 있으면 클래스 선언을 뽑기 위해 헤더만 한 번에 읽습니다.
+    렉서 청킹은 파일 전체가 필요하므로 이 경로에서는 구분자 기반 분할만 사용합니다.
+    
+    Args:
+        header_path (str): 헤더 파일 경로 (소스만 있는 경우 None)
+        cpp_path (str): 소스 파일 경로 (헤더만 있는 경우 None)
+        text_splitter: 청크 크기/겹침 설정이 담긴 텍스트 스플리터
+        include_graph (IncludeGraph): 프로젝트 include 그래프 (선택사항)
+    
+    Returns:
+        tuple: (file_name, entry). entry의 chunks는 청크를 차례로 만드는 이터레이터이고 streamed는 True
+    """
+    fingerprint = SourceFingerprint([header_path, cpp_path])
+    with METRICS.span("chunk.read"):
+        if header_path is None:
+            blocks = iter_file_blocks(cpp_path, fingerprint=fingerprint)
+            file_type = 'source_only'
+        elif cpp_path is None:
+            blocks = iter_file_blocks(header_path, fingerprint=fingerprint)
+            file_type = 'header_only'
+        else:
+            if include_graph is not None:
+                header_info = include_graph.parse(header_path)
+                includes, declarations = header_info.include_lines, header_info.declarations
+                fingerprint = header_info.fingerprint.extend([cpp_path])
+            else:
+                header_content = read_source(header_path, fingerprint)
+                includes, declarations = extract_includes(header_content), extract_class_declaration(header_content)
+            blocks = iter_inlined_blocks(includes, declarations, cpp_path, fingerprint=fingerprint)
+            file_type = 'header_and_source'
+    METRICS.count("chunk.files")
+    METRICS.count("chunk.streamed_files")
+    METRICS.count("chunk.bytes", pair_size(header_path, cpp_path))
+    
+    entry = {
+        'header_path': header_path,
+        'cpp_path': cpp_path,
+        'chunks': _count_chunks(StreamingSplitter(text_splitter).split_blocks(blocks)),
+        'type': file_type,
+        'fingerprint': fingerprint,
+        'streamed': True
+    }
+    if include_graph is not None:
+        with METRICS.span("chunk.dependencies"):
+            entry['dependencies'] = _pair_dependencies(header_path, cpp_path, include_graph, streamed=True)
+    return pair_file_name(header_path, cpp_path), entry
+
+def _count_chunks(chunks):
+    """청크를 그대로 넘기면서 개수를 셉니다."""
+    for chunk in chunks:
+        METRICS.count("chunk.chunks")
+        yield chunk
+
+# 워커 프로세스마다 한 번 생성해 재사용하는 스플리터와 청킹 설정
+_worker_splitter = None
+_worker_options = None
+
+def _init_worker(chunk_size, chunk_overlap, chunker, project_dir=None, include_paths=None, profile=False, separators=DEFAULT_SEPARATORS):
+    """워커 프로세스 초기화: 스플리터와 include 그래프를 한 번만 생성합니다."""
+    global _worker_splitter, _worker_options
+    if profile:
+        METRICS.enable()
+    _worker_splitter = create_text_splitter(chunk_size, chunk_overlap, separators)
+    # 그래프는 프로세스 간에 공유되지 않으므로 워커마다 하나씩 만들어 메모이즈
+    include_graph = IncludeGraph(project_dir, include_paths) if project_dir is not None else None
+    _worker_options = (chunk_size, chunk_overlap, chunker, include_graph)
+
+def _chunk_pair_safe(pair, text_splitter, chunk_size, chunk_overlap, chunker, include_graph=None, stream_threshold=None):
+    """파일 쌍을 청킹하고 (file_name, entry, error)를 반환합니다. 오류는 예외 대신 메시지로 돌려줍니다."""
+    header_path, cpp_path = pair
+    file_name = pair_file_name(header_path, cpp_path)
+    try:
+        file_name, entry = chunk_file_pair(
+            header_path, cpp_path, chunk_size, chunk_overlap, text_splitter, chunker, include_graph, stream_threshold
+        )
+        return file_name, entry, None
+    except Exception as e:
+        return file_name, None, str(e)
+
+def _chunk_batch_in_worker(pairs):
+    """워커 프로세스에서 파일 쌍 묶음을 청킹합니다. 프로파일링 중이면 묶음의 메트릭을 함께 돌려줍니다."""
+    results = [_chunk_pair_safe(pair, _worker_splitter, *_worker_options) for pair in pairs]
+    return results, METRICS.drain() if METRICS.enabled else None
+
+def iter_chunked_pairs(cpp_files, chunk_size=1000, chunk_overlap=200, jobs=1, chunker='splitter', project_dir=None, include_paths=None, stream_threshold=None, separators=DEFAULT_SEPARATORS):
+    """
+    파일 쌍들을 청킹한 결과를 입력 순서대로 돌려줍니다.
+    
+    Args:
+        cpp_files (list): (header_path, cpp_path) 튜플 리스트
+        chunk_size (int): 각 청크의 최대 크기
+        chunk_overlap (int): 청크 간 중복 크기
+        jobs (int): 워커 프로세스 수 (1이면 현재 프로세스에서 처리)
+        chunker (str): 청킹 방식 ('splitter' 또는 'lexer')
+        project_dir (str): 프로젝트 루트 (지정하면 include 그래프로 헤더를 한 번만 파싱하고 의존 헤더를 기록)
+        include_paths (list): 추가 include 검색 경로
+        stream_threshold (int): 파일 크기 합이 이보다 크면(바이트) 스트리밍으로 청킹 (None이면 항상 한 번에 읽음).
+            스트리밍 결과의 chunks는 이터레이터이므로 다음 결과를 받기 전에 소비해야 함
+        separators (str): 구분자 집합 이름 (SEPARATOR_SETS의 키)
+    
+    Yields:
+        tuple: (file_name, entry, error). 실패한 경우 entry는 None
+    """
+    if jobs <= 1 or len(cpp_files) <= 1:
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap, separators)
+        include_graph = IncludeGraph(project_dir, include_paths) if project_dir is not None else None
+        for pair in cpp_files:
+            yield _chunk_pair_safe(pair, text_splitter, chunk_size, chunk_overlap, chunker, include_graph, stream_threshold)
+        return
+    
+    # 스트리밍할 큰 파일 쌍은 이터레이터를 프로세스 간에 넘길 수 없으므로 현재 프로세스에서 처리
+    text_splitter = None
+    include_graph = None
+    
+    def stream_pair(pair):
+        nonlocal text_splitter, include_graph
+        if text_splitter is None:
+            text_splitter = create_text_splitter(chunk_size, chunk_overlap, separators)
+            include_graph = IncludeGraph(project_dir, include_paths) if project_dir is not None else None
+        return [_chunk_pair_safe(pair, text_splitter, chunk_size, chunk_overlap, chunker, include_graph, stream_threshold)]
+    
+    # 작업 전달 오버헤드를 줄이기 위해 여러 파일 쌍을 묶어 전달 (묶음 크기는 최대 64)
+    batch = max(1, min(64, len(cpp_files) // (jobs * 8)))
+    batches = _plan_batches(cpp_files, batch, stream_threshold)
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(chunk_size, chunk_overlap, chunker, project_dir, include_paths, METRICS.enabled, separators)
+    ) as executor:
+        # 진행 중인 묶음 수를 제한해 결과가 메모리에 쌓이지 않게 하고,
+        # 제출 순서대로 결과를 꺼내 직렬 실행과 같은 순서를 보장
+        pending = deque()
+        for pairs in batches:
+            # 큰 파일 쌍은 (header_path, cpp_path) 튜플 그대로 순서를 지켜 대기
+            pending.append(executor.submit(_chunk_batch_in_worker, pairs) if isinstance(pairs, list) else pairs)
+            if len(pending) >= jobs * 2:
+                yield from _take_pending(pending.popleft(), stream_pair)
+        while pending:
+            yield from _take_pending(pending.popleft(), stream_pair)
 
-def process_project(project_dir, output_dir=None, chunk_size=1000, chunk_overlap=200):
+def _plan_batches(cpp_files, batch, stream_threshold=None):
+    """
+    파일 쌍을 워커에 넘길 묶음(리스트)으로 나눕니다. 스트리밍할 큰 파일 쌍은 묶지 않고 튜플 그대로 냅니다.
+    """
+    current = []
+    for pair in cpp_files:
+        if stream_threshold is not None and pair_size(*pair) > stream_threshold:
+            if current:
+                yield current
+                current = []
+            yield pair
+            continue
+        current.append(pair)
+        if len(current) >= batch:
+            yield current
+            current = []
+    if current:
+        yield current
+
+def _take_pending(item, stream_pair):
+    """대기 중인 워커 묶음의 결과나, 현재 프로세스에서 스트리밍한 큰 파일 쌍의 결과를 돌려줍니다."""
+    if isinstance(item, tuple):
+        return stream_pair(item)
+    return _merge_worker_result(item.result())
+
+def _merge_worker_result(result):
+    """워커 묶음 결과의 메트릭을 현재 프로세스에 합치고 청킹 결과를 돌려줍니다."""
+    results, snapshot = result
+    METRICS.merge(snapshot)
+    return results
+
+def process_project(project_dir, output_dir=None, chunk_size=1000, chunk_overlap=200, jobs=1, chunker='splitter', output_format='json', include_paths=None, discovery_options=None, stream_threshold=STREAM_THRESHOLD, separators=DEFAULT_SEPARATORS):
     """
     프로젝트의 모든 C++ 파일을 처리합니다.
     
@@ -134,6 +696,15 @@ def process_project(project_dir, output_dir=None, chunk_size=1000, chunk_overlap
         output_dir (str): 결과를 저장할 디렉토리 경로 (기본값: None)
         chunk_size (int): 각 청크의 최대 크기
         chunk_overlap (int): 청크 간 중복 크기
+        jobs (int): 청킹 워커 프로세스 수 (기본값: 1, 직렬 처리)
+        chunker (str): 청킹 방식 ('splitter' 또는 'lexer')
+        output_format (str): 출력 형식 ('json' 또는 'jsonl'). 'jsonl'은 청크를 만들자마자
+            chunks.jsonl에 한 줄씩 기록하고 메모리에 모아두지 않음
+        include_paths (list): 추가 include 검색 경로 (프로젝트 include 그래프 해석용)
+        discovery_options (dict): discover_project에 넘길 탐색 옵션 (excludes, use_gitignore, layouts 등)
+        stream_threshold (int): 파일 크기 합이 이보다 크면(바이트) 파일 전체를 읽지 않고 스트리밍으로 청킹.
+            'jsonl'이면 청크를 만드는 대로 기록하므로 메모리 사용량이 파일 크기와 무관함 (None이면 사용 안 함)
+        separators (str): 구분자 집합 이름 (SEPARATOR_SETS의 키)
     """
     if output_dir is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -141,115 +712,134 @@ def process_project(project_dir, output_dir=None, chunk_size=1000, chunk_overlap
     
     os.makedirs(output_dir, exist_ok=True)
     
-    cpp_files = find_cpp_files(project_dir)
+    cpp_files, discovery_stats = discover_project(project_dir, **(discovery_options or {}))
+    print(discovery_report(discovery_stats))
+    
+    if output_format == 'jsonl':
+        _process_project_jsonl(project_dir, output_dir, cpp_files, chunk_size, chunk_overlap, jobs, chunker, include_paths, stream_threshold, separators)
+        return
+    
     results = {}
     
-    for header_path, cpp_path in cpp_files:
-        try:
-            # 파일 읽기
-            with open(header_path, 'r', encoding='utf-8') as f:
-                header_content = f.read()
-            
-            # 헤더 파일만 있는 경우
-            if cpp_path is None:
-                # 헤더 파일만 청킹
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=chunk_size,
-                    chunk_overlap=chunk_overlap,
-                    separators=[
-                        "\n\n",  # 함수/클래스 간 구분
-                        "};",    # 클래스 정의 끝
-                        ") {",   # 함수 정의 시작
-                        "\n",    # 일반 줄바꿈
-                        " ",     # 단어 구분
-                        ""
-                    ],
-                    keep_separator=True,
-                )
-                chunks = text_splitter.split_text(header_content)
-                
-                # 결과 저장
-                file_name = os.path.basename(header_path)[:-2]  # .h 제거
-                results[file_name] = {
-                    'header_path': header_path,
-                    'cpp_path': None,
-                    'chunks': chunks,
-                    'type': 'header_only'
-                }
-                
-                # 개별 파일로 저장
-                output_file = os.path.join(output_dir, f"{file_name}_chunks.json")
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'header_path': header_path,
-                        'cpp_path': None,
-                        'chunks': chunks,
-                        'type': 'header_only'
-                    }, f, ensure_ascii=False, indent=2)
-                
-                print(f"처리 완료 (헤더만): {file_name} ({len(chunks)} 청크)")
+    for file_name, entry, error in iter_chunked_pairs(cpp_files, chunk_size, chunk_overlap, jobs, chunker, project_dir, include_paths, stream_threshold, separators):
+        if error is None and entry.get('streamed'):
+            # json 형식은 파일별 결과를 한 번에 저장하므로 청크를 모음 (입력 텍스트는 한 번에 올리지 않음)
+            try:
+                entry['chunks'] = list(entry['chunks'])
+            except Exception as e:
+                error = str(e)
+        if error is not None:
+            print(f"오류 발생 ({file_name}): {error}")
+            continue
+        
+        # 개별 파일로 저장 (코드 한 벌 + 청크 오프셋). 다른 디렉토리의 같은 이름 파일이 겹치지 않도록 상대 경로로 구분
+        output_name = pair_output_name(entry['header_path'], entry['cpp_path'], project_dir)
+        chunks_file = write_chunks_file(output_dir, output_name, entry)
+        
+        # 요약에는 코드와 청크 텍스트 없이 오프셋 목록만 남김 (텍스트는 파일별 JSON에서 읽음)
+        results[output_name] = _summary_entry(entry, chunks_file)
+        
+        if entry['type'] == 'header_only':
+            print(f"처리 완료 (헤더만): {output_name} ({len(entry['chunks'])} 청크)")
+        elif entry['type'] == 'source_only':
+            print(f"처리 완료 (소스만): {output_name} ({len(entry['chunks'])} 청크)")
+        else:
+            print(f"처리 완료 (헤더+소스): {output_name} ({len(entry['chunks'])} 청크)")
+    
+    # 전체 결과 저장
+    summary_file = os.path.join(output_dir, "summary.json")
+    with METRICS.span("output.summary"), open(summary_file, 'w', encoding='utf-8') as f:
+        dump_json({
+            'project_dir': project_dir,
+            'processed_files': len(cpp_files),
+            'results': results
+        }, f)
+    
+    print(f"\n처리 완료: 총 {len(cpp_files)}개 파일")
+    print(f"결과 저장 위치: {output_dir}")
+
+def _process_project_jsonl(project_dir, output_dir, cpp_files, chunk_size, chunk_overlap, jobs, chunker, include_paths=None, stream_threshold=None, separators=DEFAULT_SEPARATORS):
+    """
+    청크를 만들자마자 chunks.jsonl에 한 줄씩 기록합니다. summary.json에는 개수와 경로만 남깁니다.
+    
+    Args:
+        project_dir (str): 프로젝트 루트 디렉토리 경로
+        output_dir (str): 결과를 저장할 디렉토리 경로
+        cpp_files (list): (header_path, cpp_path) 튜플 리스트
+        chunk_size (int): 각 청크의 최대 크기
+        chunk_overlap (int): 청크 간 중복 크기
+        jobs (int): 청킹 워커 프로세스 수
+        chunker (str): 청킹 방식
+        include_paths (list): 추가 include 검색 경로
+        stream_threshold (int): 파일 크기 합이 이보다 크면(바이트) 스트리밍으로 청킹
+        separators (str): 구분자 집합 이름
+    """
+    chunks_file = os.path.join(output_dir, "chunks.jsonl")
+    total_chunks = 0
+    total_chars = 0
+    failed_files = 0
+    
+    with open(chunks_file, 'w', encoding='utf-8') as out:
+        for file_name, entry, error in iter_chunked_pairs(cpp_files, chunk_size, chunk_overlap, jobs, chunker, project_dir, include_paths, stream_threshold, separators):
+            if error is not None:
+                failed_files += 1
+                print(f"오류 발생 ({file_name}): {error}")
                 continue
             
-            # 헤더와 소스 파일이 모두 있는 경우
-            with open(cpp_path, 'r', encoding='utf-8') as f:
-                cpp_content = f.read()
-            
-            # 인라인화
-            inlined_code = inline_cpp_content(header_content, cpp_content)
-            
-            # C++ 코드에 특화된 텍스트 스플리터 설정
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                separators=[
-                    "\n\n",  # 함수/클래스 간 구분
-                    "};",    # 클래스 정의 끝
-                    ") {",   # 함수 정의 시작
-                    "\n",    # 일반 줄바꿈
-                    " ",     # 단어 구분
-                    ""
-                ],
-                keep_separator=True,
-            )
-            
-            # 코드 청킹
-            chunks = text_splitter.split_text(inlined_code)
-            
-            # 결과 저장
-            file_name = os.path.basename(header_path)[:-2]  # .h 제거
-            results[file_name] = {
-                'header_path': header_path,
-                'cpp_path': cpp_path,
-                'chunks': chunks,
-                'type': 'header_and_source'
-            }
-            
-            # 개별 파일로 저장
-            output_file = os.path.join(output_dir, f"{file_name}_chunks.json")
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'header_path': header_path,
-                    'cpp_path': cpp_path,
-                    'chunks': chunks,
-                    'type': 'header_and_source'
-                }, f, ensure_ascii=False, indent=2)
-            
-            print(f"처리 완료 (헤더+소스): {file_name} ({len(chunks)} 청크)")
-            
-        except Exception as e:
-            print(f"오류 발생 ({file_name}): {str(e)}")
+            chunk_meta = entry.get('chunk_meta')
+            spans = entry['chunks'].spans if isinstance(entry['chunks'], ChunkSpans) else None
+            file_id = make_file_id(os.path.abspath(entry['header_path'] or entry['cpp_path']))
+            index = -1
+            try:
+                # 스트리밍 결과는 청크를 만드는 대로 바로 기록
+                for index, chunk in enumerate(entry['chunks']):
+                    record = {
+                        'file_name': file_name,
+                        'header_path': entry['header_path'],
+                        'cpp_path': entry['cpp_path'],
+                        'type': entry['type'],
+                        'file_id': file_id,
+                        'chunk_index': index,
+                        'text': chunk
+                    }
+                    if spans is not None:
+                        # 청킹한 코드에서의 오프셋
+                        record['start'], record['end'] = spans[index]
+                    if chunk_meta:
+                        record.update(chunk_meta[index])
+                    if 'dependencies' in entry:
+                        record['dependencies'] = entry['dependencies']
+                    with METRICS.span("output.write"):
+                        out.write(json.dumps(record, ensure_ascii=False))
+                        out.write('\n')
+                    total_chars += len(chunk)
+            except Exception as e:
+                # 스트리밍 도중 실패하면 이미 기록한 청크는 남김
+                failed_files += 1
+                print(f"오류 발생 ({file_name}): {e}")
+            total_chunks += index + 1
     
-    # 전체 결과 저장
+    # 요약에는 개수와 경로만 저장
     summary_file = os.path.join(output_dir, "summary.json")
     with open(summary_file, 'w', encoding='utf-8') as f:
         json.dump({
             'project_dir': project_dir,
             'processed_files': len(cpp_files),
-            'results': results
+            'failed_files': failed_files,
+            'total_chunks': total_chunks,
+            'total_chars': total_chars,
+            'output_format': 'jsonl',
+            'chunks_file': chunks_file
         }, f, ensure_ascii=False, indent=2)
     
-    print(f"\n처리 완료: 총 {len(cpp_files)}개 파일")
-    print(f"결과 저장 위치: {output_dir}")
+    print(f"\n처리 완료: 총 {len(cpp_files)}개 파일, {total_chunks}개 청크")
+    print(f"결과 저장 위치: {chunks_file}")
+
+def stream_threshold_bytes(megabytes):
+    """--stream-threshold 값(MB)을 바이트로 바꿉니다. 음수면 None(스트리밍 사용 안 함)"""
+    if megabytes is None or megabytes < 0:
+        return None
+    return int(megabytes * 1024 * 1024)
 
 def main():
     import argparse
@@ -259,16 +849,35 @@ def main():
     parser.add_argument('--output-dir', type=str, help='결과를 저장할 디렉토리 경로')
     parser.add_argument('--chunk-size', type=int, default=1000, help='각 청크의 최대 크기')
     parser.add_argument('--chunk-overlap', type=int, default=200, help='청크 간 중복 크기')
+    parser.add_argument('--chunker', type=str, choices=CHUNKERS, default='splitter', help='청킹 방식 (기본값: splitter, lexer는 클래스/함수 경계 기준)')
+    parser.add_argument('--separators', type=str, choices=list(SEPARATOR_SETS), default=DEFAULT_SEPARATORS, help=f'구분자 집합 (기본값: {DEFAULT_SEPARATORS}, lines는 빈 줄/줄 단위만 사용)')
+    parser.add_argument('--output-format', type=str, choices=OUTPUT_FORMATS, default='json', help='출력 형식 (기본값: json, jsonl은 청크를 한 줄씩 스트리밍 기록)')
+    parser.add_argument('--jobs', type=int, default=1, help='청킹 워커 프로세스 수 (기본값: 1, 0이면 CPU 코어 수)')
+    parser.add_argument('--include-path', '-I', action='append', default=[], help='include 검색 경로 (여러 번 지정 가능)')
+    parser.add_argument('--exclude', action='append', help='탐색에서 제외할 경로 패턴 (.gitignore 형식, 여러 번 지정 가능, 지정하면 기본 제외 목록 대신 사용)')
+    parser.add_argument('--no-gitignore', action='store_true', help='.gitignore를 적용하지 않음')
+    parser.add_argument('--layout', action='append', choices=LAYOUTS, help='헤더/소스 짝짓기 방식 (여러 번 지정 가능, 기본값: same, include-src)')
+    parser.add_argument('--stream-threshold', type=float, default=STREAM_THRESHOLD / (1024 * 1024), help=f'파일 쌍 크기가 이보다 크면(MB) 전체를 읽지 않고 스트리밍으로 청킹 (기본값: {STREAM_THRESHOLD // (1024 * 1024)}, 음수면 사용 안 함)')
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    start_profiling(args)
     
     if args.project_dir:
         process_project(
             args.project_dir,
             args.output_dir,
             args.chunk_size,
-            args.chunk_overlap
+            args.chunk_overlap,
+            jobs=args.jobs or os.cpu_count(),
+            chunker=args.chunker,
+            output_format=args.output_format,
+            include_paths=args.include_path,
+            discovery_options={"excludes": args.exclude, "use_gitignore": not args.no_gitignore, "layouts": args.layout},
+            stream_threshold=stream_threshold_bytes(args.stream_threshold),
+            separators=args.separators
         )
+        finish_profiling(args)
     else:
         # 기존 단일 파일 처리 로직
         cpp_name = "student"
@@ -1,5 +1,5 @@
 import os
-import re
+from cpp_lexer import extract_record_declarations
 
 def extract_includes(content):
     """헤더 파일에서 include 문을 추출합니다."""
@@ -10,12 +10,10 @@ def extract_includes(content):
     return includes
 
 def extract_class_declaration(content):
-    """클래스 선언부를 추출합니다."""
-    class_pattern = r'class\s+\w+\s*{[^}]*}'
-    matches = re.finditer(class_pattern, content, re.DOTALL)
-    return [match.group(0) for match in matches]
+    """클래스/구조체 선언부 전체를 추출합니다. (인라인 메서드 본문, 중첩 타입, 템플릿 포함)"""
+    return extract_record_declarations(content)
 
-def inline_cpp_files(header_path, cpp_path, output_path):
+def inline_cpp_files(header_path, cpp_path, output_path, include_graph=None):
     """
     헤더 파일과 소스 파일을 하나의 파일로 인라인화합니다.
     
@@ -23,19 +21,25 @@ def inline_cpp_files(header_path, cpp_path, output_path):
         header_path (str): 헤더 파일 경로
         cpp_path (str): 소스 파일 경로
         output_path (str): 출력 파일 경로
+        include_graph (IncludeGraph): 헤더를 한 번만 파싱해 공유할 include 그래프 (선택사항)
     """
-    # 파일 읽기
-    with open(header_path, 'r', encoding='utf-8') as f:
-        header_content = f.read()
-    
     with open(cpp_path, 'r', encoding='utf-8') as f:
         cpp_content = f.read()
     
-    # 헤더의 include 문 추출
-    includes = extract_includes(header_content)
-    
-    # 클래스 선언 추출
-    class_declarations = extract_class_declaration(header_content)
+    if include_graph is not None:
+        # 이미 파싱한 헤더는 다시 읽지 않음
+        header_info = include_graph.parse(header_path)
+        includes = header_info.include_lines
+        class_declarations = header_info.declarations
+    else:
+        with open(header_path, 'r', encoding='utf-8') as f:
+            header_content = f.read()
+        
+        # 헤더의 include 문 추출
+        includes = extract_includes(header_content)
+        
+        # 클래스 선언 추출
+        class_declarations = extract_class_declaration(header_content)
     
     # 인라인화된 내용 생성
     inline_content = []
@@ -0,0 +1,675 @@
+import re
+import sys
+
+# 후보 문자는 문자 집합 하나로 찾고(정규식 엔진의 빠른 문자 집합 검색), 주석/문자 리터럴/문자열은
+# 그 위치에서만 한 번의 매칭으로 전체를 소비해 토큰 수를 줄임 (종류는 첫 글자로 구분)
+_COMMENT_OR_LITERAL = re.compile(r'//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:[^"\\\n]|\\.)*"?|\'(?:[^\'\\\n]|\\.)*\'?', re.DOTALL)
+# 컨테이너(전역/네임스페이스)에서는 문장 경계를 위해 괄호와 세미콜론도 추적
+_CONTAINER_TOKEN = re.compile(r'[/"\'#{}();]')
+# 주석, 문자열, 중첩 괄호, 중괄호, 전처리기, ';'가 없는 괄호 안 (흔한 매개변수 목록)
+_SIMPLE_PARENS = re.compile(r'[^()/"\'#{};]*\)')
+_RAW_PREFIX = re.compile(r'(?:u8|[uUL])?R$')
+_IDENT_CHAR = re.compile(r'[A-Za-z0-9_]')
+
+_TEMPLATE_PREFIX = re.compile(r'^\s*template\s*<')
+_ATTRIBUTES = re.compile(r'^\s*(?:\[\[.*?\]\]|__attribute__\s*\(\(.*?\)\)|__declspec\s*\(.*?\)|alignas\s*\(.*?\))\s*', re.DOTALL)
+_NAMESPACE = re.compile(r'^\s*(?:inline\s+)?namespace\b\s*([\w:]*)')
+_EXTERN_BLOCK = re.compile(r'^\s*extern\s*"[^"]*"\s*$')
+_RECORD = re.compile(r'^\s*(?:typedef\s+)?(?:export\s+)?(class|struct|union|enum(?:\s+class|\s+struct)?)\b((?:\s+[A-Z_][A-Z0-9_]*(?=\s+\w))*)\s*([\w:]*)')
+# 한정 이름의 각 부분은 템플릿 인자를 가질 수 있음 (예: ns::Box<int>::set, Foo<T>::operator=)
+# (식별자 중간에서는 매칭을 시작하지 않아 검색이 선언부 길이에 비례)
+# 템플릿 인자는 두 단계 중첩까지 괄호 짝을 맞춤 ('Box<T>& Box<T>::f'의 반환 타입을 이름에 붙이지 않도록)
+_TEMPLATE_ARGS = r'<[^<>()]*(?:<[^<>()]*(?:<[^<>()]*>[^<>()]*)*>[^<>()]*)*>'
+_FUNCTION_NAME = re.compile(r'(?<![\w:~])((?:::)?(?:\w+(?:' + _TEMPLATE_ARGS + r')?::)*(?:operator\s*(?:\(\)|[^\s(]+)|~?\w+(?:' + _TEMPLATE_ARGS + r')?))\s*$')
+# 공백/포인터/참조 기호 뒤의 템플릿 인자/연산자가 없는 한정 이름 (흔한 함수 이름)
+_PLAIN_NAME = re.compile(r'(?:::)?(?:\w+::)*~?\w+')
+_WHITESPACE = re.compile(r'\s+')
+# 매개변수 목록 뒤의 생성자 초기화 목록 시작 ':' ('::' 제외)
+_CTOR_INITIALIZER = re.compile(r'(?<!:):(?!:)')
+# 닫는 '}' 또는 ';' 뒤 같은 줄의 주석 (예: '} // namespace x')
+_TRAILING_COMMENT = re.compile(r'[ \t]*(?://[^\n]*|/\*(?:(?!\*/)[^\n])*\*/(?=[ \t]*(?:\n|$)))')
+
+def _chars_except(chars):
+    """
+    chars를 뺀 모든 문자의 정규식 문자 집합을 만듭니다.
+
+    '[^...]'와 같은 뜻이지만 범위로 적으면 정규식 엔진이 비트맵으로 검사해 긴 구간을 두 배 가까이 빨리 건너뜁니다.
+    """
+    ranges = []
+    low = 0
+    for code in sorted(set(map(ord, chars))):
+        if code > low:
+            ranges.append((low, code - 1))
+        low = code + 1
+    ranges.append((low, sys.maxunicode))
+    return '[' + ''.join(re.escape(chr(a)) + ('-' + re.escape(chr(b)) if b > a else '') for a, b in ranges) + ']'
+
+# 함수/클래스 본문에서 중괄호가 아닌 구간: 주석, 문자열, 문자 리터럴, 숫자 구분자, 나눗셈 '/'를 한 번의 매칭으로 소비
+# (각 항목은 첫 글자로 구분되고 끝 위치가 하나로 정해지므로 되돌아가며 다른 해석을 시도하지 않음).
+# 전처리기 줄, raw 문자열, 닫히지 않은 주석 앞에서 멈추면 _find_block_end가 한 토큰씩 처리
+_BODY_RUN_CHARS = _chars_except('{}"\'/#') + '*'
+_STRING_CHARS = _chars_except('"\\\n') + '*'
+_CHAR_CHARS = _chars_except("'\\\n") + '*'
+_BODY_RUN = re.compile(
+    _BODY_RUN_CHARS + r'(?:(?:'
+    + r'(?<!R)"' + _STRING_CHARS + r'(?:\\[\s\S]' + _STRING_CHARS + r')*(?:"|(?=\n)|\Z)'
+    + r"|(?:(?<![A-Za-z0-9_])|(?<=[uUL8]))'" + _CHAR_CHARS + r"(?:\\[\s\S]" + _CHAR_CHARS + r")*(?:'|(?=\n)|\Z)"
+    + r"|(?<=[A-Za-z0-9_])(?<![uUL8])'"
+    + r'|//[^\n]*(?![^\n])|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/(?![/*])'
+    + r')' + _BODY_RUN_CHARS + r')*'
+)
+# 컨테이너에서 주석/문자열/중괄호/전처리기가 없는 흔한 문장 (앞의 주석은 허용, 괄호는 두 단계까지).
+# 그룹 1은 선행 주석을 포함한 문장 시작, 그룹 2는 선언부, 끝은 '{' 또는 ';'
+_HEADER_CHARS = _chars_except('{}();/"\'#') + '*'
+_PARAMS = _HEADER_CHARS + r'(?:\(' + _HEADER_CHARS + r'\)' + _HEADER_CHARS + r')*'
+_SIMPLE_STATEMENT = re.compile(
+    r'\s*((?:(?://[^\n]*(?![^\n])|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/)\s*)*'
+    r'([^{}();/"\'#\s]' + _HEADER_CHARS + r'(?:\(' + _PARAMS + r'\)' + _HEADER_CHARS + r')*))[{;]'
+)
+# 가장 흔한 함수 선언부 ('int ns::A::f(int x) const '). 그룹 1은 함수 이름
+# (템플릿 인자, '=', 속성, 생성자 초기화 목록이 있으면 매칭하지 않고 classify_block_header로 판별.
+# 이름은 마지막 공백/'*'/'&' 뒤의 한정 이름이므로 _function_name의 결과와 같음)
+_SIMPLE_FUNCTION_HEADER = re.compile(
+    r'(?!__attribute__|__declspec|alignas|(?:inline\s+)?namespace\b)[ \t\n*&]*(?:[0-9A-Za-z_:]+[ \t\n*&]+)*'
+    r'((?:::)?(?:[0-9A-Za-z_]+::)*~?[0-9A-Za-z_]+)[ \t\n]*\(' + _PARAMS + r'\)[0-9A-Za-z_ \t\n]*'
+)
+
+# 청크 경계로 사용하는 단위 (namespace는 내부 단위를 담는 컨테이너)
+RECORD_KINDS = ('class', 'struct', 'union', 'enum')
+
+class CodeUnit:
+    __slots__ = ('kind', 'name', 'start', 'end', 'start_line', 'end_line')
+
+    def __init__(self, kind, name, start, end):
+        """
+        렉서가 찾은 최상위 코드 단위
+
+        Args:
+            kind (str): 'namespace', 'class', 'struct', 'union', 'enum', 'function' 중 하나
+            name (str): 네임스페이스를 포함한 심볼 이름 (예: 'school::Student::getName')
+            start (int): 시작 오프셋 (선행 주석/템플릿 선언 포함)
+            end (int): 끝 오프셋 (닫는 '}' 또는 ';' 다음)
+        """
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.end = end
+        self.start_line = 0
+        self.end_line = 0
+
+    def __repr__(self):
+        return f"CodeUnit({self.kind!r}, {self.name!r}, lines {self.start_line}-{self.end_line})"
+
+def _strip_template_prefix(header):
+    """선언 앞의 template<...> 목록과 속성 지정자를 제거합니다."""
+    while True:
+        if '[' in header or '__' in header or 'alignas' in header:
+            header = _ATTRIBUTES.sub('', header, count=1)
+        if 'template' not in header:
+            return header
+        match = _TEMPLATE_PREFIX.match(header)
+        if not match:
+            return header
+        depth = 0
+        for i in range(match.end() - 1, len(header)):
+            ch = header[i]
+            if ch == '<':
+                depth += 1
+            elif ch == '>':
+                depth -= 1
+                if depth == 0:
+                    header = header[i + 1:]
+                    break
+        else:
+            return header
+
+def _paren_outside_template_args(header, pos):
+    """pos 뒤에 템플릿 인자(<...>) 밖의 '('가 있는지 확인합니다. (예: 'S : B<int(int)>'는 함수가 아님)"""
+    if '(' not in header[pos:]:
+        return False
+    depth = 0
+    for i in range(pos, len(header)):
+        ch = header[i]
+        if ch == '<':
+            depth += 1
+        elif ch == '>' and depth:
+            depth -= 1
+        elif ch == '(' and depth == 0:
+            return True
+    return False
+
+def _top_level_paren(header):
+    """괄호 깊이 0에서 처음 나오는 '('의 위치를 반환합니다. 없으면 -1."""
+    first = header.find('(')
+    if '<' not in header[:max(first, 0)]:
+        return first
+    depth = 0
+    for i, ch in enumerate(header):
+        if ch == '<':
+            depth += 1
+        elif ch == '>' and depth:
+            depth -= 1
+        elif ch == '(' and depth == 0:
+            return i
+    return header.find('(')
+
+def _has_ctor_initializer(header):
+    """함수 선언부의 매개변수 목록 뒤에 생성자 초기화 목록(': member{...}')이 시작되었는지 확인합니다."""
+    if ':' not in header:
+        return False
+    paren = _top_level_paren(header)
+    if paren < 0:
+        return False
+    depth = 0
+    for i in range(paren, len(header)):
+        ch = header[i]
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                return _CTOR_INITIALIZER.search(header, i + 1) is not None
+    return False
+
+def _trailing_comment_end(text, end):
+    """end 위치 뒤 같은 줄에 주석만 있으면 그 주석의 끝을, 아니면 end를 반환합니다."""
+    match = _TRAILING_COMMENT.match(text, end)
+    return match.end() if match else end
+
+def _function_name(before):
+    """
+    함수 선언부에서 '(' 앞의 함수 이름을 공백 없이 반환합니다. 찾지 못하면 None.
+
+    마지막 공백/'*'/'&' 뒤가 단순한 한정 이름이면 그대로 쓰고, 템플릿 인자나 연산자 이름이면
+    _FUNCTION_NAME으로 찾습니다. (두 경우 모두 이름은 템플릿 인자 밖의 구분자를 넘지 않으므로 결과가 같음)
+    """
+    tail = before.rstrip()
+    if 'operator' not in tail:
+        start = max(tail.rfind(' '), tail.rfind('\n'), tail.rfind('\t'), tail.rfind('*'), tail.rfind('&')) + 1
+        if _PLAIN_NAME.fullmatch(tail, start):
+            return tail[start:]
+    match = _FUNCTION_NAME.search(before)
+    return _WHITESPACE.sub('', match.group(1)) if match else None
+
+def classify_block_header(header):
+    """
+    '{' 앞의 선언부를 보고 블록 종류와 이름을 판별합니다.
+
+    Args:
+        header (str): 직전 문장 경계부터 '{' 직전까지의 텍스트 (주석 제외)
+
+    Returns:
+        tuple: (kind, name). kind는 'namespace', 'extern', 'class' 등, 'function', 또는 'other'
+    """
+    header = _strip_template_prefix(header)
+
+    match = _NAMESPACE.match(header)
+    if match:
+        return 'namespace', match.group(1)
+    if _EXTERN_BLOCK.match(header):
+        return 'extern', ''
+
+    match = _RECORD.match(header)
+    if match and not _paren_outside_template_args(header, match.end()):
+        kind = match.group(1).split()[0]
+        return kind, match.group(3)
+
+    paren = _top_level_paren(header)
+    if paren < 0:
+        return 'other', ''
+    before = header[:paren]
+    # 'int x = f({...})' 같은 초기화는 함수가 아님 (operator= 는 예외)
+    if '=' in before and 'operator' not in before:
+        return 'other', ''
+    name = _function_name(before)
+    if name is None:
+        return 'other', ''
+    return 'function', name
+
+class _Frame:
+    __slots__ = ('kind', 'name', 'start')
+
+    def __init__(self, kind, name, start):
+        self.kind = kind
+        self.name = name
+        self.start = start
+
+class _LineCounter:
+    __slots__ = ('text', 'pos', 'line')
+
+    def __init__(self, text):
+        """
+        오프셋의 줄 번호(1부터)를 직전 조회 위치부터 줄바꿈을 세어 계산합니다.
+        단위와 청크는 대체로 앞에서부터 조회하므로 줄바꿈 위치 목록을 만들지 않고 str.count로 셉니다.
+        """
+        self.text = text
+        self.pos = 0
+        self.line = 1
+
+    def line_at(self, offset):
+        """offset 위치 문자가 있는 줄 번호"""
+        if offset >= self.pos:
+            self.line += self.text.count('\n', self.pos, offset)
+        else:
+            self.line -= self.text.count('\n', offset, self.pos)
+        self.pos = offset
+        return self.line
+
+def _line_numbers(text, units):
+    """단위들의 시작/끝 줄 번호(1부터)를 채웁니다."""
+    lines = _LineCounter(text)
+    for unit in units:
+        unit.start_line = lines.line_at(unit.start)
+        unit.end_line = lines.line_at(max(unit.start, unit.end - 1))
+
+def _skip_raw_string(text, i):
+    """i 위치의 '"'가 raw 문자열 시작이면 그 끝 위치를, 아니면 None을 반환합니다."""
+    if not i or text[i - 1] != 'R':
+        return None
+    prefix = _RAW_PREFIX.search(text, max(0, i - 3), i)
+    if not prefix or (prefix.start() and _IDENT_CHAR.match(text[prefix.start() - 1])):
+        return None
+    # raw 문자열: R"delim( ... )delim"
+    open_paren = text.find('(', i)
+    if open_paren < 0:
+        return len(text)
+    delimiter = text[i + 1:open_paren]
+    end = text.find(')' + delimiter + '"', open_paren + 1)
+    return len(text) if end < 0 else end + len(delimiter) + 2
+
+def _is_digit_separator(text, i):
+    """i 위치의 작은따옴표가 숫자 구분자(예: 1'000'000)인지 확인합니다."""
+    return bool(i) and text[i - 1] not in 'uUL8' and bool(_IDENT_CHAR.match(text[i - 1]))
+
+def _skip_directive(text, i):
+    """i 위치의 '#'가 줄 맨 앞의 전처리기 지시문이면 연속 줄까지 포함한 끝 위치를, 아니면 None을 반환합니다."""
+    line_start = text.rfind('\n', 0, i) + 1
+    if text[line_start:i].strip():
+        return None
+    end = i
+    while True:
+        end = text.find('\n', end)
+        if end < 0:
+            return len(text)
+        if text[end - 1] == '\\' or (text[end - 1] == '\r' and text[end - 2] == '\\'):
+            end += 1
+            continue
+        return end
+
+def _find_block_end(text, pos):
+    """
+    여는 '{' 다음 위치부터 짝이 맞는 '}'의 위치를 찾습니다.
+
+    본문 안에서는 중괄호 깊이만 세면 되므로, 중괄호 사이의 주석/문자열/리터럴은 _BODY_RUN 한 번의
+    매칭으로 건너뛰고 그 정규식이 멈춘 전처리기 줄/raw 문자열 등만 한 토큰씩 처리합니다.
+
+    Args:
+        text (str): 소스 코드
+        pos (int): 여는 '{' 다음 위치
+
+    Returns:
+        int: 닫는 '}'의 위치. 짝이 없으면 len(text)
+    """
+    depth = 1
+    length = len(text)
+    while True:
+        pos = _BODY_RUN.match(text, pos).end()
+        if pos >= length:
+            return length
+        ch = text[pos]
+        if ch == '}':
+            depth -= 1
+            if depth == 0:
+                return pos
+            pos += 1
+            continue
+        if ch == '{':
+            depth += 1
+            pos += 1
+            continue
+
+        match = _COMMENT_OR_LITERAL.match(text, pos) if ch != '#' else None
+        if ch == '"':
+            raw_end = _skip_raw_string(text, pos)
+            pos = match.end() if raw_end is None else raw_end
+        elif ch == "'":
+            pos = pos + 1 if _is_digit_separator(text, pos) else match.end()
+        elif ch == '#':
+            directive_end = _skip_directive(text, pos)
+            pos = pos + 1 if directive_end is None else directive_end
+        else:
+            # 닫히지 않은 주석은 끝까지
+            pos = pos + 1 if match is None else match.end()
+
+def scan_units(text, line_numbers=True):
+    """
+    C++ 소스를 한 번 훑어 최상위 코드 단위를 찾습니다.
+
+    주석, 문자열/문자 리터럴, raw 문자열, 전처리기 줄을 건너뛰며 중괄호 깊이를 추적합니다.
+    네임스페이스와 extern "C" 블록은 컨테이너로 취급해 그 안의 클래스/함수도 단위로 냅니다.
+    클래스 안에 정의된 멤버 함수는 클래스 단위에 포함되고, 클래스 밖에 정의된 멤버 함수
+    (예: Student::getName)는 별도 함수 단위가 됩니다.
+
+    Args:
+        text (str): C++ 소스 코드
+        line_numbers (bool): 단위의 start_line/end_line을 채울지 여부 (오프셋만 쓰면 False로 생략)
+
+    Returns:
+        list: 시작 위치 순으로 정렬된 CodeUnit 리스트
+    """
+    units = []
+    # 컨테이너(전역/네임스페이스/extern 블록) 스택. 함수/클래스 본문은 _find_block_end로 한 번에 건너뜀
+    stack = [_Frame('root', '', 0)]
+    # 현재 컨테이너에서 진행 중인 문장의 시작 위치와, 주석을 뺀 선언부 조각들
+    stmt_start = None
+    header_parts = []
+    header_from = 0
+    paren_depth = 0
+    # 클래스 정의 뒤 '};' 까지를 단위에 포함시키기 위한 대기 상태: (kind, name, start, '}' 다음 위치)
+    pending_record = None
+
+    # 현재 네임스페이스 접두사 (예: 'a::b::'). 컨테이너 스택이 바뀔 때만 다시 계산
+    scope = ''
+
+    def qualified(name):
+        return scope + name if name else scope[:-2]
+
+    def scope_of(frames):
+        return ''.join(frame.name + '::' for frame in frames if frame.kind == 'namespace' and frame.name)
+
+    pos = 0
+    length = len(text)
+    while pos < length:
+        match = None
+        if stmt_start is None and pending_record is None and not paren_depth and not header_parts:
+            # 흔한 문장은 토큰을 하나씩 보지 않고 '{' 또는 ';'로 바로 이동
+            match = _SIMPLE_STATEMENT.match(text, pos)
+            if match is not None:
+                i = match.end() - 1
+                # 선행 주석은 단위에 포함하고 선언부에서는 뺌
+                header_from = match.start(2)
+                if text[i] == ';':
+                    pos = i + 1
+                    continue
+                token = '{'
+                stmt_start = match.start(1)
+                function = _SIMPLE_FUNCTION_HEADER.fullmatch(text, header_from, i)
+                if function is not None and text.find('operator', header_from, function.end(1)) < 0:
+                    # 흔한 함수 정의는 선언부 판별 없이 바로 본문을 건너뜀
+                    pos = _trailing_comment_end(text, min(length, _find_block_end(text, i + 1) + 1))
+                    units.append(CodeUnit('function', scope + function.group(1), stmt_start, pos))
+                    stmt_start = None
+                    continue
+        if match is None:
+            match = _CONTAINER_TOKEN.search(text, pos)
+            if match is None:
+                break
+            i = match.start()
+            token = text[i]
+
+        if stmt_start is None:
+            # 문장의 첫 번째 의미 있는 문자 (공백 제외, 선행 주석 포함)
+            gap = text[pos:i]
+            if gap.strip():
+                stmt_start = pos + len(gap) - len(gap.lstrip())
+                header_from = stmt_start
+            elif token in '/"\'':
+                stmt_start = header_from = i
+
+        if token in '/"\'':
+            match = _COMMENT_OR_LITERAL.match(text, i)
+
+        if token == '/':
+            if match is None:
+                # 주석이 아닌 '/'(나눗셈)
+                pos = i + 1
+                continue
+            pos = match.end()
+            header_parts.append(text[header_from:i])
+            header_from = pos
+            continue
+
+        if token == '"':
+            raw_end = _skip_raw_string(text, i)
+            pos = match.end() if raw_end is None else raw_end
+            continue
+
+        if token == "'":
+            pos = i + 1 if _is_digit_separator(text, i) else match.end()
+            continue
+
+        if token == '#':
+            end = _skip_directive(text, i)
+            if end is None:
+                pos = i + 1
+                continue
+            if paren_depth == 0:
+                # 전처리기 줄은 문장 경계
+                if pending_record is not None:
+                    units.append(CodeUnit(*pending_record))
+                    pending_record = None
+                stmt_start = None
+                header_parts = []
+            pos = end
+            continue
+
+        pos = i + 1
+
+        if token == '(':
+            simple = _SIMPLE_PARENS.match(text, pos)
+            if simple is not None:
+                # 주석/문자열/중첩 괄호가 없는 매개변수 목록은 ')'까지 한 번에 건너뜀
+                pos = simple.end()
+                continue
+            paren_depth += 1
+            continue
+        if token == ')':
+            paren_depth = max(0, paren_depth - 1)
+            continue
+
+        if token == ';':
+            if paren_depth:
+                continue
+            if pending_record is not None:
+                pos = _trailing_comment_end(text, pos)
+                units.append(CodeUnit(pending_record[0], pending_record[1], pending_record[2], pos))
+                pending_record = None
+            stmt_start = None
+            header_parts = []
+            continue
+
+        if pending_record is not None:
+            # ';' 없이 다른 블록이 시작/종료되면 '}'에서 단위를 끝냄
+            units.append(CodeUnit(*pending_record))
+            pending_record = None
+
+        if token == '}':
+            if len(stack) == 1:
+                # 짝이 맞지 않는 '}'는 무시
+                continue
+            frame = stack.pop()
+            scope = scope_of(stack)
+            # '} // namespace x' 같은 닫는 주석은 닫힌 블록에 붙임
+            pos = _trailing_comment_end(text, pos)
+            if frame.kind == 'namespace':
+                units.append(CodeUnit('namespace', qualified(frame.name), frame.start, pos))
+            stmt_start = None
+            header_parts = []
+            continue
+
+        # token == '{'
+        if paren_depth:
+            # 괄호 안의 중괄호 초기화 (예: f({1, 2}))
+            pos = _find_block_end(text, pos) + 1
+            continue
+
+        header_parts.append(text[header_from:i])
+        header = ''.join(header_parts)
+        kind, name = classify_block_header(header)
+        if kind == 'function' and header.rstrip()[-1:] not in (')', '}') and _has_ctor_initializer(header):
+            # 생성자 초기화 목록의 중괄호 초기화 (예: ': size_{n}, data_{new int[n]} {'):
+            # 본문은 ')' 또는 '}' 바로 뒤의 '{'이므로 그 전까지는 선언부에 포함
+            pos = _find_block_end(text, pos) + 1
+            header_parts = [header]
+            header_from = i
+            continue
+        start = stmt_start if stmt_start is not None else i
+        if kind in ('namespace', 'extern'):
+            stack.append(_Frame(kind, name, start))
+            scope = scope_of(stack)
+            stmt_start = None
+            header_parts = []
+            continue
+
+        end = min(length, _find_block_end(text, pos) + 1)
+        if kind == 'function':
+            end = _trailing_comment_end(text, end)
+        pos = end
+        if kind == 'other':
+            # 초기화 목록 등: 같은 문장이 ';'까지 이어짐
+            header_parts = []
+            header_from = end
+            continue
+
+        if kind == 'function':
+            units.append(CodeUnit('function', qualified(name), start, end))
+        else:
+            # 'class A { ... };' 처럼 ';'까지 포함
+            pending_record = (kind, qualified(name), start, end)
+        stmt_start = None
+        header_parts = []
+
+    if pending_record is not None:
+        units.append(CodeUnit(*pending_record))
+
+    units.sort(key=lambda unit: (unit.start, -unit.end))
+    if line_numbers:
+        _line_numbers(text, units)
+    return units
+
+def extract_record_declarations(content):
+    """
+    클래스/구조체/공용체/열거형 정의 전체를 추출합니다. 중첩 중괄호와 인라인 메서드 본문을 포함합니다.
+
+    Args:
+        content (str): C++ 소스 코드
+
+    Returns:
+        list: 선언 텍스트 리스트
+    """
+    return [content[unit.start:unit.end] for unit in scan_units(content, line_numbers=False) if unit.kind in RECORD_KINDS]
+
+def chunk_by_units(text, chunk_size=1000, chunk_overlap=200, text_splitter=None, units=None):
+    """
+    렉서가 찾은 코드 단위 경계에 맞춰 청크를 만듭니다.
+
+    연속된 단위(와 그 사이 텍스트)를 chunk_size 안에서 묶고, 한 단위가 chunk_size보다 크면
+    text_splitter로 나눕니다. 단위 경계에서 나뉜 청크끼리는 겹치지 않으며, chunk_overlap은
+    큰 단위를 나눌 때만 적용됩니다.
+
+    Args:
+        text (str): C++ 소스 코드
+        chunk_size (int): 각 청크의 최대 크기
+        chunk_overlap (int): 큰 단위를 나눌 때의 청크 간 중복 크기
+        text_splitter: 큰 단위를 나눌 스플리터 (split_text 제공, split_spans가 있으면 오프셋을 그대로 사용)
+        units (list): 미리 계산한 CodeUnit 리스트 (선택사항)
+
+    Returns:
+        list: 각 청크의 dict 리스트. text, start, end(원문 오프셋), start_line, end_line, symbols 키를 가짐
+    """
+    if units is None:
+        units = scan_units(text, line_numbers=False)
+
+    # 컨테이너(namespace)를 제외하고, 다른 단위 안에 들어 있지 않은 단위만 경계로 사용
+    segments = []
+    cursor = 0
+    for unit in units:
+        if unit.kind == 'namespace' or unit.start < cursor:
+            continue
+        if unit.start > cursor and not text[cursor:unit.start].isspace():
+            # 공백뿐인 단위 사이 구간은 청크 경계와 내용(앞뒤 공백 제거 후)에 영향이 없으므로 건너뜀
+            segments.append((cursor, unit.start, None))
+        segments.append((unit.start, unit.end, unit.name or unit.kind))
+        cursor = unit.end
+    if cursor < len(text):
+        segments.append((cursor, len(text), None))
+
+    lines = _LineCounter(text)
+
+    def make_chunk(start, end, symbols):
+        if end <= start:
+            return None
+        # 단위 경계에서 시작/끝나는 청크는 앞뒤가 공백이 아니므로 잘라 볼 필요가 없음
+        if text[start].isspace() or text[end - 1].isspace():
+            body = text[start:end]
+            lead = len(body) - len(body.lstrip())
+            trail = len(body.rstrip())
+            if trail <= lead:
+                return None
+            start, end = start + lead, start + trail
+        return {
+            'text': text[start:end],
+            'start': start,
+            'end': end,
+            'start_line': lines.line_at(start),
+            'end_line': lines.line_at(end - 1),
+            'symbols': symbols,
+        }
+
+    chunks = []
+    group_start = None
+    group_end = None
+    group_symbols = []
+
+    def flush():
+        if group_start is not None:
+            chunk = make_chunk(group_start, group_end, list(group_symbols))
+            if chunk:
+                chunks.append(chunk)
+
+    for start, end, symbol in segments:
+        # 공백을 빼기 전 길이가 chunk_size 이하면 크기 비교에는 앞뒤 공백 제거가 필요 없음
+        size = end - start
+        if size > chunk_size or not symbol:
+            size = len(text[start:end].strip())
+        if size == 0:
+            if group_start is not None:
+                group_end = end
+            continue
+
+        if size > chunk_size:
+            # 한 단위가 너무 크면 스플리터로 나눔
+            flush()
+            group_start, group_end, group_symbols = None, None, []
+            if hasattr(text_splitter, 'split_spans'):
+                # 스플리터가 오프셋을 주면 청크 위치를 다시 찾지 않음
+                spans = [(start + piece_start, start + piece_end) for piece_start, piece_end in text_splitter.split_spans(text[start:end])]
+            elif text_splitter is not None:
+                spans = []
+                search_from = start
+                for piece in text_splitter.split_text(text[start:end]):
+                    piece_start = text.find(piece, search_from, end)
+                    if piece_start < 0:
+                        piece_start = search_from
+                    spans.append((piece_start, piece_start + len(piece)))
+                    search_from = piece_start + 1
+            else:
+                step = max(1, chunk_size - chunk_overlap)
+                spans = [(offset, min(end, offset + chunk_size)) for offset in range(start, end, step)]
+            for piece_start, piece_end in spans:
+                chunk = make_chunk(piece_start, piece_end, [symbol] if symbol else [])
+                if chunk:
+                    chunks.append(chunk)
+            continue
+
+        if group_start is not None and end - group_start > chunk_size and len(text[group_start:end].strip()) > chunk_size:
+            flush()
+            group_start, group_symbols = None, []
+        if group_start is None:
+            group_start = start
+        group_end = end
+        if symbol:
+            group_symbols.append(symbol)
+
+    flush()
+    return chunks
@@ -0,0 +1,368 @@
+import os
+import json
+import zlib
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from code_tokens import tokenize_code
+from file_table import SHARED_ID_FIELD
+
+# 청크 중복 제거 방식
+#   none: 중복 제거 안 함 (파일별 청크 ID)
+#   exact: 내용이 같은 청크를 하나만 임베딩 (기본값)
+#   near: exact + MinHash/LSH로 거의 같은 청크도 하나만 임베딩
+DEDUP_MODES = ('none', 'exact', 'near')
+DEFAULT_DEDUP = 'exact'
+
+DEDUP_INDEX_VERSION = 1
+DEDUP_INDEX_FILE = "dedup_index.json"
+# 저장 청크 메타데이터 형식 버전. 바뀌면 다음 finalize에서 모든 청크의 메타데이터를 한 번 다시 씀
+DEDUP_METADATA_VERSION = 2
+
+DEFAULT_NEAR_THRESHOLD = 0.9
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 8
+SHINGLE_SIZE = 5
+
+# 64비트 곱셈-시프트 해시의 모듈러 (numpy uint64 곱셈은 2^64에서 자연스럽게 넘침)
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+def content_id(text: str) -> str:
+    """
+    청크 내용으로 결정적 ID를 만듭니다. 내용이 같으면 어느 파일에서 나왔든 같은 ID입니다.
+
+    Args:
+        text (str): 청크 텍스트
+
+    Returns:
+        str: 청크 ID ("c-" 접두사로 파일별 청크 ID와 구분)
+    """
+    return "c-" + hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class MinHasher:
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, shingle_size: int = SHINGLE_SIZE, seed: int = 1):
+        """
+        식별자 토큰 shingle 집합의 MinHash 서명을 계산합니다.
+
+        Args:
+            num_perm (int): 해시 함수(순열) 수
+            shingle_size (int): shingle 하나의 토큰 수
+            seed (int): 해시 계수 난수 시드 (서명을 저장해 재사용하므로 고정)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # 곱셈-시프트 해시 h(x) = ((a * x + b) mod 2^64) >> 32, a는 홀수
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        텍스트의 MinHash 서명을 계산합니다.
+
+        Args:
+            text (str): 청크 텍스트
+
+        Returns:
+            np.ndarray: (num_perm,) uint32 서명. 토큰이 shingle 두 개를 만들 만큼 없으면 None
+        """
+        tokens = tokenize_code(text)
+        count = len(tokens) - self.shingle_size + 1
+        # 너무 짧은 청크(닫는 괄호 등)는 유사도를 믿을 수 없으므로 정확히 같은 경우만 합침
+        if count < 2:
+            return None
+        shingles = {
+            zlib.crc32('\0'.join(tokens[i:i + self.shingle_size]).encode('utf-8'))
+            for i in range(count)
+        }
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return (hashed.min(axis=0) & _MASK_32).astype(np.uint32)
+
+def _location_label(file_key: str, index: int, metadata: Dict) -> str:
+    """위치를 "경로:시작줄-끝줄" (줄 범위가 없으면 "경로#청크 순번") 문자열로 만듭니다."""
+    if "start_line" in metadata and "end_line" in metadata:
+        return f"{file_key}:{metadata['start_line']}-{metadata['end_line']}"
+    return f"{file_key}#{index}"
+
+def _metadata_digest(metadata: Dict) -> str:
+    """저장소에 쓴 메타데이터가 바뀌었는지 비교하기 위한 짧은 해시"""
+    return hashlib.sha1(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+class ChunkDeduplicator:
+    def __init__(
+        self,
+        path: str = None,
+        mode: str = DEFAULT_DEDUP,
+        threshold: float = DEFAULT_NEAR_THRESHOLD,
+        num_perm: int = MINHASH_PERMUTATIONS,
+        bands: int = MINHASH_BANDS
+    ):
+        """
+        청킹과 임베딩 사이에서 중복 청크를 하나로 합치는 색인
+
+        저장된 청크 ID마다 그 청크가 나타나는 모든 위치(파일 키, 청크 순번, 파일 메타데이터)를 기록합니다.
+        위치가 하나도 남지 않은 청크는 finalize()에서 삭제 대상으로, 위치가 바뀐 청크는 메타데이터 갱신 대상으로 돌려줍니다.
+
+        Args:
+            path (str): 색인 파일 경로 (None이면 저장하지 않음)
+            mode (str): 'exact' 또는 'near'
+            threshold (float): near 모드에서 같은 청크로 볼 최소 추정 Jaccard 유사도
+            num_perm (int): MinHash 순열 수
+            bands (int): LSH 밴드 수 (num_perm의 약수)
+        """
+        if mode not in DEDUP_MODES or mode == 'none':
+            raise ValueError(f"알 수 없는 중복 제거 방식: {mode} (선택 가능: exact, near)")
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.path = path
+        self.mode = mode
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm) if mode == 'near' else None
+        # 청크 ID -> {"locations": [[파일 키, 청크 순번, 메타데이터], ...], "sig": 서명 hex 또는 None,
+        #            "row": 저장소에 마지막으로 쓴 메타데이터의 해시}
+        self.entries = {}
+        self._buckets = {}
+        self._signatures = {}
+        self._touched = set()
+        self.stats = {"chunks": 0, "unique": 0, "exact": 0, "near": 0}
+
+    @classmethod
+    def load(cls, persist_directory: str, mode: str = DEFAULT_DEDUP, threshold: float = DEFAULT_NEAR_THRESHOLD):
+        """
+        DB 디렉토리에서 색인을 읽습니다. 파일이 없거나 버전이 다르면 빈 색인을 반환합니다.
+
+        Args:
+            persist_directory (str): Chroma DB 저장 디렉토리
+            mode (str): 'exact' 또는 'near'
+            threshold (float): near 모드 유사도 임계값
+
+        Returns:
+            ChunkDeduplicator: 색인
+        """
+        index = cls(os.path.join(persist_directory, DEDUP_INDEX_FILE), mode, threshold)
+        if not os.path.exists(index.path):
+            return index
+        with open(index.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != DEDUP_INDEX_VERSION:
+            return index
+        index.entries = data.get("entries", {})
+        if data.get("metadata_version") != DEDUP_METADATA_VERSION:
+            # 이전 형식으로 쓴 메타데이터(shared_id 없음 등)는 해시가 없는 항목처럼 다시 씀
+            for entry in index.entries.values():
+                entry.pop("row", None)
+        if index.hasher is not None:
+            for chunk_id, entry in index.entries.items():
+                if entry.get("sig"):
+                    index._add_to_buckets(chunk_id, np.frombuffer(bytes.fromhex(entry["sig"]), dtype=np.uint32))
+        return index
+
+    def save(self) -> None:
+        """색인을 원자적으로 저장합니다."""
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": DEDUP_INDEX_VERSION, "metadata_version": DEDUP_METADATA_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def release(self, file_key: str, chunk_ids: List[str]) -> List[str]:
+        """
+        파일 쌍이 참조하던 청크에서 그 파일의 위치를 제거합니다. 변경되거나 삭제된 파일에 호출합니다.
+
+        Args:
+            file_key (str): 파일 쌍 키
+            chunk_ids (List[str]): 매니페스트에 기록된 그 파일의 청크 ID
+
+        Returns:
+            List[str]: 이 색인이 모르는 청크 ID (중복 제거 전에 저장된 파일별 청크, 바로 삭제해도 됨)
+        """
+        untracked = []
+        for chunk_id in set(chunk_ids):
+            entry = self.entries.get(chunk_id)
+            if entry is None:
+                untracked.append(chunk_id)
+                continue
+            entry["locations"] = [location for location in entry["locations"] if location[0] != file_key]
+            self._touched.add(chunk_id)
+        return untracked
+
+    def assign(self, file_key: str, index: int, text: str, metadata: Dict) -> Tuple[str, bool]:
+        """
+        청크 하나의 저장 ID를 정합니다. 같은(또는 거의 같은) 청크가 이미 있으면 위치만 추가합니다.
+
+        Args:
+            file_key (str): 파일 쌍 키
+            index (int): 파일 내 청크 순번
+            text (str): 청크 텍스트
+            metadata (Dict): 이 위치의 청크 메타데이터
+
+        Returns:
+            tuple: (저장 ID, 새로 임베딩해야 하면 True)
+        """
+        self.stats["chunks"] += 1
+        chunk_id = content_id(text)
+        entry = self.entries.get(chunk_id)
+        signature = None
+        if entry is not None:
+            self.stats["exact"] += 1
+            if self.hasher is not None and entry.get("sig") is None:
+                # exact 모드로 만든 청크를 near 모드에서도 찾을 수 있게 서명 보충
+                signature = self.hasher.signature(text)
+                if signature is not None:
+                    entry["sig"] = signature.tobytes().hex()
+                    self._add_to_buckets(chunk_id, signature)
+            self._add_location(chunk_id, file_key, index, metadata)
+            return chunk_id, False
+
+        if self.hasher is not None:
+            signature = self.hasher.signature(text)
+            match = self._find_near(signature) if signature is not None else None
+            if match is not None:
+                self.stats["near"] += 1
+                self._add_location(match, file_key, index, {**metadata, "near_duplicate": True})
+                return match, False
+
+        self.stats["unique"] += 1
+        self.entries[chunk_id] = {
+            "locations": [],
+            "sig": signature.tobytes().hex() if signature is not None else None,
+        }
+        if signature is not None:
+            self._add_to_buckets(chunk_id, signature)
+        self._add_location(chunk_id, file_key, index, metadata)
+        return chunk_id, True
+
+    def drop(self, chunk_id: str) -> List[str]:
+        """
+        저장하지 못한 청크(임베딩 실패)를 색인에서 지웁니다.
+
+        Returns:
+            List[str]: 그 청크를 참조하던 파일 키 (다음 실행에서 다시 처리해야 함)
+        """
+        entry = self.entries.pop(chunk_id, None)
+        self._touched.discard(chunk_id)
+        if entry is None:
+            return []
+        self._remove_from_buckets(chunk_id, entry)
+        return sorted({location[0] for location in entry["locations"]})
+
+    def finalize(self) -> Tuple[List[str], Dict[str, Dict]]:
+        """
+        이번 실행에서 위치가 바뀐 청크를 정리합니다.
+
+        저장 청크의 메타데이터(file_id 등 청크별 값)는 현재 첫 위치에서 다시 만들므로, 처음 청크를 만든 파일이
+        빠지면 남은 파일의 값으로 바뀝니다. 저장소에 마지막으로 쓴 메타데이터의 해시("row")와 다를 때만 갱신하며,
+        해시가 없는 항목(이전 형식 색인)도 한 번 다시 씁니다.
+
+        Returns:
+            tuple: (위치가 남지 않아 삭제할 청크 ID 리스트, {청크 ID: 새 메타데이터})
+        """
+        deleted = []
+        updates = {}
+        pending = self._touched | {chunk_id for chunk_id, entry in self.entries.items() if "row" not in entry}
+        for chunk_id in sorted(pending):
+            entry = self.entries.get(chunk_id)
+            if entry is None:
+                continue
+            if not entry["locations"]:
+                self._remove_from_buckets(chunk_id, entry)
+                del self.entries[chunk_id]
+                deleted.append(chunk_id)
+                continue
+            metadata = self.stored_metadata(chunk_id)
+            row = _metadata_digest(metadata)
+            if entry.get("row") != row:
+                updates[chunk_id] = metadata
+                entry["row"] = row
+        self._touched.clear()
+        return deleted, updates
+
+    def stored_metadata(self, chunk_id: str) -> Dict:
+        """
+        저장 청크의 메타데이터를 만듭니다. 첫 위치의 메타데이터에 모든 위치 목록을 더합니다.
+        다른 파일에도 위치가 있으면 파일 단위 필터가 그 파일로도 고를 수 있도록 자기 ID(shared_id)를 기록합니다.
+
+        Args:
+            chunk_id (str): 저장 청크 ID
+
+        Returns:
+            Dict: Chroma 메타데이터 (locations는 "; "로 이은 문자열)
+        """
+        locations = self.entries[chunk_id]["locations"]
+        metadata = dict(locations[0][2])
+        metadata.pop("near_duplicate", None)
+        metadata["locations"] = "; ".join(_location_label(key, index, meta) for key, index, meta in locations)
+        metadata["duplicate_count"] = len(locations)
+        first_file = locations[0][2].get("file_id")
+        if any(meta.get("file_id") != first_file for _, _, meta in locations[1:]):
+            metadata[SHARED_ID_FIELD] = chunk_id
+        return metadata
+
+    def shared_chunks(self) -> Dict[str, List[str]]:
+        """
+        파일별로, 그 파일이 첫 위치가 아닌 위치로 들어 있는 저장 청크 ID 목록을 만듭니다. (파일 테이블의 필터 변환용)
+
+        Returns:
+            Dict[str, List[str]]: 파일 ID -> 청크 ID 리스트
+        """
+        shared = {}
+        for chunk_id, entry in self.entries.items():
+            locations = entry["locations"]
+            if not locations:
+                continue
+            first_file = locations[0][2].get("file_id")
+            for _, _, meta in locations[1:]:
+                file_id = meta.get("file_id")
+                if file_id is not None and file_id != first_file:
+                    shared.setdefault(file_id, []).append(chunk_id)
+        return {file_id: sorted(set(chunk_ids)) for file_id, chunk_ids in sorted(shared.items())}
+
+    def report(self) -> str:
+        """중복 제거 요약 문자열을 반환합니다."""
+        return (
+            f"중복 제거({self.mode}): 청크 {self.stats['chunks']}개 중 새 청크 {self.stats['unique']}개, "
+            f"완전 중복 {self.stats['exact']}개, 유사 중복 {self.stats['near']}개"
+        )
+
+    def _add_location(self, chunk_id: str, file_key: str, index: int, metadata: Dict) -> None:
+        self.entries[chunk_id]["locations"].append([file_key, index, metadata])
+        self._touched.add(chunk_id)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _add_to_buckets(self, chunk_id: str, signature: np.ndarray) -> None:
+        self._signatures[chunk_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(chunk_id)
+
+    def _remove_from_buckets(self, chunk_id: str, entry: Dict) -> None:
+        signature = self._signatures.pop(chunk_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(chunk_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _find_near(self, signature: np.ndarray) -> Optional[str]:
+        """LSH 후보 중 추정 Jaccard 유사도가 임계값 이상인 가장 비슷한 청크를 찾습니다."""
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        best_id, best_score = None, self.threshold
+        for candidate in sorted(candidates):
+            score = float(np.mean(self._signatures[candidate] == signature))
+            if score >= best_score:
+                best_id, best_score = candidate, score
+        return best_id
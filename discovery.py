@@ -0,0 +1,407 @@
+import os
+import re
+import time
+from typing import Dict, List, Tuple
+
+from metrics import METRICS
+
+# 헤더/소스로 인식하는 확장자 (소문자 비교)
+HEADER_EXTENSIONS = ('.h', '.hh', '.hpp', '.hxx')
+SOURCE_EXTENSIONS = ('.cpp', '.cc', '.cxx')
+
+# 기본으로 탐색하지 않는 디렉토리 (.gitignore 형식, 끝의 '/'는 디렉토리에만 적용)
+#   숨김 디렉토리(.git 등), 빌드 출력, 외부 라이브러리, 이전 청킹 결과
+DEFAULT_EXCLUDES = (
+    '.*/',
+    'build/',
+    'cmake-build-*/',
+    'third_party/',
+    'node_modules/',
+    '__pycache__/',
+    'chunks_*/',
+)
+
+# 헤더와 소스를 짝짓는 방식
+#   same: 같은 디렉토리의 같은 이름 (foo.h + foo.cpp)
+#   include-src: include/ 아래 헤더와 src/ 아래 소스 (include/a/foo.h + src/a/foo.cpp 또는 src/foo.cpp)
+#   stem: 프로젝트 전체에서 이름이 하나뿐인 헤더와 소스
+LAYOUTS = ('same', 'include-src', 'stem')
+DEFAULT_LAYOUTS = ('same', 'include-src')
+
+INCLUDE_DIR_NAMES = ('include', 'inc')
+SOURCE_DIR_NAMES = ('src', 'source')
+
+def _translate_glob(glob: str) -> str:
+    """.gitignore 글롭 패턴을 정규식 문자열로 바꿉니다."""
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif glob.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif c == '*':
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = glob.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end + 1
+        elif c == '\\' and i + 1 < len(glob):
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
+
+def parse_ignore_patterns(lines) -> List[Tuple]:
+    """
+    .gitignore 형식의 줄들을 규칙 리스트로 바꿉니다.
+
+    Args:
+        lines (Iterable[str]): 패턴 줄 (빈 줄과 '#' 주석은 무시)
+
+    Returns:
+        List[Tuple]: (정규식, 부정 여부, 디렉토리 전용 여부) 리스트
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # 중간에 '/'가 있으면 .gitignore가 있는 디렉토리 기준, 없으면 모든 깊이의 이름과 비교
+        anchored = '/' in line
+        line = line.lstrip('/')
+        pattern = ('' if anchored else '(?:.*/)?') + _translate_glob(line) + '$'
+        rules.append((re.compile(pattern), negate, dir_only))
+    return rules
+
+def _is_ignored(rule_sets, rel_path: str, is_dir: bool) -> bool:
+    """상위 디렉토리들의 규칙을 순서대로 적용합니다. 마지막으로 일치한 규칙이 결과를 정합니다."""
+    ignored = False
+    for base, rules in rule_sets:
+        if base:
+            if not rel_path.startswith(base):
+                continue
+            path = rel_path[len(base):]
+        else:
+            path = rel_path
+        for regex, negate, dir_only in rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                ignored = not negate
+    return ignored
+
+def _read_gitignore(path: str) -> List[Tuple]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_ignore_patterns(f)
+    except OSError:
+        return []
+
+def _include_src_dirs(rel_dir: str) -> List[str]:
+    """include 디렉토리 아래 헤더의 디렉토리에 대응하는 소스 디렉토리 후보를 반환합니다."""
+    parts = rel_dir.split('/') if rel_dir else []
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index] in INCLUDE_DIR_NAMES:
+            candidates = []
+            for source_name in SOURCE_DIR_NAMES:
+                # 하위 경로를 유지한 경우와 src/ 바로 아래에 둔 경우
+                candidates.append('/'.join(parts[:index] + [source_name] + parts[index + 1:]))
+                candidates.append('/'.join(parts[:index] + [source_name]))
+            return candidates
+    return []
+
+def _check_layouts(layouts: List[str]) -> Tuple[str, ...]:
+    """레이아웃 이름을 확인하고 튜플로 반환합니다. None이면 DEFAULT_LAYOUTS"""
+    layouts = tuple(layouts) if layouts else DEFAULT_LAYOUTS
+    for layout in layouts:
+        if layout not in LAYOUTS:
+            raise ValueError(f"알 수 없는 레이아웃: {layout} (선택 가능: {', '.join(LAYOUTS)})")
+    return layouts
+
+def discover_project(
+    project_dir: str,
+    excludes: List[str] = None,
+    use_gitignore: bool = True,
+    layouts: List[str] = None,
+    header_extensions: Tuple[str, ...] = HEADER_EXTENSIONS,
+    source_extensions: Tuple[str, ...] = SOURCE_EXTENSIONS,
+    include_orphans: bool = True
+) -> Tuple[List[Tuple[str, str]], Dict]:
+    """
+    프로젝트 디렉토리를 한 번 훑어 헤더/소스 파일 쌍을 찾습니다.
+
+    os.scandir로 디렉토리를 순회하며 제외 패턴과 .gitignore에 걸리는 디렉토리는 들어가기 전에 건너뜁니다.
+    파일마다 존재 여부를 다시 확인하지 않고, 찾은 소스 파일을 (디렉토리, 이름) 사전에 모아 짝을 찾습니다.
+
+    Args:
+        project_dir (str): 프로젝트 루트 디렉토리 경로
+        excludes (List[str]): 제외할 경로 패턴 (.gitignore 형식, None이면 DEFAULT_EXCLUDES)
+        use_gitignore (bool): 각 디렉토리의 .gitignore를 적용할지 여부
+        layouts (List[str]): 헤더/소스 짝짓기 방식 (None이면 DEFAULT_LAYOUTS)
+        header_extensions (Tuple[str, ...]): 헤더 확장자
+        source_extensions (Tuple[str, ...]): 소스 확장자
+        include_orphans (bool): 짝이 되는 헤더가 없는 소스 파일을 (None, cpp_path)로 포함할지 여부
+
+    Returns:
+        tuple: ((header_path, cpp_path) 튜플 리스트, 탐색 통계 dict).
+            헤더만 있으면 cpp_path가, 소스만 있으면 header_path가 None
+    """
+    stats = {}
+    ordered = sorted(_walk_pairs(
+        project_dir, stats, excludes, use_gitignore, _check_layouts(layouts), header_extensions, source_extensions, include_orphans
+    ), key=lambda item: item[0])
+    return [(header_path, cpp_path) for _, header_path, cpp_path in ordered], stats
+
+def iter_project_pairs(
+    project_dir: str,
+    stats: Dict = None,
+    excludes: List[str] = None,
+    use_gitignore: bool = True,
+    layouts: List[str] = None,
+    header_extensions: Tuple[str, ...] = HEADER_EXTENSIONS,
+    source_extensions: Tuple[str, ...] = SOURCE_EXTENSIONS,
+    include_orphans: bool = True
+):
+    """
+    discover_project와 같은 파일 쌍을 탐색하는 대로 냅니다. (청킹 파이프라인에 바로 넘기는 용도)
+
+    첫 번째 레이아웃이 'same'이면 같은 디렉토리의 헤더/소스 쌍은 그 디렉토리를 훑자마자 냅니다.
+    다른 디렉토리의 소스와 짝지어질 수 있는 헤더와 짝이 없는 소스는 전체 탐색이 끝난 뒤 냅니다.
+    결과 집합은 discover_project와 같고 순서만 다릅니다.
+
+    Args:
+        project_dir (str): 프로젝트 루트 디렉토리 경로
+        stats (Dict): 탐색이 끝나면 탐색 통계를 채울 dict (선택사항)
+        excludes, use_gitignore, layouts, header_extensions, source_extensions, include_orphans: discover_project와 같음
+
+    Returns:
+        Iterator: (header_path, cpp_path) 튜플을 내는 이터레이터
+    """
+    # 잘못된 레이아웃은 탐색을 시작하기 전에 바로 알림
+    layouts = _check_layouts(layouts)
+    walk = _walk_pairs(
+        project_dir, {} if stats is None else stats, excludes, use_gitignore, layouts, header_extensions, source_extensions, include_orphans
+    )
+    return ((header_path, cpp_path) for _, header_path, cpp_path in walk)
+
+def _walk_pairs(project_dir, stats, excludes, use_gitignore, layouts, header_extensions, source_extensions, include_orphans):
+    """
+    파일 쌍을 (탐색 순서, header_path, cpp_path)로 냅니다. 짝이 확정된 쌍부터 내므로 순서는 정렬되어 있지 않습니다.
+    탐색 통계는 끝난 뒤 stats에 채웁니다.
+    """
+    started = time.perf_counter()
+    # 소비 쪽이 다음 쌍을 받기까지 기다린 시간은 탐색 시간에서 뺌
+    waited = 0.0
+    kinds = {ext.lower(): 'header' for ext in header_extensions}
+    kinds.update({ext.lower(): 'source' for ext in source_extensions})
+    # 'same'이 첫 레이아웃이면 같은 디렉토리의 짝은 다른 레이아웃보다 먼저 확정되므로 디렉토리마다 바로 짝지음
+    same_first = layouts[0] == 'same'
+
+    counts = {"dirs": 0, "pruned_dirs": 0, "files": 0, "headers": 0, "sources": 0}
+    headers = []  # (순서, 상대 디렉토리, 이름, 경로)
+    sources = {}  # (상대 디렉토리, 이름) -> (순서, 경로)
+    extra_sources = []
+    claimed = set()
+    matched = {}
+    order = 0
+
+    base_rules = [('', parse_ignore_patterns(DEFAULT_EXCLUDES if excludes is None else excludes))]
+    stack = [(project_dir, '', base_rules)]
+    files = 0
+    while stack:
+        directory, rel_dir, rule_sets = stack.pop()
+        # 1차: 하위 디렉토리와 확장자가 맞는 파일만 모음 (무시 규칙은 후보에만 적용)
+        subdirs = []
+        candidates = []
+        has_gitignore = False
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry)
+                            continue
+                    except OSError:
+                        continue
+                    files += 1
+                    dot = name.rfind('.')
+                    if dot > 0:
+                        kind = kinds.get(name[dot:].lower())
+                        if kind is not None:
+                            candidates.append((name, name[:dot], kind, entry.path))
+                    elif name == '.gitignore':
+                        has_gitignore = True
+        except OSError:
+            continue
+        counts["dirs"] += 1
+        prefix = rel_dir + '/' if rel_dir else ''
+
+        if use_gitignore and has_gitignore:
+            rules = _read_gitignore(os.path.join(directory, '.gitignore'))
+            if rules:
+                rule_sets = rule_sets + [(prefix, rules)]
+        # 디렉토리 전용 규칙(기본 제외 목록 등)만 있으면 파일은 검사하지 않음
+        check_files = any(not dir_only for _, rules in rule_sets for _, _, dir_only in rules)
+
+        # 2차: 이름 순서대로 처리해 결과 순서를 파일 시스템과 무관하게 고정
+        candidates.sort()
+        first_header = len(headers)
+        for name, stem, kind, path in candidates:
+            if check_files and _is_ignored(rule_sets, prefix + name, False):
+                continue
+            if kind == 'header':
+                headers.append((order, rel_dir, stem, path))
+                counts["headers"] += 1
+            else:
+                # 같은 이름의 소스가 여러 개면 먼저 찾은 것만 짝 후보로 쓰고 나머지는 소스만 있는 파일로 처리
+                if (rel_dir, stem) in sources:
+                    extra_sources.append((order, path))
+                else:
+                    sources[(rel_dir, stem)] = (order, path)
+                counts["sources"] += 1
+            order += 1
+
+        if same_first:
+            for index, _, stem, header_path in headers[first_header:]:
+                key = (rel_dir, stem)
+                if key in sources and key not in claimed:
+                    claimed.add(key)
+                    matched[header_path] = sources[key][1]
+                    resumed = time.perf_counter()
+                    yield index, header_path, matched[header_path]
+                    waited += time.perf_counter() - resumed
+
+        # 이름 순서대로 방문하도록 역순으로 쌓음
+        subdirs.sort(key=lambda entry: entry.name, reverse=True)
+        for entry in subdirs:
+            rel_path = prefix + entry.name
+            if _is_ignored(rule_sets, rel_path, True):
+                counts["pruned_dirs"] += 1
+            else:
+                stack.append((entry.path, rel_path, rule_sets))
+
+    # 앞선 레이아웃이 모든 헤더에 먼저 적용되도록 레이아웃 순서대로 아직 짝이 없는 소스를 찾음
+    emitted = set(matched)
+    for layout in layouts:
+        if layout == 'stem' or (layout == 'same' and same_first):
+            continue
+        for _, rel_dir, stem, header_path in headers:
+            if header_path in matched:
+                continue
+            if layout == 'same':
+                key = (rel_dir, stem)
+                if key not in sources or key in claimed:
+                    continue
+            else:
+                key = next(((d, stem) for d in _include_src_dirs(rel_dir) if (d, stem) in sources and (d, stem) not in claimed), None)
+            if key is not None:
+                claimed.add(key)
+                matched[header_path] = sources[key][1]
+
+    if 'stem' in layouts:
+        header_stems = {}
+        for _, _, stem, header_path in headers:
+            header_stems.setdefault(stem, []).append(header_path)
+        source_stems = {}
+        for key in sources:
+            if key not in claimed:
+                source_stems.setdefault(key[1], []).append(key)
+        for stem, keys in source_stems.items():
+            candidates = header_stems.get(stem, [])
+            if len(keys) == 1 and len(candidates) == 1 and candidates[0] not in matched:
+                claimed.add(keys[0])
+                matched[candidates[0]] = sources[keys[0]][1]
+
+    ordered = [(index, header_path, matched.get(header_path)) for index, _, _, header_path in headers if header_path not in emitted]
+    orphans = 0
+    if include_orphans:
+        for key, (index, cpp_path) in sources.items():
+            if key not in claimed:
+                ordered.append((index, None, cpp_path))
+                orphans += 1
+        for index, cpp_path in extra_sources:
+            ordered.append((index, None, cpp_path))
+            orphans += 1
+    ordered.sort(key=lambda item: item[0])
+
+    counts["files"] = files
+    counts["pairs"] = len(matched)
+    counts["header_only"] = len(headers) - len(matched)
+    counts["orphan_sources"] = orphans
+    counts["seconds"] = time.perf_counter() - started - waited
+    stats.update(counts)
+    METRICS.observe("discover", counts["seconds"])
+    METRICS.count("discover.dirs", counts["dirs"])
+    METRICS.count("discover.pruned_dirs", counts["pruned_dirs"])
+    yield from ordered
+
+def is_cpp_file(path: str) -> bool:
+    """헤더나 소스 확장자를 가진 파일인지 확인합니다."""
+    return os.path.splitext(path)[1].lower() in HEADER_EXTENSIONS + SOURCE_EXTENSIONS
+
+def iter_project_dirs(project_dir: str, excludes: List[str] = None, use_gitignore: bool = True):
+    """
+    discover_project와 같은 제외 규칙으로 탐색 대상 디렉토리를 차례로 냅니다. (파일 감시용)
+
+    Args:
+        project_dir (str): 프로젝트 루트 디렉토리 경로
+        excludes (List[str]): 제외할 경로 패턴 (.gitignore 형식, None이면 DEFAULT_EXCLUDES)
+        use_gitignore (bool): 각 디렉토리의 .gitignore를 적용할지 여부
+
+    Yields:
+        str: 디렉토리 경로 (프로젝트 루트 포함)
+    """
+    base_rules = [('', parse_ignore_patterns(DEFAULT_EXCLUDES if excludes is None else excludes))]
+    stack = [(project_dir, '', base_rules)]
+    while stack:
+        directory, rel_dir, rule_sets = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                subdirs = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        yield directory
+        prefix = rel_dir + '/' if rel_dir else ''
+        if use_gitignore and os.path.exists(os.path.join(directory, '.gitignore')):
+            rules = _read_gitignore(os.path.join(directory, '.gitignore'))
+            if rules:
+                rule_sets = rule_sets + [(prefix, rules)]
+        for entry in sorted(subdirs, key=lambda entry: entry.name, reverse=True):
+            rel_path = prefix + entry.name
+            if not _is_ignored(rule_sets, rel_path, True):
+                stack.append((entry.path, rel_path, rule_sets))
+
+def discovery_report(stats: Dict) -> str:
+    """탐색 통계를 한 줄 요약 문자열로 만듭니다."""
+    return (
+        f"탐색: 디렉토리 {stats['dirs']}개 (제외 {stats['pruned_dirs']}개), 파일 {stats['files']}개, "
+        f"헤더+소스 {stats['pairs']}쌍, 헤더만 {stats['header_only']}개, 소스만 {stats['orphan_sources']}개, "
+        f"{stats['seconds']:.2f}초"
+    )
@@ -0,0 +1,306 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from metrics import METRICS
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 대략 추정합니다 (영문/코드 기준 약 4자당 1토큰)."""
+    return len(text) // 4 + 1
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """예외가 429(rate limit) 응답인지 확인합니다."""
+    if type(exc).__name__ == "RateLimitError":
+        return True
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+# 상태 코드 없이 전송 계층 오류(연결 실패, 시간 초과)를 나타내는 예외 클래스 이름
+# (openai, httpx, requests의 예외를 임포트하지 않고 이름으로 확인)
+_TRANSPORT_ERROR_NAMES = frozenset((
+    "APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException",
+    "ConnectionError", "Timeout", "ChunkedEncodingError",
+))
+
+def _status_code(exc: Exception) -> Optional[int]:
+    """예외에 담긴 HTTP 상태 코드를 반환합니다. 없으면 None"""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable_error(exc: Exception) -> bool:
+    """
+    다시 시도하면 성공할 수 있는 오류인지 확인합니다.
+    429, 408, 5xx 응답과 연결 실패/시간 초과는 재시도하고, 인증 오류나 400 같은 다른 4xx 응답,
+    프로그래밍 오류(TypeError 등)는 재시도해도 같은 결과이므로 바로 실패시킵니다.
+    """
+    if is_rate_limit_error(exc):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status == 408 or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _TRANSPORT_ERROR_NAMES for cls in type(exc).__mro__)
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """429 응답의 Retry-After 헤더 값을 초 단위로 반환합니다."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class EmbeddingScheduler:
+    def __init__(
+        self,
+        embeddings,
+        store_fn: Callable[[List[str], List[List[float]], List[str], List[Dict]], None],
+        persist_fn: Callable[[], None] = None,
+        max_batch_tokens: int = 64000,
+        max_batch_rows: int = 512,
+        max_in_flight: int = 4,
+        persist_every: int = 32,
+        max_retries: int = 6,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        """
+        여러 파일의 청크를 토큰/행 예산에 맞춘 요청으로 묶어 동시에 임베딩하는 스케줄러
+
+        Args:
+            embeddings: embed_documents를 제공하는 임베딩 객체
+            store_fn: (ids, vectors, texts, metadatas)를 받아 저장하는 함수
+            persist_fn: 배치 윈도우마다 호출할 디스크 저장 함수 (선택사항)
+            max_batch_tokens (int): 요청 하나에 담을 최대 추정 토큰 수
+            max_batch_rows (int): 요청 하나에 담을 최대 청크 수
+            max_in_flight (int): 동시에 진행할 최대 요청 수
+            persist_every (int): persist_fn을 호출할 저장 배치 간격
+            max_retries (int): 429/5xx/연결 오류에 대한 최대 재시도 횟수
+            backoff_base (float): 지수 백오프 기본 대기 시간(초)
+            backoff_max (float): 백오프 최대 대기 시간(초)
+        """
+        self.embeddings = embeddings
+        self.store_fn = store_fn
+        self.persist_fn = persist_fn
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_rows = max_batch_rows
+        self.max_in_flight = max_in_flight
+        self.persist_every = persist_every
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._store_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pause_until = 0.0
+        self._pending = []
+        self._pending_tokens = 0
+        self._unpersisted_batches = 0
+        self._started = time.perf_counter()
+
+        self.failed_keys = set()
+        self.failed_ids = set()
+        self.stats = {
+            "files": 0,
+            "chunks": 0,
+            "requests": 0,
+            "batches": 0,
+            "skipped_chunks": 0,
+            "skipped_tokens": 0,
+            # 건너뛴 청크까지 모두 보냈다면 필요했을 요청 수 (같은 예산으로 계산)
+            "batches_without_skips": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "persists": 0,
+            "failed_batches": 0,
+            "elapsed": 0.0,
+        }
+        self._seen_keys = set()
+        self._shadow_rows = 0
+        self._shadow_tokens = 0
+
+    def submit(self, ids: List[str], texts: List[str], metadatas: List[Dict], key: str = None) -> None:
+        """
+        청크들을 대기열에 추가합니다. 예산이 차면 요청을 보냅니다.
+
+        Args:
+            ids (List[str]): 청크 ID 리스트
+            texts (List[str]): 청크 텍스트 리스트
+            metadatas (List[Dict]): 청크 메타데이터 리스트
+            key (str): 청크가 속한 파일 키 (실패 추적용, 선택사항)
+        """
+        if key is not None and key not in self._seen_keys:
+            self._seen_keys.add(key)
+            self.stats["files"] += 1
+
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            tokens = estimate_tokens(text)
+            if self._pending and (
+                self._pending_tokens + tokens > self.max_batch_tokens
+                or len(self._pending) >= self.max_batch_rows
+            ):
+                self._dispatch()
+            self._pending.append((chunk_id, text, metadata, key))
+            self._pending_tokens += tokens
+            self._count_shadow(tokens)
+
+    def skip(self, texts: List[str]) -> None:
+        """
+        임베딩하지 않고 건너뛴 청크(중복 등)를 기록합니다. 절약한 요청 수 계산에만 쓰입니다.
+
+        Args:
+            texts (List[str]): 건너뛴 청크 텍스트 리스트
+        """
+        METRICS.count("embed.skipped_chunks", len(texts))
+        for text in texts:
+            tokens = estimate_tokens(text)
+            self.stats["skipped_chunks"] += 1
+            self.stats["skipped_tokens"] += tokens
+            self._count_shadow(tokens)
+
+    def _count_shadow(self, tokens: int) -> None:
+        """건너뛴 청크까지 포함한 가상의 대기열로 요청 수를 셉니다."""
+        if self._shadow_rows and (
+            self._shadow_tokens + tokens > self.max_batch_tokens
+            or self._shadow_rows >= self.max_batch_rows
+        ):
+            self.stats["batches_without_skips"] += 1
+            self._shadow_rows = 0
+            self._shadow_tokens = 0
+        self._shadow_rows += 1
+        self._shadow_tokens += tokens
+
+    def close(self) -> Dict:
+        """
+        남은 청크를 보내고 모든 요청이 끝날 때까지 기다린 뒤 마지막으로 저장합니다.
+
+        Returns:
+            Dict: 처리 통계
+        """
+        if self._pending:
+            self._dispatch()
+        if self._shadow_rows:
+            self.stats["batches_without_skips"] += 1
+            self._shadow_rows = 0
+            self._shadow_tokens = 0
+        # _run_batch는 예외를 기록만 하므로 종료 대기로 충분
+        self._executor.shutdown(wait=True)
+
+        if self.persist_fn is not None and self._unpersisted_batches:
+            with METRICS.span("store.persist"):
+                self.persist_fn()
+            self.stats["persists"] += 1
+            self._unpersisted_batches = 0
+
+        self.stats["elapsed"] = time.perf_counter() - self._started
+        return self.stats
+
+    def report(self) -> str:
+        """처리량 요약 문자열을 반환합니다."""
+        elapsed = max(self.stats["elapsed"], 1e-9)
+        return (
+            f"파일 {self.stats['files']}개 ({self.stats['files'] / elapsed:.1f} 파일/초), "
+            f"청크 {self.stats['chunks']}개, "
+            f"임베딩 요청 {self.stats['requests']}회 ({self.stats['requests'] / elapsed:.1f} 요청/초), "
+            f"재시도 {self.stats['retries']}회 (429: {self.stats['rate_limited']}회), "
+            f"디스크 저장 {self.stats['persists']}회, 경과 {elapsed:.2f}초"
+        ) + self._skip_report()
+
+    def _skip_report(self) -> str:
+        if not self.stats["skipped_chunks"]:
+            return ""
+        saved_requests = max(0, self.stats["batches_without_skips"] - self.stats["batches"])
+        return (
+            f"\n건너뛴 청크 {self.stats['skipped_chunks']}개: 임베딩 벡터 {self.stats['skipped_chunks']}개, "
+            f"추정 토큰 {self.stats['skipped_tokens']}개, 임베딩 요청 {saved_requests}회 절약"
+        )
+
+    def _dispatch(self) -> None:
+        """대기 중인 청크를 요청 하나로 묶어 보냅니다. 동시 요청 수가 가득 차면 기다립니다."""
+        batch = self._pending
+        self._pending = []
+        self._pending_tokens = 0
+        self.stats["batches"] += 1
+
+        # 진행 중인 요청 수 제한 (배압). 기다린 시간은 임베딩이 병목인 정도를 나타냄
+        with METRICS.span("embed.backpressure"):
+            self._slots.acquire()
+        future = self._executor.submit(self._run_batch, batch)
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def _wait_for_rate_limit(self) -> None:
+        """다른 요청이 429를 받아 설정한 전역 대기 시간이 끝날 때까지 기다립니다."""
+        while True:
+            delay = self._pause_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        """429, 5xx, 연결/시간 초과 오류에 대해 지수 백오프로 재시도하며 임베딩합니다. 다른 오류는 바로 다시 던집니다."""
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit()
+            try:
+                with METRICS.span("embed.request"):
+                    vectors = self.embeddings.embed_documents(texts)
+                with self._stats_lock:
+                    self.stats["requests"] += 1
+                METRICS.count("embed.requests")
+                return vectors
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * (0.5 + random.random() / 2)
+                METRICS.count("embed.retries")
+                with self._stats_lock:
+                    self.stats["retries"] += 1
+                    if is_rate_limit_error(e):
+                        METRICS.count("embed.rate_limited")
+                        self.stats["rate_limited"] += 1
+                        # 모든 요청이 함께 쉬도록 전역 대기 시간 설정
+                        delay = max(delay, _retry_after_seconds(e) or 0.0)
+                        self._pause_until = max(self._pause_until, time.monotonic() + delay)
+                attempt += 1
+                time.sleep(delay)
+
+    def _run_batch(self, batch) -> None:
+        """배치 하나를 임베딩하고 저장합니다."""
+        ids = [item[0] for item in batch]
+        texts = [item[1] for item in batch]
+        metadatas = [item[2] for item in batch]
+        if METRICS.enabled:
+            METRICS.count("embed.tokens", sum(estimate_tokens(text) for text in texts))
+        try:
+            vectors = self._embed_with_retry(texts)
+            with self._store_lock:
+                with METRICS.span("store.upsert"):
+                    self.store_fn(ids, vectors, texts, metadatas)
+                self._unpersisted_batches += 1
+                if self.persist_fn is not None and self._unpersisted_batches >= self.persist_every:
+                    with METRICS.span("store.persist"):
+                        self.persist_fn()
+                    self._unpersisted_batches = 0
+                    with self._stats_lock:
+                        self.stats["persists"] += 1
+            with self._stats_lock:
+                self.stats["chunks"] += len(batch)
+            METRICS.count("embed.chunks", len(batch))
+        except Exception as e:
+            METRICS.count("embed.failed_batches")
+            with self._stats_lock:
+                self.stats["failed_batches"] += 1
+                self.failed_keys.update(item[3] for item in batch if item[3] is not None)
+                self.failed_ids.update(item[0] for item in batch)
+            print(f"임베딩 배치 실패 ({len(batch)} 청크): {str(e)}")
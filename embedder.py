@@ -1,118 +1,821 @@
 import os
 from typing import List, Dict
-import json
+import copy
+import time
+import shutil
 import argparse
-from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from cpp_chunker import chunk_cpp_code, process_project
-
-# .env 파일에서 환경 변수 로드
-load_dotenv()
+from cpp_chunker import CHUNKERS, DEFAULT_SEPARATORS, SEPARATOR_SETS, SourceCache, pair_output_name, stream_threshold_bytes, write_chunks_file
+from discovery import LAYOUTS, discover_project, discovery_report, iter_project_pairs
+from pipeline import ChunkPipeline
+from include_graph import IncludeGraph
+from index_manifest import MANIFEST_FILE, IndexManifest, make_chunk_id
+from embed_scheduler import EmbeddingScheduler
+from metrics import METRICS, add_profile_arguments, finish_profiling, start_profiling
+from lexical_index import LexicalIndex
+from file_table import FileTable, make_file_id
+from stream_chunker import STREAM_THRESHOLD
+from watcher import DEFAULT_DEBOUNCE, DEFAULT_MAX_DELAY, DEFAULT_POLL_INTERVAL, WATCH_BACKENDS, IndexWatcher
+from snapshot import check_compatible, export_snapshot, import_snapshot, read_snapshot_header, snapshot_report
+from shards import DEFAULT_SHARD_COUNT, SHARD_MODES, SHARDS_DIR, group_pairs, is_sharded, load_shard_config, save_shard_config, shard_directory, shard_name
+from chroma_store import ChromaStore
+from flat_store import DEFAULT_STORE, DEFAULT_STORE_DTYPE, FLAT_STORE_DIR, STORE_DTYPES, STORES, FlatVectorStore
+from dedup import DEDUP_INDEX_FILE, DEDUP_MODES, DEFAULT_DEDUP, DEFAULT_NEAR_THRESHOLD, ChunkDeduplicator
+from embedding_cache import DEFAULT_CACHE_MAX_MB, DEFAULT_CACHE_PATH, CachedEmbeddings, wrap_with_cache
+from embedding_backends import DEFAULT_EMBEDDER, EMBEDDERS, create_embeddings, load_environment, requires_api_key
 
 class CodeEmbedder:
-    def __init__(self, persist_directory: str = "code_chunks_db"):
+    def __init__(
+        self,
+        persist_directory: str = "code_chunks_db",
+        embedding_base_url: str = None,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        cache_max_mb: float = DEFAULT_CACHE_MAX_MB,
+        embedder: str = DEFAULT_EMBEDDER,
+        embedding_dim: int = None,
+        store: str = DEFAULT_STORE,
+        store_dtype: str = DEFAULT_STORE_DTYPE,
+        store_rerank: bool = False
+    ):
         """
         코드 임베더 초기화
         
         Args:
             persist_directory (str): Chroma DB 저장 디렉토리
+            embedding_base_url (str): OpenAI 호환 임베딩 API 주소 (선택사항, 로컬 대체 서버 테스트용)
+            cache_path (str): 임베딩 캐시 파일 경로 (None이면 캐시 사용 안 함)
+            cache_max_mb (float): 임베딩 캐시 최대 크기(MB)
+            embedder (str): 임베딩 백엔드 ('openai' 또는 'hashing')
+            embedding_dim (int): 벡터 차원 (hashing 백엔드 전용)
+            store (str): 벡터 저장소 백엔드 ('chroma' 또는 'flat')
+            store_dtype (str): flat 저장소의 벡터 형식 ('int8' 또는 'float16')
+            store_rerank (bool): flat 저장소에 float32 원본도 저장해 검색 시 상위 후보를 재정렬할지 여부
         """
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        if store not in STORES:
+            raise ValueError(f"알 수 없는 저장소: {store} (선택 가능: {', '.join(STORES)})")
+        embeddings, cache_model, cacheable = create_embeddings(embedder, embedding_base_url, embedding_dim)
+        self.embeddings = wrap_with_cache(embeddings, cache_path if cacheable else None, cache_max_mb, model=cache_model)
+        # 스냅샷 호환성 확인용 임베딩 모델 이름
+        self.embedding_model = cache_model
+        self.embedder = embedder
+        self.store = store
+        self.store_dtype = store_dtype
+        self.store_rerank = store_rerank
         self.persist_directory = persist_directory
         self.db = None
+        self.lexical_index = None
+        self.file_table = None
+        # 샤드별 임베더 (파일 감시처럼 여러 번 실행할 때 열어둔 저장소와 색인을 재사용)
+        self._shard_embedders = {}
 
     def initialize_db(self):
-        """Chroma DB 초기화"""
-        self.db = Chroma(
-            persist_directory=self.persist_directory,
+        """벡터 저장소(Chroma DB 또는 flat 저장소) 초기화"""
+        if self.store == 'flat':
+            self.db = FlatVectorStore(
+                self.persist_directory,
+                embedding_function=self.embeddings,
+                dtype=self.store_dtype,
+                rerank=self.store_rerank
+            )
+            return
+        flat_path = os.path.join(self.persist_directory, FLAT_STORE_DIR)
+        if os.path.exists(flat_path):
+            # Chroma로 다시 인덱싱하면 이전 flat 저장소는 갱신되지 않으므로 검색에 쓰이지 않게 삭제
+            shutil.rmtree(flat_path)
+        self.db = ChromaStore(
+            self.persist_directory,
             embedding_function=self.embeddings
         )
 
-    def embed_and_store_chunks(self, chunks: List[str], metadata: Dict = None) -> None:
+    def embed_and_store_chunks(self, chunks: List[str], metadata: Dict = None, ids: List[str] = None, metadatas: List[Dict] = None) -> None:
         """
         코드 청크들을 임베딩하고 Chroma DB에 저장
         
         Args:
             chunks (List[str]): 코드 청크 리스트
             metadata (Dict): 각 청크에 대한 메타데이터 (선택사항)
+            ids (List[str]): 청크 ID 리스트. 같은 ID의 기존 청크는 교체됨 (선택사항)
+            metadatas (List[Dict]): 청크별 메타데이터 리스트 (주면 metadata 대신 사용)
         """
         if self.db is None:
             self.initialize_db()
 
         # 각 청크에 대한 메타데이터 생성
-        metadatas = []
-        if metadata:
-            metadatas = [metadata for _ in chunks]
-        else:
-            metadatas = [{"source": "code_chunk"} for _ in chunks]
+        if metadatas is None:
+            if metadata:
+                metadatas = [metadata for _ in chunks]
+            else:
+                metadatas = [{"source": "code_chunk"} for _ in chunks]
 
         # Chroma DB에 저장
         self.db.add_texts(
             texts=chunks,
-            metadatas=metadatas
+            metadatas=metadatas,
+            ids=ids
         )
         
         # 변경사항 저장
         self.db.persist()
 
-    def embed_cpp_file(self, cpp_name: str, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def _store_embeddings(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[Dict]) -> None:
         """
-        C++ 파일을 청킹하고 임베딩하여 저장
+        미리 계산된 임베딩을 Chroma DB에 저장 (같은 ID는 교체)
         
         Args:
-            cpp_name (str): C++ 파일 이름 (확장자 제외)
-            chunk_size (int): 각 청크의 최대 크기
-            chunk_overlap (int): 청크 간 중복 크기
+            ids (List[str]): 청크 ID 리스트
+            embeddings (List[List[float]]): 임베딩 벡터 리스트
+            texts (List[str]): 청크 텍스트 리스트
+            metadatas (List[Dict]): 청크 메타데이터 리스트
+        """
+        self.db._collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            documents=texts
+        )
+
+    @staticmethod
+    def _chunk_metadatas(file_id: str, data: Dict, count: int, start: int = 0) -> List[Dict]:
+        """
+        청크별 메타데이터 리스트를 만듭니다. 파일 단위 값은 파일 테이블에 한 번만 저장하므로
+        청크에는 파일 ID, 파일 내 순번, 줄 범위와 심볼(렉서 청킹 시)만 기록합니다.
+        
+        Args:
+            file_id (str): 파일 테이블의 파일 ID
+            data (Dict): chunk_file_pair 결과
+            count (int): 청크 수
+            start (int): 첫 청크의 파일 내 순번 (스트리밍 청크를 나눠 넘길 때 사용)
+        
+        Returns:
+            List[Dict]: 청크별 메타데이터 리스트
+        """
+        chunk_meta = data.get("chunk_meta")
+        if not chunk_meta:
+            return [{"file_id": file_id, "chunk_index": start + i} for i in range(count)]
+        return [
+            {
+                "file_id": file_id,
+                "chunk_index": start + i,
+                "start_line": meta["start_line"],
+                "end_line": meta["end_line"],
+                # Chroma 메타데이터는 스칼라 값만 허용
+                "symbols": ", ".join(meta["symbols"])
+            }
+            for i, meta in enumerate(chunk_meta)
+        ]
+
+    def update_metadatas(self, metadatas: Dict[str, Dict], batch_size: int = 1000) -> None:
         """
-        # 코드 청킹
-        chunks = chunk_cpp_code(cpp_name, chunk_size, chunk_overlap)
+        저장된 청크의 메타데이터만 교체합니다. (임베딩과 문서는 그대로)
         
-        # 메타데이터 설정
-        metadata = {
-            "file_name": cpp_name,
-            "language": "cpp",
-            "chunk_size": chunk_size,
-            "chunk_overlap": chunk_overlap
-        }
+        Args:
+            metadatas (Dict[str, Dict]): {청크 ID: 새 메타데이터}
+            batch_size (int): 요청 하나에 담을 최대 청크 수
+        """
+        if not metadatas:
+            return
+        if self.db is None:
+            self.initialize_db()
+        ids = list(metadatas)
+        with METRICS.span("store.update"):
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                # 새 메타데이터에 없는 이전 키(처음 청크를 만든 파일의 값 등)가 남지 않도록 통째로 교체
+                self.db.update_metadatas(batch, [metadatas[chunk_id] for chunk_id in batch])
+
+    def _submit_deduplicated(
+        self,
+        deduplicator: ChunkDeduplicator,
+        scheduler: EmbeddingScheduler,
+        file_key: str,
+        chunks: List[str],
+        metadatas: List[Dict],
+        data: Dict,
+        start: int = 0
+    ) -> List[str]:
+        """
+        파일 하나의 청크를 중복 제거 색인에 등록하고, 처음 보는 청크만 스케줄러에 전달합니다.
+        
+        Args:
+            deduplicator (ChunkDeduplicator): 중복 제거 색인
+            scheduler (EmbeddingScheduler): 임베딩 스케줄러
+            file_key (str): 파일 쌍 키
+            chunks (List[str]): 청크 리스트
+            metadatas (List[Dict]): 청크별 메타데이터
+            data (Dict): chunk_file_pair 결과
+            start (int): 첫 청크의 파일 내 순번 (스트리밍 청크를 나눠 넘길 때 사용)
         
-        # 임베딩 및 저장
-        self.embed_and_store_chunks(chunks, metadata)
+        Returns:
+            List[str]: 청크별 저장 ID (중복이면 이미 저장된 청크의 ID)
+        """
+        chunk_meta = data.get("chunk_meta")
+        ids = []
+        new_ids, new_chunks, new_metadatas = [], [], []
+        skipped = []
+        for i, (chunk, metadata) in enumerate(zip(chunks, metadatas)):
+            chunk_id, is_new = deduplicator.assign(file_key, start + i, chunk, metadata)
+            ids.append(chunk_id)
+            if is_new:
+                new_ids.append(chunk_id)
+                new_chunks.append(chunk)
+                new_metadatas.append(metadata)
+                self.lexical_index.add(chunk_id, chunk, chunk_meta[i]["symbols"] if chunk_meta else None)
+            else:
+                skipped.append(chunk)
+        scheduler.submit(new_ids, new_chunks, new_metadatas, key=file_key)
+        scheduler.skip(skipped)
+        return ids
 
-    def embed_project(self, project_dir: str, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def _submit_streamed(
+        self,
+        deduplicator: ChunkDeduplicator,
+        scheduler: EmbeddingScheduler,
+        manifest: IndexManifest,
+        file_key: str,
+        data: Dict,
+        file_id: str,
+        batch_rows: int
+    ) -> List[str]:
+        """
+        스트리밍으로 청킹한 큰 파일의 청크를 만들어지는 대로 batch_rows개씩 스케줄러에 넘깁니다.
+        파일 전체의 청크를 모으지 않고, 스케줄러의 동시 요청 제한이 청킹 속도를 조절합니다.
+        
+        Args:
+            deduplicator (ChunkDeduplicator): 중복 제거 색인 (사용하지 않으면 None)
+            scheduler (EmbeddingScheduler): 임베딩 스케줄러
+            manifest (IndexManifest): 인덱스 매니페스트
+            file_key (str): 파일 쌍 키
+            data (Dict): chunk_file_pair 결과 (chunks는 청크 이터레이터)
+            file_id (str): 파일 테이블의 파일 ID
+            batch_rows (int): 한 번에 넘길 청크 수
+        
+        Returns:
+            List[str]: 청크별 저장 ID
+        """
+        if deduplicator is not None:
+            self.delete_chunks(deduplicator.release(file_key, manifest.chunk_ids(file_key)))
+        ids = []
+        
+        def flush(batch):
+            metadatas = self._chunk_metadatas(file_id, {}, len(batch), start=len(ids))
+            if deduplicator is not None:
+                with METRICS.span("index.dedup"):
+                    ids.extend(self._submit_deduplicated(deduplicator, scheduler, file_key, batch, metadatas, data, start=len(ids)))
+            else:
+                batch_ids = [make_chunk_id(file_key, len(ids) + i) for i in range(len(batch))]
+                scheduler.submit(batch_ids, batch, metadatas, key=file_key)
+                self._index_lexical(batch_ids, batch)
+                ids.extend(batch_ids)
+        
+        batch = []
+        try:
+            for chunk in data["chunks"]:
+                batch.append(chunk)
+                if len(batch) >= batch_rows:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        except Exception:
+            # 도중에 실패하면 일부만 넘겼으므로, 넘긴 청크도 기록해 두고 다음 실행에서 다시 처리
+            previous = manifest.chunk_ids(file_key)
+            manifest.update(file_key, data["header_path"], data["cpp_path"], list(dict.fromkeys(list(previous) + ids)), data.get("fingerprint"))
+            manifest.invalidate(file_key)
+            raise
+        if deduplicator is None:
+            # 청크 수가 줄었으면 남은 이전 청크 삭제
+            new_ids = set(ids)
+            self.delete_chunks([chunk_id for chunk_id in manifest.chunk_ids(file_key) if chunk_id not in new_ids])
+        return ids
+
+    def delete_chunks(self, ids: List[str]) -> None:
+        """
+        주어진 ID의 청크들을 Chroma DB와 어휘 색인에서 삭제
+        
+        Args:
+            ids (List[str]): 삭제할 청크 ID 리스트
+        """
+        if not ids:
+            return
+        if self.db is None:
+            self.initialize_db()
+        with METRICS.span("store.delete"):
+            self.db.delete(ids=ids)
+        if self.lexical_index is not None:
+            self.lexical_index.remove(ids)
+
+    def load_lexical_index(self) -> LexicalIndex:
+        """
+        DB 디렉토리의 어휘(BM25/심볼) 색인을 읽습니다.
+        
+        색인 파일이 없는데 컬렉션에 청크가 있으면 (어휘 색인 도입 전에 만든 DB) 컬렉션에서 다시 만듭니다.
+        
+        Returns:
+            LexicalIndex: 어휘 색인
+        """
+        if self.lexical_index is not None:
+            return self.lexical_index
+        if self.db is None:
+            self.initialize_db()
+        self.lexical_index = LexicalIndex.load(self.persist_directory)
+        if not len(self.lexical_index):
+            stored = self.db._collection.get(include=["documents", "metadatas"])
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                symbols = (metadata or {}).get("symbols")
+                self.lexical_index.add(doc_id, text, symbols.split(", ") if symbols else None)
+        return self.lexical_index
+
+    def load_file_table(self) -> FileTable:
+        """
+        DB 디렉토리의 파일 테이블(파일 단위 메타데이터)을 읽습니다.
+        
+        Returns:
+            FileTable: 파일 테이블
+        """
+        if self.file_table is None:
+            self.file_table = FileTable.load(self.persist_directory)
+        return self.file_table
+
+    def _index_lexical(self, ids: List[str], chunks: List[str], data: Dict = None) -> None:
+        """
+        청크를 어휘 색인에 추가합니다. 렉서 청킹 결과면 청크별 심볼을 그대로 사용합니다.
+        
+        Args:
+            ids (List[str]): 청크 ID 리스트
+            chunks (List[str]): 청크 리스트
+            data (Dict): chunk_file_pair 결과 (선택사항)
+        """
+        lexical_index = self.load_lexical_index()
+        chunk_meta = data.get("chunk_meta") if data else None
+        with METRICS.span("index.lexical"):
+            for i, (chunk_id, chunk) in enumerate(zip(ids, chunks)):
+                lexical_index.add(chunk_id, chunk, chunk_meta[i]["symbols"] if chunk_meta else None)
+
+    def embed_cpp_file(self, cpp_name: str, chunk_size: int = None, chunk_overlap: int = None) -> Dict:
+        """
+        C++ 파일 쌍 하나를 청킹하고 임베딩하여 저장
+        
+        프로젝트 DB에 파일 하나를 더할 때도 인덱스가 어긋나지 않도록 embed_project와 같은 경로
+        (같은 청킹 방식/구분자/중복 제거, 같은 청크 ID 체계, 임베딩 백엔드 확인)로 처리하며,
+        청킹 방식, 구분자, 중복 제거 방식은 DB 매니페스트에 기록된 값을 따릅니다.
+        
+        Args:
+            cpp_name (str): C++ 파일 이름 (확장자 제외)
+            chunk_size (int): 각 청크의 최대 크기 (None이면 매니페스트에 기록된 값, 없으면 1000)
+            chunk_overlap (int): 청크 간 중복 크기 (None이면 매니페스트에 기록된 값, 없으면 200)
+        
+        Returns:
+            Dict: embed_project 결과
+        """
+        if is_sharded(self.persist_directory):
+            raise ValueError(f"'{self.persist_directory}'는 샤딩된 DB입니다. 파일 하나가 아니라 --project-dir로 인덱싱하세요.")
+        settings = IndexManifest.read_settings(self.persist_directory)
+        if chunk_size is None:
+            chunk_size = settings.get("chunk_size") or 1000
+        if chunk_overlap is None:
+            chunk_overlap = settings.get("chunk_overlap")
+            chunk_overlap = 200 if chunk_overlap is None else chunk_overlap
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        header_path = os.path.join(current_dir, f"{cpp_name}.h")
+        cpp_path = os.path.join(current_dir, f"{cpp_name}.cpp")
+        return self.embed_project(
+            current_dir,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            chunker=settings.get("chunker", 'splitter'),
+            dedup=settings.get("dedup", DEFAULT_DEDUP),
+            separators=settings.get("separators", DEFAULT_SEPARATORS),
+            pairs=[(header_path, cpp_path if os.path.exists(cpp_path) else None)],
+            remove_missing=False,
+            verbose=False
+        )
+
+    def embed_project(
+        self,
+        project_dir: str,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_batch_tokens: int = 64000,
+        max_batch_rows: int = 512,
+        max_in_flight: int = 4,
+        chunker: str = 'splitter',
+        chunks_dir: str = None,
+        queue_size: int = 64,
+        include_paths: List[str] = None,
+        discovery_options: Dict = None,
+        dedup: str = DEFAULT_DEDUP,
+        near_threshold: float = DEFAULT_NEAR_THRESHOLD,
+        stream_threshold: int = STREAM_THRESHOLD,
+        shard_by: str = None,
+        shard_count: int = DEFAULT_SHARD_COUNT,
+        rebuild_shards: List[str] = None,
+        pairs: List = None,
+        changed_paths: List[str] = None,
+        separators: str = DEFAULT_SEPARATORS,
+        source_cache: SourceCache = None,
+        remove_missing: bool = True,
+        verbose: bool = True
+    ) -> Dict:
         """
         프로젝트 전체를 청킹하고 임베딩하여 저장
         
+        파일 탐색, 청킹, 임베딩/저장 단계가 크기 제한 큐로 연결되어 동시에 진행되므로
+        청킹이 끝나기 전에 임베딩이 시작되고, 청크를 JSON 파일로 썼다가 다시 읽지 않습니다.
+        매니페스트에 기록된 내용 해시와 비교해 바뀌지 않은 파일 쌍은 건너뛰고,
+        바뀐 파일 쌍의 청크는 교체하며, 삭제된 파일의 청크는 DB에서 제거합니다.
+        여러 파일의 청크는 토큰/행 예산 단위 요청으로 묶여 동시에 임베딩됩니다.
+        중복 제거를 켜면 내용이 같은(또는 거의 같은) 청크는 한 번만 임베딩해 저장하고,
+        저장된 청크의 메타데이터(locations)에 그 청크가 나타나는 모든 위치를 기록합니다.
+        
         Args:
             project_dir (str): 프로젝트 디렉토리 경로
             chunk_size (int): 각 청크의 최대 크기
             chunk_overlap (int): 청크 간 중복 크기
+            max_batch_tokens (int): 임베딩 요청 하나의 최대 추정 토큰 수
+            max_batch_rows (int): 임베딩 요청 하나의 최대 청크 수
+            max_in_flight (int): 동시에 진행할 최대 임베딩 요청 수
+            chunker (str): 청킹 방식 ('splitter' 또는 'lexer'). 'lexer'면 청크별 줄 범위와 심볼을 메타데이터로 저장
+            chunks_dir (str): 파일별 _chunks.json을 함께 저장할 디렉토리 (선택사항, 기본값은 저장 안 함)
+            queue_size (int): 파이프라인 단계 사이 큐의 최대 크기
+            include_paths (List[str]): 추가 include 검색 경로. 청크 메타데이터의 dependencies(의존 헤더) 해석에 사용
+            discovery_options (Dict): discover_project에 넘길 탐색 옵션 (excludes, use_gitignore, layouts 등)
+            dedup (str): 청크 중복 제거 방식 ('none', 'exact', 'near')
+            near_threshold (float): 'near' 방식에서 같은 청크로 볼 최소 추정 Jaccard 유사도
+            stream_threshold (int): 파일 쌍 크기가 이보다 크면(바이트) 전체를 읽지 않고 스트리밍으로 청킹해
+                청크를 만드는 대로 임베딩 (None이면 사용 안 함)
+            shard_by (str): 샤딩 방식 ('dir' 또는 'hash'). 지정하거나 DB가 이미 샤딩되어 있으면
+                파일 쌍을 샤드별 DB(<DB 디렉토리>/shards/<이름>)에 나눠 저장 (None이면 기존 설정을 따름)
+            shard_count (int): 'hash' 방식의 샤드 수
+            rebuild_shards (List[str]): 지정한 샤드만 지우고 다시 만듦 (다른 샤드는 건드리지 않음)
+            pairs (List): 탐색 대신 처리할 (header_path, cpp_path) 목록 (샤드별 처리용)
+            changed_paths (List[str]): 바뀐(생성/수정/삭제된) 파일 경로. 지정하면 이 파일이 들어간 파일 쌍과
+                짝이 바뀐 파일 쌍만 확인하고 나머지는 stat 없이 건너뜀 (파일 감시용, None이면 모든 파일 쌍 확인)
+            separators (str): 구분자 집합 이름 ('cpp' 또는 'lines')
+            source_cache (SourceCache): 파일 읽기/인라인화 결과를 재사용할 캐시 (같은 프로젝트를 여러 설정으로
+                인덱싱할 때 공유, None이면 사용 안 함)
+            remove_missing (bool): 이번에 발견되지 않은 프로젝트 파일의 청크를 삭제할지 여부 (파일 하나만 인덱싱할 때는 False)
+            verbose (bool): 끝난 뒤 단계별 통계를 출력할지 여부
+
+        Returns:
+            Dict: {"updated": 갱신한 파일 쌍 수, "skipped": 건너뛴 파일 쌍 수, "removed_chunks": 삭제한 청크 수}
+        """
+        if shard_by is not None or rebuild_shards or is_sharded(self.persist_directory):
+            return self._embed_sharded(
+                project_dir, shard_by, shard_count, rebuild_shards, discovery_options,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                max_batch_tokens=max_batch_tokens,
+                max_batch_rows=max_batch_rows,
+                max_in_flight=max_in_flight,
+                chunker=chunker,
+                chunks_dir=chunks_dir,
+                queue_size=queue_size,
+                include_paths=include_paths,
+                dedup=dedup,
+                near_threshold=near_threshold,
+                stream_threshold=stream_threshold,
+                changed_paths=changed_paths,
+                separators=separators,
+                source_cache=source_cache,
+                verbose=verbose
+            )
+        if self.db is None:
+            with METRICS.span("store.open"):
+                self.initialize_db()
+        manifest = IndexManifest.load(self.persist_directory, chunk_size, chunk_overlap, chunker, self.embedder, dedup, self.store, separators)
+        if manifest.stored_embedder not in (None, self.embedder):
+            # 백엔드마다 벡터 공간과 차원이 달라 한 컬렉션에 섞을 수 없음
+            raise ValueError(
+                f"'{self.persist_directory}'는 '{manifest.stored_embedder}' 임베딩으로 만든 DB입니다. "
+                f"'{self.embedder}' 임베딩을 쓰려면 다른 --db-dir를 지정하세요."
+            )
+        self.load_lexical_index()
+        file_table = self.load_file_table()
+        deduplicator = None
+        if dedup != 'none':
+            deduplicator = ChunkDeduplicator.load(self.persist_directory, dedup, near_threshold)
+        elif os.path.exists(os.path.join(self.persist_directory, DEDUP_INDEX_FILE)):
+            # 중복 제거를 끄면 모든 파일을 파일별 청크 ID로 다시 인덱싱하므로 이전 색인은 필요 없음
+            os.remove(os.path.join(self.persist_directory, DEDUP_INDEX_FILE))
+        scheduler = EmbeddingScheduler(
+            self.embeddings,
+            self._store_embeddings,
+            persist_fn=self.db.persist,
+            max_batch_tokens=max_batch_tokens,
+            max_batch_rows=max_batch_rows,
+            max_in_flight=max_in_flight
+        )
+        
+        # 청크 파일은 요청한 경우에만 부가 출력으로 저장
+        if chunks_dir:
+            os.makedirs(chunks_dir, exist_ok=True)
+        
+        seen_keys = set()
+        changed = None if changed_paths is None else {os.path.abspath(path) for path in changed_paths}
+        
+        def is_unchanged(header_path, cpp_path):
+            # 탐색 스레드에서 호출: 발견한 파일을 기록하고 바뀌지 않은 파일 쌍은 건너뜀
+            file_key = os.path.abspath(header_path or cpp_path)
+            seen_keys.add(file_key)
+            with METRICS.span("index.check"):
+                if (
+                    changed is not None
+                    and file_key not in changed
+                    and (cpp_path is None or os.path.abspath(cpp_path) not in changed)
+                    and manifest.is_indexed(file_key, cpp_path)
+                ):
+                    return True
+                return manifest.is_unchanged(file_key, header_path, cpp_path)
+        
+        # 탐색한 파일 쌍을 바로 파이프라인 큐에 넣어 탐색과 청킹/임베딩을 겹침 (탐색 통계는 탐색이 끝나면 채워짐)
+        if pairs is None:
+            discovery_stats = {}
+            cpp_files = iter_project_pairs(project_dir, discovery_stats, **(discovery_options or {}))
+        else:
+            cpp_files, discovery_stats = pairs, None
+        # 공통 헤더는 실행 전체에서 한 번만 읽고 파싱
+        include_graph = IncludeGraph(project_dir, include_paths)
+        pipeline = ChunkPipeline(
+            cpp_files,
+            chunk_size,
+            chunk_overlap,
+            chunker,
+            skip_fn=is_unchanged,
+            queue_size=queue_size,
+            include_graph=include_graph,
+            stream_threshold=stream_threshold,
+            separators=separators,
+            source_cache=source_cache
+        )
+        updated = 0
+        for header_path, cpp_path, file_name, data, error in pipeline:
+            if error is not None:
+                print(f"오류 발생 ({header_path or cpp_path}): {error}")
+                continue
+            
+            try:
+                file_key = os.path.abspath(header_path or cpp_path)
+                if chunks_dir:
+                    if data.get("streamed"):
+                        # 파일별 청크 JSON은 한 번에 쓰므로 청크를 모음 (요청한 경우에만)
+                        data["chunks"] = list(data["chunks"])
+                    write_chunks_file(chunks_dir, pair_output_name(header_path, cpp_path, project_dir), data)
+                
+                metadata = {
+                    "file_name": file_name,
+                    "language": "cpp",
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "header_path": data["header_path"],
+                    "cpp_path": data["cpp_path"],
+                    "type": data["type"]
+                }
+                if data.get("dependencies"):
+                    metadata["dependencies"] = ", ".join(data["dependencies"])
+                # 파일 단위 값은 파일 테이블에 한 번만 저장
+                file_id = make_file_id(file_key)
+                file_table.put(file_id, metadata)
+                chunks = data["chunks"]
+                if data.get("streamed"):
+                    # 큰 파일은 청크를 만드는 대로 요청 크기만큼씩 넘김
+                    ids = self._submit_streamed(deduplicator, scheduler, manifest, file_key, data, file_id, max_batch_rows)
+                elif deduplicator is not None:
+                    metadatas = self._chunk_metadatas(file_id, data, len(chunks))
+                    # 이 파일의 이전 위치를 지우고 처음 보는 청크만 임베딩 (공유 청크 정리는 마지막에)
+                    self.delete_chunks(deduplicator.release(file_key, manifest.chunk_ids(file_key)))
+                    with METRICS.span("index.dedup"):
+                        ids = self._submit_deduplicated(deduplicator, scheduler, file_key, chunks, metadatas, data)
+                else:
+                    metadatas = self._chunk_metadatas(file_id, data, len(chunks))
+                    ids = [make_chunk_id(file_key, i) for i in range(len(chunks))]
+                    
+                    # 더 이상 없는 이전 청크 삭제 후 새 청크를 스케줄러에 전달
+                    new_ids = set(ids)
+                    self.delete_chunks([chunk_id for chunk_id in manifest.chunk_ids(file_key) if chunk_id not in new_ids])
+                    scheduler.submit(ids, chunks, metadatas, key=file_key)
+                    self._index_lexical(ids, chunks, data)
+                # 청킹한 바이트로 계산한 해시를 기록 (청킹 뒤에 파일이 바뀌었으면 다음 실행에서 다시 처리)
+                manifest.update(file_key, header_path, cpp_path, ids, data.get("fingerprint"))
+                updated += 1
+            except Exception as e:
+                print(f"오류 발생 ({header_path or cpp_path}): {str(e)}")
+        
+        # 남은 임베딩 요청이 끝날 때까지 기다린 시간
+        with METRICS.span("embed.drain"):
+            scheduler.close()
+        
+        # 임베딩에 실패한 파일은 다음 실행에서 다시 처리
+        for file_key in scheduler.failed_keys:
+            manifest.invalidate(file_key)
+        
+        # 삭제된 파일의 청크 제거
+        removed = manifest.pop_missing(project_dir, seen_keys) if remove_missing else {}
+        file_table.remove([make_file_id(file_key) for file_key in removed])
+        # 저장하지 못한 청크는 어휘 색인에서도 뺌
+        self.lexical_index.remove(scheduler.failed_ids)
+        if deduplicator is None:
+            removed_ids = [chunk_id for chunk_ids in removed.values() for chunk_id in chunk_ids]
+            self.delete_chunks(removed_ids)
+            changed_metadata = False
+            file_table.set_shared({})
+        else:
+            # 저장하지 못한 청크를 공유하던 파일도 다시 처리
+            for chunk_id in scheduler.failed_ids:
+                for file_key in deduplicator.drop(chunk_id):
+                    manifest.invalidate(file_key)
+            removed_ids = []
+            for file_key, chunk_ids in removed.items():
+                removed_ids.extend(deduplicator.release(file_key, chunk_ids))
+            # 위치가 남지 않은 청크는 삭제하고, 위치가 바뀐 청크는 메타데이터만 갱신
+            with METRICS.span("index.dedup_finalize"):
+                deleted_ids, metadata_updates = deduplicator.finalize()
+            removed_ids.extend(deleted_ids)
+            self.delete_chunks(removed_ids)
+            self.update_metadatas(metadata_updates)
+            changed_metadata = bool(metadata_updates)
+            # 공유 청크를 첫 위치가 아닌 파일의 필터로도 찾을 수 있도록 파일 테이블에 기록
+            file_table.set_shared(deduplicator.shared_chunks())
+            with METRICS.span("index.save"):
+                deduplicator.save()
+        if removed_ids or changed_metadata:
+            with METRICS.span("store.persist"):
+                self.db.persist()
+        with METRICS.span("index.save"):
+            manifest.save()
+            self.lexical_index.save()
+            file_table.save()
+        
+        result = {"updated": updated, "skipped": pipeline.stats['skipped'], "removed_chunks": len(removed_ids)}
+        if not verbose:
+            return result
+        print(f"\n갱신 {updated}개, 변경 없음 {pipeline.stats['skipped']}개, 삭제된 청크 {len(removed_ids)}개")
+        if discovery_stats:
+            print(discovery_report(discovery_stats))
+        print(pipeline.report())
+        if source_cache is not None:
+            print(source_cache.report())
+        print(f"include 그래프: 파싱 {include_graph.stats['parsed']}개 파일, 해석 {include_graph.stats['resolved']}개, 미해석 {include_graph.stats['unresolved']}개")
+        print(scheduler.report())
+        if deduplicator is not None:
+            print(deduplicator.report())
+        if self.store == 'flat':
+            stats = self.db.stats()
+            print(f"flat 저장소: 청크 {stats['count']}개, 세그먼트 {stats['segments']}개, 벡터 {stats['vector_mb']:.1f}MB ({stats['dtype']}), 디스크 {stats['disk_mb']:.1f}MB")
+        if isinstance(self.embeddings, CachedEmbeddings):
+            print(self.embeddings.report())
+        return result
+
+    def _for_directory(self, persist_directory: str) -> 'CodeEmbedder':
+        """같은 임베딩 백엔드와 캐시를 쓰면서 다른 DB 디렉토리에 저장하는 임베더를 만듭니다."""
+        embedder = copy.copy(self)
+        embedder.persist_directory = persist_directory
+        embedder.db = None
+        embedder.lexical_index = None
+        embedder.file_table = None
+        embedder._shard_embedders = {}
+        return embedder
+
+    def _remove_shard(self, name: str) -> None:
+        """샤드 DB 디렉토리를 지우고 열어둔 샤드 임베더도 버립니다."""
+        self._shard_embedders.pop(name, None)
+        shutil.rmtree(shard_directory(self.persist_directory, name), ignore_errors=True)
+
+    def _embed_sharded(self, project_dir: str, shard_by: str, shard_count: int, rebuild_shards: List[str], discovery_options: Dict, **options) -> Dict:
+        """
+        프로젝트를 한 번 탐색해 파일 쌍을 샤드별로 나누고, 샤드마다 독립된 DB에 embed_project를 실행합니다.
+
+        각 샤드는 자체 매니페스트, 중복 제거 색인, 어휘 색인을 가지므로 증분 인덱싱과 다시 만들기가 샤드 단위로 이뤄집니다.
+        샤딩 방식이나 샤드 수가 바뀌면 모든 샤드를 다시 만들고, 파일이 모두 사라진 샤드는 삭제합니다.
+
+        Args:
+            project_dir (str): 프로젝트 디렉토리 경로
+            shard_by (str): 샤딩 방식 (None이면 저장된 설정)
+            shard_count (int): 'hash' 방식의 샤드 수
+            rebuild_shards (List[str]): 다시 만들 샤드 이름 (None이면 모든 샤드를 증분 갱신)
+            discovery_options (Dict): discover_project에 넘길 탐색 옵션
+            **options: 샤드별 embed_project에 넘길 옵션
+
+        Returns:
+            Dict: 샤드별 embed_project 결과의 합
+        """
+        if os.path.exists(os.path.join(self.persist_directory, MANIFEST_FILE)):
+            raise ValueError(
+                f"'{self.persist_directory}'는 샤딩하지 않은 DB입니다. 샤딩하려면 다른 --db-dir를 지정하세요."
+            )
+        config = load_shard_config(self.persist_directory)
+        if shard_by is None:
+            if config is None:
+                raise ValueError("--rebuild-shard는 샤딩된 DB에서만 사용할 수 있습니다. (--shard-by 지정 필요)")
+            shard_by, shard_count = config["shard_by"], config["shard_count"]
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"알 수 없는 샤딩 방식: {shard_by} (선택 가능: {', '.join(SHARD_MODES)})")
+        if shard_by == 'dir':
+            # 디렉토리 샤딩은 샤드 수가 디렉토리 수로 정해짐
+            shard_count = None
+        elif shard_count < 1:
+            raise ValueError(f"샤드 수는 1 이상이어야 합니다: {shard_count}")
+        if config is not None and (config["shard_by"], config["shard_count"]) != (shard_by, shard_count):
+            # 파일 쌍이 들어갈 샤드가 달라지므로 처음부터 다시 만듦
+            print(f"샤딩 설정이 바뀌어({config['shard_by']}/{config['shard_count']} -> {shard_by}/{shard_count}) 모든 샤드를 다시 만듭니다.")
+            self._shard_embedders.clear()
+            shutil.rmtree(os.path.join(self.persist_directory, SHARDS_DIR), ignore_errors=True)
+            config = None
+
+        verbose = options.get("verbose", True)
+        pairs, discovery_stats = discover_project(project_dir, **(discovery_options or {}))
+        if verbose:
+            print(discovery_report(discovery_stats))
+        groups = group_pairs(pairs, project_dir, shard_by, shard_count)
+        shards = dict(config["shards"]) if config else {}
+
+        if rebuild_shards:
+            unknown = sorted(set(rebuild_shards) - set(groups))
+            if unknown:
+                raise ValueError(f"파일이 없는 샤드: {', '.join(unknown)} (선택 가능: {', '.join(groups)})")
+            targets = [name for name in groups if name in set(rebuild_shards)]
+            for name in targets:
+                self._remove_shard(name)
+        else:
+            targets = list(groups)
+            changed_paths = options.get("changed_paths")
+            if changed_paths is not None:
+                # 바뀐 파일이 키였을 샤드(삭제된 파일 포함)와, 헤더와 소스는 파일 이름(확장자 제외)으로
+                # 짝지어지므로 바뀐 파일과 이름이 같은 파일이 있는 샤드만 확인
+                touched = {shard_name(path, project_dir, shard_by, shard_count) for path in changed_paths}
+                stems = {os.path.splitext(os.path.basename(path))[0] for path in changed_paths}
+                targets = [
+                    name for name, files in groups.items()
+                    if name not in shards or name in touched or any(
+                        os.path.splitext(os.path.basename(path))[0] in stems
+                        for pair in files for path in pair if path is not None
+                    )
+                ]
+            # 파일이 모두 사라진 샤드 삭제
+            for name in sorted(set(shards) - set(groups)):
+                self._remove_shard(name)
+                del shards[name]
+                print(f"샤드 삭제: {name}")
+
+        result = {"updated": 0, "skipped": 0, "removed_chunks": 0}
+        for name in targets:
+            if verbose:
+                print(f"\n=== 샤드 {name}: 파일 쌍 {len(groups[name])}개 ===")
+            embedder = self._shard_embedders.get(name)
+            if embedder is None:
+                embedder = self._shard_embedders[name] = self._for_directory(shard_directory(self.persist_directory, name))
+            for key, value in embedder.embed_project(project_dir, pairs=groups[name], **options).items():
+                result[key] += value
+            shards[name] = {"files": len(groups[name])}
+            # 중간에 실패해도 이미 만든 샤드는 검색할 수 있도록 샤드마다 설정을 저장
+            save_shard_config(self.persist_directory, {"shard_by": shard_by, "shard_count": shard_count, "shards": dict(sorted(shards.items()))})
+        if verbose:
+            print(f"\n샤드 {len(shards)}개 중 {len(targets)}개 갱신 ({shard_by})")
+        return result
+
+    def export_snapshot(self, output_path: str) -> Dict:
         """
-        # 프로젝트 청킹
-        chunks_dir = os.path.join(project_dir, "chunks")
-        process_project(project_dir, chunks_dir, chunk_size, chunk_overlap)
-        
-        # 청크 파일들 처리
-        for root, _, files in os.walk(chunks_dir):
-            for file in files:
-                if file.endswith("_chunks.json"):
-                    file_path = os.path.join(root, file)
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        chunks = data["chunks"]
-                        metadata = {
-                            "file_name": file[:-12],  # _chunks.json 제거
-                            "language": "cpp",
-                            "chunk_size": chunk_size,
-                            "chunk_overlap": chunk_overlap,
-                            "header_path": data["header_path"],
-                            "cpp_path": data["cpp_path"],
-                            "type": data["type"]
-                        }
-                        self.embed_and_store_chunks(chunks, metadata)
+        DB 디렉토리의 인덱스를 스냅샷 파일로 내보냅니다. 스냅샷에는 이 임베더의 임베딩 모델 이름이 기록됩니다.
+
+        Args:
+            output_path (str): 만들 스냅샷 파일 경로
+
+        Returns:
+            Dict: 스냅샷 헤더
+        """
+        manifest = IndexManifest.load(self.persist_directory, None, None, embedder=self.embedder)
+        if manifest.stored_embedder not in (None, self.embedder):
+            raise ValueError(
+                f"'{self.persist_directory}'는 '{manifest.stored_embedder}' 임베딩으로 만든 DB입니다. "
+                f"--embedder {manifest.stored_embedder}로 내보내세요."
+            )
+        with METRICS.span("snapshot.export"):
+            return export_snapshot(self.persist_directory, output_path, self.embedding_model)
+
+    def import_snapshot(self, path: str, chunk_size: int = None, chunk_overlap: int = None, chunker: str = None, dedup: str = None, separators: str = None) -> Dict:
+        """
+        스냅샷을 이 임베더의 DB 디렉토리와 저장소 설정으로 가져옵니다. (다시 임베딩하지 않음)
+
+        임베딩 백엔드/모델과 지정한 청킹 설정이 스냅샷과 다르면 가져오지 않고 ValueError를 냅니다.
+
+        Args:
+            path (str): 스냅샷 파일 경로
+            chunk_size (int): 이후 증분 인덱싱에 쓸 청크 크기 (None이면 비교하지 않음)
+            chunk_overlap (int): 이후 증분 인덱싱에 쓸 청크 중복 크기
+            chunker (str): 이후 증분 인덱싱에 쓸 청킹 방식
+            dedup (str): 이후 증분 인덱싱에 쓸 중복 제거 방식
+            separators (str): 이후 증분 인덱싱에 쓸 구분자 집합
+
+        Returns:
+            Dict: 스냅샷 헤더
+        """
+        header = read_snapshot_header(path)
+        check_compatible(header, self.embedder, self.embedding_model, chunk_size=chunk_size, chunk_overlap=chunk_overlap, chunker=chunker, separators=separators, dedup=dedup)
+        with METRICS.span("snapshot.import"):
+            import_snapshot(path, self.persist_directory, self.store, self.store_dtype, self.store_rerank)
+        # 새로 적재한 저장소와 색인을 다시 열도록 초기화
+        self.db = None
+        self.lexical_index = None
+        self.file_table = None
+        return header
 
 def main():
     # 커맨드 라인 인자 파싱
@@ -122,25 +825,118 @@ def main():
     parser.add_argument('--chunk-overlap', type=int, default=200, help='청크 간 중복 크기 (기본값: 200)')
     parser.add_argument('--db-dir', type=str, default='code_chunks_db', help='Chroma DB 저장 디렉토리 (기본값: code_chunks_db)')
     parser.add_argument('--single-file', type=str, help='단일 파일 처리 (확장자 제외)')
+    parser.add_argument('--chunker', type=str, choices=CHUNKERS, default='splitter', help='청킹 방식 (기본값: splitter, lexer는 클래스/함수 경계 기준)')
+    parser.add_argument('--separators', type=str, choices=list(SEPARATOR_SETS), default=DEFAULT_SEPARATORS, help=f'구분자 집합 (기본값: {DEFAULT_SEPARATORS}, lines는 빈 줄/줄 단위만 사용)')
+    parser.add_argument('--embedder', type=str, choices=EMBEDDERS, default=DEFAULT_EMBEDDER, help=f'임베딩 백엔드 (기본값: {DEFAULT_EMBEDDER}, hashing은 네트워크 없이 로컬 계산)')
+    parser.add_argument('--embedding-dim', type=int, help='벡터 차원 (hashing 백엔드 전용, 기본값: 1024)')
+    parser.add_argument('--embedding-base-url', type=str, help='OpenAI 호환 임베딩 API 주소 (예: 로컬 대체 서버 http://127.0.0.1:8765/v1)')
+    parser.add_argument('--embedding-cache', type=str, default=DEFAULT_CACHE_PATH, help=f'임베딩 캐시 파일 경로 (기본값: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_MB, help=f'임베딩 캐시 최대 크기(MB) (기본값: {DEFAULT_CACHE_MAX_MB})')
+    parser.add_argument('--no-embedding-cache', action='store_true', help='임베딩 캐시 사용 안 함')
+    parser.add_argument('--batch-tokens', type=int, default=64000, help='임베딩 요청 하나의 최대 추정 토큰 수 (기본값: 64000)')
+    parser.add_argument('--batch-rows', type=int, default=512, help='임베딩 요청 하나의 최대 청크 수 (기본값: 512)')
+    parser.add_argument('--chunks-dir', type=str, help='파일별 청크 JSON을 함께 저장할 디렉토리 (선택사항, 기본값: 저장 안 함)')
+    parser.add_argument('--include-path', '-I', action='append', default=[], help='include 검색 경로 (여러 번 지정 가능)')
+    parser.add_argument('--exclude', action='append', help='탐색에서 제외할 경로 패턴 (.gitignore 형식, 여러 번 지정 가능, 지정하면 기본 제외 목록 대신 사용)')
+    parser.add_argument('--no-gitignore', action='store_true', help='.gitignore를 적용하지 않음')
+    parser.add_argument('--layout', action='append', choices=LAYOUTS, help='헤더/소스 짝짓기 방식 (여러 번 지정 가능, 기본값: same, include-src)')
+    parser.add_argument('--dedup', type=str, choices=DEDUP_MODES, default=DEFAULT_DEDUP, help=f'청크 중복 제거 방식 (기본값: {DEFAULT_DEDUP}, near는 MinHash로 거의 같은 청크도 합침)')
+    parser.add_argument('--near-threshold', type=float, default=DEFAULT_NEAR_THRESHOLD, help=f'near 중복 제거의 최소 유사도 (기본값: {DEFAULT_NEAR_THRESHOLD})')
+    parser.add_argument('--store', type=str, choices=STORES, default=DEFAULT_STORE, help=f'벡터 저장소 (기본값: {DEFAULT_STORE}, flat은 양자화 벡터를 메모리 맵 파일에 저장)')
+    parser.add_argument('--store-dtype', type=str, choices=STORE_DTYPES, default=DEFAULT_STORE_DTYPE, help=f'flat 저장소의 벡터 형식 (기본값: {DEFAULT_STORE_DTYPE})')
+    parser.add_argument('--store-rerank', action='store_true', help='flat 저장소에 float32 원본도 저장해 상위 후보를 재정렬')
+    parser.add_argument('--stream-threshold', type=float, default=STREAM_THRESHOLD / (1024 * 1024), help=f'파일 쌍 크기가 이보다 크면(MB) 전체를 읽지 않고 스트리밍으로 청킹 (기본값: {STREAM_THRESHOLD // (1024 * 1024)}, 음수면 사용 안 함)')
+    parser.add_argument('--shard-by', type=str, choices=SHARD_MODES, help='인덱스를 샤드로 나누는 방식 (dir은 최상위 디렉토리별, hash는 파일 경로 해시, 기본값: 샤딩 안 함 또는 기존 설정)')
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARD_COUNT, help=f'hash 샤딩의 샤드 수 (기본값: {DEFAULT_SHARD_COUNT})')
+    parser.add_argument('--rebuild-shard', action='append', help='지정한 샤드만 지우고 다시 만듦 (여러 번 지정 가능)')
+    parser.add_argument('--watch', action='store_true', help='--project-dir를 감시하며 바뀐 파일을 계속 인덱스에 반영 (Ctrl+C로 종료)')
+    parser.add_argument('--watch-backend', type=str, choices=WATCH_BACKENDS, default='auto', help='변경 감지 방식 (기본값: auto, inotify를 쓸 수 없으면 poll)')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, help=f'마지막 변경 후 반영까지 기다릴 시간(초) (기본값: {DEFAULT_DEBOUNCE})')
+    parser.add_argument('--max-delay', type=float, default=DEFAULT_MAX_DELAY, help=f'변경이 이어져도 이 시간(초)이 지나면 반영 (기본값: {DEFAULT_MAX_DELAY})')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help=f'poll 방식의 확인 주기(초) (기본값: {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument('--export-snapshot', type=str, help='인덱싱 후(또는 --project-dir 없이) --db-dir의 인덱스를 스냅샷 파일로 내보냄')
+    parser.add_argument('--import-snapshot', type=str, help='스냅샷 파일을 빈 --db-dir로 가져옴 (--project-dir를 함께 주면 가져온 뒤 바뀐 파일만 증분 인덱싱)')
+    add_profile_arguments(parser)
+    parser.add_argument('--queue-size', type=int, default=64, help='파이프라인 단계 사이 큐의 최대 크기 (기본값: 64)')
+    parser.add_argument('--max-in-flight', type=int, default=4, help='동시에 진행할 최대 임베딩 요청 수 (기본값: 4)')
     
     args = parser.parse_args()
+    start_profiling(args)
 
-    # 환경 변수 확인
-    if not os.getenv("OPENAI_API_KEY"):
+    # .env 파일에서 환경 변수 로드 후 확인 (로컬 백엔드는 API 키가 필요 없음)
+    load_environment()
+    if requires_api_key(args.embedder) and not os.getenv("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY가 설정되지 않았습니다.")
         print("'.env' 파일을 생성하고 OPENAI_API_KEY를 설정해주세요.")
         return
 
     # CodeEmbedder 인스턴스 생성
-    embedder = CodeEmbedder(persist_directory=args.db_dir)
+    embedder = CodeEmbedder(
+        persist_directory=args.db_dir,
+        embedding_base_url=args.embedding_base_url,
+        cache_path=None if args.no_embedding_cache else args.embedding_cache,
+        cache_max_mb=args.cache_max_mb,
+        embedder=args.embedder,
+        embedding_dim=args.embedding_dim,
+        store=args.store,
+        store_dtype=args.store_dtype,
+        store_rerank=args.store_rerank
+    )
+
+    if args.import_snapshot:
+        # 다시 임베딩하지 않고 스냅샷의 벡터를 그대로 적재
+        print(f"스냅샷 '{args.import_snapshot}'을 가져옵니다...")
+        started = time.perf_counter()
+        header = embedder.import_snapshot(
+            args.import_snapshot,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            chunker=args.chunker,
+            dedup=args.dedup,
+            separators=args.separators
+        )
+        print(snapshot_report(header))
+        print(f"스냅샷 가져오기가 완료되었습니다. (저장 위치: {args.db_dir}, {args.store}, {time.perf_counter() - started:.1f}초)")
 
+    watcher = None
     if args.project_dir:
         # 프로젝트 전체 처리
+        options = dict(
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            max_batch_tokens=args.batch_tokens,
+            max_batch_rows=args.batch_rows,
+            max_in_flight=args.max_in_flight,
+            chunker=args.chunker,
+            chunks_dir=args.chunks_dir,
+            queue_size=args.queue_size,
+            include_paths=args.include_path,
+            dedup=args.dedup,
+            near_threshold=args.near_threshold,
+            stream_threshold=stream_threshold_bytes(args.stream_threshold),
+            separators=args.separators
+        )
+        discovery_options = {"excludes": args.exclude, "use_gitignore": not args.no_gitignore, "layouts": args.layout}
+        if args.watch:
+            # 첫 인덱싱 중에 바뀐 파일도 놓치지 않도록 감시를 먼저 걸어둠
+            watcher = IndexWatcher(
+                embedder,
+                args.project_dir,
+                backend=args.watch_backend,
+                debounce=args.debounce,
+                max_delay=args.max_delay,
+                poll_interval=args.poll_interval,
+                discovery_options=discovery_options,
+                **options
+            )
         print(f"프로젝트 디렉토리 '{args.project_dir}'의 코드를 임베딩합니다...")
         embedder.embed_project(
             args.project_dir,
-            chunk_size=args.chunk_size,
-            chunk_overlap=args.chunk_overlap
+            discovery_options=discovery_options,
+            shard_by=args.shard_by,
+            shard_count=args.shards,
+            rebuild_shards=args.rebuild_shard,
+            **options
         )
         print(f"프로젝트 임베딩이 완료되었습니다. (저장 위치: {args.db_dir})")
     
@@ -154,11 +950,23 @@ def main():
         )
         print(f"파일 임베딩이 완료되었습니다. (저장 위치: {args.db_dir})")
     
-    else:
+    elif not (args.import_snapshot or args.export_snapshot):
         # 기본값: student.cpp 예제 파일 처리
         print("예제 파일 'student.cpp'를 임베딩합니다...")
         embedder.embed_cpp_file("student")
         print(f"예제 파일 임베딩이 완료되었습니다. (저장 위치: {args.db_dir})")
+    
+    if args.export_snapshot:
+        started = time.perf_counter()
+        header = embedder.export_snapshot(args.export_snapshot)
+        print(snapshot_report(header))
+        size_mb = os.path.getsize(args.export_snapshot) / (1024 * 1024)
+        print(f"스냅샷을 내보냈습니다. (저장 위치: {args.export_snapshot}, {size_mb:.1f}MB, {time.perf_counter() - started:.1f}초)")
+    
+    if watcher is not None:
+        watcher.run(initial_sync=False)
+    
+    finish_profiling(args)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
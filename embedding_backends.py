@@ -0,0 +1,229 @@
+import os
+import zlib
+import threading
+from typing import List
+
+import numpy as np
+
+from code_tokens import tokenize_code
+
+# 선택 가능한 임베딩 백엔드
+#   openai: OpenAI 임베딩 API (기본값, OPENAI_API_KEY 필요)
+#   hashing: 네트워크 없이 로컬 CPU에서 계산하는 해시 기반 임베딩
+EMBEDDERS = ('openai', 'hashing')
+DEFAULT_EMBEDDER = 'openai'
+
+OPENAI_MODEL = "text-embedding-3-small"
+DEFAULT_HASHING_DIM = 1024
+DEFAULT_HASHING_NGRAM = 3
+
+# 해시 혼합용 상수 (32비트)
+_GOLDEN = np.uint32(0x9E3779B1)
+_MIX_1 = np.uint32(0x85EBCA6B)
+_MIX_2 = np.uint32(0xC2B2AE35)
+
+def _mix(hashes: np.ndarray) -> np.ndarray:
+    """32비트 해시 값의 비트를 고르게 섞습니다 (murmur3 finalizer)."""
+    hashes = hashes ^ (hashes >> np.uint32(16))
+    hashes = hashes * _MIX_1
+    hashes = hashes ^ (hashes >> np.uint32(13))
+    hashes = hashes * _MIX_2
+    return hashes ^ (hashes >> np.uint32(16))
+
+class HashingEmbeddings:
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM, ngram: int = DEFAULT_HASHING_NGRAM, token_weight: float = 1.0, ngram_weight: float = 0.5):
+        """
+        식별자 토큰과 문자 n-gram을 해시해 고정 차원 벡터로 만드는 로컬 임베딩
+
+        네트워크나 모델 파일 없이 결정적인 벡터를 만들며, 여러 텍스트를 NumPy로 한 번에 처리합니다.
+
+        Args:
+            dim (int): 벡터 차원
+            ngram (int): 문자 n-gram 길이
+            token_weight (float): 식별자 토큰 특징의 가중치
+            ngram_weight (float): 문자 n-gram 특징의 가중치
+        """
+        self.dim = dim
+        self.ngram = ngram
+        self.token_weight = token_weight
+        self.ngram_weight = ngram_weight
+        self.model = f"hashing-{dim}-n{ngram}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        문서 임베딩
+
+        Args:
+            texts (List[str]): 텍스트 리스트
+
+        Returns:
+            List[List[float]]: L2 정규화된 임베딩 벡터 리스트
+        """
+        if not texts:
+            return []
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩. 문서 임베딩과 같은 방식입니다."""
+        return self.embed_array([text])[0].tolist()
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        텍스트 리스트를 (len(texts), dim) float32 배열로 임베딩합니다.
+
+        Args:
+            texts (List[str]): 텍스트 리스트
+
+        Returns:
+            np.ndarray: L2 정규화된 임베딩 행렬
+        """
+        count = len(texts)
+        doc_parts = []
+        hash_parts = []
+        weight_parts = []
+
+        # 식별자 토큰 특징: 토큰마다 crc32 해시
+        token_hashes = []
+        token_docs = []
+        for index, text in enumerate(texts):
+            tokens = tokenize_code(text)
+            token_hashes.extend(zlib.crc32(token.encode('utf-8')) for token in tokens)
+            token_docs.extend([index] * len(tokens))
+        if token_hashes:
+            doc_parts.append(np.asarray(token_docs, dtype=np.int64))
+            hash_parts.append(np.asarray(token_hashes, dtype=np.uint32))
+            weight_parts.append(np.full(len(token_hashes), self.token_weight, dtype=np.float32))
+
+        # 문자 n-gram 특징: 전체 텍스트를 한 바이트 배열로 이어 붙여 한 번에 해시
+        encoded = [text.lower().encode('utf-8') for text in texts]
+        lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=count)
+        buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint32)
+        if len(buffer) >= self.ngram:
+            docs = np.repeat(np.arange(count, dtype=np.int64), lengths)
+            span = len(buffer) - self.ngram + 1
+            hashes = np.zeros(span, dtype=np.uint32)
+            for offset in range(self.ngram):
+                hashes = (hashes * _GOLDEN) ^ buffer[offset:offset + span]
+            # 문서 경계를 넘는 n-gram 제외
+            valid = docs[:span] == docs[self.ngram - 1:]
+            doc_parts.append(docs[:span][valid])
+            hash_parts.append(hashes[valid] + np.uint32(0x5BD1E995))
+            weight_parts.append(np.full(int(valid.sum()), self.ngram_weight, dtype=np.float32))
+
+        matrix = np.zeros((count, self.dim), dtype=np.float32)
+        if hash_parts:
+            docs = np.concatenate(doc_parts)
+            hashes = _mix(np.concatenate(hash_parts))
+            # 상위 비트로 부호를 정해 해시 충돌의 편향을 줄임
+            signs = np.where(hashes >> np.uint32(31), -1.0, 1.0).astype(np.float32)
+            buckets = (hashes % np.uint32(self.dim)).astype(np.int64)
+            weights = np.concatenate(weight_parts) * signs
+            flat = np.bincount(docs * self.dim + buckets, weights=weights, minlength=count * self.dim)
+            matrix = flat.reshape(count, self.dim).astype(np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+_environment_loaded = False
+
+def load_environment() -> None:
+    """.env 파일의 환경 변수를 읽습니다. python-dotenv는 처음 호출할 때 임포트하고, 두 번째부터는 아무것도 하지 않습니다."""
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _environment_loaded = True
+
+def requires_api_key(embedder: str) -> bool:
+    """임베딩 백엔드가 OPENAI_API_KEY를 필요로 하는지 반환합니다."""
+    return embedder == 'openai'
+
+def embedding_model_name(embedder: str = DEFAULT_EMBEDDER, embedding_base_url: str = None, dim: int = None):
+    """
+    임베딩 객체를 만들지 않고 모델 이름과 디스크 캐시 사용 여부를 반환합니다.
+
+    Args:
+        embedder (str): 백엔드 이름 ('openai' 또는 'hashing')
+        embedding_base_url (str): OpenAI 호환 임베딩 API 주소 (openai 백엔드 전용, 선택사항)
+        dim (int): 벡터 차원 (hashing 백엔드 전용, 기본값: 1024)
+
+    Returns:
+        tuple: (캐시 키로 쓸 모델 이름, 디스크 캐시 사용 여부)
+    """
+    if embedder == 'openai':
+        # 다른 API 주소의 벡터가 섞이지 않도록 캐시 키에 주소 포함
+        return (f"{OPENAI_MODEL}@{embedding_base_url}" if embedding_base_url else OPENAI_MODEL), True
+    if embedder == 'hashing':
+        # 로컬 계산이 캐시 조회보다 빠르므로 디스크 캐시를 쓰지 않음
+        return f"hashing-{dim or DEFAULT_HASHING_DIM}-n{DEFAULT_HASHING_NGRAM}", False
+    raise ValueError(f"알 수 없는 임베딩 백엔드: {embedder} (선택 가능: {', '.join(EMBEDDERS)})")
+
+class LazyEmbeddings:
+    def __init__(self, factory):
+        """
+        첫 임베딩 요청 때 factory()로 실제 임베딩 객체를 만드는 래퍼
+
+        OpenAI 백엔드는 생성만으로 langchain_openai/langchain_core를 임포트하므로,
+        어휘 검색이나 메타데이터 조회처럼 임베딩이 필요 없는 경로는 이 비용을 내지 않습니다.
+
+        Args:
+            factory: 인자 없이 호출하면 임베딩 객체를 반환하는 함수
+        """
+        self._factory = factory
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """실제 임베딩 객체가 만들어졌는지 여부"""
+        return self._embeddings is not None
+
+    @property
+    def embeddings(self):
+        """실제 임베딩 객체 (처음 접근할 때 생성)"""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self._factory()
+        return self._embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+def create_embeddings(embedder: str = DEFAULT_EMBEDDER, embedding_base_url: str = None, dim: int = None):
+    """
+    이름으로 임베딩 백엔드를 생성합니다.
+
+    Args:
+        embedder (str): 백엔드 이름 ('openai' 또는 'hashing')
+        embedding_base_url (str): OpenAI 호환 임베딩 API 주소 (openai 백엔드 전용, 선택사항)
+        dim (int): 벡터 차원 (hashing 백엔드 전용, 기본값: 1024)
+
+    Returns:
+        tuple: (임베딩 객체, 캐시 키로 쓸 모델 이름, 디스크 캐시 사용 여부)
+    """
+    if embedder == 'openai':
+        # 무거운 의존성이므로 OpenAI 백엔드를 쓸 때만 임포트
+        from langchain_openai import OpenAIEmbeddings
+
+        load_environment()
+        embeddings = OpenAIEmbeddings(
+            model=OPENAI_MODEL,
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            openai_api_base=embedding_base_url,
+            # 대체 서버는 토큰 ID 입력을 지원하지 않을 수 있으므로 원문 그대로 전송
+            check_embedding_ctx_length=embedding_base_url is None
+        )
+        return (embeddings,) + embedding_model_name(embedder, embedding_base_url)
+
+    if embedder == 'hashing':
+        embeddings = HashingEmbeddings(dim=dim or DEFAULT_HASHING_DIM)
+        return (embeddings,) + embedding_model_name(embedder, dim=dim)
+
+    raise ValueError(f"알 수 없는 임베딩 백엔드: {embedder} (선택 가능: {', '.join(EMBEDDERS)})")
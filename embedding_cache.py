@@ -0,0 +1,215 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import List
+
+from embed_scheduler import estimate_tokens
+
+# 기본 캐시 위치: DB 디렉토리와 무관하게 재사용되도록 사용자 캐시 디렉토리에 저장
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-chunk", "embedding_cache.sqlite")
+DEFAULT_CACHE_MAX_MB = 1024
+
+# SQLite 바인드 변수 개수 제한을 넘지 않도록 조회를 나누는 단위
+_LOOKUP_BATCH = 500
+
+def text_hash(text: str) -> str:
+    """텍스트의 sha256 hex 해시를 반환합니다."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class CachedEmbeddings:
+    def __init__(self, embeddings, cache_path: str = DEFAULT_CACHE_PATH, model: str = None, max_mb: float = DEFAULT_CACHE_MAX_MB):
+        """
+        임베딩 객체를 감싸 (모델, 텍스트 sha256) 단위로 벡터를 디스크에 캐시하는 래퍼
+
+        Args:
+            embeddings: embed_documents/embed_query를 제공하는 임베딩 객체
+            cache_path (str): SQLite 캐시 파일 경로
+            model (str): 캐시 키에 쓸 모델 이름 (기본값: embeddings.model)
+            max_mb (float): 캐시 최대 크기(MB). 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+        """
+        self.embeddings = embeddings
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.cache_path = cache_path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "tokens_saved": 0,
+            "backend_seconds": 0.0,
+            "evicted": 0,
+        }
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        문서 임베딩. 캐시에 없는 텍스트만 원래 임베딩 객체로 계산합니다.
+
+        Args:
+            texts (List[str]): 텍스트 리스트
+
+        Returns:
+            List[List[float]]: 임베딩 벡터 리스트
+        """
+        hashes = [text_hash(text) for text in texts]
+        cached = self._lookup(hashes)
+
+        # 캐시에 없는 텍스트는 중복을 제거해 한 번만 계산
+        missing = {}
+        for text, digest in zip(texts, hashes):
+            if digest not in cached and digest not in missing:
+                missing[digest] = text
+
+        with self._lock:
+            for text, digest in zip(texts, hashes):
+                if digest in cached:
+                    self.stats["hits"] += 1
+                    self.stats["tokens_saved"] += estimate_tokens(text)
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            started = time.perf_counter()
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            elapsed = time.perf_counter() - started
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            with self._lock:
+                self.stats["backend_seconds"] += elapsed
+            cached.update(computed)
+
+        return [list(cached[digest]) for digest in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩. 문서 임베딩과 같은 캐시를 사용합니다."""
+        return self.embed_documents([text])[0]
+
+    def hit_rate(self) -> float:
+        """캐시 적중률(0~1)을 반환합니다."""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def report(self) -> str:
+        """캐시 효과 요약 문자열을 반환합니다."""
+        misses = self.stats["misses"]
+        avg_latency = self.stats["backend_seconds"] / misses if misses else 0.0
+        return (
+            f"임베딩 캐시: 적중 {self.stats['hits']}회, 미적중 {misses}회 "
+            f"(적중률 {self.hit_rate() * 100:.1f}%), "
+            f"절약한 토큰 약 {self.stats['tokens_saved']}개, "
+            f"절약한 시간 약 {avg_latency * self.stats['hits']:.2f}초, "
+            f"캐시 크기 {self._total_bytes / (1024 * 1024):.1f}MB"
+        )
+
+    def close(self) -> None:
+        """캐시 연결을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+    def _lookup(self, hashes: List[str]) -> dict:
+        """해시 목록 중 캐시에 있는 벡터를 조회하고 사용 시각을 갱신합니다."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                part = unique[start:start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model, *part]
+                ).fetchall()
+                for digest, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[digest] = vector
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model, digest) for digest in found]
+                )
+                self._conn.commit()
+        return found
+
+    def _store(self, vectors: dict) -> None:
+        """새로 계산한 벡터를 저장하고 크기 제한을 넘으면 오래된 항목을 삭제합니다."""
+        now = time.time()
+        rows = [(self.model, digest, array('f', vector).tobytes(), now) for digest, vector in vectors.items()]
+        with self._lock:
+            # 다른 스레드/프로세스가 먼저 저장한 항목은 교체되므로 이전 크기를 빼고 더함
+            replaced = self._stored_sizes(list(vectors))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._total_bytes += sum(len(row[2]) for row in rows) - sum(replaced.values())
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _stored_sizes(self, hashes: List[str]) -> dict:
+        """해시 목록 중 이미 저장된 항목의 벡터 크기(바이트)를 조회합니다. (잠금 보유 상태에서 호출)"""
+        sizes = {}
+        for start in range(0, len(hashes), _LOOKUP_BATCH):
+            part = hashes[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(part))
+            sizes.update(self._conn.execute(
+                f"SELECT text_hash, LENGTH(vector) FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model, *part]
+            ).fetchall())
+        return sizes
+
+    def _evict(self) -> None:
+        """가장 오래 사용하지 않은 항목부터 최대 크기의 90%까지 삭제합니다. (잠금 보유 상태에서 호출)"""
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT ?",
+                (_LOOKUP_BATCH,)
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            removed = []
+            for rowid, size in rows:
+                removed.append((rowid,))
+                self._total_bytes -= size
+                if self._total_bytes <= target:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", removed)
+            self.stats["evicted"] += len(removed)
+
+def wrap_with_cache(embeddings, cache_path: str = DEFAULT_CACHE_PATH, max_mb: float = DEFAULT_CACHE_MAX_MB, model: str = None):
+    """
+    임베딩 객체를 디스크 캐시로 감쌉니다. cache_path가 None이면 그대로 반환합니다.
+
+    Args:
+        embeddings: 임베딩 객체
+        cache_path (str): SQLite 캐시 파일 경로 (None이면 캐시 사용 안 함)
+        max_mb (float): 캐시 최대 크기(MB)
+        model (str): 캐시 키에 쓸 모델 이름
+
+    Returns:
+        임베딩 객체 (캐시 사용 시 CachedEmbeddings)
+    """
+    if cache_path is None:
+        return embeddings
+    return CachedEmbeddings(embeddings, cache_path, model=model, max_mb=max_mb)
@@ -0,0 +1,420 @@
+import os
+import re
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from typing import List, Dict
+from cpp_chunker import CHUNKERS, DEFAULT_SEPARATORS, SEPARATOR_SETS, SourceCache
+from discovery import LAYOUTS, discover_project, discovery_report
+from embedder import CodeEmbedder
+from retriever import SEARCH_MODES, CodeRetriever
+from flat_store import DEFAULT_STORE, STORES
+from metrics import add_profile_arguments, finish_profiling, start_profiling
+from embedding_cache import DEFAULT_CACHE_MAX_MB, DEFAULT_CACHE_PATH, CachedEmbeddings
+from embedding_backends import DEFAULT_EMBEDDER, EMBEDDERS, load_environment, requires_api_key
+
+# 지정하지 않았을 때 평가할 청킹 설정과 순위
+DEFAULT_CHUNK_SIZES = [1000]
+DEFAULT_CHUNK_OVERLAPS = [200]
+DEFAULT_KS = [1, 5, 10]
+
+# 중복 제거로 합친 청크의 위치 문자열 ("경로:시작줄-끝줄" 또는 "경로#청크 순번")에서 경로 부분
+_LOCATION_PATH = re.compile(r'^(.*?)(?::\d+-\d+|#\d+)$')
+
+def load_query_set(path: str) -> List[Dict]:
+    """
+    레이블된 쿼리 집합을 읽습니다. JSON 배열 또는 한 줄에 하나씩 쓴 JSONL 파일을 받습니다.
+
+    각 항목은 {"query": 쿼리, "file": 기대 파일, "symbol": 기대 심볼} 형식이며 file과 symbol 중 하나 이상이
+    있어야 합니다. 기대 결과가 여러 개면 {"query": 쿼리, "expected": [{"file": ..., "symbol": ...}, ...]}로 씁니다.
+
+    Args:
+        path (str): 쿼리 집합 파일 경로
+
+    Returns:
+        List[Dict]: {"query": 쿼리, "expected": [{"file": 파일 또는 None, "symbol": 심볼 또는 None}, ...]} 리스트
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    stripped = content.lstrip()
+    if stripped.startswith('['):
+        items = json.loads(content)
+    else:
+        items = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    queries = []
+    for number, item in enumerate(items, 1):
+        if not isinstance(item, dict) or not item.get("query"):
+            raise ValueError(f"'{path}'의 {number}번째 항목에 query가 없습니다.")
+        targets = item.get("expected") or [{"file": item.get("file"), "symbol": item.get("symbol")}]
+        expected = [
+            {"file": target.get("file"), "symbol": target.get("symbol")}
+            for target in targets
+            if target.get("file") or target.get("symbol")
+        ]
+        if not expected:
+            raise ValueError(f"'{path}'의 {number}번째 항목에 기대 결과(file 또는 symbol)가 없습니다: {item['query']}")
+        queries.append({"query": item["query"], "expected": expected})
+    if not queries:
+        raise ValueError(f"'{path}'에 쿼리가 없습니다.")
+    return queries
+
+def build_grid(chunk_sizes: List[int], chunk_overlaps: List[int], separators: List[str], chunkers: List[str]):
+    """
+    청킹 설정 조합을 만듭니다. 중복 크기가 청크 크기 이상인 조합은 건너뜁니다.
+
+    Returns:
+        tuple: (설정 리스트, 건너뛴 설정 리스트). 설정은 name, chunker, separators, chunk_size, chunk_overlap을 담은 dict
+    """
+    configs = []
+    skipped = []
+    for chunker in chunkers:
+        for separator_set in separators:
+            if separator_set not in SEPARATOR_SETS:
+                raise ValueError(f"알 수 없는 구분자 집합: {separator_set} (선택 가능: {', '.join(SEPARATOR_SETS)})")
+            for chunk_size in chunk_sizes:
+                for chunk_overlap in chunk_overlaps:
+                    config = {
+                        "name": f"{chunker}-{separator_set}-{chunk_size}-{chunk_overlap}",
+                        "chunker": chunker,
+                        "separators": separator_set,
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": chunk_overlap,
+                    }
+                    if chunk_size <= 0 or chunk_overlap < 0 or chunk_overlap >= chunk_size:
+                        skipped.append(config)
+                    else:
+                        configs.append(config)
+    return configs, skipped
+
+def _normalize_path(path: str) -> str:
+    return path.replace('\\', '/').rstrip('/')
+
+def result_paths(metadata: Dict) -> List[str]:
+    """검색 결과 청크가 나타나는 파일 경로들 (헤더, 소스, 중복 제거로 합친 다른 위치)"""
+    paths = [metadata.get("header_path"), metadata.get("cpp_path")]
+    for label in (metadata.get("locations") or '').split("; "):
+        match = _LOCATION_PATH.match(label)
+        if match:
+            paths.append(match.group(1))
+    return [_normalize_path(path) for path in paths if path]
+
+def matches_target(result: Dict, target: Dict) -> bool:
+    """
+    검색 결과가 기대 결과 하나와 일치하는지 확인합니다.
+
+    file은 결과 청크의 헤더/소스 경로(또는 확장자를 뺀 경로)가 그 경로로 끝나면(디렉토리 경계 기준) 일치하고,
+    symbol은 청크 텍스트에 단어 단위로 나타나면 일치합니다. (청킹 방식과 무관하게 같은 기준)
+    둘 다 있으면 모두 일치해야 합니다.
+
+    Args:
+        result (Dict): CodeRetriever 검색 결과 ({"code", "metadata"})
+        target (Dict): {"file", "symbol"}
+
+    Returns:
+        bool: 일치하면 True
+    """
+    metadata = result["metadata"] or {}
+    expected_file = target.get("file")
+    if expected_file:
+        expected_file = _normalize_path(expected_file)
+        # 확장자를 뺀 경로도 비교하므로 "student", "src/student", "src/student.h" 모두 쓸 수 있음
+        candidates = [candidate for path in result_paths(metadata) for candidate in (path, os.path.splitext(path)[0])]
+        if not any(candidate == expected_file or candidate.endswith('/' + expected_file) for candidate in candidates):
+            return False
+    symbol = target.get("symbol")
+    if symbol and not re.search(rf'(?<!\w){re.escape(symbol)}(?!\w)', result["code"]):
+        return False
+    return True
+
+def score_rankings(queries: List[Dict], rankings: List[List[Dict]], ks: List[int]) -> Dict:
+    """
+    쿼리별 검색 결과를 기대 결과와 비교해 recall@k와 MRR을 계산합니다.
+
+    recall@k는 쿼리마다 상위 k개 결과로 찾은 기대 결과의 비율을 평균한 값이고,
+    MRR은 기대 결과 중 하나와 처음 일치한 결과 순위의 역수를 평균한 값입니다. (상위 max(ks)개 안에 없으면 0)
+
+    Args:
+        queries (List[Dict]): load_query_set 결과
+        rankings (List[List[Dict]]): 쿼리별 검색 결과
+        ks (List[int]): recall을 계산할 순위들
+
+    Returns:
+        Dict: {"recall@k": ..., "mrr": ..., "misses": 기대 결과를 하나도 찾지 못한 쿼리 목록}
+    """
+    recall_totals = {k: 0.0 for k in ks}
+    reciprocal_total = 0.0
+    misses = []
+    for query, results in zip(queries, rankings):
+        expected = query["expected"]
+        # 기대 결과마다 처음 일치한 순위 (1부터, 없으면 None)
+        first_ranks = []
+        for target in expected:
+            rank = next((i for i, result in enumerate(results, 1) if matches_target(result, target)), None)
+            first_ranks.append(rank)
+        for k in ks:
+            recall_totals[k] += sum(1 for rank in first_ranks if rank is not None and rank <= k) / len(expected)
+        found = [rank for rank in first_ranks if rank is not None]
+        if found:
+            reciprocal_total += 1.0 / min(found)
+        else:
+            misses.append(query["query"])
+    count = max(1, len(queries))
+    scores = {f"recall@{k}": recall_totals[k] / count for k in ks}
+    scores["mrr"] = reciprocal_total / count
+    scores["misses"] = misses
+    return scores
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """정렬한 값에서 q 분위수를 반환합니다."""
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def directory_mb(path: str) -> float:
+    """디렉토리 전체 크기(MB)"""
+    size = 0
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return size / (1024 * 1024)
+
+def evaluate_index(retriever: CodeRetriever, queries: List[Dict], ks: List[int], mode: str) -> Dict:
+    """
+    인덱스 하나에서 쿼리 집합을 검색해 품질과 지연 시간을 측정합니다.
+
+    쿼리 임베딩 캐시나 저장소 열기 비용이 앞 설정에만 몰리지 않도록 모든 쿼리를 한 번 미리 실행한 뒤
+    두 번째 실행의 지연 시간과 결과를 사용합니다.
+
+    Returns:
+        Dict: recall@k, mrr, misses와 지연 시간 latency_ms ({"mean", "p50", "p95"})
+    """
+    k = max(ks)
+    for query in queries:
+        retriever.similarity_search(query["query"], k=k, mode=mode)
+    latencies = []
+    rankings = []
+    for query in queries:
+        started = time.perf_counter()
+        rankings.append(retriever.similarity_search(query["query"], k=k, mode=mode))
+        latencies.append((time.perf_counter() - started) * 1000)
+    scores = score_rankings(queries, rankings, ks)
+    latencies.sort()
+    scores["latency_ms"] = {
+        "mean": sum(latencies) / len(latencies),
+        "p50": _percentile(latencies, 0.5),
+        "p95": _percentile(latencies, 0.95),
+    }
+    return scores
+
+def run_sweep(
+    embedder: CodeEmbedder,
+    project_dir: str,
+    queries: List[Dict],
+    configs: List[Dict],
+    work_dir: str,
+    retriever_options: Dict = None,
+    modes: List[str] = None,
+    ks: List[int] = None,
+    include_paths: List[str] = None,
+    discovery_options: Dict = None,
+    reuse_sources: bool = True,
+    verbose: bool = True
+) -> Dict:
+    """
+    청킹 설정마다 프로젝트 인덱스를 만들고 레이블된 쿼리 집합으로 검색 품질과 지연 시간을 평가합니다.
+
+    프로젝트는 한 번만 탐색하고, 파일 쌍을 읽고 인라인화한 결과(SourceCache)를 모든 설정이 공유하므로
+    설정마다 달라지는 청킹, 임베딩, 저장만 반복됩니다. 임베딩 캐시를 쓰면 설정 사이에 같은 청크는 한 번만 임베딩됩니다.
+    설정별 인덱스는 work_dir/<설정 이름>에 만듭니다.
+
+    Args:
+        embedder (CodeEmbedder): 임베딩 백엔드와 저장소 설정 (DB 디렉토리는 설정마다 바꿔 사용)
+        project_dir (str): 프로젝트 디렉토리 경로
+        queries (List[Dict]): load_query_set 결과
+        configs (List[Dict]): build_grid로 만든 청킹 설정 리스트
+        work_dir (str): 설정별 인덱스를 만들 디렉토리
+        retriever_options (Dict): CodeRetriever에 넘길 옵션 (embedder, cache_path 등, 인덱싱과 같은 임베딩이어야 함)
+        modes (List[str]): 평가할 검색 방식 (기본값: ['vector'])
+        ks (List[int]): recall을 계산할 순위들 (기본값: [1, 5, 10])
+        include_paths (List[str]): 추가 include 검색 경로
+        discovery_options (Dict): discover_project에 넘길 탐색 옵션
+        reuse_sources (bool): 파일 읽기/인라인화 결과를 설정 사이에 재사용할지 여부
+        verbose (bool): 진행 상황을 출력할지 여부
+
+    Returns:
+        Dict: {"project", "queries", "configs": [설정별 결과], "source_cache"}. 설정별 결과는 설정 값과
+            build_seconds, chunks, index_mb, 검색 방식별 점수(modes)를 담음
+    """
+    modes = modes or ['vector']
+    ks = sorted(set(ks or DEFAULT_KS))
+    pairs, discovery_stats = discover_project(project_dir, **(discovery_options or {}))
+    if verbose:
+        print(discovery_report(discovery_stats))
+    source_cache = SourceCache() if reuse_sources else None
+
+    results = []
+    for number, config in enumerate(configs, 1):
+        if verbose:
+            print(f"[{number}/{len(configs)}] {config['name']} 인덱싱 중...")
+        persist_directory = os.path.join(work_dir, config["name"])
+        shutil.rmtree(persist_directory, ignore_errors=True)
+        target = embedder._for_directory(persist_directory)
+        started = time.perf_counter()
+        target.embed_project(
+            project_dir,
+            chunk_size=config["chunk_size"],
+            chunk_overlap=config["chunk_overlap"],
+            chunker=config["chunker"],
+            separators=config["separators"],
+            include_paths=include_paths,
+            pairs=pairs,
+            source_cache=source_cache,
+            verbose=False
+        )
+        build_seconds = time.perf_counter() - started
+        entry = dict(config, build_seconds=build_seconds, chunks=target.db._collection.count(), index_mb=directory_mb(persist_directory))
+
+        retriever = CodeRetriever(persist_directory=persist_directory, **(retriever_options or {}))
+        entry["modes"] = {mode: evaluate_index(retriever, queries, ks, mode) for mode in modes}
+        results.append(entry)
+        if verbose:
+            summary = ", ".join(
+                f"{mode} MRR {scores['mrr']:.3f} recall@{ks[-1]} {scores[f'recall@{ks[-1]}']:.3f}"
+                for mode, scores in entry["modes"].items()
+            )
+            print(f"  청크 {entry['chunks']}개, {entry['index_mb']:.1f}MB, 빌드 {build_seconds:.1f}초, {summary}")
+
+    sweep = {
+        "project": project_dir,
+        "queries": len(queries),
+        "pairs": len(pairs),
+        "ks": ks,
+        "configs": results,
+    }
+    if source_cache is not None:
+        sweep["source_cache"] = dict(source_cache.stats, pairs=len(source_cache.entries))
+    return sweep
+
+def sweep_report(sweep: Dict) -> str:
+    """설정별 결과를 검색 방식마다 표로 만든 문자열을 반환합니다. 방식마다 MRR이 가장 높은 설정을 표시합니다."""
+    ks = sweep["ks"]
+    modes = list(sweep["configs"][0]["modes"]) if sweep["configs"] else []
+    lines = [f"평가: 쿼리 {sweep['queries']}개, 파일 쌍 {sweep['pairs']}개, 설정 {len(sweep['configs'])}개"]
+    for mode in modes:
+        header = ("설정", "청크", "크기(MB)", "빌드(초)") + tuple(f"R@{k}" for k in ks) + ("MRR", "p50(ms)", "p95(ms)")
+        rows = [header]
+        best = max(sweep["configs"], key=lambda entry: entry["modes"][mode]["mrr"])
+        for entry in sweep["configs"]:
+            scores = entry["modes"][mode]
+            rows.append(
+                (("* " if entry is best else "  ") + entry["name"], str(entry["chunks"]), f"{entry['index_mb']:.1f}", f"{entry['build_seconds']:.1f}")
+                + tuple(f"{scores[f'recall@{k}']:.3f}" for k in ks)
+                + (f"{scores['mrr']:.3f}", f"{scores['latency_ms']['p50']:.1f}", f"{scores['latency_ms']['p95']:.1f}")
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines.append(f"\n검색 방식: {mode} (* MRR 최고)")
+        for row in rows:
+            lines.append("  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))))
+    if "source_cache" in sweep:
+        cache = sweep["source_cache"]
+        lines.append(f"\n소스 캐시: 파일 쌍 {cache['pairs']}개, 재사용 {cache['hits']}회, 새로 읽음 {cache['misses']}회")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='청킹 설정 조합별로 인덱스를 만들어 레이블된 쿼리 집합으로 검색 품질과 지연 시간을 평가합니다.')
+    parser.add_argument('--project-dir', type=str, required=True, help='프로젝트 디렉토리 경로')
+    parser.add_argument('--queries', type=str, required=True, help='레이블된 쿼리 집합 (JSON 배열 또는 JSONL, 항목마다 query와 file/symbol)')
+    parser.add_argument('--chunk-size', type=int, action='append', help='평가할 청크 크기 (여러 번 지정 가능, 기본값: 1000)')
+    parser.add_argument('--chunk-overlap', type=int, action='append', help='평가할 청크 중복 크기 (여러 번 지정 가능, 기본값: 200)')
+    parser.add_argument('--separators', type=str, action='append', choices=list(SEPARATOR_SETS), help=f'평가할 구분자 집합 (여러 번 지정 가능, 기본값: {DEFAULT_SEPARATORS})')
+    parser.add_argument('--chunker', type=str, action='append', choices=CHUNKERS, help='평가할 청킹 방식 (여러 번 지정 가능, 기본값: splitter)')
+    parser.add_argument('--mode', type=str, action='append', choices=SEARCH_MODES, help='평가할 검색 방식 (여러 번 지정 가능, 기본값: vector)')
+    parser.add_argument('--k', type=int, action='append', help='recall을 계산할 순위 (여러 번 지정 가능, 기본값: 1, 5, 10)')
+    parser.add_argument('--work-dir', type=str, help='설정별 인덱스를 만들어 남겨 둘 디렉토리 (기본값: 임시 디렉토리, 끝나면 삭제)')
+    parser.add_argument('--output', type=str, help='결과 JSON 파일 경로')
+    parser.add_argument('--no-source-reuse', action='store_true', help='설정마다 파일을 다시 읽고 인라인화 (재사용 효과 비교용)')
+    parser.add_argument('--embedder', type=str, choices=EMBEDDERS, default=DEFAULT_EMBEDDER, help=f'임베딩 백엔드 (기본값: {DEFAULT_EMBEDDER}, hashing은 네트워크 없이 로컬 계산)')
+    parser.add_argument('--embedding-dim', type=int, help='벡터 차원 (hashing 백엔드 전용, 기본값: 1024)')
+    parser.add_argument('--embedding-base-url', type=str, help='OpenAI 호환 임베딩 API 주소 (예: 로컬 대체 서버 http://127.0.0.1:8765/v1)')
+    parser.add_argument('--embedding-cache', type=str, default=DEFAULT_CACHE_PATH, help=f'임베딩 캐시 파일 경로 (기본값: {DEFAULT_CACHE_PATH}, 설정 사이에 같은 청크는 한 번만 임베딩)')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_MB, help=f'임베딩 캐시 최대 크기(MB) (기본값: {DEFAULT_CACHE_MAX_MB})')
+    parser.add_argument('--no-embedding-cache', action='store_true', help='임베딩 캐시 사용 안 함')
+    parser.add_argument('--store', type=str, choices=STORES, default=DEFAULT_STORE, help=f'벡터 저장소 (기본값: {DEFAULT_STORE})')
+    parser.add_argument('--include-path', '-I', action='append', default=[], help='include 검색 경로 (여러 번 지정 가능)')
+    parser.add_argument('--exclude', action='append', help='탐색에서 제외할 경로 패턴 (.gitignore 형식, 여러 번 지정 가능, 지정하면 기본 제외 목록 대신 사용)')
+    parser.add_argument('--no-gitignore', action='store_true', help='.gitignore를 적용하지 않음')
+    parser.add_argument('--layout', action='append', choices=LAYOUTS, help='헤더/소스 짝짓기 방식 (여러 번 지정 가능, 기본값: same, include-src)')
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    start_profiling(args)
+
+    # .env 파일에서 환경 변수 로드 후 확인 (로컬 백엔드는 API 키가 필요 없음)
+    load_environment()
+    if requires_api_key(args.embedder) and not os.getenv("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY가 설정되지 않았습니다.")
+        print("'.env' 파일을 생성하고 OPENAI_API_KEY를 설정해주세요.")
+        return
+
+    queries = load_query_set(args.queries)
+    configs, skipped = build_grid(
+        args.chunk_size or DEFAULT_CHUNK_SIZES,
+        args.chunk_overlap or DEFAULT_CHUNK_OVERLAPS,
+        args.separators or [DEFAULT_SEPARATORS],
+        args.chunker or ['splitter']
+    )
+    for config in skipped:
+        print(f"건너뜀: {config['name']} (중복 크기는 청크 크기보다 작아야 합니다)")
+    if not configs:
+        print("평가할 청킹 설정이 없습니다.")
+        return
+
+    cache_path = None if args.no_embedding_cache else args.embedding_cache
+    embedder = CodeEmbedder(
+        embedding_base_url=args.embedding_base_url,
+        cache_path=cache_path,
+        cache_max_mb=args.cache_max_mb,
+        embedder=args.embedder,
+        embedding_dim=args.embedding_dim,
+        store=args.store
+    )
+    retriever_options = dict(
+        cache_path=cache_path,
+        cache_max_mb=args.cache_max_mb,
+        embedding_base_url=args.embedding_base_url,
+        embedder=args.embedder,
+        embedding_dim=args.embedding_dim,
+        store=args.store
+    )
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="mcp_chunk_eval_")
+    print(f"쿼리 {len(queries)}개로 청킹 설정 {len(configs)}개를 평가합니다... (인덱스 위치: {work_dir})")
+    try:
+        sweep = run_sweep(
+            embedder,
+            args.project_dir,
+            queries,
+            configs,
+            work_dir,
+            retriever_options=retriever_options,
+            modes=args.mode,
+            ks=args.k,
+            include_paths=args.include_path,
+            discovery_options={"excludes": args.exclude, "use_gitignore": not args.no_gitignore, "layouts": args.layout},
+            reuse_sources=not args.no_source_reuse
+        )
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print()
+    print(sweep_report(sweep))
+    if isinstance(embedder.embeddings, CachedEmbeddings):
+        print(embedder.embeddings.report())
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(sweep, f, ensure_ascii=False, indent=2)
+        print(f"결과를 저장했습니다: {args.output}")
+    finish_profiling(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import json
+import base64
+import struct
+import hashlib
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def fake_vector(item, dim: int):
+    """입력(문자열 또는 토큰 ID 리스트)으로부터 결정적인 단위 벡터를 만듭니다."""
+    raw = item if isinstance(item, str) else json.dumps(item)
+    seed = hashlib.sha256(raw.encode('utf-8')).digest()
+    values = []
+    counter = 0
+    while len(values) < dim:
+        block = hashlib.sha256(seed + counter.to_bytes(4, 'little')).digest()
+        values.extend((b - 127.5) / 127.5 for b in block)
+        counter += 1
+    values = values[:dim]
+    norm = sum(v * v for v in values) ** 0.5 or 1.0
+    return [v / norm for v in values]
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    """OpenAI 호환 /v1/embeddings 엔드포인트를 흉내 내는 요청 핸들러"""
+
+    def do_POST(self):
+        server = self.server
+        if not self.path.rstrip('/').endswith('/embeddings'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        with server.lock:
+            server.request_count += 1
+            count = server.request_count
+        if server.rate_limit_every and count % server.rate_limit_every == 0:
+            # 일정 간격으로 429 응답
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}}).encode('utf-8')
+            self.send_response(429)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Retry-After', str(server.retry_after))
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        inputs = body.get('input', [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+
+        data = []
+        for i, item in enumerate(inputs):
+            vector = fake_vector(item, server.dim)
+            if body.get('encoding_format') == 'base64':
+                vector = base64.b64encode(struct.pack(f'<{len(vector)}f', *vector)).decode('ascii')
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+
+        payload = json.dumps({
+            "object": "list",
+            "data": data,
+            "model": body.get('model', 'fake'),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def create_server(host: str = "127.0.0.1", port: int = 8765, dim: int = 256, latency: float = 0.0,
+                  rate_limit_every: int = 0, retry_after: float = 0.5, verbose: bool = False):
+    """
+    로컬 대체 임베딩 서버를 생성합니다.
+
+    Args:
+        host (str): 바인드 주소
+        port (int): 포트 (0이면 임의 포트)
+        dim (int): 벡터 차원
+        latency (float): 요청당 인위적 지연(초)
+        rate_limit_every (int): N번째 요청마다 429 응답 (0이면 사용 안 함)
+        retry_after (float): 429 응답의 Retry-After 값(초)
+        verbose (bool): 요청 로그 출력 여부
+
+    Returns:
+        ThreadingHTTPServer: 서버 객체. base URL은 http://host:port/v1
+    """
+    server = ThreadingHTTPServer((host, port), FakeEmbeddingHandler)
+    server.dim = dim
+    server.latency = latency
+    server.rate_limit_every = rate_limit_every
+    server.retry_after = retry_after
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.request_count = 0
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='테스트용 로컬 OpenAI 호환 임베딩 서버')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='바인드 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='포트 (기본값: 8765)')
+    parser.add_argument('--dim', type=int, default=256, help='벡터 차원 (기본값: 256)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='요청당 지연 (밀리초)')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='N번째 요청마다 429 응답 (기본값: 0, 사용 안 함)')
+    parser.add_argument('--verbose', action='store_true', help='요청 로그 출력')
+
+    args = parser.parse_args()
+
+    server = create_server(
+        args.host,
+        args.port,
+        dim=args.dim,
+        latency=args.latency_ms / 1000.0,
+        rate_limit_every=args.rate_limit_every,
+        verbose=args.verbose
+    )
+    print(f"대체 임베딩 서버 실행 중: http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+FILE_TABLE_VERSION = 1
+FILE_TABLE_FILE = "file_table.json"
+
+# 청크마다 반복하지 않고 파일 테이블에 한 번만 저장하는 파일 단위 메타데이터
+FILE_FIELDS = ("file_name", "language", "chunk_size", "chunk_overlap", "header_path", "cpp_path", "type", "dependencies")
+
+# 일치하는 파일이 없는 조건을 대신할 파일 ID (어떤 청크의 file_id와도 같지 않음)
+_NO_FILE = ""
+
+# 모든 파일과 일치하는 조건 (필터에서 빠짐)
+_ALL_FILES = None
+
+# 중복 제거로 여러 파일이 공유하는 청크에 저장하는 자기 청크 ID 필드.
+# 저장 청크의 file_id는 첫 위치의 파일이므로, 다른 위치의 파일에 대한 필터는 이 필드로 공유 청크를 함께 고름
+SHARED_ID_FIELD = "shared_id"
+
+def make_file_id(file_key: str) -> str:
+    """
+    파일 쌍의 짧은 결정적 ID를 만듭니다. 같은 파일은 실행이나 샤드가 달라도 항상 같은 ID를 가집니다.
+
+    Args:
+        file_key (str): 파일 쌍 키 (헤더 파일 절대 경로, 헤더가 없으면 소스 경로)
+
+    Returns:
+        str: 12자리 hex 문자열
+    """
+    return hashlib.sha1(file_key.encode('utf-8')).hexdigest()[:12]
+
+def _value_key(value) -> str:
+    """값 색인의 키 (True와 1처럼 타입이 다른 값을 구분)"""
+    return json.dumps(value, sort_keys=True)
+
+def _matches(value, operator: str, operand) -> bool:
+    """파일 속성 값 하나가 Chroma 형식 조건을 만족하는지 확인합니다."""
+    if operator == '$eq':
+        return _value_key(value) == _value_key(operand)
+    if operator == '$ne':
+        return _value_key(value) != _value_key(operand)
+    if operator in ('$in', '$nin'):
+        found = _value_key(value) in {_value_key(item) for item in operand}
+        return found if operator == '$in' else not found
+    comparisons = {
+        '$gt': lambda stored: stored > operand,
+        '$gte': lambda stored: stored >= operand,
+        '$lt': lambda stored: stored < operand,
+        '$lte': lambda stored: stored <= operand,
+    }
+    if operator not in comparisons:
+        raise ValueError(f"지원하지 않는 필터 연산자: {operator}")
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and comparisons[operator](value)
+
+class FileTable:
+    def __init__(self, path: str = None):
+        """
+        파일 단위 메타데이터(파일 이름, 경로, 청킹 설정 등)를 파일 ID별로 한 번만 저장하는 테이블
+
+        청크 메타데이터에는 file_id와 청크별 값(순번, 줄 범위, 심볼)만 저장하고, 검색 결과를 돌려줄 때
+        이 테이블로 파일 단위 값을 다시 채웁니다. 파일 단위 값에 대한 필터는 file_id 조건으로 바꿔 저장소에 넘깁니다.
+
+        Args:
+            path (str): 테이블 파일 경로 (None이면 저장하지 않음)
+        """
+        self.path = path
+        # 파일 ID -> {필드: 값}
+        self.files = {}
+        # 파일 ID -> 그 파일이 첫 위치가 아닌 위치로 들어 있는 공유 청크 ID 목록 (중복 제거 시)
+        self.shared = {}
+        self.dirty = False
+        # 필드 -> {값 키: [파일 ID]} ($eq/$in 조건용, 처음 쓸 때 만듦)
+        self._value_index = {}
+        # 필터 JSON -> 바꾼 필터
+        self._filters = {}
+
+    @staticmethod
+    def exists(persist_directory: str) -> bool:
+        """DB 디렉토리에 파일 테이블이 있는지 (없으면 파일 단위 값을 청크마다 저장한 이전 형식의 DB)"""
+        return os.path.exists(os.path.join(persist_directory, FILE_TABLE_FILE))
+
+    @classmethod
+    def load(cls, persist_directory: str) -> 'FileTable':
+        """
+        DB 디렉토리에서 테이블을 읽습니다. 파일이 없거나 버전이 다르면 빈 테이블을 반환합니다.
+
+        Args:
+            persist_directory (str): DB 저장 디렉토리
+
+        Returns:
+            FileTable: 파일 테이블
+        """
+        table = cls(os.path.join(persist_directory, FILE_TABLE_FILE))
+        if not os.path.exists(table.path):
+            return table
+        with open(table.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") == FILE_TABLE_VERSION:
+            table.files = data.get("files", {})
+            table.shared = data.get("shared", {})
+        return table
+
+    @classmethod
+    def merge(cls, tables: List['FileTable']) -> 'FileTable':
+        """여러 테이블(샤드별 테이블 등)을 합친 읽기용 테이블. 파일 ID는 파일 경로로 정해지므로 겹치지 않습니다."""
+        merged = cls()
+        for table in tables:
+            merged.files.update(table.files)
+            merged.shared.update(table.shared)
+        return merged
+
+    def save(self) -> None:
+        """테이블을 원자적으로 저장합니다. 바뀐 것이 없으면 아무것도 하지 않습니다."""
+        if self.path is None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": FILE_TABLE_VERSION, "files": self.files, "shared": self.shared}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def put(self, file_id: str, attributes: Dict) -> None:
+        """파일의 속성을 저장합니다. 같은 ID가 있으면 교체합니다."""
+        if self.files.get(file_id) == attributes:
+            return
+        self.files[file_id] = dict(attributes)
+        self._changed()
+
+    def remove(self, file_ids: List[str]) -> None:
+        """파일들을 테이블에서 지웁니다."""
+        removed = [file_id for file_id in file_ids if self.files.pop(file_id, None) is not None]
+        for file_id in file_ids:
+            self.shared.pop(file_id, None)
+        if removed:
+            self._changed()
+
+    def set_shared(self, shared: Dict[str, List[str]]) -> None:
+        """
+        파일별 공유 청크 목록을 교체합니다. (ChunkDeduplicator.shared_chunks 결과, 중복 제거를 끄면 빈 dict)
+
+        Args:
+            shared (Dict[str, List[str]]): 파일 ID -> 그 파일이 첫 위치가 아닌 공유 청크 ID 목록
+        """
+        if shared == self.shared:
+            return
+        self.shared = {file_id: list(chunk_ids) for file_id, chunk_ids in shared.items()}
+        self._changed()
+
+    def _changed(self) -> None:
+        self.dirty = True
+        self._value_index = {}
+        self._filters = {}
+
+    def rehydrate(self, metadata: Optional[Dict]) -> Optional[Dict]:
+        """
+        청크 메타데이터에 파일 단위 값을 채운 메타데이터를 반환합니다. file_id가 없으면(이전 형식) 그대로 반환합니다.
+
+        Args:
+            metadata (Dict): 저장소에서 읽은 청크 메타데이터
+
+        Returns:
+            Dict: 파일 속성과 청크 메타데이터를 합친 메타데이터
+        """
+        attributes = self.files.get((metadata or {}).get("file_id"))
+        if attributes is None:
+            return metadata
+        return {**attributes, **metadata}
+
+    def translate_filter(self, where: Optional[Dict]) -> Optional[Dict]:
+        """
+        파일 단위 필드에 대한 조건을 file_id 조건으로 바꾼 Chroma 형식 필터를 반환합니다.
+
+        예를 들어 {"file_name": "student"}는 {"file_id": {"$in": [일치하는 파일 ID]}}가 됩니다.
+        모든 파일과 일치하는 조건은 빠지고, 일치하는 파일이 전체의 절반보다 많으면 나머지를 $nin으로 제외해
+        저장소에 넘기는 ID 목록을 짧게 유지합니다. 청크 단위 필드(start_line 등) 조건은 그대로 둡니다.
+        중복 제거로 공유된 청크는 위치 중 하나라도 조건에 맞는 파일이면 일치하도록 shared_id 조건을 $or로 더합니다.
+        (한 조건 안에서만 위치를 따지므로 여러 파일 단위 조건을 $and로 묶으면 서로 다른 위치가 각각 맞아도 일치합니다)
+
+        Args:
+            where (Dict): Chroma 형식 필터 ($and, $or, $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte)
+
+        Returns:
+            Dict: 바꾼 필터 (조건이 모두 빠지면 None)
+        """
+        if not where:
+            return where
+        cache_key = _value_key(where)
+        if cache_key not in self._filters:
+            self._filters[cache_key] = self._translate(where)
+        return self._filters[cache_key]
+
+    def _translate(self, where: Dict) -> Optional[Dict]:
+        clauses = []
+        for key, condition in where.items():
+            if key in ('$and', '$or'):
+                translated = [self._translate(clause) for clause in condition]
+                if key == '$or' and any(clause is _ALL_FILES for clause in translated):
+                    # 항상 참인 절이 있으면 $or 전체가 참
+                    continue
+                translated = [clause for clause in translated if clause is not _ALL_FILES]
+                if len(translated) == 1:
+                    clauses.append(translated[0])
+                elif translated:
+                    clauses.append({key: translated})
+                continue
+            if key not in FILE_FIELDS:
+                clauses.append({key: condition})
+                continue
+            if isinstance(condition, dict):
+                if len(condition) != 1:
+                    raise ValueError(f"필터 조건에는 연산자가 하나만 있어야 합니다: {condition}")
+                (operator, operand), = condition.items()
+            else:
+                operator, operand = '$eq', condition
+            matched = self._matching_ids(key, operator, operand)
+            if not matched:
+                clauses.append({"file_id": {"$in": [_NO_FILE]}})
+            elif len(matched) == len(self.files):
+                continue
+            else:
+                clauses.append(self._file_clause(matched))
+        if not clauses:
+            return _ALL_FILES
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _file_clause(self, matched: List[str]) -> Dict:
+        """일치하는 파일 ID 목록을 저장소 조건으로 만듭니다. 그 파일들이 다른 위치로 들어 있는 공유 청크도 포함합니다."""
+        if len(matched) * 2 > len(self.files):
+            matched_set = set(matched)
+            clause = {"file_id": {"$nin": sorted(file_id for file_id in self.files if file_id not in matched_set)}}
+        else:
+            clause = {"file_id": {"$in": sorted(matched)}}
+        shared = sorted({chunk_id for file_id in matched for chunk_id in self.shared.get(file_id, ())})
+        if not shared:
+            return clause
+        return {"$or": [clause, {SHARED_ID_FIELD: {"$in": shared}}]}
+
+    def _matching_ids(self, key: str, operator: str, operand) -> List[str]:
+        """필드 조건과 일치하는 파일 ID 목록. 필드가 없는 파일은 어떤 조건과도 일치하지 않습니다."""
+        if operator in ('$eq', '$in'):
+            index = self._value_index.get(key)
+            if index is None:
+                index = self._value_index[key] = {}
+                for file_id, attributes in self.files.items():
+                    if key in attributes:
+                        index.setdefault(_value_key(attributes[key]), []).append(file_id)
+            operands = [operand] if operator == '$eq' else operand
+            matched = []
+            for item in operands:
+                matched.extend(index.get(_value_key(item), []))
+            return list(dict.fromkeys(matched))
+        return [
+            file_id for file_id, attributes in self.files.items()
+            if key in attributes and _matches(attributes[key], operator, operand)
+        ]
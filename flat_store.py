@@ -0,0 +1,813 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import argparse
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 벡터 저장소 백엔드
+#   chroma: Chroma(HNSW) 컬렉션 (기본값)
+#   flat: 양자화 벡터를 메모리 맵 NumPy 파일에 저장하고 정확한 전수 검색
+STORES = ('chroma', 'flat')
+DEFAULT_STORE = 'chroma'
+
+# flat 저장소의 벡터 저장 형식 (int8은 행별 스케일로 대칭 양자화)
+STORE_DTYPES = ('int8', 'float16')
+DEFAULT_STORE_DTYPE = 'int8'
+
+FLAT_STORE_VERSION = 1
+FLAT_STORE_DIR = "flat_store"
+FLAT_MANIFEST_FILE = "manifest.json"
+
+# float32 재정렬 시 양자화 점수로 고를 후보 수 (k의 배수)
+RERANK_FACTOR = 4
+
+# 한 번에 행렬곱할 최대 행 수 (양자화 벡터를 float32로 바꾸는 임시 메모리 제한)
+BLOCK_ROWS = 32768
+
+# 세그먼트가 이보다 많거나 삭제된 행 비율이 이보다 크면 저장 시 하나로 합침
+MAX_SEGMENTS = 8
+MAX_DEAD_RATIO = 0.3
+
+def detect_store(persist_directory: str) -> str:
+    """
+    DB 디렉토리에 flat 저장소가 있으면 'flat', 없으면 'chroma'를 반환합니다.
+
+    Args:
+        persist_directory (str): DB 저장 디렉토리
+
+    Returns:
+        str: 저장소 백엔드 이름
+    """
+    if os.path.exists(os.path.join(persist_directory, FLAT_STORE_DIR, FLAT_MANIFEST_FILE)):
+        return 'flat'
+    return 'chroma'
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    float32 벡터를 저장 형식으로 바꿉니다.
+
+    Args:
+        vectors (np.ndarray): (행 수, 차원) float32 벡터
+        dtype (str): 'int8' 또는 'float16'
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (양자화 벡터, 행별 스케일). float16이면 스케일은 None
+    """
+    if dtype == 'float16':
+        return vectors.astype(np.float16), None
+    # 행별 최대 절댓값을 127로 맞추는 대칭 양자화 (다시 양자화해도 값이 바뀌지 않음)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def _value_key(value):
+    # True == 1 이므로 타입까지 구분
+    return (type(value).__name__, value)
+
+def _load(path: str, mmap: bool = True) -> np.ndarray:
+    """npy 파일을 읽습니다. 빈 배열은 메모리 맵을 만들 수 없으므로 그냥 읽습니다."""
+    if mmap:
+        try:
+            return np.load(path, mmap_mode='r')
+        except ValueError:
+            pass
+    return np.load(path)
+
+def _encode_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열 리스트를 (UTF-8 바이트 배열, 오프셋 배열)로 이어 붙입니다."""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+class FlatDocument:
+    __slots__ = ('page_content', 'metadata')
+
+    def __init__(self, page_content: str, metadata: Dict):
+        """similarity_search 결과 (langchain Document와 같은 속성)"""
+        self.page_content = page_content
+        self.metadata = metadata
+
+class _Segment:
+    def __init__(self, arrays: Dict[str, np.ndarray], columns: Dict[str, Tuple[List, np.ndarray]], name: str = None):
+        """
+        한 번 쓰면 바뀌지 않는 행 묶음. 삭제는 alive 배열로만 표시합니다.
+
+        Args:
+            arrays (Dict[str, np.ndarray]): ids, vectors, scales, norms, full, docs, doc_offsets, metas, meta_offsets, alive
+            columns (Dict[str, Tuple[List, np.ndarray]]): {메타데이터 키: (값 목록, 행별 값 번호)} (값이 없으면 -1)
+            name (str): 저장된 디렉토리 이름 (아직 저장하지 않았으면 None)
+        """
+        self.ids = arrays["ids"]
+        self.vectors = arrays["vectors"]
+        self.scales = arrays.get("scales")
+        self.norms = arrays["norms"]
+        self.full = arrays.get("full")
+        self.docs = arrays["docs"]
+        self.doc_offsets = arrays["doc_offsets"]
+        self.metas = arrays["metas"]
+        self.meta_offsets = arrays["meta_offsets"]
+        self.alive = np.array(arrays["alive"], dtype=bool)
+        self.columns = columns
+        self._value_index = {
+            key: {_value_key(value): code for code, value in enumerate(values)}
+            for key, (values, _) in columns.items()
+        }
+        self._masks = {}
+        self.name = name
+        self.alive_dirty = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, rows: List[Tuple], dtype: str, keep_full: bool) -> '_Segment':
+        """
+        (ID, float32 벡터, 문서, 메타데이터, 제곱 노름) 행들로 메모리 세그먼트를 만듭니다.
+        제곱 노름이 None이면 벡터에서 계산합니다.
+        """
+        vectors = np.stack([row[1] for row in rows]).astype(np.float32)
+        norms = np.einsum('ij,ij->i', vectors, vectors)
+        for i, row in enumerate(rows):
+            if row[4] is not None:
+                norms[i] = row[4]
+        codes, scales = quantize(vectors, dtype)
+        docs, doc_offsets = _encode_strings([row[2] or '' for row in rows])
+        metas, meta_offsets = _encode_strings([json.dumps(row[3], ensure_ascii=False) for row in rows])
+
+        columns = {}
+        value_index = {}
+        for i, row in enumerate(rows):
+            for key, value in (row[3] or {}).items():
+                if not isinstance(value, (str, int, float, bool)):
+                    continue
+                if key not in columns:
+                    columns[key] = ([], np.full(len(rows), -1, dtype=np.int32))
+                    value_index[key] = {}
+                values, column = columns[key]
+                code = value_index[key].get(_value_key(value))
+                if code is None:
+                    code = value_index[key][_value_key(value)] = len(values)
+                    values.append(value)
+                column[i] = code
+
+        arrays = {
+            "ids": np.array([row[0].encode('utf-8') for row in rows]),
+            "vectors": codes,
+            "norms": norms.astype(np.float32),
+            "docs": docs,
+            "doc_offsets": doc_offsets,
+            "metas": metas,
+            "meta_offsets": meta_offsets,
+            "alive": np.ones(len(rows), dtype=bool),
+        }
+        if scales is not None:
+            arrays["scales"] = scales
+        if keep_full:
+            arrays["full"] = vectors
+        return cls(arrays, columns)
+
+    @classmethod
+    def open(cls, path: str, name: str) -> '_Segment':
+        """저장된 세그먼트를 메모리 맵으로 엽니다. alive만 메모리로 읽습니다."""
+        directory = os.path.join(path, name)
+        arrays = {}
+        for array_name in ("ids", "vectors", "scales", "norms", "full", "docs", "doc_offsets", "metas", "meta_offsets"):
+            file_path = os.path.join(directory, f"{array_name}.npy")
+            if os.path.exists(file_path):
+                arrays[array_name] = _load(file_path)
+        arrays["alive"] = _load(os.path.join(directory, "alive.npy"), mmap=False)
+        with open(os.path.join(directory, "columns.json"), 'r', encoding='utf-8') as f:
+            column_values = json.load(f)
+        columns = {
+            key: (values, _load(os.path.join(directory, f"col-{i}.npy")))
+            for i, (key, values) in enumerate(column_values)
+        }
+        return cls(arrays, columns, name)
+
+    def write(self, path: str, name: str) -> None:
+        """세그먼트를 디렉토리에 저장하고, 이후에는 저장된 이름으로 가리킵니다."""
+        directory = os.path.join(path, name)
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "ids": self.ids, "vectors": self.vectors, "scales": self.scales, "norms": self.norms, "full": self.full,
+            "docs": self.docs, "doc_offsets": self.doc_offsets, "metas": self.metas, "meta_offsets": self.meta_offsets,
+            "alive": self.alive,
+        }
+        for array_name, array in arrays.items():
+            if array is not None:
+                np.save(os.path.join(directory, f"{array_name}.npy"), array)
+        column_values = []
+        for i, (key, (values, column)) in enumerate(self.columns.items()):
+            column_values.append([key, values])
+            np.save(os.path.join(directory, f"col-{i}.npy"), column)
+        with open(os.path.join(directory, "columns.json"), 'w', encoding='utf-8') as f:
+            json.dump(column_values, f, ensure_ascii=False)
+        self.name = name
+        self.alive_dirty = False
+
+    def write_alive(self, path: str) -> None:
+        """삭제 표시만 원자적으로 다시 씁니다."""
+        file_path = os.path.join(path, self.name, "alive.npy")
+        tmp_path = file_path + ".tmp.npy"
+        np.save(tmp_path, self.alive)
+        os.replace(tmp_path, file_path)
+        self.alive_dirty = False
+
+    def chunk_id(self, row: int) -> str:
+        return bytes(self.ids[row]).decode('utf-8')
+
+    def document(self, row: int) -> str:
+        return bytes(self.docs[self.doc_offsets[row]:self.doc_offsets[row + 1]]).decode('utf-8')
+
+    def metadata(self, row: int) -> Optional[Dict]:
+        return json.loads(bytes(self.metas[self.meta_offsets[row]:self.meta_offsets[row + 1]]).decode('utf-8'))
+
+    def vector(self, row: int) -> np.ndarray:
+        """float32 벡터. 원본이 없으면 양자화 값을 되돌립니다."""
+        if self.full is not None:
+            return np.array(self.full[row], dtype=np.float32)
+        vector = np.array(self.vectors[row], dtype=np.float32)
+        if self.scales is not None:
+            vector *= self.scales[row]
+        return vector
+
+    def filter_mask(self, where: Dict = None) -> Optional[np.ndarray]:
+        """
+        메타데이터 필터를 행별 불리언 마스크로 바꿉니다. 세그먼트는 바뀌지 않으므로 필터별로 한 번만 계산합니다.
+
+        Args:
+            where (Dict): Chroma 형식 필터 ($and, $or, $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte)
+
+        Returns:
+            np.ndarray: 불리언 마스크 (필터가 없으면 None)
+        """
+        if not where:
+            return None
+        key = json.dumps(where, sort_keys=True, ensure_ascii=False)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = self._evaluate(where)
+        return mask
+
+    def _evaluate(self, where: Dict) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for key, condition in where.items():
+            if key in ('$and', '$or'):
+                masks = [self._evaluate(clause) for clause in condition]
+                combined = np.logical_and.reduce(masks) if key == '$and' else np.logical_or.reduce(masks)
+                mask &= combined
+                continue
+            if isinstance(condition, dict):
+                if len(condition) != 1:
+                    raise ValueError(f"필터 조건에는 연산자가 하나만 있어야 합니다: {condition}")
+                (operator, value), = condition.items()
+            else:
+                operator, value = '$eq', condition
+            mask &= self._compare(key, operator, value)
+        return mask
+
+    def _compare(self, key: str, operator: str, value) -> np.ndarray:
+        if key not in self.columns:
+            return np.zeros(len(self), dtype=bool)
+        values, column = self.columns[key]
+        index = self._value_index[key]
+        if operator in ('$eq', '$ne'):
+            code = index.get(_value_key(value), -2)
+            return (column == code) if operator == '$eq' else ((column != code) & (column >= 0))
+        if operator in ('$in', '$nin'):
+            codes = [index[_value_key(item)] for item in value if _value_key(item) in index]
+            matched = np.isin(column, codes)
+            return matched if operator == '$in' else (~matched & (column >= 0))
+        comparisons = {
+            '$gt': lambda stored: stored > value,
+            '$gte': lambda stored: stored >= value,
+            '$lt': lambda stored: stored < value,
+            '$lte': lambda stored: stored <= value,
+        }
+        if operator not in comparisons:
+            raise ValueError(f"지원하지 않는 필터 연산자: {operator}")
+        # 값 목록에서 조건에 맞는 값 번호를 고른 뒤 열과 비교
+        codes = [
+            code for code, stored in enumerate(values)
+            if isinstance(stored, (int, float)) and not isinstance(stored, bool) and comparisons[operator](stored)
+        ]
+        return np.isin(column, codes)
+
+class FlatVectorStore:
+    def __init__(
+        self,
+        persist_directory: str,
+        embedding_function=None,
+        dtype: str = DEFAULT_STORE_DTYPE,
+        rerank: bool = False
+    ):
+        """
+        양자화 벡터를 메모리 맵 NumPy 파일에 저장하는 정확한(전수) 검색 저장소
+
+        벡터는 int8(행별 스케일) 또는 float16으로 저장해 float32보다 4배(2배) 작고,
+        열 때는 매니페스트만 읽고 배열은 메모리 맵으로 연결하므로 거의 바로 열립니다.
+        검색은 블록 단위 행렬곱과 argpartition으로 정확한 top-k를 구하며,
+        rerank를 켜면 원본 float32 벡터도 저장해 양자화 점수로 고른 후보를 다시 정렬합니다.
+        메타데이터 필터는 세그먼트별로 미리 만든 값 번호 열에서 불리언 마스크로 계산합니다.
+
+        Chroma 래퍼와 컬렉션 중 이 저장소에서 쓰는 메서드(get, query, upsert, update, delete, count,
+        add_texts, similarity_search, persist)를 같은 형태로 제공하므로 db._collection으로도 쓸 수 있습니다.
+        쓰기는 메모리에 모았다가 persist() 때 새 세그먼트로 추가되고, 여러 스레드에서 함께 사용할 수 있습니다.
+
+        Args:
+            persist_directory (str): DB 저장 디렉토리 (그 아래 flat_store/에 저장)
+            embedding_function: 쿼리/문서 임베딩 객체 (add_texts, similarity_search에만 사용)
+            dtype (str): 새 저장소의 벡터 형식 ('int8' 또는 'float16', 기존 저장소는 저장된 형식을 따름)
+            rerank (bool): 새 저장소에 float32 원본을 함께 저장해 상위 후보를 재정렬할지 여부
+        """
+        if dtype not in STORE_DTYPES:
+            raise ValueError(f"알 수 없는 벡터 형식: {dtype} (선택 가능: {', '.join(STORE_DTYPES)})")
+        self.path = os.path.join(persist_directory, FLAT_STORE_DIR)
+        self._embedding_function = embedding_function
+        self._collection = self
+        self._lock = threading.RLock()
+        self.dtype = dtype
+        self.keep_full = rerank
+        self.dim = None
+        self.segments: List[_Segment] = []
+        self._pending = {}
+        self._index = None
+        self._next_segment = 0
+        self._obsolete = []
+        self._dirty = False
+
+        manifest_path = os.path.join(self.path, FLAT_MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") != FLAT_STORE_VERSION:
+                raise ValueError(f"'{self.path}'는 지원하지 않는 flat 저장소 버전입니다: {manifest.get('version')}")
+            self.dtype = manifest["dtype"]
+            self.keep_full = manifest["rerank"]
+            self.dim = manifest["dim"]
+            self._next_segment = manifest["next_segment"]
+            self.segments = [_Segment.open(self.path, name) for name in manifest["segments"]]
+
+    # --- 내부 도우미 ---
+
+    def _id_index(self) -> Dict[str, Tuple[_Segment, int]]:
+        """ID -> (세그먼트, 행) 사전. ID로 접근할 때 처음 한 번만 만듭니다. (검색만 할 때는 만들지 않음)"""
+        if self._index is None:
+            index = {}
+            for segment in self.segments:
+                for row in np.flatnonzero(segment.alive):
+                    index[segment.chunk_id(row)] = (segment, int(row))
+            self._index = index
+        return self._index
+
+    def _seal(self) -> None:
+        """메모리에 모은 행을 읽기 가능한 세그먼트로 만듭니다."""
+        if not self._pending:
+            return
+        segment = _Segment.build(
+            [(chunk_id,) + row for chunk_id, row in self._pending.items()],
+            self.dtype,
+            self.keep_full
+        )
+        self.segments.append(segment)
+        if self._index is not None:
+            for row, chunk_id in enumerate(self._pending):
+                self._index[chunk_id] = (segment, row)
+        self._pending = {}
+
+    def _check_dim(self, dim: int) -> None:
+        if self.dim is None:
+            self.dim = dim
+        elif dim != self.dim:
+            raise ValueError(f"벡터 차원이 저장소와 다릅니다: {dim} (저장소: {self.dim})")
+
+    def _kill(self, chunk_id: str) -> bool:
+        """ID의 기존 행을 삭제 표시합니다. 있었으면 True"""
+        if self._pending.pop(chunk_id, None) is not None:
+            return True
+        location = self._id_index().pop(chunk_id, None)
+        if location is None:
+            return False
+        segment, row = location
+        segment.alive[row] = False
+        segment.alive_dirty = True
+        return True
+
+    def _rows(self, ids: List[str] = None, where: Dict = None) -> List[Tuple[_Segment, int]]:
+        """ID 목록(순서 유지) 또는 필터에 맞는 살아 있는 행 목록"""
+        self._seal()
+        if ids is not None:
+            index = self._id_index()
+            rows = [index[chunk_id] for chunk_id in ids if chunk_id in index]
+            if where:
+                rows = [(segment, row) for segment, row in rows if segment.filter_mask(where)[row]]
+            return rows
+        rows = []
+        for segment in self.segments:
+            mask = segment.alive
+            filter_mask = segment.filter_mask(where)
+            if filter_mask is not None:
+                mask = mask & filter_mask
+            rows.extend((segment, int(row)) for row in np.flatnonzero(mask))
+        return rows
+
+    @staticmethod
+    def _columns(rows: List[Tuple[_Segment, int]], include: List[str]) -> Dict:
+        result = {"ids": [segment.chunk_id(row) for segment, row in rows], "documents": None, "metadatas": None, "embeddings": None}
+        if "documents" in include:
+            result["documents"] = [segment.document(row) for segment, row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [segment.metadata(row) for segment, row in rows]
+        if "embeddings" in include:
+            result["embeddings"] = [segment.vector(row).tolist() for segment, row in rows]
+        return result
+
+    # --- 컬렉션 메서드 (Chroma와 같은 형태) ---
+
+    def count(self) -> int:
+        """저장된 청크 수"""
+        with self._lock:
+            return len(self._pending) + sum(int(segment.alive.sum()) for segment in self.segments)
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict] = None, documents: List[str] = None) -> None:
+        """
+        청크를 추가합니다. 같은 ID가 있으면 교체합니다.
+
+        Args:
+            ids (List[str]): 청크 ID 리스트
+            embeddings (List[List[float]]): 임베딩 벡터 리스트
+            metadatas (List[Dict]): 메타데이터 리스트 (선택사항)
+            documents (List[str]): 문서 리스트 (선택사항)
+        """
+        if not ids:
+            return
+        with self._lock:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            self._check_dim(vectors.shape[1])
+            for i, chunk_id in enumerate(ids):
+                self._kill(chunk_id)
+                self._pending[chunk_id] = (
+                    vectors[i],
+                    documents[i] if documents else '',
+                    metadatas[i] if metadatas else None,
+                    None
+                )
+            self._dirty = True
+
+    def update(self, ids: List[str], metadatas: List[Dict] = None, documents: List[str] = None) -> None:
+        """
+        저장된 청크의 메타데이터나 문서만 교체합니다. 없는 ID는 무시합니다.
+        행은 바뀐 내용으로 새 세그먼트에 다시 쓰고, 벡터는 저장된 값을 그대로 옮깁니다.
+        """
+        with self._lock:
+            for i, chunk_id in enumerate(ids):
+                pending = self._pending.get(chunk_id)
+                if pending is not None:
+                    vector, document, metadata, norm = pending
+                else:
+                    location = self._id_index().get(chunk_id)
+                    if location is None:
+                        continue
+                    segment, row = location
+                    vector, document, metadata, norm = segment.vector(row), segment.document(row), segment.metadata(row), float(segment.norms[row])
+                    self._kill(chunk_id)
+                self._pending[chunk_id] = (
+                    vector,
+                    documents[i] if documents else document,
+                    metadatas[i] if metadatas else metadata,
+                    norm
+                )
+                self._dirty = True
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict]) -> None:
+        """청크의 메타데이터를 통째로 교체합니다. (ChromaStore와 같은 인터페이스)"""
+        self.update(ids, metadatas=metadatas)
+
+    def delete(self, ids: List[str] = None, where: Dict = None) -> None:
+        """
+        ID 또는 필터에 맞는 청크를 삭제합니다. 없는 ID는 무시합니다.
+
+        Args:
+            ids (List[str]): 삭제할 청크 ID 리스트
+            where (Dict): 삭제할 청크의 메타데이터 필터
+        """
+        with self._lock:
+            if ids is None and where is None:
+                return
+            if where is not None:
+                ids = [segment.chunk_id(row) for segment, row in self._rows(ids, where)]
+            for chunk_id in ids:
+                if self._kill(chunk_id):
+                    self._dirty = True
+
+    def get(self, ids: List[str] = None, where: Dict = None, limit: int = None, offset: int = None, include: List[str] = ("metadatas", "documents")) -> Dict:
+        """
+        ID 또는 메타데이터 필터로 청크를 가져옵니다.
+
+        Returns:
+            Dict: {"ids", "documents", "metadatas", "embeddings"} (include에 없는 항목은 None)
+        """
+        with self._lock:
+            rows = self._rows(ids, where)
+        start = offset or 0
+        rows = rows[start:start + limit] if limit is not None else rows[start:]
+        return self._columns(rows, include)
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10, where: Dict = None, include: List[str] = ("metadatas", "documents", "distances")) -> Dict:
+        """
+        쿼리 벡터마다 제곱 L2 거리가 가장 가까운 청크를 정확히 찾습니다. (Chroma 기본 거리와 같음)
+
+        Args:
+            query_embeddings (List[List[float]]): 쿼리 임베딩 리스트
+            n_results (int): 쿼리별 결과 수
+            where (Dict): 메타데이터 필터
+            include (List[str]): 반환할 항목 ("documents", "metadatas", "distances", "embeddings")
+
+        Returns:
+            Dict: 쿼리 순서대로의 {"ids", "distances", "documents", "metadatas", "embeddings"} 리스트
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        with self._lock:
+            self._seal()
+            segments = list(self.segments)
+            masks = []
+            for segment in segments:
+                mask = segment.alive
+                filter_mask = segment.filter_mask(where)
+                masks.append(mask & filter_mask if filter_mask is not None else mask.copy())
+        if self.dim is not None and queries.shape[1] != self.dim:
+            raise ValueError(f"쿼리 벡터 차원이 저장소와 다릅니다: {queries.shape[1]} (저장소: {self.dim})")
+
+        candidates = n_results * RERANK_FACTOR if self.keep_full else n_results
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        found_distances, found_segments, found_rows = [], [], []
+        for segment_index, (segment, mask) in enumerate(zip(segments, masks)):
+            for distances, rows in self._scan(segment, mask, queries, query_norms, candidates):
+                found_distances.append(distances)
+                found_rows.append(rows)
+                found_segments.append(np.full(rows.shape, segment_index, dtype=np.int32))
+
+        result = {"ids": [], "distances": [], "documents": None, "metadatas": None, "embeddings": None}
+        selected = []
+        for j in range(len(queries)):
+            if found_distances:
+                distances = np.concatenate([block[:, j] for block in found_distances])
+                rows = np.concatenate([block[:, j] for block in found_rows])
+                owners = np.concatenate([block[:, j] for block in found_segments])
+                valid = np.isfinite(distances)
+                distances, rows, owners = distances[valid], rows[valid], owners[valid]
+            else:
+                distances = rows = owners = np.zeros(0)
+            order = np.argsort(distances, kind='stable')[:candidates]
+            hits = [(float(distances[i]), segments[int(owners[i])], int(rows[i])) for i in order]
+            if self.keep_full and hits:
+                # 양자화 점수로 고른 후보를 float32 원본으로 다시 계산
+                exact = [float(np.sum((segment.full[row] - queries[j]) ** 2)) for _, segment, row in hits]
+                hits = sorted(((distance, segment, row) for distance, (_, segment, row) in zip(exact, hits)), key=lambda hit: hit[0])
+            hits = hits[:n_results]
+            selected.append(hits)
+            result["ids"].append([segment.chunk_id(row) for _, segment, row in hits])
+            result["distances"].append([distance for distance, _, _ in hits])
+        for key in ("documents", "metadatas", "embeddings"):
+            if key in include:
+                result[key] = [self._columns([(segment, row) for _, segment, row in hits], [key])[key] for hits in selected]
+        if "distances" not in include:
+            result["distances"] = None
+        return result
+
+    @staticmethod
+    def _scan(segment: _Segment, mask: np.ndarray, queries: np.ndarray, query_norms: np.ndarray, count: int):
+        """
+        세그먼트를 블록 단위로 행렬곱해 블록마다 쿼리별 상위 count개 (거리, 행)를 냅니다.
+        필터로 남은 행이 적으면 그 행만 모아서 계산합니다.
+        """
+        selected = int(mask.sum())
+        if not selected:
+            return
+        sparse = selected < len(mask) // 2
+        all_rows = np.flatnonzero(mask) if sparse else None
+        total = selected if sparse else len(mask)
+        for start in range(0, total, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, total)
+            if sparse:
+                rows = all_rows[start:end]
+                block = segment.vectors[rows]
+            else:
+                rows = np.arange(start, end)
+                block = segment.vectors[start:end]
+            dots = block.astype(np.float32) @ queries.T
+            if segment.scales is not None:
+                dots *= segment.scales[rows][:, None]
+            distances = segment.norms[rows][:, None] - 2.0 * dots + query_norms[None, :]
+            if not sparse:
+                distances[~mask[start:end]] = np.inf
+            keep = min(count, len(rows))
+            if keep < len(rows):
+                top = np.argpartition(distances, keep - 1, axis=0)[:keep]
+                yield np.take_along_axis(distances, top, axis=0), rows[top]
+            else:
+                yield distances, np.broadcast_to(rows[:, None], distances.shape)
+
+    # --- 래퍼 메서드 (langchain Chroma와 같은 형태) ---
+
+    def add_texts(self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None) -> List[str]:
+        """텍스트를 임베딩해 저장합니다. ID가 없으면 새로 만듭니다."""
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        self.upsert(ids, self._embedding_function.embed_documents(texts), metadatas, texts)
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4, filter: Dict = None) -> List[FlatDocument]:
+        """쿼리를 임베딩해 가장 가까운 청크 k개를 찾습니다."""
+        response = self.query([self._embedding_function.embed_query(query)], n_results=k, where=filter, include=["documents", "metadatas"])
+        return [FlatDocument(doc, metadata) for doc, metadata in zip(response["documents"][0], response["metadatas"][0])]
+
+    def persist(self) -> None:
+        """
+        메모리에 모은 행을 새 세그먼트로 쓰고 삭제 표시를 저장합니다.
+        세그먼트가 많거나 삭제된 행이 많으면 하나로 합칩니다.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._seal()
+            # 모두 삭제된 세그먼트는 버림
+            self.segments = [segment for segment in self.segments if segment.alive.any()]
+            total = sum(len(segment) for segment in self.segments)
+            dead = total - sum(int(segment.alive.sum()) for segment in self.segments)
+            if len(self.segments) > MAX_SEGMENTS or (total and dead / total > MAX_DEAD_RATIO):
+                self._compact()
+
+            os.makedirs(self.path, exist_ok=True)
+            for segment in self.segments:
+                if segment.name is None:
+                    segment.write(self.path, f"seg-{self._next_segment:06d}")
+                    self._next_segment += 1
+                elif segment.alive_dirty:
+                    segment.write_alive(self.path)
+            manifest_path = os.path.join(self.path, FLAT_MANIFEST_FILE)
+            tmp_path = manifest_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": FLAT_STORE_VERSION,
+                    "dtype": self.dtype,
+                    "rerank": self.keep_full,
+                    "dim": self.dim,
+                    "next_segment": self._next_segment,
+                    "segments": [segment.name for segment in self.segments],
+                }, f)
+            os.replace(tmp_path, manifest_path)
+
+            # 매니페스트가 더 이상 가리키지 않는 세그먼트 삭제 (이미 열린 메모리 맵은 계속 유효)
+            live_names = {segment.name for segment in self.segments}
+            for name in os.listdir(self.path):
+                if name.startswith("seg-") and name not in live_names:
+                    shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+            self._dirty = False
+
+    def _compact(self) -> None:
+        """살아 있는 행을 모두 하나의 세그먼트로 합칩니다. 양자화 값은 다시 계산하지 않고 그대로 옮깁니다."""
+        rows = [(segment, np.flatnonzero(segment.alive)) for segment in self.segments]
+        rows = [(segment, selected) for segment, selected in rows if len(selected)]
+        if not rows:
+            self.segments = []
+            return
+
+        def gather(name):
+            parts = [getattr(segment, name)[selected] for segment, selected in rows]
+            return np.concatenate(parts)
+
+        def gather_strings(data, offsets):
+            values = []
+            for segment, selected in rows:
+                source, bounds = getattr(segment, data), getattr(segment, offsets)
+                values.extend(bytes(source[bounds[row]:bounds[row + 1]]).decode('utf-8') for row in selected)
+            return _encode_strings(values)
+
+        ids = [segment.ids[selected] for segment, selected in rows]
+        width = max(part.dtype.itemsize for part in ids)
+        docs, doc_offsets = gather_strings("docs", "doc_offsets")
+        metas, meta_offsets = gather_strings("metas", "meta_offsets")
+        arrays = {
+            "ids": np.concatenate([part.astype(f"S{width}") for part in ids]),
+            "vectors": gather("vectors"),
+            "norms": gather("norms"),
+            "docs": docs,
+            "doc_offsets": doc_offsets,
+            "metas": metas,
+            "meta_offsets": meta_offsets,
+            "alive": np.ones(sum(len(selected) for _, selected in rows), dtype=bool),
+        }
+        if self.dtype == 'int8':
+            arrays["scales"] = gather("scales")
+        if self.keep_full:
+            arrays["full"] = gather("full")
+
+        # 값 번호 열은 세그먼트마다 다르므로 값 목록을 합쳐 다시 번호를 매김
+        columns = {}
+        keys = []
+        for segment, _ in rows:
+            keys.extend(key for key in segment.columns if key not in keys)
+        for key in keys:
+            values, value_index, parts = [], {}, []
+            for segment, selected in rows:
+                if key not in segment.columns:
+                    parts.append(np.full(len(selected), -1, dtype=np.int32))
+                    continue
+                segment_values, column = segment.columns[key]
+                remap = np.empty(len(segment_values) + 1, dtype=np.int32)
+                remap[-1] = -1
+                for code, value in enumerate(segment_values):
+                    new_code = value_index.get(_value_key(value))
+                    if new_code is None:
+                        new_code = value_index[_value_key(value)] = len(values)
+                        values.append(value)
+                    remap[code] = new_code
+                parts.append(remap[np.asarray(column[selected])])
+            columns[key] = (values, np.concatenate(parts))
+
+        self.segments = [_Segment(arrays, columns)]
+        self._index = None
+
+    def stats(self) -> Dict:
+        """세그먼트 수, 행 수, 파일 크기 등 저장소 통계"""
+        with self._lock:
+            size = 0
+            if os.path.isdir(self.path):
+                for root, _, files in os.walk(self.path):
+                    size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+            vector_bytes = sum(segment.vectors.nbytes for segment in self.segments)
+            return {
+                "dtype": self.dtype,
+                "rerank": self.keep_full,
+                "dim": self.dim,
+                "segments": len(self.segments),
+                "count": self.count(),
+                "vector_mb": vector_bytes / (1024 * 1024),
+                "disk_mb": size / (1024 * 1024),
+            }
+
+def convert_chroma(
+    persist_directory: str,
+    dtype: str = DEFAULT_STORE_DTYPE,
+    rerank: bool = False,
+    output_directory: str = None,
+    batch_size: int = 5000
+) -> FlatVectorStore:
+    """
+    기존 Chroma 컬렉션의 벡터/문서/메타데이터를 그대로 flat 저장소로 옮깁니다. (다시 임베딩하지 않음)
+
+    Args:
+        persist_directory (str): Chroma DB 저장 디렉토리
+        dtype (str): 벡터 형식
+        rerank (bool): float32 원본도 저장할지 여부
+        output_directory (str): flat_store/를 만들 디렉토리 (기본값: persist_directory)
+        batch_size (int): 한 번에 읽을 청크 수
+
+    Returns:
+        FlatVectorStore: 만든 저장소
+    """
+    from chroma_store import ChromaStore
+
+    output_directory = output_directory or persist_directory
+    target = os.path.join(output_directory, FLAT_STORE_DIR)
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    collection = ChromaStore(persist_directory)._collection
+    store = FlatVectorStore(output_directory, dtype=dtype, rerank=rerank)
+    total = collection.count()
+    for offset in range(0, total, batch_size):
+        batch = collection.get(offset=offset, limit=batch_size, include=["embeddings", "documents", "metadatas"])
+        store.upsert(batch["ids"], batch["embeddings"], batch["metadatas"], batch["documents"])
+    store.persist()
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description='Chroma DB를 양자화 flat 저장소로 변환')
+    parser.add_argument('--db-dir', type=str, default='code_chunks_db', help='Chroma DB 디렉토리 (기본값: code_chunks_db)')
+    parser.add_argument('--dtype', type=str, choices=STORE_DTYPES, default=DEFAULT_STORE_DTYPE, help=f'벡터 형식 (기본값: {DEFAULT_STORE_DTYPE})')
+    parser.add_argument('--rerank', action='store_true', help='float32 원본도 저장해 상위 후보를 재정렬')
+
+    args = parser.parse_args()
+
+    from index_manifest import IndexManifest
+
+    started = time.perf_counter()
+    store = convert_chroma(args.db_dir, args.dtype, args.rerank)
+    # 이후 증분 인덱싱이 flat 저장소를 이어서 갱신하도록 매니페스트의 저장소 백엔드 변경
+    IndexManifest.set_store(args.db_dir, 'flat')
+    stats = store.stats()
+    print(f"변환 완료: 청크 {stats['count']}개, 벡터 {stats['vector_mb']:.1f}MB ({stats['dtype']}), "
+          f"디스크 {stats['disk_mb']:.1f}MB, {time.perf_counter() - started:.1f}초")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from cpp_lexer import extract_record_declarations
+from stream_chunker import iter_line_heads
+from index_manifest import SourceFingerprint, read_source
+
+# #include "name" 또는 #include <name>
+_INCLUDE = re.compile(r'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]', re.MULTILINE)
+
+class HeaderInfo:
+    __slots__ = ('path', 'content', 'fingerprint', 'include_lines', 'include_names', '_declarations')
+
+    def __init__(self, path: str, content: str, fingerprint: SourceFingerprint = None):
+        """
+        한 번 읽고 파싱한 헤더 파일 정보
+
+        Args:
+            path (str): 헤더 파일 절대 경로
+            content (str): 파일 내용
+            fingerprint (SourceFingerprint): 읽은 내용의 지문 (파일 쌍 지문을 이어 계산할 때 사용)
+        """
+        self.path = path
+        self.content = content
+        self.fingerprint = fingerprint
+        # 원문 include 줄 (인라인화 시 그대로 사용)
+        self.include_lines = [line.strip() for line in content.split('\n') if line.strip().startswith('#include')]
+        # (이름, 따옴표 include 여부)
+        self.include_names = [(name.strip(), quote == '"') for quote, name in _INCLUDE.findall(content)]
+        self._declarations = None
+
+    @property
+    def declarations(self) -> List[str]:
+        """클래스/구조체 선언부 목록. 처음 요청할 때 한 번만 파싱합니다."""
+        if self._declarations is None:
+            self._declarations = extract_record_declarations(self.content)
+        return self._declarations
+
+class IncludeGraph:
+    def __init__(self, project_dir: str = None, include_paths: List[str] = None):
+        """
+        프로젝트 단위 include 그래프. 각 헤더는 한 번만 읽고 파싱해 메모이즈합니다.
+
+        따옴표 include는 포함하는 파일의 디렉토리, include 경로, 프로젝트 루트 순으로 찾고,
+        꺾쇠 include는 include 경로에서만 찾습니다. 찾지 못한 include(표준 라이브러리 등)는 무시합니다.
+        여러 스레드에서 함께 사용할 수 있습니다.
+
+        Args:
+            project_dir (str): 프로젝트 루트 디렉토리 (선택사항)
+            include_paths (List[str]): 추가 include 검색 경로 (컴파일러의 -I와 같음)
+        """
+        self.project_dir = os.path.abspath(project_dir) if project_dir else None
+        self.include_paths = [os.path.abspath(path) for path in (include_paths or [])]
+        self._headers: Dict[str, HeaderInfo] = {}
+        self._resolved: Dict[Tuple[str, str, bool], Optional[str]] = {}
+        self._closure: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+        self.stats = {"parsed": 0, "resolved": 0, "unresolved": 0}
+
+    def build(self, paths) -> 'IncludeGraph':
+        """
+        주어진 파일들과 그 파일들이 include하는 프로젝트 헤더를 모두 미리 파싱합니다.
+
+        Args:
+            paths (Iterable[str]): 헤더/소스 파일 경로
+
+        Returns:
+            IncludeGraph: self
+        """
+        for path in paths:
+            if path is not None:
+                self.dependencies(path)
+        return self
+
+    def parse(self, path: str) -> HeaderInfo:
+        """
+        파일을 읽고 파싱합니다. 같은 파일은 한 번만 읽습니다.
+
+        Args:
+            path (str): 파일 경로
+
+        Returns:
+            HeaderInfo: 파싱 결과
+        """
+        path = os.path.abspath(path)
+        info = self._headers.get(path)
+        if info is not None:
+            return info
+        with self._lock:
+            info = self._headers.get(path)
+            if info is None:
+                fingerprint = SourceFingerprint([path])
+                info = HeaderInfo(path, read_source(path, fingerprint), fingerprint)
+                self._headers[path] = info
+                self.stats["parsed"] += 1
+        return info
+
+    def resolve(self, name: str, including_file: str, quoted: bool = True) -> Optional[str]:
+        """
+        include 이름을 파일 경로로 바꿉니다.
+
+        Args:
+            name (str): include 이름 (예: "model/student.h")
+            including_file (str): include 문이 있는 파일 경로
+            quoted (bool): 따옴표 include 여부
+
+        Returns:
+            str: 헤더 파일 절대 경로 (찾지 못하면 None)
+        """
+        directory = os.path.dirname(os.path.abspath(including_file))
+        key = (directory if quoted else '', name, quoted)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        candidates = [directory] if quoted else []
+        candidates.extend(self.include_paths)
+        if quoted and self.project_dir:
+            candidates.append(self.project_dir)
+        resolved = None
+        for base in candidates:
+            path = os.path.normpath(os.path.join(base, name))
+            if os.path.isfile(path):
+                resolved = path
+                break
+
+        with self._lock:
+            self._resolved[key] = resolved
+            self.stats["resolved" if resolved else "unresolved"] += 1
+        return resolved
+
+    def direct_includes(self, path: str, info: HeaderInfo = None) -> List[str]:
+        """파일이 직접 include하는 프로젝트 헤더 경로 목록을 반환합니다. (info를 주면 파일을 다시 읽지 않음)"""
+        if info is None:
+            info = self.parse(path)
+        resolved = []
+        for name, quoted in info.include_names:
+            header = self.resolve(name, info.path, quoted)
+            if header is not None:
+                resolved.append(header)
+        return resolved
+
+    def dependencies(self, path: str) -> List[str]:
+        """
+        파일이 직접 또는 간접적으로 include하는 프로젝트 헤더 경로 목록을 반환합니다.
+        include 순서(깊이 우선)를 따르며, 헤더별 결과를 메모이즈하므로 공통 헤더의 하위 그래프는 한 번만 계산합니다.
+
+        Args:
+            path (str): 헤더/소스 파일 경로
+
+        Returns:
+            List[str]: 헤더 파일 절대 경로 리스트 (자기 자신 제외)
+        """
+        return self._dependencies(os.path.abspath(path), set())
+
+    def scan_dependencies(self, path: str) -> List[str]:
+        """
+        dependencies()와 같지만 파일 내용을 메모이즈하지 않고 전처리기 줄만 훑습니다.
+        스트리밍으로 청킹하는 아주 큰 파일에 사용합니다.
+
+        Args:
+            path (str): 헤더/소스 파일 경로
+
+        Returns:
+            List[str]: 헤더 파일 절대 경로 리스트 (자기 자신 제외)
+        """
+        path = os.path.abspath(path)
+        cached = self._closure.get(path)
+        if cached is not None:
+            return cached
+        with open(path, 'r', encoding='utf-8') as f:
+            directives = '\n'.join(head.rstrip('\n') for head in iter_line_heads(f) if head.lstrip().startswith('#'))
+        return self._dependencies(path, set(), HeaderInfo(path, directives))
+
+    def _dependencies(self, path: str, in_progress: set, info: HeaderInfo = None) -> List[str]:
+        cached = self._closure.get(path)
+        if cached is not None:
+            return cached
+
+        in_progress.add(path)
+        order = []
+        seen = {path}
+        complete = True
+        for header in self.direct_includes(path, info):
+            if header in seen:
+                continue
+            seen.add(header)
+            order.append(header)
+            if header in in_progress:
+                # 순환 include: 상위 호출에서 나머지를 채우므로 여기서는 멈춤
+                complete = False
+                continue
+            for dependency in self._dependencies(header, in_progress):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    order.append(dependency)
+        in_progress.discard(path)
+
+        # 순환 중간의 불완전한 결과는 저장하지 않음
+        if complete:
+            with self._lock:
+                self._closure[path] = order
+        return order
@@ -0,0 +1,363 @@
+import os
+import json
+import hashlib
+
+MANIFEST_VERSION = 2
+MANIFEST_FILE = "index_manifest.json"
+
+def _abspath(path):
+    return os.path.abspath(path) if path is not None else None
+
+def hash_file_pair(header_path, cpp_path):
+    """
+    헤더/소스 파일 쌍의 내용 해시를 계산합니다.
+
+    Args:
+        header_path (str): 헤더 파일 경로
+        cpp_path (str): 소스 파일 경로 (헤더만 있는 경우 None)
+
+    Returns:
+        str: sha256 hex 문자열
+    """
+    digest = hashlib.sha256()
+    for path in (header_path, cpp_path):
+        if path is None:
+            digest.update(b'\0none\0')
+            continue
+        with open(path, 'rb') as f:
+            # 큰 파일도 메모리에 한 번에 올리지 않도록 나눠 읽음
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def stat_signature(header_path, cpp_path):
+    """파일 쌍의 (mtime_ns, size) 목록을 반환합니다. 내용 해시 전 빠른 비교용입니다."""
+    signature = []
+    for path in (header_path, cpp_path):
+        if path is None:
+            signature.append(None)
+            continue
+        st = os.stat(path)
+        signature.append([st.st_mtime_ns, st.st_size])
+    return signature
+
+def decode_source(data: bytes) -> str:
+    """파일 바이트를 텍스트 모드 읽기(open(path, 'r', encoding='utf-8'))와 같은 문자열로 바꿉니다."""
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def read_source(path, fingerprint=None) -> str:
+    """
+    파일을 한 번 읽어 텍스트로 반환합니다. fingerprint가 있으면 읽은 바이트와 읽을 때의 stat을 더합니다.
+
+    Args:
+        path (str): 파일 경로
+        fingerprint (SourceFingerprint): 내용을 더할 파일 쌍 지문 (선택사항)
+
+    Returns:
+        str: 파일 내용 (줄바꿈은 '\n')
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    if fingerprint is not None:
+        fingerprint.add_file(data, st)
+    return decode_source(data)
+
+class SourceFingerprint:
+    def __init__(self, paths, digest=None, stat=None):
+        """
+        청킹에 실제로 사용한 파일 쌍 내용의 해시와 읽을 때의 stat 서명
+
+        파일을 읽는 바로 그 바이트로 hash_file_pair/stat_signature와 같은 값을 만들므로,
+        청킹 뒤 매니페스트에 기록할 때 파일이 바뀌었어도 저장된 청크와 해시가 어긋나지 않습니다.
+        (바뀐 파일은 다음 실행에서 stat/해시가 달라 다시 처리됨)
+        파일은 paths 순서대로 더해야 하며, None인 경로(없는 파일)는 자동으로 건너뜁니다.
+
+        Args:
+            paths (List[str]): 파일 경로 목록 (파일 쌍이면 [헤더, 소스])
+            digest: 이어서 계산할 sha256 객체 (extend 전용)
+            stat (list): 이미 더한 파일의 stat 서명 (extend 전용)
+        """
+        self._paths = list(paths)
+        self._digest = digest if digest is not None else hashlib.sha256()
+        self._open_stat = None
+        self._hash = None
+        self.stat = list(stat or [])
+        self._skip_missing()
+
+    def _skip_missing(self):
+        while len(self.stat) < len(self._paths) and self._paths[len(self.stat)] is None:
+            self._digest.update(b'\0none\0')
+            self.stat.append(None)
+
+    def begin_file(self, st):
+        """다음 파일 읽기를 시작합니다. st는 열린 파일의 os.fstat 결과입니다."""
+        self._open_stat = [st.st_mtime_ns, st.st_size]
+
+    def update(self, data: bytes):
+        """읽은 바이트를 더합니다."""
+        self._digest.update(data)
+
+    def end_file(self):
+        """현재 파일을 끝까지 읽었음을 기록합니다."""
+        self._digest.update(b'\0')
+        self.stat.append(self._open_stat)
+        self._skip_missing()
+
+    def add_file(self, data: bytes, st):
+        """파일 하나의 전체 바이트를 더합니다."""
+        self.begin_file(st)
+        self.update(data)
+        self.end_file()
+
+    def extend(self, paths) -> 'SourceFingerprint':
+        """지금까지 더한 내용에 paths의 파일을 이어 더할 새 지문을 반환합니다. (공유하는 헤더 지문 재사용)"""
+        return SourceFingerprint(self._paths + list(paths), self._digest.copy(), self.stat)
+
+    def finish(self) -> 'SourceFingerprint':
+        """해시를 확정합니다. 이후에는 더 더할 수 없고, 프로세스 사이로 넘길 수 있습니다."""
+        if self._hash is None:
+            self._hash = self._digest.hexdigest()
+            self._digest = None
+        return self
+
+    @property
+    def hash(self) -> str:
+        """sha256 hex 문자열 (hash_file_pair와 같은 형식)"""
+        return self._hash if self._hash is not None else self._digest.hexdigest()
+
+def make_chunk_id(file_key, index):
+    """
+    청크의 결정적 ID를 생성합니다. 같은 파일의 같은 순번 청크는 항상 같은 ID를 가집니다.
+
+    Args:
+        file_key (str): 파일 쌍을 식별하는 키 (헤더 파일 절대 경로)
+        index (int): 파일 내 청크 순번
+
+    Returns:
+        str: 청크 ID
+    """
+    digest = hashlib.sha1(f"{file_key}\0{index}".encode('utf-8')).hexdigest()
+    return f"{digest}-{index}"
+
+class IndexManifest:
+    def __init__(self, path: str, chunk_size: int, chunk_overlap: int, chunker: str = 'splitter', embedder: str = 'openai', dedup: str = 'none', store: str = 'chroma', separators: str = 'cpp'):
+        """
+        파일별 내용 해시와 청크 ID를 기록하는 인덱스 매니페스트
+
+        Args:
+            path (str): 매니페스트 파일 경로
+            chunk_size (int): 현재 청크 크기
+            chunk_overlap (int): 현재 청크 중복 크기
+            chunker (str): 현재 청킹 방식
+            embedder (str): 현재 임베딩 백엔드
+            dedup (str): 현재 청크 중복 제거 방식
+            store (str): 현재 벡터 저장소 백엔드
+            separators (str): 현재 구분자 집합 이름
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.chunker = chunker
+        self.embedder = embedder
+        self.dedup = dedup
+        self.store = store
+        self.separators = separators
+        # 기존 매니페스트를 만든 임베딩 백엔드 (새 매니페스트면 None)
+        self.stored_embedder = None
+        self.entries = {}
+
+    @classmethod
+    def load(cls, persist_directory: str, chunk_size: int, chunk_overlap: int, chunker: str = 'splitter', embedder: str = 'openai', dedup: str = 'none', store: str = 'chroma', separators: str = 'cpp'):
+        """
+        DB 디렉토리에서 매니페스트를 읽습니다. 청킹 설정(크기, 중복, 방식, 구분자)이 바뀌었으면 모든 파일을 변경된 것으로 취급합니다.
+
+        Args:
+            persist_directory (str): Chroma DB 저장 디렉토리
+            chunk_size (int): 현재 청크 크기
+            chunk_overlap (int): 현재 청크 중복 크기
+            chunker (str): 현재 청킹 방식
+            embedder (str): 현재 임베딩 백엔드
+            dedup (str): 현재 청크 중복 제거 방식 (바뀌면 청크 ID 체계가 달라지므로 전체를 다시 인덱싱)
+            store (str): 현재 벡터 저장소 백엔드 (바뀌면 새 저장소가 비어 있으므로 전체를 다시 인덱싱)
+            separators (str): 현재 구분자 집합 이름
+
+        Returns:
+            IndexManifest: 매니페스트
+        """
+        manifest = cls(os.path.join(persist_directory, MANIFEST_FILE), chunk_size, chunk_overlap, chunker, embedder, dedup, store, separators)
+        if not os.path.exists(manifest.path):
+            return manifest
+
+        with open(manifest.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        manifest.entries = data.get("files", {})
+        manifest.stored_embedder = data.get("embedder", 'openai')
+        same_params = (
+            data.get("version") == MANIFEST_VERSION
+            and data.get("chunk_size") == chunk_size
+            and data.get("chunk_overlap") == chunk_overlap
+            and data.get("chunker", 'splitter') == chunker
+            and manifest.stored_embedder == embedder
+            and data.get("dedup", 'none') == dedup
+            and data.get("store", 'chroma') == store
+            and data.get("separators", 'cpp') == separators
+        )
+        if not same_params:
+            # 기존 청크 ID는 삭제를 위해 남겨두고 해시만 무효화
+            for entry in manifest.entries.values():
+                entry["hash"] = None
+                entry["stat"] = None
+        return manifest
+
+    @staticmethod
+    def read_settings(persist_directory: str) -> dict:
+        """
+        DB 디렉토리의 매니페스트에 기록된 인덱싱 설정을 반환합니다.
+
+        Args:
+            persist_directory (str): DB 저장 디렉토리
+
+        Returns:
+            dict: chunk_size, chunk_overlap, chunker, embedder, dedup, store, separators (매니페스트가 없으면 빈 dict)
+        """
+        path = os.path.join(persist_directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        settings = {key: data[key] for key in ("chunk_size", "chunk_overlap", "chunker", "embedder", "dedup", "store", "separators") if key in data}
+        # 이전 형식 매니페스트의 기본값 (load와 같음)
+        settings.setdefault("chunker", 'splitter')
+        settings.setdefault("embedder", 'openai')
+        settings.setdefault("dedup", 'none')
+        settings.setdefault("separators", 'cpp')
+        return settings
+
+    def is_unchanged(self, file_key: str, header_path: str, cpp_path: str) -> bool:
+        """
+        파일 쌍이 마지막 인덱싱 이후 바뀌지 않았는지 확인합니다.
+        mtime/크기가 같으면 파일을 읽지 않고, 다르면 내용 해시로 비교합니다.
+
+        Args:
+            file_key (str): 파일 쌍 키
+            header_path (str): 헤더 파일 경로
+            cpp_path (str): 소스 파일 경로
+
+        Returns:
+            bool: 변경되지 않았으면 True
+        """
+        entry = self.entries.get(file_key)
+        if entry is None or entry.get("hash") is None or entry.get("cpp_path") != _abspath(cpp_path):
+            return False
+
+        signature = stat_signature(header_path, cpp_path)
+        if entry.get("stat") == signature:
+            return True
+
+        if hash_file_pair(header_path, cpp_path) == entry["hash"]:
+            # 내용은 같고 mtime만 바뀐 경우
+            entry["stat"] = signature
+            return True
+        return False
+
+    def is_indexed(self, file_key: str, cpp_path: str) -> bool:
+        """
+        파일 쌍이 같은 소스 파일과 함께 인덱싱되어 있는지만 확인합니다. (파일을 stat하지 않음)
+        파일 감시처럼 바뀐 파일을 이미 알고 있을 때 나머지 파일 쌍을 건너뛰는 데 사용합니다.
+        """
+        entry = self.entries.get(file_key)
+        return entry is not None and entry.get("hash") is not None and entry.get("cpp_path") == _abspath(cpp_path)
+
+    def chunk_ids(self, file_key: str):
+        """파일 쌍에 대해 마지막으로 저장된 청크 ID 목록을 반환합니다."""
+        entry = self.entries.get(file_key)
+        return list(entry.get("chunk_ids", [])) if entry else []
+
+    def update(self, file_key: str, header_path: str, cpp_path: str, chunk_ids, fingerprint: SourceFingerprint = None):
+        """
+        파일 쌍의 해시와 청크 ID를 기록합니다.
+
+        Args:
+            file_key (str): 파일 쌍 키
+            header_path (str): 헤더 파일 경로
+            cpp_path (str): 소스 파일 경로
+            chunk_ids (list): 저장한 청크 ID 목록
+            fingerprint (SourceFingerprint): 청킹한 내용의 지문 (chunk_file_pair 결과의 fingerprint).
+                없으면 지금 파일을 다시 읽어 계산하므로, 청킹 뒤에 바뀐 내용이 기록될 수 있음
+        """
+        self.entries[file_key] = {
+            "cpp_path": _abspath(cpp_path),
+            "hash": fingerprint.hash if fingerprint is not None else hash_file_pair(header_path, cpp_path),
+            "stat": list(fingerprint.stat) if fingerprint is not None else stat_signature(header_path, cpp_path),
+            "chunk_ids": list(chunk_ids),
+        }
+
+    def invalidate(self, file_key: str):
+        """파일 쌍을 변경된 것으로 표시해 다음 실행에서 다시 처리되게 합니다."""
+        entry = self.entries.get(file_key)
+        if entry is not None:
+            entry["hash"] = None
+            entry["stat"] = None
+
+    def pop_missing(self, project_dir: str, seen_keys):
+        """
+        프로젝트 디렉토리 아래에 있었지만 이번 탐색에서 발견되지 않은 파일 쌍을 매니페스트에서 제거합니다.
+        여러 파일이 공유하는 청크를 처리할 수 있도록 삭제된 파일 쌍별 청크 ID를 돌려줍니다.
+
+        Args:
+            project_dir (str): 프로젝트 디렉토리 경로
+            seen_keys (set): 이번에 발견된 파일 쌍 키
+
+        Returns:
+            dict: {파일 쌍 키: 청크 ID 목록}
+        """
+        root = os.path.join(os.path.abspath(project_dir), '')
+        removed = {}
+        for file_key in list(self.entries):
+            if file_key.startswith(root) and file_key not in seen_keys:
+                removed[file_key] = self.entries.pop(file_key).get("chunk_ids", [])
+        return removed
+
+    def save(self):
+        """매니페스트를 원자적으로 저장합니다."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+                "chunker": self.chunker,
+                "embedder": self.embedder,
+                "dedup": self.dedup,
+                "store": self.store,
+                "separators": self.separators,
+                "files": self.entries,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def set_store(persist_directory: str, store: str):
+        """
+        파일 해시는 그대로 두고 매니페스트의 저장소 백엔드만 바꿉니다. (저장소를 변환한 경우)
+
+        Args:
+            persist_directory (str): DB 저장 디렉토리
+            store (str): 새 벡터 저장소 백엔드
+        """
+        path = os.path.join(persist_directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["store"] = store
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,235 @@
+import os
+import re
+import math
+import json
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from code_tokens import tokenize_code
+from cpp_lexer import RECORD_KINDS, scan_units
+
+LEXICAL_INDEX_VERSION = 1
+LEXICAL_INDEX_FILE = "lexical_index.json"
+
+# BM25 매개변수
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 심볼 하나로 볼 수 있는 쿼리 (예: printInfo, Student::setGrade, ~Student)
+_SYMBOL_QUERY = re.compile(r'^\s*(~?[A-Za-z_]\w*(?:::~?[A-Za-z_]\w*)*)\s*(?:\(\s*\))?\s*$')
+
+def extract_symbols(text: str) -> List[str]:
+    """
+    청크 텍스트에서 정의/선언된 클래스와 함수 이름을 추출합니다.
+
+    Args:
+        text (str): 청크 텍스트
+
+    Returns:
+        List[str]: 심볼 이름 리스트 (예: ["Student", "Student::addGrade"])
+    """
+    try:
+        units = scan_units(text, line_numbers=False)
+    except Exception:
+        return []
+    return [unit.name for unit in units if unit.name and (unit.kind == 'function' or unit.kind in RECORD_KINDS)]
+
+def symbol_keys(symbol: str) -> List[str]:
+    """
+    심볼을 조회 키로 바꿉니다. 한정된 이름은 전체 이름과 마지막 이름을 모두 키로 사용합니다.
+
+    Args:
+        symbol (str): 심볼 이름 (예: "Student::setGrade")
+
+    Returns:
+        List[str]: 조회 키 리스트 (예: ["Student::setGrade", "setGrade"])
+    """
+    keys = [symbol]
+    if '::' in symbol:
+        keys.append(symbol.rsplit('::', 1)[1])
+    return keys
+
+def parse_symbol_query(query: str):
+    """쿼리가 심볼 하나로만 이루어져 있으면 심볼 이름을, 아니면 None을 반환합니다."""
+    match = _SYMBOL_QUERY.match(query)
+    return match.group(1) if match else None
+
+class LexicalIndex:
+    def __init__(self, path: str = None):
+        """
+        식별자 인식 토큰에 대한 BM25 역색인과 심볼 테이블
+
+        Chroma 컬렉션과 같은 청크 ID를 사용하며, 임베딩 시 함께 갱신되어 DB 디렉토리에 저장됩니다.
+
+        Args:
+            path (str): 색인 파일 경로 (None이면 저장하지 않음)
+        """
+        self.path = path
+        # 청크 ID -> {"length": 토큰 수, "tf": {토큰: 빈도}, "symbols": [심볼]}
+        self.docs = {}
+        self._postings = {}
+        self._symbols = {}
+        self._total_length = 0
+        self.dirty = False
+
+    @classmethod
+    def load(cls, persist_directory: str):
+        """
+        DB 디렉토리에서 색인을 읽습니다. 파일이 없거나 버전이 다르면 빈 색인을 반환합니다.
+
+        Args:
+            persist_directory (str): Chroma DB 저장 디렉토리
+
+        Returns:
+            LexicalIndex: 색인
+        """
+        index = cls(os.path.join(persist_directory, LEXICAL_INDEX_FILE))
+        if not os.path.exists(index.path):
+            return index
+        with open(index.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != LEXICAL_INDEX_VERSION:
+            return index
+        for doc_id, doc in data.get("docs", {}).items():
+            index._insert(doc_id, doc)
+        return index
+
+    def save(self) -> None:
+        """색인을 원자적으로 저장합니다. 바뀐 것이 없으면 아무것도 하지 않습니다."""
+        if self.path is None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": LEXICAL_INDEX_VERSION, "docs": self.docs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc_id: str, text: str, symbols: Iterable[str] = None) -> None:
+        """
+        청크를 색인에 추가합니다. 같은 ID가 있으면 교체합니다.
+
+        Args:
+            doc_id (str): 청크 ID
+            text (str): 청크 텍스트
+            symbols (Iterable[str]): 청크가 정의하는 심볼 (None이면 텍스트에서 추출)
+        """
+        if doc_id in self.docs:
+            self.remove([doc_id])
+        tokens = tokenize_code(text)
+        doc = {
+            "length": len(tokens),
+            "tf": dict(Counter(tokens)),
+            "symbols": list(symbols) if symbols is not None else extract_symbols(text),
+        }
+        self._insert(doc_id, doc)
+        self.dirty = True
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        """청크들을 색인에서 삭제합니다. 없는 ID는 무시합니다."""
+        for doc_id in doc_ids:
+            doc = self.docs.pop(doc_id, None)
+            if doc is None:
+                continue
+            for token in doc["tf"]:
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[token]
+            for symbol in doc["symbols"]:
+                for key in symbol_keys(symbol):
+                    ids = self._symbols.get(key)
+                    if ids is not None:
+                        ids.discard(doc_id)
+                        if not ids:
+                            del self._symbols[key]
+            self._total_length -= doc["length"]
+            self.dirty = True
+
+    def _insert(self, doc_id: str, doc: Dict) -> None:
+        """저장된 형태의 문서를 메모리 색인에 넣습니다."""
+        self.docs[doc_id] = doc
+        for token, count in doc["tf"].items():
+            self._postings.setdefault(token, {})[doc_id] = count
+        for symbol in doc["symbols"]:
+            for key in symbol_keys(symbol):
+                self._symbols.setdefault(key, set()).add(doc_id)
+        self._total_length += doc["length"]
+
+    def lookup_symbol(self, symbol: str) -> List[str]:
+        """
+        심볼을 정의하는 청크 ID를 찾습니다. 대소문자를 구분해 정확히 일치하는 심볼만 찾습니다.
+
+        Args:
+            symbol (str): 심볼 이름 (예: "printInfo" 또는 "Student::printInfo")
+
+        Returns:
+            List[str]: 청크 ID 리스트 (정렬됨)
+        """
+        return sorted(self._symbols.get(symbol, ()))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25로 청크를 검색합니다.
+
+        Args:
+            query (str): 검색 쿼리
+            k (int): 반환할 최대 결과 수
+
+        Returns:
+            List[Tuple[str, float]]: (청크 ID, 점수) 리스트, 점수 내림차순
+        """
+        return search_indexes([self], query, k)
+
+def search_indexes(indexes: List[LexicalIndex], query: str, k: int = 10) -> List[Tuple[str, float]]:
+    """
+    여러 색인(샤드)을 하나의 색인처럼 BM25로 검색합니다.
+    문서 수, 평균 길이, 문서 빈도를 모든 색인에서 합쳐 계산하므로 한 색인에 모두 넣고 검색한 것과 점수가 같습니다.
+
+    Args:
+        indexes (List[LexicalIndex]): 검색할 색인들 (청크 ID가 겹치지 않아야 함)
+        query (str): 검색 쿼리
+        k (int): 반환할 최대 결과 수
+
+    Returns:
+        List[Tuple[str, float]]: (청크 ID, 점수) 리스트, 점수 내림차순
+    """
+    doc_count = sum(len(index.docs) for index in indexes)
+    if not doc_count:
+        return []
+    avg_length = sum(index._total_length for index in indexes) / doc_count or 1.0
+    scores = {}
+    for token in set(tokenize_code(query)):
+        postings_list = [(index, index._postings[token]) for index in indexes if index._postings.get(token)]
+        frequency = sum(len(postings) for _, postings in postings_list)
+        if not frequency:
+            continue
+        idf = math.log(1.0 + (doc_count - frequency + 0.5) / (frequency + 0.5))
+        for index, postings in postings_list:
+            for doc_id, tf in postings.items():
+                length = index.docs[doc_id]["length"]
+                norm = tf + BM25_K1 * (1.0 - BM25_B + BM25_B * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1.0) / norm
+    return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """
+    여러 순위 목록을 RRF(reciprocal rank fusion)로 합칩니다.
+
+    Args:
+        rankings (List[List[str]]): ID 순위 목록 리스트
+        k (int): RRF 상수 (클수록 하위 순위의 영향이 커짐)
+
+    Returns:
+        List[str]: 합친 순위의 ID 리스트
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return [doc_id for doc_id, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
@@ -0,0 +1,269 @@
+import re
+import json
+import time
+import bisect
+import threading
+import unicodedata
+from typing import Dict, List
+
+# 지연 시간 히스토그램 구간 상한(초). 파일 하나의 청킹처럼 수십 마이크로초 단계부터 임베딩 요청까지 담고, +Inf는 따로 셈
+LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+METRICS_FORMATS = ('json', 'prometheus')
+
+# Prometheus 메트릭 이름 접두어
+PROMETHEUS_PREFIX = "mcp_chunk"
+
+class _NullSpan:
+    """프로파일링이 꺼져 있을 때 돌려주는 아무 일도 하지 않는 구간"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+class Metrics:
+    def __init__(self, enabled: bool = False):
+        """
+        단계별 시간 구간(span), 카운터, 지연 시간 히스토그램을 모으는 프로파일러
+
+        꺼져 있으면 span()은 공유된 빈 구간을, count()/observe()는 바로 반환하므로 계측 비용이 거의 없습니다.
+        여러 스레드에서 함께 사용할 수 있고, 워커 프로세스의 결과는 snapshot()/merge()로 합칩니다.
+
+        Args:
+            enabled (bool): 처음부터 기록할지 여부
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """기록을 모두 지우고 경과 시간 측정을 다시 시작합니다."""
+        with self._lock:
+            self.counters: Dict[str, float] = {}
+            # 이름 -> [횟수, 합계, 최대, 구간별 횟수(마지막은 +Inf)]
+            self.timers: Dict[str, List] = {}
+            self.started = time.perf_counter()
+
+    def enable(self) -> None:
+        """기록을 켜고 지금부터 경과 시간을 잽니다."""
+        self.reset()
+        self.enabled = True
+
+    def span(self, name: str):
+        """
+        with 블록의 실행 시간을 name 단계로 기록하는 컨텍스트 매니저를 반환합니다.
+
+        Args:
+            name (str): 단계 이름 (예: "chunk.split")
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """카운터를 value만큼 늘립니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """단계 한 번의 실행 시간(초)을 기록합니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = [0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+            timer[3][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> Dict:
+        """
+        지금까지의 기록을 JSON으로 저장할 수 있는 dict로 반환합니다.
+
+        Returns:
+            Dict: {"elapsed_seconds", "counters", "timers": {이름: {"count", "sum", "max", "buckets"}}}
+        """
+        with self._lock:
+            return {
+                "elapsed_seconds": time.perf_counter() - self.started,
+                "counters": dict(self.counters),
+                "timers": {
+                    name: {"count": count, "sum": total, "max": longest, "buckets": list(buckets)}
+                    for name, (count, total, longest, buckets) in self.timers.items()
+                },
+            }
+
+    def merge(self, snapshot: Dict) -> None:
+        """다른 프로세스에서 만든 snapshot()을 더합니다. (경과 시간은 더하지 않음)"""
+        if not self.enabled or not snapshot:
+            return
+        with self._lock:
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, other in snapshot["timers"].items():
+                timer = self.timers.get(name)
+                if timer is None:
+                    timer = self.timers[name] = [0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+                timer[0] += other["count"]
+                timer[1] += other["sum"]
+                timer[2] = max(timer[2], other["max"])
+                timer[3] = [a + b for a, b in zip(timer[3], other["buckets"])]
+
+    def drain(self) -> Dict:
+        """snapshot()을 반환하고 기록을 비웁니다. (워커 프로세스가 결과와 함께 넘길 때 사용)"""
+        snapshot = self.snapshot()
+        with self._lock:
+            self.counters = {}
+            self.timers = {}
+        return snapshot
+
+    @staticmethod
+    def _quantile(buckets: List[int], count: int, q: float, longest: float) -> float:
+        """히스토그램 구간 안에서 선형 보간해 분위수(초)를 추정합니다. 최댓값을 넘지 않습니다."""
+        target = q * count
+        seen = 0
+        lower = 0.0
+        for upper, hits in zip(LATENCY_BUCKETS, buckets):
+            if hits and seen + hits >= target:
+                return min(longest, lower + (upper - lower) * (target - seen) / hits)
+            seen += hits
+            lower = upper
+        return longest
+
+    def report(self) -> str:
+        """
+        단계별 시간 분포와 카운터를 표 형태 문자열로 반환합니다.
+        스레드에서 동시에 실행되는 단계는 시간이 겹치므로 비율의 합이 100%를 넘을 수 있습니다.
+        """
+        snapshot = self.snapshot()
+        elapsed = max(snapshot["elapsed_seconds"], 1e-9)
+        widths = (28, 9, 11, 8, 11, 10, 10, 11)
+        rows = [("단계", "횟수", "합계(초)", "비율", "평균(ms)", "p50(ms)", "p99(ms)", "최대(ms)")]
+        for name, timer in sorted(snapshot["timers"].items(), key=lambda item: -item[1]["sum"]):
+            count = timer["count"]
+            rows.append((
+                name,
+                str(count),
+                f"{timer['sum']:.3f}",
+                f"{timer['sum'] / elapsed * 100:.1f}%",
+                f"{timer['sum'] / count * 1000:.3f}",
+                f"{self._quantile(timer['buckets'], count, 0.5, timer['max']) * 1000:.3f}",
+                f"{self._quantile(timer['buckets'], count, 0.99, timer['max']) * 1000:.3f}",
+                f"{timer['max'] * 1000:.3f}",
+            ))
+        lines = [f"=== 프로파일 (경과 {elapsed:.2f}초) ==="]
+        for row in rows:
+            # 첫 열은 왼쪽, 나머지는 오른쪽 정렬
+            lines.append(_pad(row[0], widths[0]) + "".join(_pad(cell, width, right=True) for cell, width in zip(row[1:], widths[1:])))
+        if snapshot["counters"]:
+            lines.append("카운터: " + ", ".join(
+                f"{name}={value:g}" for name, value in sorted(snapshot["counters"].items())
+            ))
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """
+        Prometheus 텍스트 형식으로 변환합니다.
+        카운터는 <prefix>_<이름>_total, 단계는 <prefix>_stage_seconds 히스토그램(stage 레이블)이 됩니다.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value:g}")
+        metric = f"{prefix}_stage_seconds"
+        if snapshot["timers"]:
+            lines.append(f"# TYPE {metric} histogram")
+        for name, timer in sorted(snapshot["timers"].items()):
+            cumulative = 0
+            for upper, hits in zip(LATENCY_BUCKETS, timer["buckets"]):
+                cumulative += hits
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{upper:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {timer["count"]}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {timer["sum"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {timer["count"]}')
+        lines.append(f"# TYPE {prefix}_elapsed_seconds gauge")
+        lines.append(f"{prefix}_elapsed_seconds {snapshot['elapsed_seconds']:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: str = None) -> None:
+        """
+        기록을 파일로 저장합니다.
+
+        Args:
+            path (str): 저장할 파일 경로
+            fmt (str): 'json' 또는 'prometheus' (None이면 확장자가 .prom/.txt일 때 prometheus, 그 밖에는 json)
+        """
+        if fmt is None:
+            fmt = 'prometheus' if path.endswith(('.prom', '.txt')) else 'json'
+        if fmt not in METRICS_FORMATS:
+            raise ValueError(f"알 수 없는 메트릭 형식: {fmt} (선택 가능: {', '.join(METRICS_FORMATS)})")
+        with open(path, 'w', encoding='utf-8') as f:
+            if fmt == 'prometheus':
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+def _pad(text: str, width: int, right: bool = False) -> str:
+    """한글처럼 두 칸을 차지하는 문자를 고려해 표시 폭을 맞춥니다."""
+    display = sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in text)
+    padding = " " * max(0, width - display)
+    return padding + text if right else text + padding
+
+def _metric_name(name: str) -> str:
+    """단계/카운터 이름을 Prometheus 메트릭 이름에 쓸 수 있는 문자로 바꿉니다."""
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+# 프로세스 전체에서 공유하는 프로파일러 (--profile을 주면 켜짐)
+METRICS = Metrics()
+
+def add_profile_arguments(parser) -> None:
+    """CLI에 --profile, --metrics-output, --metrics-format 인자를 추가합니다."""
+    parser.add_argument('--profile', action='store_true', help='단계별 시간/카운터를 기록해 끝날 때 출력')
+    parser.add_argument('--metrics-output', type=str, help='메트릭을 저장할 파일 경로 (지정하면 --profile을 켬)')
+    parser.add_argument('--metrics-format', type=str, choices=METRICS_FORMATS, help='메트릭 파일 형식 (기본값: 확장자가 .prom/.txt면 prometheus, 아니면 json)')
+
+def start_profiling(args) -> bool:
+    """CLI 인자에 따라 프로파일러를 켭니다. 켰으면 True"""
+    if args.profile or args.metrics_output:
+        METRICS.enable()
+        return True
+    return False
+
+def finish_profiling(args, file=None) -> None:
+    """프로파일러가 켜져 있으면 요약을 출력하고(기본값: 표준 출력), 지정한 파일에 메트릭을 저장합니다."""
+    if not METRICS.enabled:
+        return
+    print(METRICS.report(), file=file)
+    if args.metrics_output:
+        METRICS.write(args.metrics_output, args.metrics_format)
+        print(f"메트릭 저장: {args.metrics_output}", file=file)
@@ -0,0 +1,199 @@
+import time
+import queue
+import threading
+from typing import Callable, Iterable
+
+from cpp_chunker import DEFAULT_SEPARATORS, SourceCache, chunk_file_pair, create_text_splitter
+from include_graph import IncludeGraph
+from metrics import METRICS
+
+# 큐의 끝을 알리는 표식
+_DONE = object()
+
+class ChunkPipeline:
+    def __init__(
+        self,
+        pairs: Iterable,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        chunker: str = 'splitter',
+        skip_fn: Callable[[str, str], bool] = None,
+        queue_size: int = 64,
+        include_graph: IncludeGraph = None,
+        stream_threshold: int = None,
+        separators: str = DEFAULT_SEPARATORS,
+        source_cache: SourceCache = None
+    ):
+        """
+        파일 탐색 → 청킹 → 소비(임베딩/저장) 단계를 크기 제한 큐로 연결하는 스트리밍 파이프라인
+
+        탐색과 청킹은 각각 별도 스레드에서 실행되고, 결과는 이 객체를 순회하는 쪽에서 소비합니다.
+        큐가 가득 차면 앞 단계가 기다리므로 메모리에 쌓이는 청크 수는 queue_size로 제한됩니다.
+
+        Args:
+            pairs (Iterable): (header_path, cpp_path) 튜플을 내는 이터러블 (예: iter_project_pairs 결과).
+                탐색 스레드에서 순회하므로 디렉토리를 훑는 대로 쌍을 내는 이터레이터를 넘기면 탐색과 청킹이 겹침
+            chunk_size (int): 각 청크의 최대 크기
+            chunk_overlap (int): 청크 간 중복 크기
+            chunker (str): 청킹 방식 ('splitter' 또는 'lexer')
+            skip_fn: (header_path, cpp_path)를 받아 True면 청킹을 건너뛰는 함수 (선택사항, 탐색 스레드에서 호출)
+            queue_size (int): 단계 사이 큐의 최대 크기
+            include_graph (IncludeGraph): 헤더 파싱을 공유하고 청크의 의존 헤더를 기록할 include 그래프 (선택사항)
+            stream_threshold (int): 파일 크기 합이 이보다 크면(바이트) 스트리밍으로 청킹 (선택사항).
+                이런 파일은 청크 이터레이터만 큐에 넣고, 실제 청킹은 소비 쪽이 청크를 꺼낼 때 일어남
+            separators (str): 구분자 집합 이름 (SEPARATOR_SETS의 키)
+            source_cache (SourceCache): 파일 읽기/인라인화 결과를 재사용할 캐시 (선택사항)
+        """
+        self.pairs = pairs
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.chunker = chunker
+        self.skip_fn = skip_fn
+        self.queue_size = queue_size
+        self.include_graph = include_graph
+        self.stream_threshold = stream_threshold
+        self.separators = separators
+        self.source_cache = source_cache
+
+        self._stop = threading.Event()
+        self._errors = []
+        self.stats = {
+            "discovered": 0,
+            "skipped": 0,
+            "chunked": 0,
+            "failed": 0,
+            "chunks": 0,
+            "streamed": 0,
+            "chunk_seconds": 0.0,
+        }
+
+    def __iter__(self):
+        """
+        청킹된 파일 쌍을 순서대로 냅니다.
+
+        Yields:
+            tuple: (header_path, cpp_path, file_name, entry, error). 실패하면 entry는 None, error는 오류 메시지
+        """
+        pair_queue = queue.Queue(maxsize=self.queue_size)
+        chunk_queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(target=self._discover, args=(pair_queue,), name="chunk-pipeline-discover", daemon=True),
+            threading.Thread(target=self._chunk, args=(pair_queue, chunk_queue), name="chunk-pipeline-chunk", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                # 소비 쪽이 청킹 결과를 기다린 시간 (길면 탐색/청킹이 병목)
+                with METRICS.span("pipeline.wait"):
+                    item = chunk_queue.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # 소비 쪽이 중간에 멈춰도 앞 단계 스레드가 큐에 막혀 남지 않도록 정리
+            self._stop.set()
+            self._drain(chunk_queue)
+            for thread in threads:
+                while thread.is_alive():
+                    self._drain(pair_queue)
+                    self._drain(chunk_queue)
+                    thread.join(timeout=0.05)
+
+        if self._errors:
+            raise self._errors[0]
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """중단 요청을 확인하면서 큐에 넣습니다. 중단되었으면 False를 반환합니다."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _drain(q: queue.Queue) -> None:
+        """큐에 남은 항목을 버립니다."""
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _discover(self, pair_queue: queue.Queue) -> None:
+        """탐색 단계: 파일 쌍을 찾아 변경된 것만 청킹 큐에 넣습니다."""
+        try:
+            for header_path, cpp_path in self.pairs:
+                if self._stop.is_set():
+                    return
+                self.stats["discovered"] += 1
+                if self.skip_fn is not None and self.skip_fn(header_path, cpp_path):
+                    self.stats["skipped"] += 1
+                    continue
+                if not self._put(pair_queue, (header_path, cpp_path)):
+                    return
+        except Exception as e:
+            self._errors.append(e)
+        finally:
+            self._put(pair_queue, _DONE)
+
+    def _chunk(self, pair_queue: queue.Queue, chunk_queue: queue.Queue) -> None:
+        """청킹 단계: 파일 쌍을 청킹해 결과 큐에 넣습니다. 스플리터는 한 번만 생성합니다."""
+        text_splitter = create_text_splitter(self.chunk_size, self.chunk_overlap, self.separators)
+        try:
+            while True:
+                try:
+                    pair = pair_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stop.is_set():
+                        return
+                    continue
+                if pair is _DONE:
+                    return
+                header_path, cpp_path = pair
+                started = time.perf_counter()
+                try:
+                    file_name, entry = chunk_file_pair(
+                        header_path, cpp_path, self.chunk_size, self.chunk_overlap, text_splitter, self.chunker,
+                        self.include_graph, self.stream_threshold, source_cache=self.source_cache
+                    )
+                    item = (header_path, cpp_path, file_name, entry, None)
+                    self.stats["chunked"] += 1
+                    if entry.get("streamed"):
+                        self.stats["streamed"] += 1
+                        entry["chunks"] = self._count_streamed(entry["chunks"])
+                    else:
+                        self.stats["chunks"] += len(entry["chunks"])
+                except Exception as e:
+                    item = (header_path, cpp_path, None, None, str(e))
+                    self.stats["failed"] += 1
+                self.stats["chunk_seconds"] += time.perf_counter() - started
+                if not self._put(chunk_queue, item):
+                    return
+        finally:
+            self._put(chunk_queue, _DONE)
+
+    def _count_streamed(self, chunks):
+        """스트리밍 청크를 소비 쪽에 넘기면서 청크 수와 청킹 시간을 셉니다."""
+        iterator = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stats["chunk_seconds"] += time.perf_counter() - started
+            self.stats["chunks"] += 1
+            yield chunk
+
+    def report(self) -> str:
+        """단계별 처리 요약 문자열을 반환합니다."""
+        return (
+            f"파이프라인: 탐색 {self.stats['discovered']}개, 변경 없음 {self.stats['skipped']}개, "
+            f"청킹 {self.stats['chunked']}개 ({self.stats['chunks']} 청크, 스트리밍 {self.stats['streamed']}개, {self.stats['chunk_seconds']:.2f}초), "
+            f"실패 {self.stats['failed']}개"
+        )
@@ -0,0 +1,415 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict, deque
+from typing import Dict, List
+from retriever import CodeRetriever
+from watcher import WATCH_STATUS_FILE, read_watch_status
+from snapshot import DEFAULT_SNAPSHOT_CACHE
+from flat_store import STORES
+from metrics import METRICS, add_profile_arguments, finish_profiling, start_profiling
+from embedding_cache import DEFAULT_CACHE_MAX_MB, DEFAULT_CACHE_PATH
+from embedding_backends import DEFAULT_EMBEDDER, EMBEDDERS, load_environment, requires_api_key
+
+SERVER_NAME = "mcp-chunk-retriever"
+SERVER_VERSION = "0.1.0"
+PROTOCOL_VERSION = "2024-11-05"
+
+# 지연 시간 통계에 남길 최근 요청 수
+LATENCY_WINDOW = 10000
+
+# MCP tools/list로 노출할 도구 정의
+TOOLS = [
+    {
+        "name": "similarity_search",
+        "description": "자연어 쿼리와 유사한 코드 청크를 검색합니다.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "k": {"type": "integer", "default": 3},
+                "filter_dict": {"type": "object"},
+                "mode": {"type": "string", "enum": ["vector", "lexical", "hybrid"], "default": "vector"},
+            },
+            "required": ["query"],
+        },
+    },
+    {
+        "name": "similarity_search_batch",
+        "description": "여러 쿼리를 한 번의 임베딩 요청과 한 번의 벡터 검색으로 처리합니다.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "queries": {"type": "array", "items": {"type": "string"}},
+                "k": {"type": "integer", "default": 3},
+                "filter_dict": {"type": "object"},
+            },
+            "required": ["queries"],
+        },
+    },
+    {
+        "name": "search_by_metadata",
+        "description": "메타데이터 필터로 코드 청크를 조회합니다.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "metadata_filter": {"type": "object"},
+                "limit": {"type": "integer", "default": 10},
+            },
+            "required": ["metadata_filter"],
+        },
+    },
+    {
+        "name": "get_similar_code",
+        "description": "코드 스니펫과 유사한 코드 청크를 검색합니다.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "code_snippet": {"type": "string"},
+                "k": {"type": "integer", "default": 3},
+                "filter_dict": {"type": "object"},
+            },
+            "required": ["code_snippet"],
+        },
+    },
+]
+
+class QueryEmbeddingLRU:
+    def __init__(self, embeddings, max_size: int = 1024):
+        """
+        쿼리 임베딩을 메모리 LRU로 캐시하는 래퍼. 문서 임베딩은 그대로 전달합니다.
+
+        Args:
+            embeddings: embed_documents/embed_query를 제공하는 임베딩 객체
+            max_size (int): 캐시할 최대 쿼리 수
+        """
+        self.embeddings = embeddings
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            vector = self._cache.get(text)
+            if vector is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self._cache[text] = vector
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return vector
+
+    def stats(self) -> Dict:
+        """캐시 통계를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+class LatencyStats:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        메서드별 최근 요청 지연 시간을 모아 백분위수를 계산합니다.
+
+        Args:
+            window (int): 메서드별로 보관할 최근 요청 수
+        """
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, seconds: float) -> None:
+        with self._lock:
+            if method not in self._samples:
+                self._samples[method] = deque(maxlen=self.window)
+                self._counts[method] = 0
+            self._samples[method].append(seconds)
+            self._counts[method] += 1
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], q: float) -> float:
+        index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    def summary(self) -> Dict:
+        """메서드별 요청 수와 p50/p99 지연 시간(밀리초)을 반환합니다."""
+        with self._lock:
+            samples = {method: sorted(values) for method, values in self._samples.items()}
+            counts = dict(self._counts)
+        result = {}
+        for method, values in samples.items():
+            result[method] = {
+                "count": counts[method],
+                "p50_ms": self._percentile(values, 0.50) * 1000,
+                "p99_ms": self._percentile(values, 0.99) * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return result
+
+class JsonRpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class RetrievalServer:
+    def __init__(self, retriever: CodeRetriever, query_cache_size: int = 1024):
+        """
+        CodeRetriever를 상주시켜 JSON-RPC(MCP 스타일) 요청을 처리하는 검색 서버
+
+        컬렉션을 한 번만 열어두고 쿼리 임베딩은 메모리 LRU로 캐시하므로,
+        요청마다 langchain 임포트와 DB 열기, 쿼리 임베딩 비용을 다시 내지 않습니다.
+
+        Args:
+            retriever (CodeRetriever): 검색에 사용할 리트리버
+            query_cache_size (int): 캐시할 최대 쿼리 임베딩 수
+        """
+        self.retriever = retriever
+        self.query_cache = QueryEmbeddingLRU(retriever.embeddings, query_cache_size)
+        # 저장소(Chroma 또는 flat)가 쿼리 임베딩 시 LRU를 거치도록 교체
+        retriever.embeddings = self.query_cache
+        retriever.db._embedding_function = self.query_cache
+        self.latency = LatencyStats()
+        self.started = time.time()
+        # embedder.py --watch가 인덱스를 갱신하면 저장소를 다시 열기 위해 감시 상태 파일을 확인
+        self.status_path = os.path.join(retriever.persist_directory, WATCH_STATUS_FILE)
+        self._reload_lock = threading.Lock()
+        self._status_mtime = None
+        self._synced_at = None
+        self.reloads = 0
+        self._reload_if_updated()
+
+        # 첫 요청이 컬렉션 로딩 비용을 내지 않도록 미리 열어둠
+        self.document_count = retriever.db._collection.count()
+
+    def _reload_if_updated(self) -> None:
+        """감시 상태 파일의 마지막 반영 시각이 바뀌었으면 저장소와 어휘 색인을 다시 엽니다. (평소에는 stat 한 번)"""
+        try:
+            mtime = os.stat(self.status_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._status_mtime:
+            return
+        with self._reload_lock:
+            if mtime == self._status_mtime:
+                return
+            status = read_watch_status(self.retriever.persist_directory)
+            synced_at = status.get("last_sync_at") if status else None
+            if self._status_mtime is not None and synced_at != self._synced_at:
+                with METRICS.span("server.reload"):
+                    self.retriever.reload()
+                self.reloads += 1
+            self._status_mtime = mtime
+            self._synced_at = synced_at
+
+    def call_tool(self, name: str, arguments: Dict):
+        """
+        도구 이름과 인자로 리트리버 메서드를 호출합니다.
+
+        Args:
+            name (str): 도구 이름 (similarity_search, similarity_search_batch, search_by_metadata, get_similar_code)
+            arguments (Dict): 메서드 인자
+
+        Returns:
+            List[Dict]: 검색 결과 리스트
+        """
+        if name not in {tool["name"] for tool in TOOLS}:
+            raise JsonRpcError(-32601, f"알 수 없는 도구: {name}")
+        self._reload_if_updated()
+        started = time.perf_counter()
+        try:
+            return getattr(self.retriever, name)(**arguments)
+        except TypeError as e:
+            raise JsonRpcError(-32602, f"잘못된 인자: {str(e)}")
+        finally:
+            self.latency.record(name, time.perf_counter() - started)
+
+    def stats(self) -> Dict:
+        """서버 통계(가동 시간, 문서 수, 쿼리 캐시, 지연 시간 백분위수, 감시 모드면 인덱스 지연 시간, 프로파일링 중이면 단계별 메트릭)를 반환합니다."""
+        stats = {
+            "uptime_seconds": time.time() - self.started,
+            "document_count": self.retriever.db._collection.count(),
+            "query_cache": self.query_cache.stats(),
+            "latency": self.latency.summary(),
+        }
+        index_status = read_watch_status(self.retriever.persist_directory)
+        if index_status is not None:
+            # 감시 모드의 반영 대기 파일 수와 인덱스 지연 시간
+            stats["index"] = dict(index_status, reloads=self.reloads)
+        if METRICS.enabled:
+            stats["metrics"] = METRICS.snapshot()
+        return stats
+
+    def handle(self, request: Dict):
+        """
+        JSON-RPC 요청 하나를 처리합니다.
+
+        MCP 메서드(initialize, tools/list, tools/call)와 함께, 도구 이름과 stats, metrics를 메서드로 직접 호출할 수 있습니다.
+
+        Args:
+            request (Dict): JSON-RPC 요청
+
+        Returns:
+            Dict: JSON-RPC 응답 (알림이면 None)
+        """
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params") or {}
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {"tools": {}},
+                    "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+                }
+            elif method == "tools/list":
+                result = {"tools": TOOLS}
+            elif method == "tools/call":
+                results = self.call_tool(params.get("name"), params.get("arguments") or {})
+                result = {"content": [{"type": "text", "text": json.dumps(results, ensure_ascii=False)}]}
+            elif method == "stats":
+                result = self.stats()
+            elif method == "metrics":
+                # Prometheus 텍스트 형식 (프로파일링이 꺼져 있으면 빈 메트릭)
+                result = {"text": METRICS.to_prometheus()}
+            elif method == "ping":
+                result = {}
+            elif method in {tool["name"] for tool in TOOLS}:
+                result = self.call_tool(method, params)
+            elif method is not None and method.startswith("notifications/"):
+                return None
+            else:
+                raise JsonRpcError(-32601, f"알 수 없는 메서드: {method}")
+        except JsonRpcError as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32603, "message": str(e)}}
+
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def handle_line(self, line: str):
+        """줄 단위 JSON 요청을 처리해 응답 문자열을 반환합니다. 응답이 없으면 None을 반환합니다."""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": str(e)}}
+        else:
+            response = self.handle(request)
+        if response is None:
+            return None
+        return json.dumps(response, ensure_ascii=False)
+
+    def serve_stdio(self, stdin=None, stdout=None) -> None:
+        """표준 입출력으로 줄 단위 JSON-RPC 요청을 처리합니다 (MCP stdio 방식)."""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+    def serve_socket(self, socket_path: str) -> None:
+        """유닉스 도메인 소켓으로 줄 단위 JSON-RPC 요청을 처리합니다. 연결마다 스레드 하나를 사용합니다."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    line = raw.decode('utf-8')
+                    if not line.strip():
+                        continue
+                    response = server.handle_line(line)
+                    if response is not None:
+                        self.wfile.write((response + "\n").encode('utf-8'))
+                        self.wfile.flush()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        # SIGTERM에도 소켓 파일을 정리하도록 KeyboardInterrupt로 처리
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as socket_server:
+            socket_server.daemon_threads = True
+            print(f"검색 서버 실행 중: {socket_path}", file=sys.stderr)
+            try:
+                socket_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.remove(socket_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='상주 코드 검색 서버 (stdio MCP 또는 유닉스 소켓)')
+    parser.add_argument('--db-dir', type=str, default='code_chunks_db', help='Chroma DB 디렉토리 (기본값: code_chunks_db)')
+    parser.add_argument('--socket', type=str, help='유닉스 소켓 경로 (지정하지 않으면 표준 입출력 사용)')
+    parser.add_argument('--query-cache-size', type=int, default=1024, help='메모리에 캐시할 최대 쿼리 임베딩 수 (기본값: 1024)')
+    parser.add_argument('--embedding-cache', type=str, default=DEFAULT_CACHE_PATH, help=f'임베딩 캐시 파일 경로 (기본값: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_MB, help=f'임베딩 캐시 최대 크기(MB) (기본값: {DEFAULT_CACHE_MAX_MB})')
+    parser.add_argument('--no-embedding-cache', action='store_true', help='임베딩 캐시 사용 안 함')
+    parser.add_argument('--embedder', type=str, choices=EMBEDDERS, default=DEFAULT_EMBEDDER, help=f'임베딩 백엔드 (기본값: {DEFAULT_EMBEDDER}, 인덱싱에 사용한 것과 같아야 함)')
+    parser.add_argument('--embedding-dim', type=int, help='벡터 차원 (hashing 백엔드 전용, 기본값: 1024)')
+    parser.add_argument('--embedding-base-url', type=str, help='OpenAI 호환 임베딩 API 주소 (예: 로컬 대체 서버 http://127.0.0.1:8765/v1)')
+    parser.add_argument('--store', type=str, choices=STORES, help='벡터 저장소 (기본값: DB 디렉토리에 flat 저장소가 있으면 flat, 없으면 chroma)')
+    parser.add_argument('--snapshot', type=str, help='--db-dir 대신 검색할 인덱스 스냅샷 파일 (embedder.py --export-snapshot으로 생성)')
+    parser.add_argument('--snapshot-cache', type=str, default=DEFAULT_SNAPSHOT_CACHE, help=f'스냅샷을 풀어 둘 캐시 디렉토리 (기본값: {DEFAULT_SNAPSHOT_CACHE})')
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    start_profiling(args)
+
+    # .env 파일에서 환경 변수 로드 (표준 출력은 프로토콜 전용이므로 안내 메시지는 표준 에러로 출력)
+    load_environment()
+    if requires_api_key(args.embedder) and not os.getenv("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY가 설정되지 않았습니다.", file=sys.stderr)
+        print("'.env' 파일을 생성하고 OPENAI_API_KEY를 설정해주세요.", file=sys.stderr)
+        sys.exit(1)
+
+    retriever = CodeRetriever(
+        persist_directory=args.db_dir,
+        cache_path=None if args.no_embedding_cache else args.embedding_cache,
+        cache_max_mb=args.cache_max_mb,
+        embedding_base_url=args.embedding_base_url,
+        embedder=args.embedder,
+        embedding_dim=args.embedding_dim,
+        store=args.store,
+        snapshot=args.snapshot,
+        snapshot_cache=args.snapshot_cache
+    )
+    server = RetrievalServer(retriever, query_cache_size=args.query_cache_size)
+
+    if args.socket:
+        server.serve_socket(args.socket)
+    else:
+        print(f"검색 서버 실행 중 (stdio, 문서 {server.document_count}개)", file=sys.stderr)
+        server.serve_stdio()
+    # 표준 출력은 프로토콜 전용이므로 요약은 표준 에러로 출력
+    finish_profiling(args, file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,121 @@
 import os
 import argparse
 from typing import List, Dict, Union
-from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+from embedding_cache import DEFAULT_CACHE_MAX_MB, DEFAULT_CACHE_PATH, CachedEmbeddings, wrap_with_cache
+from embedding_backends import DEFAULT_EMBEDDER, EMBEDDERS, LazyEmbeddings, create_embeddings, embedding_model_name, load_environment, requires_api_key
+from chroma_store import ChromaStore
+from flat_store import STORES, FlatVectorStore, detect_store
+from metrics import METRICS, add_profile_arguments, finish_profiling, start_profiling
+from lexical_index import LexicalIndex, parse_symbol_query, reciprocal_rank_fusion
+from file_table import FileTable
+from snapshot import DEFAULT_SNAPSHOT_CACHE, open_snapshot
+from shards import ShardedLexicalIndex, ShardedStore, is_sharded, load_shard_config, shard_directory
 
-# .env 파일에서 환경 변수 로드
-load_dotenv()
+# 검색 방식
+#   vector: 임베딩 유사도 (기본값)
+#   lexical: 식별자 토큰 BM25와 심볼 테이블 (임베딩 없음)
+#   hybrid: 심볼이 정확히 일치하면 심볼 결과, 아니면 BM25와 벡터 결과를 RRF로 합침
+SEARCH_MODES = ('vector', 'lexical', 'hybrid')
+
+# 하이브리드 검색 시 각 방식에서 가져올 후보 수 (k의 배수)
+HYBRID_CANDIDATES = 4
 
 class CodeRetriever:
-    def __init__(self, persist_directory: str = "code_chunks_db"):
+    def __init__(
+        self,
+        persist_directory: str = "code_chunks_db",
+        cache_path: str = DEFAULT_CACHE_PATH,
+        cache_max_mb: float = DEFAULT_CACHE_MAX_MB,
+        embedding_base_url: str = None,
+        embedder: str = DEFAULT_EMBEDDER,
+        embedding_dim: int = None,
+        store: str = None,
+        snapshot: str = None,
+        snapshot_cache: str = DEFAULT_SNAPSHOT_CACHE
+    ):
         """
         코드 리트리버 초기화
         
         Args:
             persist_directory (str): Chroma DB 저장 디렉토리
+            cache_path (str): 임베딩 캐시 파일 경로 (None이면 캐시 사용 안 함)
+            cache_max_mb (float): 임베딩 캐시 최대 크기(MB)
+            embedding_base_url (str): OpenAI 호환 임베딩 API 주소 (선택사항, 로컬 대체 서버 테스트용)
+            embedder (str): 임베딩 백엔드 (인덱싱에 사용한 것과 같아야 함)
+            embedding_dim (int): 벡터 차원 (hashing 백엔드 전용)
+            store (str): 벡터 저장소 백엔드 ('chroma' 또는 'flat', None이면 DB 디렉토리에 있는 것을 사용)
+            snapshot (str): 인덱스 스냅샷 파일 경로. 지정하면 persist_directory 대신 스냅샷을 flat 저장소로 풀어
+                (한 번만, 이후에는 캐시를 재사용) 검색합니다. 임베딩 백엔드/모델이 다르면 ValueError
+            snapshot_cache (str): 스냅샷을 풀어 둘 캐시 디렉토리
+
+        DB 디렉토리가 샤딩된 인덱스(shards.json)이면 샤드를 모두 열어 하나의 저장소처럼 검색합니다.
         """
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        cache_model, cacheable = embedding_model_name(embedder, embedding_base_url, embedding_dim)
+        # 임베딩 객체(OpenAI 백엔드는 langchain 임포트 포함)는 첫 벡터 검색 때 생성하므로
+        # 어휘 검색과 메타데이터 조회는 그 비용을 내지 않음
+        self.embeddings = LazyEmbeddings(lambda: wrap_with_cache(
+            create_embeddings(embedder, embedding_base_url, embedding_dim)[0],
+            cache_path if cacheable else None, cache_max_mb, model=cache_model
+        ))
+        # 스냅샷 호환성 확인용 임베딩 모델 이름
+        self.embedding_model = cache_model
+        if snapshot is not None:
+            with METRICS.span("snapshot.open"):
+                persist_directory = open_snapshot(snapshot, embedder, self.embedding_model, snapshot_cache)
+            store = 'flat'
         self.persist_directory = persist_directory
-        self.db = Chroma(
-            persist_directory=persist_directory,
-            embedding_function=self.embeddings
-        )
+        self.requested_store = store
+        self.db = None
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        벡터 저장소를 다시 열고 어휘 색인과 파일 테이블은 다음 검색 때 다시 읽게 합니다.
+        다른 프로세스(embedder.py --watch 등)가 인덱스를 갱신한 뒤 새 내용을 검색하려면 호출합니다.
+        """
+        store = self.requested_store
+        self.lexical_index = None
+        self.file_table = None
+        self._file_table_loaded = False
+        self.store = store
+        with METRICS.span("store.open"):
+            if is_sharded(self.persist_directory):
+                # 샤딩된 인덱스는 샤드별 저장소를 모두 열고 검색 시 동시에 질의
+                self.shard_directories = [
+                    shard_directory(self.persist_directory, name)
+                    for name in sorted(load_shard_config(self.persist_directory)["shards"])
+                ]
+                self.db = ShardedStore({
+                    os.path.basename(directory): self._open_store(directory, store)
+                    for directory in self.shard_directories
+                })
+            else:
+                self.shard_directories = None
+                self.store = store or detect_store(self.persist_directory)
+                self.db = self._open_store(self.persist_directory, self.store)
+
+    def _open_store(self, directory: str, store: str = None):
+        """
+        DB 디렉토리의 벡터 저장소를 엽니다.
+
+        Args:
+            directory (str): DB 디렉토리
+            store (str): 'chroma' 또는 'flat' (None이면 디렉토리에 있는 것을 사용)
+        """
+        store = store or detect_store(directory)
+        if store not in STORES:
+            raise ValueError(f"알 수 없는 저장소: {store} (선택 가능: {', '.join(STORES)})")
+        if store == 'flat':
+            # 매니페스트만 읽고 벡터는 메모리 맵으로 연결하므로 바로 열림
+            return FlatVectorStore(directory, embedding_function=self.embeddings)
+        return ChromaStore(directory, embedding_function=self.embeddings)
 
     def similarity_search(
         self,
         query: str,
         k: int = 3,
-        filter_dict: Dict = None
+        filter_dict: Dict = None,
+        mode: str = 'vector'
     ) -> List[Dict[str, Union[str, Dict]]]:
         """
         유사도 기반 코드 검색
@@ -39,25 +124,215 @@ class CodeRetriever:
             query (str): 검색 쿼리
             k (int): 반환할 결과 수
             filter_dict (Dict): 메타데이터 기반 필터 (예: {"language": "cpp"})
+            mode (str): 검색 방식 ('vector', 'lexical', 'hybrid')
         
         Returns:
             List[Dict]: 검색 결과 리스트. 각 결과는 코드와 메타데이터를 포함
         """
-        docs = self.db.similarity_search(
-            query=query,
-            k=k,
-            filter=filter_dict
-        )
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"알 수 없는 검색 방식: {mode} (선택 가능: {', '.join(SEARCH_MODES)})")
+        METRICS.count("retrieve.queries")
+        filter_dict = self._translate_filter(filter_dict)
+        with METRICS.span(f"retrieve.search.{mode}"):
+            if mode == 'lexical':
+                return self._lexical_search(query, k, filter_dict)
+            if mode == 'hybrid':
+                return self._hybrid_search(query, k, filter_dict)
+            
+            # 쿼리 임베딩과 벡터 검색 시간을 나눠 기록하도록 임베딩을 직접 계산해 컬렉션에 질의
+            with METRICS.span("retrieve.embed_query"):
+                query_embedding = self.embeddings.embed_query(query)
+            with METRICS.span("retrieve.vector"):
+                response = self.db._collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=k,
+                    where=filter_dict,
+                    include=["documents", "metadatas"]
+                )
         
         results = []
-        for doc in docs:
+        for doc, metadata in zip(response["documents"][0], response["metadatas"][0]):
             results.append({
-                "code": doc.page_content,
-                "metadata": doc.metadata
+                "code": doc,
+                "metadata": self._rehydrate(metadata)
             })
         
         return results
 
+    def load_lexical_index(self) -> LexicalIndex:
+        """
+        어휘(BM25/심볼) 색인을 읽습니다. 색인 파일이 없으면 컬렉션의 청크로 메모리에서 만듭니다.
+        
+        Returns:
+            LexicalIndex: 어휘 색인
+        """
+        if self.lexical_index is None:
+            if self.shard_directories is None:
+                self.lexical_index = self._load_lexical_index(self.persist_directory, self.db)
+            else:
+                # 샤드별 색인을 읽고 BM25 통계는 전체를 합쳐 계산
+                self.lexical_index = ShardedLexicalIndex([
+                    self._load_lexical_index(directory, self.db.shards[os.path.basename(directory)])
+                    for directory in self.shard_directories
+                ])
+        return self.lexical_index
+
+    @staticmethod
+    def _load_lexical_index(directory: str, db) -> LexicalIndex:
+        """DB 디렉토리 하나의 어휘 색인을 읽고, 없으면 저장소의 청크로 만듭니다."""
+        lexical_index = LexicalIndex.load(directory)
+        if not len(lexical_index):
+            stored = db._collection.get(include=["documents", "metadatas"])
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                symbols = (metadata or {}).get("symbols")
+                lexical_index.add(doc_id, text, symbols.split(", ") if symbols else None)
+        return lexical_index
+
+    def load_file_table(self) -> FileTable:
+        """
+        파일 단위 메타데이터 테이블을 읽습니다. 샤딩된 인덱스면 샤드별 테이블을 합칩니다.
+        
+        Returns:
+            FileTable: 파일 테이블 (테이블이 없는 이전 형식의 DB면 None, 청크 메타데이터를 그대로 사용)
+        """
+        if not self._file_table_loaded:
+            directories = self.shard_directories or [self.persist_directory]
+            tables = [FileTable.load(directory) for directory in directories if FileTable.exists(directory)]
+            self.file_table = FileTable.merge(tables) if tables else None
+            self._file_table_loaded = True
+        return self.file_table
+
+    def _translate_filter(self, filter_dict: Dict) -> Dict:
+        """파일 단위 필드(file_name 등)에 대한 조건을 저장소의 file_id 조건으로 바꿉니다."""
+        file_table = self.load_file_table()
+        if file_table is None or not filter_dict:
+            return filter_dict
+        with METRICS.span("retrieve.filter"):
+            return file_table.translate_filter(filter_dict)
+
+    def _rehydrate(self, metadata: Dict) -> Dict:
+        """청크 메타데이터에 파일 테이블의 파일 단위 값을 채웁니다."""
+        file_table = self.load_file_table()
+        return metadata if file_table is None else file_table.rehydrate(metadata)
+
+    def _fetch(self, ids: List[str], filter_dict: Dict = None) -> List[Dict[str, Union[str, Dict]]]:
+        """청크 ID 순서대로 코드와 메타데이터를 가져옵니다. 필터에 맞지 않는 청크는 제외합니다."""
+        if not ids:
+            return []
+        with METRICS.span("retrieve.fetch"):
+            docs = self.db._collection.get(ids=ids, where=filter_dict, include=["documents", "metadatas"])
+        found = {
+            doc_id: {"code": doc, "metadata": self._rehydrate(metadata)}
+            for doc_id, doc, metadata in zip(docs["ids"], docs["documents"], docs["metadatas"])
+        }
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def _lexical_ranking(self, query: str, count: int) -> List[str]:
+        """
+        어휘 색인으로 청크 ID 순위를 만듭니다. 쿼리가 심볼이면 그 심볼을 정의한 청크가 앞에 옵니다.
+        
+        Args:
+            query (str): 검색 쿼리
+            count (int): 최대 ID 수
+        
+        Returns:
+            List[str]: 청크 ID 리스트
+        """
+        lexical_index = self.load_lexical_index()
+        with METRICS.span("retrieve.lexical"):
+            ranked = [doc_id for doc_id, _ in lexical_index.search(query, count)]
+        symbol = parse_symbol_query(query)
+        if symbol is None:
+            return ranked
+        defining = lexical_index.lookup_symbol(symbol)
+        if not defining:
+            return ranked
+        # 심볼을 정의한 청크끼리는 BM25 순위를 유지
+        order = {doc_id: rank for rank, doc_id in enumerate(ranked)}
+        defining.sort(key=lambda doc_id: order.get(doc_id, len(order)))
+        defining_set = set(defining)
+        return (defining + [doc_id for doc_id in ranked if doc_id not in defining_set])[:count]
+
+    def _lexical_search(self, query: str, k: int, filter_dict: Dict = None) -> List[Dict[str, Union[str, Dict]]]:
+        """어휘 색인만으로 검색합니다. 임베딩을 계산하지 않습니다."""
+        if not filter_dict:
+            return self._fetch(self._lexical_ranking(query, k))
+        # 필터로 빠지는 청크가 있으므로 결과가 k개가 될 때까지 후보를 늘려가며 가져옴
+        count = k * HYBRID_CANDIDATES
+        while True:
+            ranked = self._lexical_ranking(query, count)
+            results = self._fetch(ranked, filter_dict)
+            if len(results) >= k or len(ranked) < count:
+                return results[:k]
+            count *= 4
+
+    def _hybrid_search(self, query: str, k: int, filter_dict: Dict = None) -> List[Dict[str, Union[str, Dict]]]:
+        """
+        심볼 쿼리는 심볼 테이블로 바로 답하고, 그 밖의 쿼리는 BM25와 벡터 순위를 RRF로 합칩니다.
+        """
+        symbol = parse_symbol_query(query)
+        if symbol is not None and self.load_lexical_index().lookup_symbol(symbol):
+            results = self._lexical_search(query, k, filter_dict)
+            if results:
+                return results
+        
+        count = max(k * HYBRID_CANDIDATES, 20)
+        lexical_ids = self._lexical_ranking(query, count)
+        with METRICS.span("retrieve.embed_query"):
+            query_embedding = self.embeddings.embed_query(query)
+        with METRICS.span("retrieve.vector"):
+            vector = self.db._collection.query(
+                query_embeddings=[query_embedding],
+                n_results=count,
+                where=filter_dict,
+                include=[]
+            )
+        fused = reciprocal_rank_fusion([vector["ids"][0], lexical_ids])
+        # 어휘 후보는 필터를 적용하지 않은 순위이므로 가져오면서 걸러냄
+        return self._fetch(fused, filter_dict)[:k]
+
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        k: int = 3,
+        filter_dict: Dict = None
+    ) -> List[List[Dict[str, Union[str, Dict]]]]:
+        """
+        여러 쿼리를 한 번에 검색
+        
+        모든 쿼리를 임베딩 요청 한 번으로 임베딩하고, 벡터 검색도 한 번의 다중 쿼리로 수행합니다.
+        
+        Args:
+            queries (List[str]): 검색 쿼리 리스트
+            k (int): 쿼리별 반환할 결과 수
+            filter_dict (Dict): 모든 쿼리에 공통으로 적용할 메타데이터 필터
+        
+        Returns:
+            List[List[Dict]]: 쿼리 순서대로의 검색 결과 리스트
+        """
+        if not queries:
+            return []
+        
+        METRICS.count("retrieve.queries", len(queries))
+        filter_dict = self._translate_filter(filter_dict)
+        with METRICS.span("retrieve.embed_query"):
+            query_embeddings = self.embeddings.embed_documents(list(queries))
+        with METRICS.span("retrieve.vector"):
+            response = self.db._collection.query(
+                query_embeddings=query_embeddings,
+                n_results=k,
+                where=filter_dict
+            )
+        
+        batch_results = []
+        for documents, metadatas in zip(response["documents"], response["metadatas"]):
+            batch_results.append([
+                {"code": doc, "metadata": self._rehydrate(metadata)}
+                for doc, metadata in zip(documents, metadatas)
+            ])
+        
+        return batch_results
+
     def search_by_metadata(
         self,
         metadata_filter: Dict,
@@ -75,16 +350,18 @@ class CodeRetriever:
         """
         results = []
         collection = self.db._collection
+        metadata_filter = self._translate_filter(metadata_filter)
         
-        docs = collection.get(
-            where=metadata_filter,
-            limit=limit
-        )
+        with METRICS.span("retrieve.metadata"):
+            docs = collection.get(
+                where=metadata_filter,
+                limit=limit
+            )
         
         for i, doc in enumerate(docs["documents"]):
             results.append({
                 "code": doc,
-                "metadata": docs["metadatas"][i]
+                "metadata": self._rehydrate(docs["metadatas"][i])
             })
         
         return results
@@ -116,17 +393,38 @@ def main():
     parser.add_argument('--k', type=int, default=3,
                       help='반환할 결과 수 (기본값: 3)')
     parser.add_argument('--file-name', type=str, help='특정 파일 이름으로 필터링')
+    parser.add_argument('--mode', type=str, choices=SEARCH_MODES, default='vector', help='검색 방식 (기본값: vector, lexical은 임베딩 없이 BM25/심볼, hybrid는 둘을 결합)')
+    parser.add_argument('--embedding-cache', type=str, default=DEFAULT_CACHE_PATH, help=f'임베딩 캐시 파일 경로 (기본값: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-embedding-cache', action='store_true', help='임베딩 캐시 사용 안 함')
+    parser.add_argument('--embedder', type=str, choices=EMBEDDERS, default=DEFAULT_EMBEDDER, help=f'임베딩 백엔드 (기본값: {DEFAULT_EMBEDDER}, 인덱싱에 사용한 것과 같아야 함)')
+    parser.add_argument('--embedding-dim', type=int, help='벡터 차원 (hashing 백엔드 전용, 기본값: 1024)')
+    parser.add_argument('--embedding-base-url', type=str, help='OpenAI 호환 임베딩 API 주소 (예: 로컬 대체 서버 http://127.0.0.1:8765/v1)')
+    parser.add_argument('--store', type=str, choices=STORES, help='벡터 저장소 (기본값: DB 디렉토리에 flat 저장소가 있으면 flat, 없으면 chroma)')
+    parser.add_argument('--snapshot', type=str, help='--db-dir 대신 검색할 인덱스 스냅샷 파일 (embedder.py --export-snapshot으로 생성)')
+    parser.add_argument('--snapshot-cache', type=str, default=DEFAULT_SNAPSHOT_CACHE, help=f'스냅샷을 풀어 둘 캐시 디렉토리 (기본값: {DEFAULT_SNAPSHOT_CACHE})')
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    start_profiling(args)
 
-    # 환경 변수 확인
-    if not os.getenv("OPENAI_API_KEY"):
+    # .env 파일에서 환경 변수 로드 후 확인 (로컬 백엔드와 임베딩을 쓰지 않는 lexical 검색은 API 키가 필요 없음)
+    load_environment()
+    if args.mode != 'lexical' and requires_api_key(args.embedder) and not os.getenv("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY가 설정되지 않았습니다.")
         print("'.env' 파일을 생성하고 OPENAI_API_KEY를 설정해주세요.")
         return
 
     # CodeRetriever 인스턴스 생성
-    retriever = CodeRetriever(persist_directory=args.db_dir)
+    retriever = CodeRetriever(
+        persist_directory=args.db_dir,
+        cache_path=None if args.no_embedding_cache else args.embedding_cache,
+        embedding_base_url=args.embedding_base_url,
+        embedder=args.embedder,
+        embedding_dim=args.embedding_dim,
+        store=args.store,
+        snapshot=args.snapshot,
+        snapshot_cache=args.snapshot_cache
+    )
 
     if args.query:
         # 파일 이름 필터 설정
@@ -136,7 +434,8 @@ def main():
         results = retriever.similarity_search(
             query=args.query,
             k=args.k,
-            filter_dict=filter_dict
+            filter_dict=filter_dict,
+            mode=args.mode
         )
         
         # 결과 출력
@@ -146,9 +445,16 @@ def main():
         for i, result in enumerate(results, 1):
             print(f"=== 결과 {i} ===")
             print(f"파일: {result['metadata'].get('file_name', 'N/A')}")
+            if result['metadata'].get('duplicate_count', 1) > 1:
+                # 중복 제거로 하나만 저장된 청크는 나타나는 모든 위치를 함께 출력
+                print(f"위치 ({result['metadata']['duplicate_count']}곳): {result['metadata']['locations']}")
             print("코드:")
             print(result['code'])
             print()
+        
+        if retriever.embeddings.loaded and isinstance(retriever.embeddings.embeddings, CachedEmbeddings):
+            print(retriever.embeddings.embeddings.report())
+        finish_profiling(args)
     
     else:
         print("검색 쿼리를 입력해주세요. (--query 옵션 사용)")
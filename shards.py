@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from lexical_index import LexicalIndex, search_indexes
+
+# 샤딩 방식: 'dir'는 프로젝트 최상위 디렉토리별, 'hash'는 파일 경로 해시로 정한 개수만큼
+SHARD_MODES = ('dir', 'hash')
+DEFAULT_SHARD_COUNT = 8
+
+# 샤드 DB는 <DB 디렉토리>/shards/<샤드 이름>/에 각각 독립된 인덱스(저장소, 매니페스트, 어휘 색인)로 저장
+SHARDS_DIR = "shards"
+SHARD_CONFIG_FILE = "shards.json"
+
+# 프로젝트 루트에 바로 있는 파일이 들어가는 'dir' 샤드 이름
+ROOT_SHARD = "_root"
+
+# 검색 시 동시에 질의할 최대 샤드 수
+DEFAULT_SHARD_WORKERS = 8
+
+# 한 쿼리에서 샤드별 결과를 합칠 때 가져올 항목
+_RESULT_KEYS = ("ids", "distances", "documents", "metadatas", "embeddings")
+
+def shard_name(path: str, project_dir: str, shard_by: str, shard_count: int = DEFAULT_SHARD_COUNT) -> str:
+    """
+    파일 쌍이 들어갈 샤드 이름을 정합니다.
+
+    Args:
+        path (str): 파일 쌍 키가 되는 경로 (헤더, 없으면 소스)
+        project_dir (str): 프로젝트 루트 디렉토리
+        shard_by (str): 샤딩 방식 ('dir' 또는 'hash')
+        shard_count (int): 'hash' 방식의 샤드 수
+
+    Returns:
+        str: 샤드 이름 (디렉토리 이름으로 쓸 수 있는 문자열)
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(project_dir)).replace(os.sep, '/')
+    if shard_by == 'hash':
+        # 실행마다 같은 값이 나오도록 내장 hash() 대신 crc32 사용
+        return f"shard-{zlib.crc32(relative.encode('utf-8')) % shard_count:03d}"
+    if shard_by != 'dir':
+        raise ValueError(f"알 수 없는 샤딩 방식: {shard_by} (선택 가능: {', '.join(SHARD_MODES)})")
+    parts = relative.split('/')
+    if len(parts) == 1:
+        return ROOT_SHARD
+    return re.sub(r'[^A-Za-z0-9._-]', '_', parts[0]) or ROOT_SHARD
+
+def group_pairs(pairs, project_dir: str, shard_by: str, shard_count: int = DEFAULT_SHARD_COUNT) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    파일 쌍을 샤드별로 나눕니다.
+
+    Args:
+        pairs (Iterable): (header_path, cpp_path) 튜플들
+        project_dir (str): 프로젝트 루트 디렉토리
+        shard_by (str): 샤딩 방식
+        shard_count (int): 'hash' 방식의 샤드 수
+
+    Returns:
+        Dict[str, List[Tuple[str, str]]]: {샤드 이름: 파일 쌍 리스트} (이름순)
+    """
+    groups = {}
+    for header_path, cpp_path in pairs:
+        name = shard_name(header_path or cpp_path, project_dir, shard_by, shard_count)
+        groups.setdefault(name, []).append((header_path, cpp_path))
+    return dict(sorted(groups.items()))
+
+def shard_directory(persist_directory: str, name: str) -> str:
+    """샤드 DB 디렉토리 경로"""
+    return os.path.join(persist_directory, SHARDS_DIR, name)
+
+def is_sharded(persist_directory: str) -> bool:
+    """DB 디렉토리가 샤딩된 인덱스인지 확인합니다."""
+    return os.path.exists(os.path.join(persist_directory, SHARD_CONFIG_FILE))
+
+def load_shard_config(persist_directory: str) -> Dict:
+    """
+    샤딩 설정을 읽습니다.
+
+    Returns:
+        Dict: {"shard_by", "shard_count", "shards": {이름: {"files": 파일 쌍 수}}} (샤딩되지 않았으면 None)
+    """
+    path = os.path.join(persist_directory, SHARD_CONFIG_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_shard_config(persist_directory: str, config: Dict) -> None:
+    """샤딩 설정을 원자적으로 저장합니다."""
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, SHARD_CONFIG_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+class ShardedCollection:
+    def __init__(self, collections: Dict[str, object], max_workers: int = DEFAULT_SHARD_WORKERS):
+        """
+        여러 샤드의 컬렉션을 하나의 읽기 전용 컬렉션처럼 다룹니다.
+
+        query는 모든 샤드에 동시에 질의하고 샤드별 상위 결과를 거리순으로 합쳐 전체 상위 n_results를 만듭니다.
+        각 샤드가 자기 상위 n_results를 돌려주므로 합친 결과는 하나의 컬렉션에서 검색한 것과 같습니다.
+        Chroma 컬렉션과 flat 저장소 모두 같은 query/get/count 인터페이스를 쓰므로 섞여 있어도 됩니다.
+
+        Args:
+            collections (Dict[str, object]): {샤드 이름: 컬렉션}
+            max_workers (int): 동시에 질의할 최대 샤드 수
+        """
+        self.collections = collections
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(collections))),
+            thread_name_prefix="shard-query"
+        ) if len(collections) > 1 else None
+
+    def _map(self, call, items) -> List:
+        """items마다 call(item)을 샤드 스레드 풀에서 동시에 실행하고 순서대로 결과를 반환합니다."""
+        if self._executor is None:
+            return [call(item) for item in items]
+        return list(self._executor.map(call, items))
+
+    def _fan_out(self, call) -> List:
+        """모든 샤드 컬렉션에 call(collection)을 동시에 실행하고 샤드 순서대로 결과를 반환합니다."""
+        return self._map(call, list(self.collections.values()))
+
+    def count(self) -> int:
+        return sum(self._fan_out(lambda collection: collection.count()))
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10, where: Dict = None, include: List[str] = ("metadatas", "documents", "distances")) -> Dict:
+        """
+        모든 샤드에서 검색해 쿼리별 전체 상위 n_results를 반환합니다.
+
+        샤드에는 ID와 거리만 질의하고, 합친 뒤 남은 청크의 문서/메타데이터만 그 청크가 있는 샤드에서 가져오므로
+        샤드가 많아져도 버려질 후보의 본문을 읽지 않습니다. 같은 ID(여러 샤드에 있는 같은 내용의 청크)는 한 번만 냅니다.
+
+        Args:
+            query_embeddings (List[List[float]]): 쿼리 벡터들
+            n_results (int): 쿼리별 결과 수
+            where (Dict): 메타데이터 필터
+            include (List[str]): 반환할 항목 ("documents", "metadatas", "distances", "embeddings")
+
+        Returns:
+            Dict: 쿼리 순서대로의 {"ids", "distances", "documents", "metadatas", "embeddings"} 리스트
+        """
+        responses = self._fan_out(lambda collection: collection.query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where, include=["distances"]
+        ))
+        merged = {key: [] if key in ("ids", "distances") or key in include else None for key in _RESULT_KEYS}
+        # 샤드 순서별로 가져올 청크 ID
+        wanted = [set() for _ in responses]
+        selected = []
+        for index in range(len(query_embeddings)):
+            candidates = []
+            for order, response in enumerate(responses):
+                for chunk_id, distance in zip(response["ids"][index], response["distances"][index]):
+                    candidates.append((distance, order, chunk_id))
+            candidates.sort(key=lambda candidate: candidate[:2])
+            top = []
+            taken = set()
+            for distance, order, chunk_id in candidates:
+                if chunk_id not in taken:
+                    taken.add(chunk_id)
+                    top.append((distance, order, chunk_id))
+                    wanted[order].add(chunk_id)
+                    if len(top) == n_results:
+                        break
+            selected.append(top)
+            merged["ids"].append([chunk_id for _, _, chunk_id in top])
+            merged["distances"].append([distance for distance, _, _ in top])
+
+        columns = [key for key in ("documents", "metadatas", "embeddings") if key in include]
+        if columns:
+            def fetch(item):
+                collection, chunk_ids = item
+                if not chunk_ids:
+                    return {}
+                found = collection.get(ids=list(chunk_ids), include=columns)
+                return {
+                    chunk_id: {key: found[key][i] for key in columns}
+                    for i, chunk_id in enumerate(found["ids"])
+                }
+
+            rows = self._map(fetch, list(zip(self.collections.values(), wanted)))
+            for key in columns:
+                merged[key] = [[rows[order][chunk_id][key] for _, order, chunk_id in top] for top in selected]
+        if "distances" not in include:
+            merged["distances"] = None
+        return merged
+
+    def get(self, ids: List[str] = None, where: Dict = None, limit: int = None, offset: int = None, include: List[str] = ("metadatas", "documents")) -> Dict:
+        """
+        모든 샤드에서 청크를 가져옵니다. limit/offset은 샤드 이름순으로 이어 붙인 결과에 적용합니다.
+
+        Returns:
+            Dict: {"ids", "documents", "metadatas", "embeddings"} (include에 없는 항목은 None)
+        """
+        include = list(include)
+        # 샤드마다 앞에서부터 offset + limit개만 있으면 전체 구간을 만들 수 있음
+        shard_limit = None if limit is None else (offset or 0) + limit
+        responses = self._fan_out(lambda collection: collection.get(ids=ids, where=where, limit=shard_limit, include=include))
+        merged = {key: [] if key == "ids" or key in include else None for key in _RESULT_KEYS if key != "distances"}
+        for response in responses:
+            for key in merged:
+                if merged[key] is not None:
+                    merged[key].extend(response[key])
+        start = offset or 0
+        end = None if limit is None else start + limit
+        return {key: None if values is None else values[start:end] for key, values in merged.items()}
+
+class ShardedLexicalIndex:
+    def __init__(self, indexes: List[LexicalIndex]):
+        """
+        샤드별 어휘 색인을 하나의 색인처럼 검색합니다. BM25 통계를 합쳐 계산하므로 점수는 샤딩하지 않은 색인과 같습니다.
+
+        Args:
+            indexes (List[LexicalIndex]): 샤드별 어휘 색인
+        """
+        self.indexes = indexes
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.indexes)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        return search_indexes(self.indexes, query, k)
+
+    def lookup_symbol(self, symbol: str) -> List[str]:
+        found = []
+        for index in self.indexes:
+            found.extend(index.lookup_symbol(symbol))
+        return found
+
+class ShardedStore:
+    def __init__(self, stores: Dict[str, object], max_workers: int = DEFAULT_SHARD_WORKERS):
+        """
+        샤드별 벡터 저장소(Chroma 또는 flat)를 묶은 읽기 전용 저장소. 리트리버는 _collection으로 검색합니다.
+
+        Args:
+            stores (Dict[str, object]): {샤드 이름: 저장소}
+            max_workers (int): 동시에 질의할 최대 샤드 수
+        """
+        self.shards = stores
+        self._collection = ShardedCollection({name: store._collection for name, store in stores.items()}, max_workers)
+        self._embedding_function = None
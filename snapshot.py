@@ -0,0 +1,304 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import tempfile
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from dedup import DEDUP_INDEX_FILE
+from lexical_index import LEXICAL_INDEX_FILE
+from file_table import FILE_TABLE_FILE
+from index_manifest import MANIFEST_FILE, IndexManifest
+from chroma_store import ChromaStore
+from flat_store import DEFAULT_STORE_DTYPE, STORES, FlatVectorStore, detect_store
+from shards import is_sharded
+
+# 인덱스 스냅샷: 청크, 메타데이터, 벡터, 임베딩 모델과 청킹 설정을 담은 압축(zip) 파일 하나
+#   snapshot.json: 형식 버전, 청크 수, 벡터 차원, 임베딩 백엔드/모델, 청킹 설정
+#   vectors.npy: (청크 수, 차원) float32 연속 배열
+#   chunks.jsonl: 벡터 행 순서대로 {"id", "document", "metadata"} 한 줄씩
+#   files/: 매니페스트, 어휘 색인, 중복 제거 색인, 파일 테이블 (가져온 뒤 증분 인덱싱과 검색에 그대로 사용)
+SNAPSHOT_FORMAT = "mcp-chunk-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = "snapshot.json"
+SNAPSHOT_VECTORS = "vectors.npy"
+SNAPSHOT_CHUNKS = "chunks.jsonl"
+SNAPSHOT_FILES = (MANIFEST_FILE, LEXICAL_INDEX_FILE, DEDUP_INDEX_FILE, FILE_TABLE_FILE)
+
+# 벡터는 압축률이 낮으므로 빠른 압축 수준 사용
+SNAPSHOT_COMPRESSLEVEL = 1
+
+# 스냅샷을 바로 열 때 flat 저장소로 풀어 둘 캐시 디렉토리
+DEFAULT_SNAPSHOT_CACHE = os.path.join(tempfile.gettempdir(), "mcp-chunk-snapshots")
+
+# 한 번에 읽고 쓸 청크 수
+SNAPSHOT_BATCH = 5000
+
+def is_snapshot(path: str) -> bool:
+    """경로가 인덱스 스냅샷 파일인지 확인합니다."""
+    if not os.path.isfile(path) or not zipfile.is_zipfile(path):
+        return False
+    with zipfile.ZipFile(path) as archive:
+        return SNAPSHOT_HEADER in archive.namelist()
+
+def read_snapshot_header(path: str) -> Dict:
+    """
+    스냅샷의 헤더(snapshot.json)를 읽습니다.
+
+    Args:
+        path (str): 스냅샷 파일 경로
+
+    Returns:
+        Dict: {"format", "version", "created_at", "count", "dim", "embedder", "embedding_model", "chunk_size", ...}
+    """
+    with zipfile.ZipFile(path) as archive:
+        header = json.loads(archive.read(SNAPSHOT_HEADER).decode('utf-8'))
+    if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"'{path}'는 지원하지 않는 스냅샷 형식입니다: {header.get('format')} v{header.get('version')}")
+    # 구분자 집합을 기록하기 전에 만든 스냅샷은 기본 구분자로 청킹한 것
+    header.setdefault("separators", 'cpp')
+    return header
+
+def check_compatible(header: Dict, embedder: str, embedding_model: str, **settings) -> None:
+    """
+    스냅샷이 현재 임베딩 백엔드/모델과 청킹 설정으로 쓸 수 있는지 확인합니다.
+
+    Args:
+        header (Dict): 스냅샷 헤더
+        embedder (str): 현재 임베딩 백엔드
+        embedding_model (str): 현재 임베딩 모델 이름 (벡터 차원이 다른 hashing 모델도 구분됨)
+        **settings: 비교할 청킹 설정 (chunk_size, chunk_overlap, chunker, separators, dedup, None이면 비교하지 않음)
+
+    Raises:
+        ValueError: 다른 항목이 있으면 항목별 (스냅샷 값, 현재 값)을 담은 메시지
+    """
+    current = dict(settings, embedder=embedder, embedding_model=embedding_model)
+    mismatched = [
+        f"{key}: 스냅샷 {header.get(key)!r}, 현재 {value!r}"
+        for key, value in current.items()
+        if value is not None and header.get(key) != value
+    ]
+    if mismatched:
+        raise ValueError("스냅샷과 설정이 맞지 않습니다. (" + "; ".join(mismatched) + ")")
+
+def _open_collection(persist_directory: str):
+    """DB 디렉토리의 컬렉션(Chroma 또는 flat)을 읽기용으로 엽니다."""
+    if detect_store(persist_directory) == 'flat':
+        return FlatVectorStore(persist_directory)
+    return ChromaStore(persist_directory)._collection
+
+def export_snapshot(persist_directory: str, output_path: str, embedding_model: str, batch_size: int = SNAPSHOT_BATCH) -> Dict:
+    """
+    DB 디렉토리의 인덱스를 스냅샷 파일 하나로 내보냅니다. 청크는 batch_size개씩 읽어 바로 기록하므로 메모리 사용량이 일정합니다.
+
+    Args:
+        persist_directory (str): DB 저장 디렉토리 (샤딩된 DB는 샤드 디렉토리를 하나씩 지정)
+        output_path (str): 만들 스냅샷 파일 경로
+        embedding_model (str): 인덱스를 만든 임베딩 모델 이름
+        batch_size (int): 한 번에 읽을 청크 수
+
+    Returns:
+        Dict: 스냅샷 헤더
+    """
+    if is_sharded(persist_directory):
+        raise ValueError(
+            f"'{persist_directory}'는 샤딩된 DB입니다. 샤드 디렉토리(shards/<이름>)를 하나씩 내보내세요."
+        )
+    manifest_path = os.path.join(persist_directory, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ValueError(f"'{persist_directory}'에 인덱스가 없습니다. ({MANIFEST_FILE} 없음)")
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    collection = _open_collection(persist_directory)
+    total = collection.count()
+    first = collection.get(limit=1, include=["embeddings"])
+    dim = len(first["embeddings"][0]) if total else 0
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "count": total,
+        "dim": dim,
+        "embedder": manifest.get("embedder", 'openai'),
+        "embedding_model": embedding_model,
+        "chunk_size": manifest.get("chunk_size"),
+        "chunk_overlap": manifest.get("chunk_overlap"),
+        "chunker": manifest.get("chunker", 'splitter'),
+        "separators": manifest.get("separators", 'cpp'),
+        "dedup": manifest.get("dedup", 'none'),
+        "store": detect_store(persist_directory),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    written = 0
+    chunks_path = tmp_path + ".chunks"
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=SNAPSHOT_COMPRESSLEVEL) as archive:
+            # zip 항목은 하나씩만 쓸 수 있으므로 벡터는 바로 기록하고 청크 줄은 임시 파일에 모았다가 추가
+            with archive.open(SNAPSHOT_VECTORS, 'w', force_zip64=True) as vectors, open(chunks_path, 'w', encoding='utf-8') as chunks:
+                np.lib.format.write_array_header_1_0(vectors, {'descr': '<f4', 'fortran_order': False, 'shape': (total, dim)})
+                for offset in range(0, total, batch_size):
+                    batch = collection.get(offset=offset, limit=batch_size, include=["embeddings", "documents", "metadatas"])
+                    # 세는 동안 청크가 추가되어도 헤더의 개수까지만 기록
+                    count = min(len(batch["ids"]), total - written)
+                    vectors.write(np.asarray(batch["embeddings"][:count], dtype='<f4').tobytes())
+                    for chunk_id, document, metadata in zip(batch["ids"][:count], batch["documents"], batch["metadatas"]):
+                        chunks.write(json.dumps({"id": chunk_id, "document": document, "metadata": metadata}, ensure_ascii=False) + '\n')
+                    written += count
+            if written != total:
+                raise ValueError(f"내보내는 중에 컬렉션이 바뀌었습니다. (청크 {total}개 중 {written}개)")
+            archive.write(chunks_path, SNAPSHOT_CHUNKS)
+            for name in SNAPSHOT_FILES:
+                path = os.path.join(persist_directory, name)
+                if os.path.exists(path):
+                    archive.write(path, f"files/{name}")
+            # 헤더는 마지막에 기록 (헤더가 있으면 완성된 스냅샷)
+            archive.writestr(SNAPSHOT_HEADER, json.dumps(header, ensure_ascii=False, indent=2))
+        os.replace(tmp_path, output_path)
+    finally:
+        for path in (chunks_path, tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return header
+
+def iter_snapshot(path: str, batch_size: int = SNAPSHOT_BATCH) -> Iterator[Tuple[list, np.ndarray, list, list]]:
+    """
+    스냅샷의 청크를 batch_size개씩 (ids, vectors, documents, metadatas)로 읽습니다. 벡터 배열 전체를 메모리에 올리지 않습니다.
+
+    Yields:
+        Tuple: (청크 ID 리스트, (행 수, 차원) float32 배열, 문서 리스트, 메타데이터 리스트)
+    """
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(SNAPSHOT_VECTORS) as vectors, archive.open(SNAPSHOT_CHUNKS) as chunks:
+            np.lib.format.read_magic(vectors)
+            shape, _, dtype = np.lib.format.read_array_header_1_0(vectors)
+            dim = shape[1]
+            row_bytes = dim * dtype.itemsize
+            batch = []
+            for line in chunks:
+                batch.append(json.loads(line))
+                if len(batch) == batch_size:
+                    yield _snapshot_batch(batch, vectors, row_bytes, dim)
+                    batch = []
+            if batch:
+                yield _snapshot_batch(batch, vectors, row_bytes, dim)
+
+def _snapshot_batch(batch, vectors, row_bytes, dim):
+    data = vectors.read(row_bytes * len(batch))
+    if len(data) != row_bytes * len(batch):
+        raise ValueError("스냅샷의 벡터 수가 청크 수보다 적습니다. (손상된 파일)")
+    matrix = np.frombuffer(data, dtype='<f4').reshape(len(batch), dim)
+    return (
+        [row["id"] for row in batch],
+        matrix,
+        [row["document"] for row in batch],
+        [row["metadata"] for row in batch]
+    )
+
+def import_snapshot(
+    path: str,
+    persist_directory: str,
+    store: str = 'chroma',
+    store_dtype: str = DEFAULT_STORE_DTYPE,
+    store_rerank: bool = False,
+    batch_size: int = SNAPSHOT_BATCH
+) -> Dict:
+    """
+    스냅샷을 빈 DB 디렉토리에 벡터 그대로 한 번에 적재합니다. (다시 임베딩하지 않음)
+
+    Chroma는 임베딩을 넣은 upsert를 batch_size개씩 호출하고, flat 저장소는 모두 모아 세그먼트 하나로 저장합니다.
+    매니페스트, 어휘 색인, 중복 제거 색인도 복원하므로 이후 embedder.py 증분 인덱싱이 바뀐 파일만 처리합니다.
+
+    Args:
+        path (str): 스냅샷 파일 경로
+        persist_directory (str): 적재할 DB 디렉토리 (인덱스가 없어야 함)
+        store (str): 벡터 저장소 ('chroma' 또는 'flat')
+        store_dtype (str): flat 저장소의 벡터 형식
+        store_rerank (bool): flat 저장소에 float32 원본도 저장할지 여부
+        batch_size (int): 한 번에 적재할 청크 수
+
+    Returns:
+        Dict: 스냅샷 헤더
+    """
+    if store not in STORES:
+        raise ValueError(f"알 수 없는 저장소: {store} (선택 가능: {', '.join(STORES)})")
+    header = read_snapshot_header(path)
+    if os.path.exists(os.path.join(persist_directory, MANIFEST_FILE)) or is_sharded(persist_directory):
+        raise ValueError(f"'{persist_directory}'에 이미 인덱스가 있습니다. 스냅샷은 빈 --db-dir로 가져오세요.")
+
+    if store == 'flat':
+        db = FlatVectorStore(persist_directory, dtype=store_dtype, rerank=store_rerank)
+        collection = db
+    else:
+        db = ChromaStore(persist_directory)
+        collection = db._collection
+    loaded = 0
+    for ids, vectors, documents, metadatas in iter_snapshot(path, batch_size):
+        # Chroma는 빈 메타데이터(None)를 받지 않음
+        collection.upsert(ids=ids, embeddings=vectors, metadatas=[metadata or {} for metadata in metadatas], documents=documents)
+        loaded += len(ids)
+    if loaded != header["count"]:
+        raise ValueError(f"스냅샷의 청크 수가 헤더와 다릅니다. (헤더 {header['count']}개, 읽은 청크 {loaded}개)")
+    db.persist()
+
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        for name in SNAPSHOT_FILES:
+            if f"files/{name}" in names:
+                with archive.open(f"files/{name}") as source, open(os.path.join(persist_directory, name), 'wb') as target:
+                    shutil.copyfileobj(source, target)
+    # 이후 증분 인덱싱이 가져온 저장소를 이어서 갱신하도록 매니페스트의 저장소 백엔드 변경
+    IndexManifest.set_store(persist_directory, store)
+    return header
+
+def open_snapshot(path: str, embedder: str, embedding_model: str, cache_dir: str = DEFAULT_SNAPSHOT_CACHE) -> str:
+    """
+    스냅샷을 검색에 바로 쓸 수 있도록 캐시 디렉토리에 flat 저장소로 풀고 그 DB 디렉토리를 반환합니다.
+
+    같은 스냅샷 파일(경로, 크기, 수정 시각)은 한 번만 풀고 이후에는 재사용하므로 두 번째부터는 바로 열립니다.
+
+    Args:
+        path (str): 스냅샷 파일 경로
+        embedder (str): 검색에 쓸 임베딩 백엔드
+        embedding_model (str): 검색에 쓸 임베딩 모델 이름
+        cache_dir (str): 풀어 둘 캐시 디렉토리
+
+    Returns:
+        str: DB 디렉토리 경로
+    """
+    header = read_snapshot_header(path)
+    check_compatible(header, embedder, embedding_model)
+    st = os.stat(path)
+    key = hashlib.sha1(f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}".encode('utf-8')).hexdigest()[:16]
+    directory = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(directory, SNAPSHOT_HEADER)):
+        return directory
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f"{key}.", dir=cache_dir)
+    try:
+        import_snapshot(path, tmp_dir, store='flat')
+        with open(os.path.join(tmp_dir, SNAPSHOT_HEADER), 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # 다른 프로세스가 먼저 풀어 둔 경우
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.exists(os.path.join(directory, SNAPSHOT_HEADER)):
+            raise
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return directory
+
+def snapshot_report(header: Dict) -> str:
+    """스냅샷 요약 문자열"""
+    return (
+        f"스냅샷: 청크 {header['count']}개, 차원 {header['dim']}, 임베딩 {header['embedder']} ({header['embedding_model']}), "
+        f"청킹 {header['chunker']} {header['chunk_size']}/{header['chunk_overlap']} (구분자 {header['separators']}), 중복 제거 {header['dedup']}"
+    )
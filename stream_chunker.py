@@ -0,0 +1,269 @@
+import io
+import os
+import codecs
+from collections import deque
+from typing import Iterable, Iterator, List
+
+from index_manifest import SourceFingerprint
+
+# 스트리밍 청킹 기준 크기(바이트). 파일 쌍의 크기 합이 이보다 크면 파일 전체를 메모리에 올리지 않고 청킹
+STREAM_THRESHOLD = 32 * 1024 * 1024
+
+# 파일에서 한 번에 읽는 크기(바이트)
+STREAM_BLOCK_CHARS = 256 * 1024
+
+# 최상위 구분자("\n\n") 없이 이어지는 구간을 메모리에 모아둘 최대 문자 수.
+# 넘으면 그때까지 모은 부분을 줄 경계에서 잘라 먼저 청킹하므로, 이 경우에만 일반 경로와 경계가 달라질 수 있음
+STREAM_MAX_SPLIT_CHARS = 1024 * 1024
+
+# '#include' 길이: 줄 앞부분이 이만큼 모이면 include 줄인지 판단할 수 있음
+_INCLUDE_PREFIX_LEN = len('#include')
+
+def pair_size(header_path: str, cpp_path: str) -> int:
+    """파일 쌍의 디스크 크기 합(바이트)을 반환합니다. 없는 파일은 0으로 셉니다."""
+    size = 0
+    for path in (header_path, cpp_path):
+        if path is not None:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+    return size
+
+def iter_file_blocks(path: str, block_chars: int = STREAM_BLOCK_CHARS, fingerprint: SourceFingerprint = None) -> Iterator[str]:
+    """
+    파일을 block_chars 바이트씩 읽어 냅니다. 줄바꿈은 f.read()와 같이 '\\n'으로 바뀝니다.
+
+    Args:
+        path (str): 파일 경로
+        block_chars (int): 한 번에 읽을 크기(바이트)
+        fingerprint (SourceFingerprint): 읽은 바이트를 더할 파일 쌍 지문 (선택사항, 끝까지 읽어야 완성됨)
+
+    Yields:
+        str: 파일 내용 조각
+    """
+    # 텍스트 모드 읽기와 같은 디코더 (블록 경계에 걸친 멀티바이트 문자와 '\\r\\n' 처리)
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+    with open(path, 'rb') as f:
+        if fingerprint is not None:
+            fingerprint.begin_file(os.fstat(f.fileno()))
+        while True:
+            data = f.read(block_chars)
+            if fingerprint is not None:
+                fingerprint.update(data)
+            block = decoder.decode(data, final=not data)
+            if block:
+                yield block
+            if not data:
+                break
+    if fingerprint is not None:
+        fingerprint.end_file()
+
+def iter_line_heads(f, limit: int = 4096) -> Iterator[str]:
+    """
+    열린 텍스트 파일의 각 줄에서 앞부분 limit 문자까지만 냅니다. 한 줄이 아주 길어도 메모리에 다 올리지 않습니다.
+
+    Args:
+        f: 텍스트 모드로 연 파일 객체
+        limit (int): 줄마다 읽을 최대 문자 수
+
+    Yields:
+        str: 줄 앞부분 (줄이 limit보다 짧으면 줄바꿈 포함 전체)
+    """
+    while True:
+        head = f.readline(limit)
+        if not head:
+            return
+        if not head.endswith('\n'):
+            # 긴 줄의 나머지는 건너뜀
+            while True:
+                rest = f.readline(limit)
+                if not rest or rest.endswith('\n'):
+                    break
+        yield head
+
+def iter_inlined_blocks(includes: List[str], declarations: List[str], cpp_path: str, block_chars: int = STREAM_BLOCK_CHARS, fingerprint: SourceFingerprint = None) -> Iterator[str]:
+    """
+    inline_cpp_content와 같은 내용을 소스 파일을 조각씩 읽으며 냅니다.
+    헤더의 include 문과 클래스 선언을 먼저 내고, 소스는 #include 줄만 빼고 그대로 이어 붙입니다.
+
+    Args:
+        includes (List[str]): 헤더의 include 문
+        declarations (List[str]): 헤더의 클래스/구조체 선언부
+        cpp_path (str): 소스 파일 경로
+        block_chars (int): 한 번에 읽을 크기(바이트)
+        fingerprint (SourceFingerprint): 소스 파일에서 읽은 바이트를 더할 지문 (선택사항)
+
+    Yields:
+        str: 인라인화된 코드 조각
+    """
+    prefix = list(includes)
+    prefix.append('')
+    for decl in declarations:
+        prefix.append(decl)
+        prefix.append('')
+    yield '\n'.join(prefix)
+
+    # 줄마다 상태: None은 아직 include 줄인지 모름, True는 남기는 줄, False는 버리는 줄
+    keep = None
+    pending = ''
+    for block in iter_file_blocks(cpp_path, block_chars, fingerprint):
+        out = []
+        pos = 0
+        size = len(block)
+        while pos < size:
+            newline = block.find('\n', pos)
+            end = newline if newline >= 0 else size
+            segment = block[pos:end]
+            if keep is None:
+                pending += segment
+                if newline >= 0:
+                    if not pending.strip().startswith('#include'):
+                        out.append('\n' + pending)
+                    pending = ''
+                else:
+                    stripped = pending.lstrip()
+                    if len(stripped) >= _INCLUDE_PREFIX_LEN:
+                        keep = not stripped.startswith('#include')
+                        if keep:
+                            out.append('\n' + pending)
+                        pending = ''
+            elif keep:
+                out.append(segment)
+            if newline >= 0:
+                # 다음 줄 시작
+                keep = None
+                pos = newline + 1
+            else:
+                pos = size
+        if out:
+            yield ''.join(out)
+    # 마지막 줄 (파일이 줄바꿈으로 끝나면 빈 줄)
+    if keep is None and not pending.strip().startswith('#include'):
+        yield '\n' + pending
+
+class _SplitMerger:
+    def __init__(self, text_splitter, separator: str):
+        """
+        TextSplitter._merge_splits를 한 조각씩 받도록 바꾼 것. 같은 조각 순서에 대해 같은 청크를 냅니다.
+
+        Args:
+            text_splitter: 설정을 가져올 텍스트 스플리터
+            separator (str): 조각을 이을 구분자
+        """
+        self.splitter = text_splitter
+        self.separator = separator
+        self.separator_len = text_splitter._length_function(separator)
+        self.current = deque()
+        self.total = 0
+
+    def add(self, split: str) -> List[str]:
+        """조각을 추가하고, 이 조각 때문에 완성된 청크를 반환합니다."""
+        splitter = self.splitter
+        length = splitter._length_function(split)
+        docs = []
+        if self.total + length + (self.separator_len if self.current else 0) > splitter._chunk_size:
+            if self.current:
+                doc = splitter._join_docs(list(self.current), self.separator)
+                if doc is not None:
+                    docs.append(doc)
+                # 겹침 크기만 남을 때까지 앞 조각을 버림
+                while self.total > splitter._chunk_overlap or (
+                    self.total + length + (self.separator_len if self.current else 0) > splitter._chunk_size
+                    and self.total > 0
+                ):
+                    self.total -= splitter._length_function(self.current[0]) + (self.separator_len if len(self.current) > 1 else 0)
+                    self.current.popleft()
+        self.current.append(split)
+        self.total += length + (self.separator_len if len(self.current) > 1 else 0)
+        return docs
+
+    def flush(self) -> List[str]:
+        """남은 조각을 청크로 내보내고 비웁니다."""
+        docs = []
+        if self.current:
+            doc = self.splitter._join_docs(list(self.current), self.separator)
+            if doc is not None:
+                docs.append(doc)
+        self.current = deque()
+        self.total = 0
+        return docs
+
+class StreamingSplitter:
+    def __init__(self, text_splitter, max_split_chars: int = STREAM_MAX_SPLIT_CHARS):
+        """
+        RecursiveCharacterTextSplitter와 같은 청크 경계를 텍스트 조각 스트림에서 만들어 내는 스플리터
+
+        최상위 구분자로 나눈 조각을 하나씩 받아 병합하고, chunk_size 이상인 조각만 원래 스플리터로
+        재귀 분할하므로 메모리에는 병합 중인 청크 몇 개와 최상위 조각 하나만 남습니다.
+        구분자가 텍스트에 없으면 텍스트 전체를 조각 하나로 보는 것과 결과가 같으므로 미리 훑을 필요가 없습니다.
+
+        Args:
+            text_splitter: create_text_splitter로 만든 스플리터 (구분자는 정규식이 아닌 문자열)
+            max_split_chars (int): 최상위 구분자 없이 모아둘 최대 문자 수
+        """
+        self.splitter = text_splitter
+        self.max_split_chars = max(max_split_chars, text_splitter._chunk_size * 2)
+        separators = text_splitter._separators
+        self.separator = separators[0]
+        self.sub_separators = separators[1:]
+        # keep_separator면 구분자가 조각 앞에 붙어 있으므로 빈 문자열로 병합
+        self.merge_separator = "" if text_splitter._keep_separator else self.separator
+
+    def split_blocks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        텍스트 조각 스트림을 청킹합니다. splitter.split_text(''.join(blocks))와 같은 청크를 차례로 냅니다.
+
+        Args:
+            blocks (Iterable[str]): 텍스트 조각들
+
+        Yields:
+            str: 청크
+        """
+        separator = self.separator
+        keep_separator = self.splitter._keep_separator
+        merger = _SplitMerger(self.splitter, self.merge_separator)
+        buffer = ''
+        # 현재 조각의 시작 위치와, 다음 구분자를 찾기 시작할 위치 (조각이 구분자로 시작하면 그 뒤부터).
+        # 조각마다 버퍼를 잘라내면 블록 크기에 비례한 복사가 반복되므로 블록마다 한 번만 앞부분을 버림
+        start = 0
+        search_from = 0
+        for block in blocks:
+            buffer = buffer[start:] + block
+            search_from -= start
+            start = 0
+            while True:
+                found = buffer.find(separator, search_from)
+                if found < 0:
+                    break
+                yield from self._emit(buffer[start:found], merger)
+                start = found if keep_separator else found + len(separator)
+                search_from = found + len(separator)
+            if len(buffer) - start > self.max_split_chars:
+                # 구분자 없는 구간이 너무 길면 줄 경계에서 잘라 먼저 청킹
+                cut = buffer.rfind('\n', start + 1)
+                if cut <= start:
+                    cut = len(buffer) - (len(separator) - 1)
+                yield from merger.flush()
+                yield from self._split_large(buffer[start:cut])
+                start = cut
+                search_from = cut
+            search_from = max(search_from, len(buffer) - len(separator) + 1)
+        yield from self._emit(buffer[start:], merger)
+        yield from merger.flush()
+
+    def _emit(self, piece: str, merger: _SplitMerger) -> Iterator[str]:
+        """최상위 조각 하나를 병합기에 넣거나, 크면 재귀 분할합니다."""
+        if not piece:
+            return
+        if self.splitter._length_function(piece) < self.splitter._chunk_size:
+            yield from merger.add(piece)
+        else:
+            yield from merger.flush()
+            yield from self._split_large(piece)
+
+    def _split_large(self, piece: str) -> List[str]:
+        """chunk_size 이상인 조각을 다음 구분자들로 분할합니다."""
+        if not self.sub_separators:
+            return [piece]
+        return self.splitter._split_text(piece, self.sub_separators)
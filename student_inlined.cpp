@@ -4,6 +4,7 @@
 #include <memory>
 #include <algorithm>
 
+// 학생 클래스 정의
 class Student {
 private:
     std::string name;
@@ -16,8 +17,9 @@ public:
     float getAverage() const;
     std::string getName() const;
     int getId() const;
-}
+};
 
+// 학생 관리 시스템 클래스
 class StudentManagementSystem {
 private:
     std::vector<std::shared_ptr<Student>> students;
@@ -27,7 +29,7 @@ public:
     void addGrade(int studentId, float grade);
     void displayStudentInfo(int studentId) const;
     void displayAllStudents() const;
-}
+};
 
 
 Student::Student(const std::string& name, int id) : name(name), studentId(id) {}
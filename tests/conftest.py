@@ -0,0 +1,40 @@
+import os
+import sys
+
+# 저장소 루트의 모듈을 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+STUDENT_HEADER = """#pragma once
+#include <string>
+
+class Student {
+public:
+    Student(const std::string& name, int grade);
+    void print() const;
+    int grade() const { return grade_; }
+private:
+    std::string name_;
+    int grade_;
+};
+"""
+
+STUDENT_SOURCE = """#include "student.h"
+#include <iostream>
+
+Student::Student(const std::string& name, int grade) : name_{name}, grade_{grade} {}
+
+void Student::print() const {
+    std::cout << name_ << " " << grade_ << std::endl;
+}
+"""
+
+@pytest.fixture
+def cpp_project(tmp_path):
+    """student.h/student.cpp 쌍이 있는 작은 C++ 프로젝트 디렉토리"""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "student.h").write_text(STUDENT_HEADER, encoding='utf-8')
+    (project / "student.cpp").write_text(STUDENT_SOURCE, encoding='utf-8')
+    return project
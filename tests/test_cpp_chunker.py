@@ -0,0 +1,41 @@
+import json
+
+from cpp_chunker import ChunkSpans, chunk_file_pair, entry_from_json, entry_to_json, load_chunks_file, pair_output_name, process_project, write_chunks_file
+
+def test_same_file_names_in_different_directories_do_not_collide(tmp_path):
+    project = tmp_path / "project"
+    for directory, body in (("a", "int a_value;"), ("b", "int b_value;")):
+        (project / directory).mkdir(parents=True)
+        (project / directory / "util.h").write_text(f"#pragma once\n{body}\n", encoding='utf-8')
+    output = tmp_path / "out"
+
+    process_project(str(project), str(output), chunk_size=200, chunk_overlap=0)
+
+    with open(output / "summary.json", encoding='utf-8') as f:
+        results = json.load(f)["results"]
+    assert sorted(results) == ["a/util", "b/util"]
+    for name, body in (("a/util", "a_value"), ("b/util", "b_value")):
+        assert results[name]["chunks_file"] == f"{name}_chunks.json"
+        entry = load_chunks_file(str(output / f"{name}_chunks.json"))
+        assert body in "".join(entry["chunks"])
+
+def test_output_name_outside_project_uses_file_id(tmp_path):
+    name = pair_output_name(str(tmp_path / "other" / "util.h"), None, str(tmp_path / "project"))
+    assert name.startswith("util_") and "/" not in name
+    assert pair_output_name(str(tmp_path / "project" / "src" / "util.h"), None, str(tmp_path / "project")) == "src/util"
+
+def test_spans_round_trip_through_chunks_file(cpp_project, tmp_path):
+    header = str(cpp_project / "student.h")
+    source = str(cpp_project / "student.cpp")
+    (cpp_project / "student.cpp").write_text(
+        (cpp_project / "student.cpp").read_text(encoding='utf-8') + 'const char* s = "[\\n  1,\\n  2\\n]";\n',
+        encoding='utf-8',
+    )
+    _, entry = chunk_file_pair(header, source, chunk_size=120, chunk_overlap=40)
+    assert isinstance(entry["chunks"], ChunkSpans) and len(entry["chunks"]) > 1
+
+    chunks_file = write_chunks_file(str(tmp_path / "out"), "student", entry)
+    loaded = load_chunks_file(str(tmp_path / "out" / chunks_file))
+    assert list(loaded["chunks"]) == list(entry["chunks"])
+    assert loaded["chunks"].spans == entry["chunks"].spans
+    assert entry_from_json(entry_to_json(loaded))["chunks"].source == entry["chunks"].source
@@ -0,0 +1,82 @@
+from cpp_lexer import chunk_by_units, extract_record_declarations, scan_units
+
+def units_of(text):
+    """(kind, name, 단위 텍스트) 목록"""
+    return [(unit.kind, unit.name, text[unit.start:unit.end]) for unit in scan_units(text)]
+
+def test_ctor_brace_member_initializers_stay_in_one_unit():
+    text = (
+        "Widget::Widget(int n) : size_{n}, data_{new int[n]} {\n"
+        "    init();\n"
+        "}\n"
+        "void Widget::reset() { size_ = 0; }\n"
+    )
+    units = units_of(text)
+    assert [(kind, name) for kind, name, _ in units] == [('function', 'Widget::Widget'), ('function', 'Widget::reset')]
+    assert units[0][2].endswith("init();\n}")
+    assert units[1][2] == "void Widget::reset() { size_ = 0; }"
+
+def test_empty_ctor_body_after_brace_initializer():
+    text = "Student::Student() : id{0} {}\nvoid g() {}\n"
+    assert units_of(text) == [
+        ('function', 'Student::Student', "Student::Student() : id{0} {}"),
+        ('function', 'g', "void g() {}"),
+    ]
+
+def test_mixed_paren_and_brace_initializers():
+    text = "A::A() : b(1), c{2}, d(3) { go(); }\nA::A(int) : B<int>{1}, v{{1, 2}} {}\n"
+    units = units_of(text)
+    assert [(kind, name) for kind, name, _ in units] == [('function', 'A::A'), ('function', 'A::A')]
+    assert units[0][2].endswith("{ go(); }")
+    assert units[1][2].endswith("v{{1, 2}} {}")
+
+def test_brace_initializer_outside_ctor_is_not_function():
+    text = "int values[] = {1, 2, 3};\nvoid f() {}\n"
+    assert [(kind, name) for kind, name, _ in units_of(text)] == [('function', 'f')]
+
+def test_qualified_template_names():
+    text = (
+        "void ns::Box<int>::set() { v = 1; }\n"
+        "template<class T> T ns::Box<T>::get() const { return v; }\n"
+        "template<class T> Box<T>& Box<T>::operator=(const Box& other) { return *this; }\n"
+    )
+    assert [name for _, name, _ in units_of(text)] == ['ns::Box<int>::set', 'ns::Box<T>::get', 'Box<T>::operator=']
+
+def test_template_specialization_with_function_type_is_record():
+    text = "template<typename F, typename... A>\nclass Bind<F(A...)> { void run() {} };\nstruct S : B<int(int)> { };\n"
+    assert [(kind, name) for kind, name, _ in units_of(text)] == [('class', 'Bind'), ('struct', 'S')]
+
+def test_trailing_comment_attaches_to_closed_unit():
+    text = "namespace x {\nvoid a() {} // done\nclass C { int y; };  /* C */\n} // namespace x\n\n// b 설명\nvoid b() {}\n"
+    units = units_of(text)
+    assert units[0] == ('namespace', 'x', text[:text.index("\n\n// b")])
+    assert units[1] == ('function', 'x::a', "void a() {} // done")
+    assert units[2] == ('class', 'x::C', "class C { int y; };  /* C */")
+    assert units[3] == ('function', 'b', "// b 설명\nvoid b() {}")
+
+def test_comments_strings_and_raw_strings_do_not_affect_braces():
+    text = (
+        'void a() {\n'
+        '    const char* s = "}";  // }\n'
+        "    char c = '{';\n"
+        '    auto r = R"x(})x";\n'
+        '    /* { */ int n = 1\'000 / 2;\n'
+        '}\n'
+        '#define OPEN {\n'
+        'void b() {}\n'
+    )
+    assert [(kind, name) for kind, name, _ in units_of(text)] == [('function', 'a'), ('function', 'b')]
+
+def test_record_declarations_include_inline_bodies_and_nested_types():
+    text = "class A {\n    struct Inner { int x; };\n    int get() { return 1; }\n};\nint A_value;\n"
+    assert extract_record_declarations(text) == [text[:text.index("\nint A_value")]]
+
+def test_chunk_line_ranges_and_symbols():
+    text = "void a() {}\n\nvoid b() {\n    return;\n}\n"
+    chunks = chunk_by_units(text, chunk_size=30, chunk_overlap=0)
+    assert [(chunk['start_line'], chunk['end_line'], chunk['symbols']) for chunk in chunks] == [(1, 1, ['a']), (3, 5, ['b'])]
+    assert all(text[chunk['start']:chunk['end']] == chunk['text'] for chunk in chunks)
+
+def test_nested_template_arguments_in_qualified_name():
+    text = "void Map<std::vector<std::pair<int, int>>>::clear() {}\n"
+    assert [name for _, name, _ in units_of(text)] == ['Map<std::vector<std::pair<int,int>>>::clear']
@@ -0,0 +1,125 @@
+import pytest
+
+from chroma_store import ChromaStore
+from dedup import ChunkDeduplicator, MinHasher, content_id
+from embedder import CodeEmbedder
+from retriever import CodeRetriever
+
+SHARED = "int shared_value(int x) { return compute(x) * 2 + offset(x); }"
+
+def meta(file_id, index):
+    return {"file_id": file_id, "chunk_index": index}
+
+def test_exact_duplicates_share_one_id():
+    index = ChunkDeduplicator(mode='exact')
+    first, is_new = index.assign("a.h", 0, SHARED, meta("A", 0))
+    second, second_new = index.assign("b.h", 3, SHARED, meta("B", 3))
+    assert first == second == content_id(SHARED) and is_new and not second_new
+    _, updates = index.finalize()
+    assert updates[first]["duplicate_count"] == 2
+    assert updates[first]["locations"] == "a.h#0; b.h#3"
+
+def test_near_duplicates_merge_and_short_chunks_do_not():
+    index = ChunkDeduplicator(mode='near', threshold=0.5)
+    body = " ".join(f"value_{i} = compute(value_{i - 1}, factor_{i});" for i in range(1, 40))
+    original, _ = index.assign("a.h", 0, body, meta("A", 0))
+    near, is_new = index.assign("b.h", 0, body + " extra_call();", meta("B", 0))
+    assert near == original and not is_new
+    assert MinHasher().signature("};") is None
+    assert index.assign("c.h", 0, "};", meta("C", 0))[1]
+
+def test_finalize_moves_metadata_to_remaining_location():
+    index = ChunkDeduplicator(mode='exact')
+    chunk_id, _ = index.assign("a.h", 0, SHARED, meta("A", 0))
+    index.assign("b.h", 3, SHARED, meta("B", 3))
+    index.finalize()
+
+    # 처음 청크를 만든 파일이 빠지면 남은 위치의 file_id로 바뀜
+    index.release("a.h", [chunk_id])
+    deleted, updates = index.finalize()
+    assert deleted == []
+    assert updates[chunk_id] == {"file_id": "B", "chunk_index": 3, "locations": "b.h#3", "duplicate_count": 1}
+
+    # 다시 처리했지만 저장할 메타데이터가 같으면 갱신하지 않음
+    index.release("b.h", [chunk_id])
+    index.assign("b.h", 3, SHARED, meta("B", 3))
+    assert index.finalize() == ([], {})
+
+    index.release("b.h", [chunk_id])
+    assert index.finalize() == ([chunk_id], {})
+
+def test_entries_without_row_digest_are_rewritten_once(tmp_path):
+    index = ChunkDeduplicator(str(tmp_path / "dedup_index.json"), mode='exact')
+    chunk_id, _ = index.assign("a.h", 0, SHARED, meta("A", 0))
+    index.finalize()
+    del index.entries[chunk_id]["row"]
+    index.save()
+
+    loaded = ChunkDeduplicator.load(str(tmp_path), 'exact')
+    assert list(loaded.finalize()[1]) == [chunk_id]
+    assert loaded.finalize() == ([], {})
+
+def test_chroma_metadata_update_replaces_keys(tmp_path):
+    store = ChromaStore(str(tmp_path / "db"))
+    store._collection.upsert(ids=["x"], embeddings=[[1.0, 0.0]], metadatas=[{"file_id": "A", "start_line": 1}], documents=["x"])
+    store.update_metadatas(["x"], [{"file_id": "B"}])
+    assert store._collection.get(ids=["x"])["metadatas"] == [{"file_id": "B"}]
+
+@pytest.mark.parametrize("store", ["flat", "chroma"])
+def test_shared_chunk_follows_remaining_file(tmp_path, store):
+    project = tmp_path / "project"
+    (project / "a").mkdir(parents=True)
+    (project / "b").mkdir()
+    shared = "\n".join(f"int shared_{i}(int x) {{ return x * {i} + compute(x, {i}); }}" for i in range(6))
+    (project / "a" / "student.h").write_text("class Student { int id; };\n\n" + shared + "\n", encoding='utf-8')
+    (project / "b" / "example.cpp").write_text("int other() { return 1; }\n\n" + shared + "\n", encoding='utf-8')
+    db_dir = str(tmp_path / "db")
+
+    def index():
+        embedder = CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing', store=store)
+        embedder.embed_project(str(project), chunk_size=200, chunk_overlap=0, dedup='exact', verbose=False)
+        return CodeRetriever(db_dir, cache_path=None, embedder='hashing')
+
+    retriever = index()
+    assert retriever.search_by_metadata({"file_name": "student"}, 50)
+    (project / "a" / "student.h").write_text("class Student { int id; };\n", encoding='utf-8')
+    retriever = index()
+
+    results = retriever.search_by_metadata({"file_name": "example"}, 50)
+    shared_results = [result for result in results if "shared_0" in result["code"]]
+    assert shared_results
+    for result in shared_results:
+        assert result["metadata"]["cpp_path"].endswith("example.cpp")
+        assert result["metadata"]["duplicate_count"] == 1
+
+@pytest.mark.parametrize("store", ["flat", "chroma"])
+def test_file_filters_match_every_location_of_shared_chunk(tmp_path, store):
+    project = tmp_path / "project"
+    (project / "a").mkdir(parents=True)
+    (project / "b").mkdir()
+    source = "\n".join(f"int shared_{i}(int x) {{ return x * {i} + compute(x, {i}); }}" for i in range(6)) + "\n"
+    (project / "a" / "alpha.cpp").write_text(source, encoding='utf-8')
+    (project / "b" / "beta.cpp").write_text(source, encoding='utf-8')
+    db_dir = str(tmp_path / "db")
+
+    def index():
+        embedder = CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing', store=store)
+        embedder.embed_project(str(project), chunk_size=200, chunk_overlap=0, verbose=False)
+        return CodeRetriever(db_dir, cache_path=None, embedder='hashing')
+
+    retriever = index()
+    expected = len(retriever.search_by_metadata({"file_name": "alpha"}, 50))
+    assert expected > 0
+    assert len(retriever.search_by_metadata({"file_name": "beta"}, 50)) == expected
+    assert len(retriever.search_by_metadata({"file_name": {"$in": ["beta", "gamma"]}}, 50)) == expected
+    for mode in ("vector", "lexical", "hybrid"):
+        results = retriever.similarity_search("shared_3 compute", k=3, filter_dict={"file_name": "beta"}, mode=mode)
+        assert results, mode
+        assert all("beta.cpp" in result["metadata"]["locations"] for result in results)
+    assert retriever.similarity_search_batch(["shared_1"], k=2, filter_dict={"file_name": "beta"})[0]
+
+    # 공유가 풀리면 남은 파일로만 고름
+    (project / "b" / "beta.cpp").unlink()
+    retriever = index()
+    assert retriever.search_by_metadata({"file_name": "beta"}, 50) == []
+    assert len(retriever.search_by_metadata({"file_name": "alpha"}, 50)) == expected
@@ -0,0 +1,35 @@
+from discovery import discover_project, iter_project_pairs
+
+def make_tree(root, paths):
+    for path in paths:
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("int v;\n", encoding='utf-8')
+
+LAYOUT_FILES = (
+    "a/x.h", "a/x.hpp", "a/x.cpp", "b/x.cpp", "b/y.h",
+    "include/lib/foo.hpp", "src/lib/foo.cc", "src/bar.cpp", "inc/bar.h", "z/solo.h",
+)
+
+def test_iter_project_pairs_matches_discover_project(tmp_path):
+    make_tree(tmp_path, LAYOUT_FILES)
+    for layouts in (None, ['same', 'include-src', 'stem'], ['include-src', 'same'], ['stem']):
+        pairs, stats = discover_project(str(tmp_path), layouts=layouts)
+        streamed_stats = {}
+        streamed = list(iter_project_pairs(str(tmp_path), streamed_stats, layouts=layouts))
+        assert sorted(streamed, key=str) == sorted(pairs, key=str)
+        stats.pop("seconds")
+        streamed_stats.pop("seconds")
+        assert streamed_stats == stats
+
+def test_same_directory_pairs_are_yielded_before_walk_finishes(tmp_path):
+    make_tree(tmp_path, LAYOUT_FILES)
+    stats = {}
+    pairs = iter_project_pairs(str(tmp_path), stats)
+    header_path, cpp_path = next(pairs)
+    assert (header_path, cpp_path) == (str(tmp_path / "a" / "x.h"), str(tmp_path / "a" / "x.cpp"))
+    # 다른 디렉토리와 짝지어질 수 있는 파일은 아직 탐색 중이므로 통계도 비어 있음
+    assert stats == {}
+    rest = list(pairs)
+    assert (str(tmp_path / "include" / "lib" / "foo.hpp"), str(tmp_path / "src" / "lib" / "foo.cc")) in rest
+    assert stats["pairs"] == 3
@@ -0,0 +1,67 @@
+import pytest
+
+from embed_scheduler import EmbeddingScheduler, is_retryable_error
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+class APIConnectionError(Exception):
+    pass
+
+class FlakyEmbeddings:
+    """처음 failures번은 error를 던지고 이후에는 고정 벡터를 반환하는 임베딩"""
+    def __init__(self, error, failures=1):
+        self.error = error
+        self.failures = failures
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return [[1.0, 0.0] for _ in texts]
+
+def run_scheduler(embeddings):
+    stored = []
+    scheduler = EmbeddingScheduler(
+        embeddings, lambda ids, vectors, texts, metadatas: stored.extend(ids),
+        max_in_flight=1, max_retries=3, backoff_base=0.0, backoff_max=0.0,
+    )
+    scheduler.submit(["a", "b"], ["int a;", "int b;"], [{}, {}], key="a.h")
+    stats = scheduler.close()
+    return scheduler, stats, stored
+
+@pytest.mark.parametrize("error", [
+    StatusError(429), StatusError(500), StatusError(503), StatusError(408),
+    APIConnectionError("connection refused"), TimeoutError("read timed out"), ConnectionResetError(),
+])
+def test_transient_errors_are_retried(error):
+    assert is_retryable_error(error)
+    embeddings = FlakyEmbeddings(error)
+    scheduler, stats, stored = run_scheduler(embeddings)
+    assert embeddings.calls == 2
+    assert stats["retries"] == 1
+    assert stored == ["a", "b"]
+    assert not scheduler.failed_keys
+
+@pytest.mark.parametrize("error", [
+    StatusError(400), StatusError(401), StatusError(404), ValueError("bad input"), TypeError("bug"),
+])
+def test_permanent_errors_fail_without_retry(error):
+    assert not is_retryable_error(error)
+    embeddings = FlakyEmbeddings(error, failures=10)
+    scheduler, stats, stored = run_scheduler(embeddings)
+    assert embeddings.calls == 1
+    assert stats["retries"] == 0
+    assert stats["failed_batches"] == 1
+    assert stored == []
+    assert scheduler.failed_keys == {"a.h"}
+
+def test_retries_stop_after_max_retries():
+    embeddings = FlakyEmbeddings(StatusError(502), failures=10)
+    scheduler, stats, stored = run_scheduler(embeddings)
+    assert embeddings.calls == 4
+    assert stats["retries"] == 3
+    assert scheduler.failed_keys == {"a.h"}
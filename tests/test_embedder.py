@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from embedder import CodeEmbedder
+from embedding_backends import HashingEmbeddings
+from index_manifest import MANIFEST_FILE, IndexManifest
+from lexical_index import LexicalIndex
+
+OPTIONS = dict(chunker='lexer', dedup='near', separators='lines', chunk_size=300, chunk_overlap=0, verbose=False)
+
+def make_embedder(db_dir, embedder='hashing'):
+    return CodeEmbedder(persist_directory=str(db_dir), cache_path=None, embedder=embedder, store='flat')
+
+def test_single_file_keeps_project_settings(cpp_project, tmp_path):
+    db_dir = tmp_path / "db"
+    make_embedder(db_dir).embed_project(str(cpp_project), **OPTIONS)
+    before = IndexManifest.read_settings(str(db_dir))
+
+    result = make_embedder(db_dir).embed_cpp_file("student")
+    assert result["updated"] == 1
+    assert IndexManifest.read_settings(str(db_dir)) == before
+    with open(os.path.join(db_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        files = json.load(f)["files"]
+    assert len(files) == 2 and all(entry["hash"] for entry in files.values())
+
+    # 프로젝트의 다른 파일은 그대로 최신 상태
+    assert make_embedder(db_dir).embed_project(str(cpp_project), **OPTIONS) == {"updated": 0, "skipped": 1, "removed_chunks": 0}
+
+def test_single_file_uses_dedup_ids(cpp_project, tmp_path):
+    db_dir = tmp_path / "db"
+    make_embedder(db_dir).embed_project(str(cpp_project), **dict(OPTIONS, dedup='exact'))
+    make_embedder(db_dir).embed_cpp_file("student")
+    manifest = IndexManifest.load(str(db_dir), 300, 0, 'lexer', 'hashing', 'exact', 'flat', 'lines')
+    repo_key = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "student.h")
+    # 중복 제거 방식의 청크 ID는 내용 해시 ('c-...')
+    assert manifest.chunk_ids(repo_key) and all(chunk_id.startswith('c-') for chunk_id in manifest.chunk_ids(repo_key))
+
+def test_single_file_rejects_other_embedder(cpp_project, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    db_dir = tmp_path / "db"
+    make_embedder(db_dir).embed_project(str(cpp_project), **OPTIONS)
+    with pytest.raises(ValueError):
+        make_embedder(db_dir, embedder='openai').embed_cpp_file("student")
+
+@pytest.mark.parametrize("dedup", ["none", "exact"])
+def test_failed_chunks_leave_lexical_index(cpp_project, tmp_path, monkeypatch, dedup):
+    def fail(self, texts):
+        raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr(HashingEmbeddings, "embed_documents", fail)
+    db_dir = tmp_path / "db"
+    make_embedder(db_dir).embed_project(str(cpp_project), **dict(OPTIONS, dedup=dedup))
+    # 벡터 저장소에 없는 청크는 어휘 검색에도 나오지 않아야 함
+    assert len(LexicalIndex.load(str(db_dir))) == 0
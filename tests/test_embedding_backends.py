@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+from embedding_backends import HashingEmbeddings, LazyEmbeddings, create_embeddings, embedding_model_name
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_lazy_embeddings_created_once_on_first_use():
+    created = []
+
+    def factory():
+        created.append(1)
+        return HashingEmbeddings(dim=16)
+
+    lazy = LazyEmbeddings(factory)
+    assert not lazy.loaded and not created
+    assert len(lazy.embed_query("int main()")) == 16
+    assert len(lazy.embed_documents(["a", "b"])) == 2
+    assert lazy.loaded and len(created) == 1
+
+def test_model_name_matches_created_backend():
+    for embedder, dim in (('hashing', None), ('hashing', 64), ('openai', None)):
+        if embedder == 'openai':
+            assert embedding_model_name(embedder, "http://127.0.0.1:1/v1") == ("text-embedding-3-small@http://127.0.0.1:1/v1", True)
+            continue
+        _, model, cacheable = create_embeddings(embedder, dim=dim)
+        assert embedding_model_name(embedder, dim=dim) == (model, cacheable)
+
+def test_retriever_with_default_embedder_does_not_import_langchain(cpp_project, tmp_path):
+    from embedder import CodeEmbedder
+
+    db_dir = str(tmp_path / "db")
+    CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing', store='flat').embed_project(str(cpp_project))
+    code = (
+        "import sys\n"
+        "from retriever import CodeRetriever\n"
+        f"retriever = CodeRetriever({db_dir!r}, cache_path=None)\n"
+        "assert retriever.search_by_metadata({'language': 'cpp'}, 1)\n"
+        "print(sorted(name for name in ('langchain_core', 'langchain_openai') if name in sys.modules))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True,
+                               env=dict(os.environ, PYTHONWARNINGS="ignore", OPENAI_API_KEY="sk-test"))
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,48 @@
+from embedding_cache import CachedEmbeddings
+
+class CountingEmbeddings:
+    model = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0, 2.0] for text in texts]
+
+def stored_bytes(cache):
+    return cache._conn.execute("SELECT SUM(LENGTH(vector)) FROM embeddings").fetchone()[0]
+
+def test_replaced_rows_are_not_counted_twice(tmp_path):
+    cache = CachedEmbeddings(CountingEmbeddings(), str(tmp_path / "cache.sqlite"))
+    cache.embed_documents(["a", "bb"])
+    # 다른 워커가 같은 텍스트를 동시에 계산해 다시 저장하는 경우
+    cache._store({"a": [1.0, 1.0, 2.0]})
+    cache._store(dict(zip(["x", "y"], [[0.0] * 3, [0.0] * 3])))
+    cache._store(dict(zip(["x", "y"], [[0.0] * 3, [0.0] * 3])))
+    assert cache._total_bytes == stored_bytes(cache)
+    cache.close()
+
+def test_hits_do_not_call_backend_and_size_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    backend = CountingEmbeddings()
+    cache = CachedEmbeddings(backend, path)
+    first = cache.embed_documents(["int a;", "int b;", "int a;"])
+    assert cache.embed_documents(["int b;", "int a;"]) == [first[1], first[0]]
+    assert backend.calls == 1
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 2
+    total = cache._total_bytes
+    cache.close()
+
+    reopened = CachedEmbeddings(backend, path)
+    assert reopened._total_bytes == total == stored_bytes(reopened)
+    reopened.close()
+
+def test_eviction_keeps_size_under_limit(tmp_path):
+    # 벡터 하나는 12바이트. 최대 크기를 넘으면 오래된 항목부터 90%까지 삭제
+    cache = CachedEmbeddings(CountingEmbeddings(), str(tmp_path / "cache.sqlite"), max_mb=120 / (1024 * 1024))
+    for i in range(30):
+        cache.embed_documents([f"text {i}"])
+    assert cache._total_bytes == stored_bytes(cache) <= 120
+    assert cache.stats["evicted"] > 0
+    cache.close()
@@ -0,0 +1,82 @@
+import pytest
+
+from embedder import CodeEmbedder
+from file_table import SHARED_ID_FIELD, FileTable
+from retriever import CodeRetriever
+
+def make_table():
+    table = FileTable()
+    table.put("A", {"file_name": "alpha", "type": "pair", "chunk_size": 300})
+    # B에는 type 필드가 없음
+    table.put("B", {"file_name": "beta", "chunk_size": 300})
+    table.put("C", {"file_name": "gamma", "type": "header", "chunk_size": 500})
+    return table
+
+def test_missing_field_matches_no_condition():
+    table = make_table()
+    assert table.translate_filter({"type": {"$ne": "pair"}}) == {"file_id": {"$in": ["C"]}}
+    assert table.translate_filter({"type": {"$nin": ["pair"]}}) == {"file_id": {"$in": ["C"]}}
+    # 절반보다 많이 일치하면 나머지(필드가 없는 B 포함)를 $nin으로 제외
+    assert table.translate_filter({"type": {"$in": ["pair", "header"]}}) == {"file_id": {"$nin": ["B"]}}
+    assert table.translate_filter({"type": "source"}) == {"file_id": {"$in": [""]}}
+
+def test_mixed_file_and_chunk_conditions():
+    table = make_table()
+    chunk_condition = {"start_line": {"$gt": 10}}
+    assert table.translate_filter({"$or": [{"file_name": "alpha"}, chunk_condition]}) == {
+        "$or": [{"file_id": {"$in": ["A"]}}, chunk_condition]
+    }
+    assert table.translate_filter({"$and": [{"chunk_size": {"$lt": 400}}, chunk_condition]}) == {
+        "$and": [{"file_id": {"$nin": ["C"]}}, chunk_condition]
+    }
+    # 모든 파일과 일치하는 조건은 빠지고, $or 안에 있으면 $or 전체가 참
+    assert table.translate_filter({"$and": [{"chunk_size": {"$gte": 300}}, chunk_condition]}) == chunk_condition
+    assert table.translate_filter({"$or": [{"chunk_size": {"$gte": 300}}, chunk_condition]}) is None
+    with pytest.raises(ValueError):
+        table.translate_filter({"file_name": {"$eq": "alpha", "$ne": "beta"}})
+
+def test_shared_chunks_match_every_location():
+    table = make_table()
+    table.set_shared({"B": ["c-1", "c-2"]})
+    assert table.translate_filter({"file_name": "beta"}) == {
+        "$or": [{"file_id": {"$in": ["B"]}}, {SHARED_ID_FIELD: {"$in": ["c-1", "c-2"]}}]
+    }
+    assert table.translate_filter({"file_name": "alpha"}) == {"file_id": {"$in": ["A"]}}
+    # 공유 청크는 첫 위치(file_id)의 파일 속성으로 채움
+    assert table.rehydrate({"file_id": "A", SHARED_ID_FIELD: "c-1", "chunk_index": 2})["file_name"] == "alpha"
+
+def test_rehydrate_keeps_chunk_values_and_old_metadata():
+    table = make_table()
+    assert table.rehydrate({"file_id": "A", "chunk_index": 1, "chunk_size": 10}) == {
+        "file_name": "alpha", "type": "pair", "chunk_size": 10, "file_id": "A", "chunk_index": 1
+    }
+    # file_id가 없거나 테이블에 없는 이전 형식 메타데이터는 그대로
+    assert table.rehydrate({"file_name": "old"}) == {"file_name": "old"}
+    assert table.rehydrate({"file_id": "Z"}) == {"file_id": "Z"}
+    assert table.rehydrate(None) is None
+
+@pytest.mark.parametrize("store", ["flat", "chroma"])
+def test_search_results_are_rehydrated(cpp_project, tmp_path, store):
+    (cpp_project / "course.h").write_text("class Course {\npublic:\n    int credits() const { return 3; }\n};\n", encoding='utf-8')
+    db_dir = str(tmp_path / "db")
+    CodeEmbedder(persist_directory=db_dir, cache_path=None, embedder='hashing', store=store).embed_project(
+        str(cpp_project), chunker='lexer', chunk_size=300, chunk_overlap=0, verbose=False
+    )
+    retriever = CodeRetriever(db_dir, cache_path=None, embedder='hashing')
+    # 저장소에는 파일 단위 값이 없음
+    stored = retriever.db._collection.get()["metadatas"]
+    assert stored and all("file_name" not in metadata for metadata in stored)
+
+    def check(results, file_name="student"):
+        assert results
+        for result in results:
+            assert result["metadata"]["file_name"] == file_name
+            assert result["metadata"]["header_path"].endswith(file_name + ".h")
+            assert "chunk_index" in result["metadata"]
+
+    for mode in ("vector", "lexical", "hybrid"):
+        check(retriever.similarity_search("Student print", k=3, filter_dict={"file_name": "student"}, mode=mode))
+    check(retriever.similarity_search_batch(["Course credits"], k=3, filter_dict={"file_name": "course"})[0], "course")
+    check(retriever.search_by_metadata({"$and": [{"file_name": "student"}, {"start_line": {"$gte": 1}}]}, 50))
+    assert retriever.search_by_metadata({"$or": [{"file_name": "course"}, {"start_line": {"$gt": 10**6}}]}, 50)
+    assert retriever.search_by_metadata({"file_name": {"$ne": "student"}}, 50) == retriever.search_by_metadata({"file_name": "course"}, 50)
@@ -0,0 +1,51 @@
+import numpy as np
+
+from flat_store import MAX_SEGMENTS, FlatVectorStore
+
+def vector(i, dim=8):
+    rng = np.random.default_rng(i)
+    return rng.standard_normal(dim).tolist()
+
+def add_rounds(store, rounds, per_round=5):
+    for r in range(rounds):
+        ids = [f"c{r}-{i}" for i in range(per_round)]
+        store.upsert(
+            ids, [vector(r * 100 + i) for i in range(per_round)],
+            metadatas=[{"file_id": f"f{r}", "round": r, "even": i % 2 == 0} for i in range(per_round)],
+            documents=[f"doc {chunk_id}" for chunk_id in ids],
+        )
+        store.persist()
+
+def snapshot(store):
+    result = store.get(include=["metadatas", "documents"])
+    return sorted(zip(result["ids"], result["documents"], [sorted(m.items()) for m in result["metadatas"]]))
+
+def test_compaction_keeps_live_rows_and_filters(tmp_path):
+    store = FlatVectorStore(str(tmp_path))
+    add_rounds(store, MAX_SEGMENTS)
+    assert store.stats()["segments"] == MAX_SEGMENTS
+    store.delete(ids=["c0-0", "c3-1"])
+    store.delete(where={"file_id": "f5"})
+    store.update_metadatas(["c1-1"], [{"file_id": "moved", "round": 1, "even": False}])
+    before = snapshot(store)
+    query = vector(2 * 100 + 3)
+    expected = store.query([query], n_results=3)["ids"][0]
+
+    # 세그먼트가 MAX_SEGMENTS를 넘으면 하나로 합침
+    store.upsert(["extra"], [vector(999)], metadatas=[{"file_id": "x"}], documents=["doc extra"])
+    store.persist()
+    assert store.stats()["segments"] == 1
+    reopened = FlatVectorStore(str(tmp_path))
+    assert snapshot(reopened) == sorted(before + [("extra", "doc extra", [("file_id", "x")])])
+    assert reopened.query([query], n_results=3)["ids"][0] == expected
+    assert sorted(reopened.get(where={"file_id": "moved"})["ids"]) == ["c1-1"]
+    assert reopened.get(where={"file_id": "f5"})["ids"] == []
+    assert sorted(reopened.get(where={"$and": [{"round": 2}, {"even": True}]})["ids"]) == ["c2-0", "c2-2", "c2-4"]
+
+def test_dead_rows_trigger_compaction(tmp_path):
+    store = FlatVectorStore(str(tmp_path))
+    add_rounds(store, 2, per_round=10)
+    store.delete(ids=[f"c0-{i}" for i in range(8)])
+    store.persist()
+    assert store.stats()["segments"] == 1
+    assert sorted(FlatVectorStore(str(tmp_path)).get()["ids"]) == ["c0-8", "c0-9"] + [f"c1-{i}" for i in range(10)]
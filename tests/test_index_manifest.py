@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from cpp_chunker import chunk_file_pair
+from include_graph import IncludeGraph
+from index_manifest import IndexManifest, hash_file_pair, stat_signature
+
+def write(path, content):
+    with open(path, 'wb') as f:
+        f.write(content.encode('utf-8'))
+    return str(path)
+
+@pytest.fixture
+def pair(tmp_path):
+    header = write(tmp_path / "a.h", "#include <vector>\r\nclass A {\r\n    int x;\r\n};\r\n")
+    source = write(tmp_path / "a.cpp", '#include "a.h"\n\nint f() { return 1; }\n// 한글 주석\n')
+    return header, source
+
+@pytest.mark.parametrize("stream_threshold", [None, 0])
+@pytest.mark.parametrize("use_graph", [False, True])
+@pytest.mark.parametrize("layout", ["pair", "header_only", "source_only"])
+def test_fingerprint_matches_file_hash(pair, layout, use_graph, stream_threshold):
+    header, source = pair
+    if layout == "header_only":
+        source = None
+    elif layout == "source_only":
+        header = None
+    graph = IncludeGraph(os.path.dirname(header or source)) if use_graph else None
+    _, entry = chunk_file_pair(header, source, chunk_size=40, chunk_overlap=0, include_graph=graph, stream_threshold=stream_threshold)
+    chunks = list(entry['chunks'])
+    assert chunks and all('\r' not in chunk for chunk in chunks)
+    assert entry['fingerprint'].hash == hash_file_pair(header, source)
+    assert entry['fingerprint'].stat == stat_signature(header, source)
+
+def test_manifest_records_chunked_content_not_current_file(tmp_path, pair):
+    header, source = pair
+    _, entry = chunk_file_pair(header, source, chunk_size=40, chunk_overlap=0)
+    # 청킹한 뒤 매니페스트에 기록하기 전에 파일이 바뀜
+    write(source, "int g() { return 2; }\n")
+    os.utime(source, ns=(1, 1))
+    manifest = IndexManifest(str(tmp_path / "manifest.json"), 40, 0)
+    key = os.path.abspath(header)
+    manifest.update(key, header, source, ["id-0"], entry['fingerprint'])
+    assert not manifest.is_unchanged(key, header, source)
+
+def test_manifest_params_change_invalidates_hashes(tmp_path, pair):
+    header, source = pair
+    key = os.path.abspath(header)
+    manifest = IndexManifest.load(str(tmp_path), 40, 0, chunker='lexer', embedder='hashing', dedup='exact', store='flat')
+    manifest.update(key, header, source, ["id-0"])
+    manifest.save()
+
+    same = IndexManifest.load(str(tmp_path), 40, 0, chunker='lexer', embedder='hashing', dedup='exact', store='flat')
+    assert same.is_unchanged(key, header, source)
+    changed = IndexManifest.load(str(tmp_path), 40, 0, chunker='splitter', embedder='hashing', dedup='exact', store='flat')
+    assert not changed.is_unchanged(key, header, source)
+    # 해시는 무효화되어도 이전 청크 ID는 삭제를 위해 남음
+    assert changed.chunk_ids(key) == ["id-0"]
+
+def test_mtime_only_change_is_unchanged(tmp_path, pair):
+    header, source = pair
+    key = os.path.abspath(header)
+    manifest = IndexManifest(str(tmp_path / "manifest.json"), 40, 0)
+    manifest.update(key, header, source, [])
+    os.utime(source, ns=(10 ** 9, 10 ** 9))
+    assert manifest.is_unchanged(key, header, source)
+    write(source, "int h();\n")
+    assert not manifest.is_unchanged(key, header, source)
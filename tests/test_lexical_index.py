@@ -0,0 +1,15 @@
+from lexical_index import reciprocal_rank_fusion
+
+def test_rrf_prefers_ids_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "a"]])
+    assert fused[:2] == ["a", "c"]
+    assert set(fused) == {"a", "b", "c", "d"}
+
+def test_rrf_breaks_ties_by_id():
+    assert reciprocal_rank_fusion([["y", "x"], ["x", "y"]]) == ["x", "y"]
+
+def test_rrf_constant_controls_weight_of_lower_ranks():
+    rankings = [["top", "mid", "low"], ["second", "low"]]
+    # k가 작으면 한 목록의 1위가, 크면 여러 목록에 나온 하위 순위가 앞섬
+    assert reciprocal_rank_fusion(rankings, k=0).index("low") == 2
+    assert reciprocal_rank_fusion(rankings, k=60)[0] == "low"
@@ -0,0 +1,220 @@
+import re
+from collections import deque
+from typing import Callable, Iterable, List, Tuple
+
+class RecursiveTextSplitter:
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: List[str] = None,
+        keep_separator: bool = True,
+        length_function: Callable[[str], int] = len,
+        strip_whitespace: bool = True
+    ):
+        """
+        구분자 목록을 차례로 적용해 텍스트를 chunk_size 이하의 청크로 나누는 스플리터
+
+        langchain_text_splitters.RecursiveCharacterTextSplitter(문자열 구분자, keep_separator=True)와
+        같은 청크를 만들지만 langchain을 임포트하지 않으므로 청킹 경로의 시작 시간이 짧습니다.
+        스트리밍 청킹(StreamingSplitter)도 같은 설정 속성(_chunk_size, _separators 등)을 사용합니다.
+
+        Args:
+            chunk_size (int): 각 청크의 최대 크기
+            chunk_overlap (int): 청크 간 중복 크기
+            separators (List[str]): 앞에서부터 시도할 구분자 (마지막 ""는 문자 단위 분할)
+            keep_separator (bool): 구분자를 뒤 조각의 앞에 붙여 남길지 여부
+            length_function (Callable[[str], int]): 길이 계산 함수
+            strip_whitespace (bool): 청크 앞뒤 공백을 제거할지 여부
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"청크 크기는 0보다 커야 합니다: {chunk_size}")
+        if chunk_overlap < 0 or chunk_overlap > chunk_size:
+            raise ValueError(f"청크 중복 크기는 0 이상, 청크 크기({chunk_size}) 이하여야 합니다: {chunk_overlap}")
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._separators = separators or ["\n\n", "\n", " ", ""]
+        self._keep_separator = keep_separator
+        self._length_function = length_function
+        self._strip_whitespace = strip_whitespace
+        # 구분자 -> 컴파일한 패턴 (split_spans용)
+        self._patterns = {}
+
+    def split_text(self, text: str) -> List[str]:
+        """텍스트를 청크 리스트로 나눕니다."""
+        return self._split_text(text, self._separators)
+
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        텍스트를 청크로 나눈 (시작, 끝) 오프셋 리스트를 반환합니다. text[start:end]가 split_text의 각 청크입니다.
+
+        keep_separator면 구분자가 뒤 조각에 붙어 있어 청크가 항상 원문의 연속 구간이므로,
+        청크 문자열을 만들지 않고 오프셋만 계산합니다.
+
+        Args:
+            text (str): 나눌 텍스트
+
+        Returns:
+            List[Tuple[int, int]]: 청크별 (시작, 끝) 오프셋
+        """
+        if not self._keep_separator:
+            raise ValueError("split_spans는 keep_separator=True인 스플리터에서만 사용할 수 있습니다.")
+        return self._split_spans(text, 0, len(text), self._separators)
+
+    def _split_text(self, text: str, separators: List[str]) -> List[str]:
+        """텍스트에 있는 첫 구분자로 나누고, chunk_size 이상인 조각은 다음 구분자들로 다시 나눕니다."""
+        if self._keep_separator:
+            return [text[start:end] for start, end in self._split_spans(text, 0, len(text), separators)]
+        separator = separators[-1]
+        new_separators = []
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if candidate in text:
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+
+        splits = self._split_with_separator(text, separator)
+        final_chunks = []
+        good_splits = []
+        merge_separator = "" if self._keep_separator else separator
+        for split in splits:
+            if self._length_function(split) < self._chunk_size:
+                good_splits.append(split)
+                continue
+            if good_splits:
+                final_chunks.extend(self._merge_splits(good_splits, merge_separator))
+                good_splits = []
+            if not new_separators:
+                final_chunks.append(split)
+            else:
+                final_chunks.extend(self._split_text(split, new_separators))
+        if good_splits:
+            final_chunks.extend(self._merge_splits(good_splits, merge_separator))
+        return final_chunks
+
+    def _split_spans(self, text: str, start: int, end: int, separators: List[str]) -> List[Tuple[int, int]]:
+        """_split_text를 text[start:end] 구간의 오프셋으로 계산합니다. (keep_separator 전용)"""
+        separator = separators[-1]
+        new_separators = []
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if text.find(candidate, start, end) >= 0:
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+
+        final_spans = []
+        good_pieces = []
+        for piece in self._separator_pieces(text, start, end, separator):
+            if piece[2] < self._chunk_size:
+                good_pieces.append(piece)
+                continue
+            if good_pieces:
+                final_spans.extend(self._merge_spans(text, good_pieces))
+                good_pieces = []
+            if not new_separators:
+                final_spans.append(piece[:2])
+            else:
+                final_spans.extend(self._split_spans(text, piece[0], piece[1], new_separators))
+        if good_pieces:
+            final_spans.extend(self._merge_spans(text, good_pieces))
+        return final_spans
+
+    def _separator_pieces(self, text: str, start: int, end: int, separator: str) -> List[Tuple[int, int, int]]:
+        """text[start:end]를 구분자 앞에서 자른 비어 있지 않은 조각들의 (시작, 끝, 길이). 구분자는 뒤 조각의 앞에 붙습니다."""
+        if not separator:
+            cuts = range(start, end + 1)
+        else:
+            pattern = self._patterns.get(separator)
+            if pattern is None:
+                pattern = self._patterns[separator] = re.compile(re.escape(separator))
+            cuts = [start] + [match.start() for match in pattern.finditer(text, start, end)] + [end]
+        if self._length_function is len:
+            # 기본 길이 함수면 조각 문자열을 만들지 않음
+            return [(cuts[i], cuts[i + 1], cuts[i + 1] - cuts[i]) for i in range(len(cuts) - 1) if cuts[i] < cuts[i + 1]]
+        return [
+            (cuts[i], cuts[i + 1], self._length_function(text[cuts[i]:cuts[i + 1]]))
+            for i in range(len(cuts) - 1) if cuts[i] < cuts[i + 1]
+        ]
+
+    def _merge_spans(self, text: str, pieces: List[Tuple[int, int, int]]) -> List[Tuple[int, int]]:
+        """_merge_splits를 이웃한 조각들의 오프셋으로 계산합니다. 이은 청크는 첫 조각 시작부터 마지막 조각 끝까지입니다."""
+        separator_len = self._length_function("")
+        chunks = []
+        current = deque()
+        total = 0
+        for piece in pieces:
+            length = piece[2]
+            if total + length + (separator_len if current else 0) > self._chunk_size and current:
+                chunk = self._strip_span(text, current[0][0], current[-1][1])
+                if chunk is not None:
+                    chunks.append(chunk)
+                # 겹침 크기만 남을 때까지 앞 조각을 버림
+                while total > self._chunk_overlap or (
+                    total + length + (separator_len if current else 0) > self._chunk_size and total > 0
+                ):
+                    total -= current[0][2] + (separator_len if len(current) > 1 else 0)
+                    current.popleft()
+            current.append(piece)
+            total += length + (separator_len if len(current) > 1 else 0)
+        if current:
+            chunk = self._strip_span(text, current[0][0], current[-1][1])
+            if chunk is not None:
+                chunks.append(chunk)
+        return chunks
+
+    def _strip_span(self, text: str, start: int, end: int):
+        """_join_docs와 같이 앞뒤 공백을 뺀 (시작, 끝). 공백뿐이면 None"""
+        if self._strip_whitespace:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        return (start, end) if start < end else None
+
+    def _split_with_separator(self, text: str, separator: str) -> List[str]:
+        """구분자로 나눈 비어 있지 않은 조각들. keep_separator면 구분자는 뒤 조각의 앞에 붙습니다."""
+        if not separator:
+            return list(text)
+        if not self._keep_separator:
+            return [split for split in text.split(separator) if split]
+        parts = re.split(f"({re.escape(separator)})", text)
+        splits = [parts[0]] + [parts[i] + parts[i + 1] for i in range(1, len(parts) - 1, 2)]
+        return [split for split in splits if split]
+
+    def _join_docs(self, docs: List[str], separator: str) -> str:
+        """조각들을 이어 청크 하나로 만듭니다. 공백뿐이면 None"""
+        text = separator.join(docs)
+        if self._strip_whitespace:
+            text = text.strip()
+        return text or None
+
+    def _merge_splits(self, splits: Iterable[str], separator: str) -> List[str]:
+        """작은 조각들을 chunk_size를 넘지 않게 이어 붙이고, 다음 청크는 chunk_overlap만큼 앞 조각을 겹쳐 시작합니다."""
+        separator_len = self._length_function(separator)
+        docs = []
+        current = deque()
+        total = 0
+        for split in splits:
+            length = self._length_function(split)
+            if total + length + (separator_len if current else 0) > self._chunk_size and current:
+                doc = self._join_docs(list(current), separator)
+                if doc is not None:
+                    docs.append(doc)
+                # 겹침 크기만 남을 때까지 앞 조각을 버림
+                while total > self._chunk_overlap or (
+                    total + length + (separator_len if current else 0) > self._chunk_size and total > 0
+                ):
+                    total -= self._length_function(current[0]) + (separator_len if len(current) > 1 else 0)
+                    current.popleft()
+            current.append(split)
+            total += length + (separator_len if len(current) > 1 else 0)
+        doc = self._join_docs(list(current), separator)
+        if doc is not None:
+            docs.append(doc)
+        return docs
@@ -0,0 +1,460 @@
+import os
+import sys
+import json
+import time
+import errno
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from typing import Dict, List, Optional, Set
+
+from discovery import is_cpp_file, iter_project_dirs
+
+# 파일 변경 감지 방식: inotify(리눅스), poll(mtime 주기 확인), auto는 inotify를 쓸 수 없으면 poll
+WATCH_BACKENDS = ('auto', 'inotify', 'poll')
+
+# 마지막 변경 후 이 시간(초) 동안 더 바뀌지 않으면 모아둔 변경을 반영
+DEFAULT_DEBOUNCE = 0.5
+# 변경이 계속 이어져도 가장 오래된 변경이 이 시간(초)을 넘기면 반영
+DEFAULT_MAX_DELAY = 10.0
+# poll 방식의 확인 주기(초)
+DEFAULT_POLL_INTERVAL = 1.0
+
+# DB 디렉토리에 저장하는 감시 상태 파일 (검색 서버가 인덱스 지연 시간을 보고할 때 읽음)
+WATCH_STATUS_FILE = "watch_status.json"
+
+# inotify 이벤트 (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+    | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct('iIII')
+
+class PollingSource:
+    name = 'poll'
+
+    def __init__(self, project_dir: str, discovery_options: Dict = None, interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        주기적으로 프로젝트의 C++ 파일 mtime/크기를 읽어 바뀐 파일을 찾는 변경 감지기 (모든 플랫폼)
+
+        Args:
+            project_dir (str): 프로젝트 디렉토리
+            discovery_options (Dict): 탐색 옵션 (excludes, use_gitignore만 사용)
+            interval (float): 확인 주기(초)
+        """
+        self.project_dir = project_dir
+        self.excludes = (discovery_options or {}).get("excludes")
+        self.use_gitignore = (discovery_options or {}).get("use_gitignore", True)
+        self.interval = interval
+        self._closed = threading.Event()
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for directory in iter_project_dirs(self.project_dir, self.excludes, self.use_gitignore):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if is_cpp_file(entry.name):
+                            try:
+                                stat = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            snapshot[os.path.abspath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """
+        최대 timeout초 기다린 뒤 바뀐(생성/수정/삭제된) 파일 경로를 반환합니다.
+
+        Returns:
+            Optional[Set[str]]: 바뀐 파일의 절대 경로 (None이면 변경을 놓쳤을 수 있어 전체 확인 필요)
+        """
+        if self._closed.wait(min(timeout, self.interval)):
+            return set()
+        current = self._scan()
+        previous = self.snapshot
+        self.snapshot = current
+        changed = {path for path, signature in current.items() if previous.get(path) != signature}
+        changed.update(path for path in previous if path not in current)
+        return changed
+
+    def close(self) -> None:
+        self._closed.set()
+
+class InotifySource:
+    name = 'inotify'
+
+    def __init__(self, project_dir: str, discovery_options: Dict = None):
+        """
+        리눅스 inotify로 탐색 대상 디렉토리를 감시하는 변경 감지기. libc를 ctypes로 직접 호출하므로 추가 패키지가 필요 없습니다.
+
+        Args:
+            project_dir (str): 프로젝트 디렉토리
+            discovery_options (Dict): 탐색 옵션 (excludes, use_gitignore만 사용)
+
+        Raises:
+            OSError: inotify를 쓸 수 없는 환경 (리눅스가 아니거나 감시 수 제한 초과 등)
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify는 리눅스에서만 사용할 수 있습니다")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.project_dir = project_dir
+        self.excludes = (discovery_options or {}).get("excludes")
+        self.use_gitignore = (discovery_options or {}).get("use_gitignore", True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self.watches: Dict[int, str] = {}
+        try:
+            self._watch_tree()
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self) -> None:
+        """아직 감시하지 않는 탐색 대상 디렉토리를 모두 감시에 추가합니다."""
+        watched = set(self.watches.values())
+        for directory in iter_project_dirs(self.project_dir, self.excludes, self.use_gitignore):
+            if directory in watched:
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                if code in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                    # 그 사이 지워졌거나 읽을 수 없는 디렉토리
+                    continue
+                raise OSError(code, f"inotify_add_watch 실패: {directory} (fs.inotify.max_user_watches 확인)")
+            self.watches[wd] = directory
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """
+        최대 timeout초 동안 이벤트를 기다린 뒤 바뀐 파일 경로를 반환합니다.
+        디렉토리가 생기거나 옮겨지면 그 안의 파일 이벤트를 놓쳤을 수 있으므로 감시를 다시 걸고 None을 반환합니다.
+
+        Returns:
+            Optional[Set[str]]: 바뀐 파일의 절대 경로 (None이면 전체 확인 필요)
+        """
+        if self.fd < 0:
+            return set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError:
+                # 다른 스레드에서 닫힘
+                return set()
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += _EVENT_HEADER.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                if mask & _IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & (_IN_ISDIR | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                    rescan = True
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if is_cpp_file(path):
+                    changed.add(os.path.abspath(path))
+        if rescan:
+            self._watch_tree()
+            return None
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+def create_source(project_dir: str, backend: str = 'auto', discovery_options: Dict = None, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    변경 감지기를 만듭니다.
+
+    Args:
+        project_dir (str): 프로젝트 디렉토리
+        backend (str): 'auto', 'inotify', 'poll'
+        discovery_options (Dict): 탐색 옵션
+        poll_interval (float): poll 방식의 확인 주기(초)
+
+    Returns:
+        InotifySource 또는 PollingSource
+    """
+    if backend not in WATCH_BACKENDS:
+        raise ValueError(f"알 수 없는 감시 방식: {backend} (선택 가능: {', '.join(WATCH_BACKENDS)})")
+    if backend in ('auto', 'inotify'):
+        try:
+            return InotifySource(project_dir, discovery_options)
+        except (OSError, AttributeError) as e:
+            if backend == 'inotify':
+                raise
+            print(f"inotify를 사용할 수 없어 {poll_interval}초 주기 확인으로 감시합니다. ({e})")
+    return PollingSource(project_dir, discovery_options, poll_interval)
+
+def read_watch_status(persist_directory: str) -> Optional[Dict]:
+    """
+    감시 상태 파일을 읽고, 지금 기준의 인덱스 지연 시간(lag_seconds)을 더해 반환합니다.
+
+    Returns:
+        Optional[Dict]: 감시 상태 (감시 중인 적이 없으면 None)
+    """
+    try:
+        with open(os.path.join(persist_directory, WATCH_STATUS_FILE), 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+    oldest = status.get("oldest_pending_at")
+    status["lag_seconds"] = max(0.0, time.time() - oldest) if oldest else 0.0
+    return status
+
+class IndexWatcher:
+    def __init__(
+        self,
+        embedder,
+        project_dir: str,
+        backend: str = 'auto',
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        discovery_options: Dict = None,
+        **embed_options
+    ):
+        """
+        프로젝트 파일을 감시하며 인덱스를 계속 최신으로 유지합니다.
+
+        감지 스레드가 바뀐 파일을 모으고, 마지막 변경 후 debounce초 동안 조용하면(또는 가장 오래된 변경이
+        max_delay초를 넘기면) 모인 변경을 한 번의 embed_project 실행으로 반영합니다.
+        embed_project는 바뀐 파일이 들어간 파일 쌍만 다시 청킹해 청크를 교체하고,
+        여러 파일의 청크는 임베딩 스케줄러가 요청 단위로 묶습니다.
+        반영을 기다리는 파일 수와 가장 오래된 변경의 경과 시간은 status()와 DB 디렉토리의 watch_status.json으로 확인합니다.
+
+        Args:
+            embedder (CodeEmbedder): 인덱싱에 사용할 임베더
+            project_dir (str): 프로젝트 디렉토리
+            backend (str): 변경 감지 방식 ('auto', 'inotify', 'poll')
+            debounce (float): 마지막 변경 후 기다릴 시간(초)
+            max_delay (float): 변경을 모아둘 최대 시간(초)
+            poll_interval (float): poll 방식의 확인 주기(초)
+            discovery_options (Dict): 탐색 옵션 (excludes, use_gitignore, layouts)
+            **embed_options: embed_project에 넘길 옵션 (chunk_size, dedup 등)
+        """
+        self.embedder = embedder
+        self.project_dir = project_dir
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.discovery_options = discovery_options
+        self.embed_options = embed_options
+        self.source = create_source(project_dir, backend, discovery_options, poll_interval)
+        self.status_path = os.path.join(embedder.persist_directory, WATCH_STATUS_FILE)
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        # 반영을 기다리는 파일: 경로 -> (처음 감지한 monotonic 시각, time.time() 시각)
+        self.pending: Dict[str, tuple] = {}
+        self.full_check = False
+        self.last_event = None
+        # 반영에 실패하면 이 시각(monotonic)까지 다시 시도하지 않음
+        self.retry_at = 0.0
+        self.syncing = False
+        self.stats = {
+            "syncs": 0,
+            "failed_syncs": 0,
+            "changed_files": 0,
+            "updated_files": 0,
+            "removed_chunks": 0,
+            "last_change_at": None,
+            "last_sync_at": None,
+            "last_sync_seconds": None,
+        }
+
+    def status(self) -> Dict:
+        """
+        감시 상태를 반환합니다.
+
+        Returns:
+            Dict: 감지 방식, 반영 대기 파일 수(pending_files), 가장 오래된 대기 변경의 경과 시간(lag_seconds),
+                반영 중 여부, 누적 통계
+        """
+        with self._condition:
+            oldest = min((wall for _, wall in self.pending.values()), default=None)
+            status = {
+                "backend": self.source.name,
+                "project_dir": os.path.abspath(self.project_dir),
+                "pid": os.getpid(),
+                "pending_files": len(self.pending),
+                "full_check_pending": self.full_check,
+                "oldest_pending_at": oldest,
+                "lag_seconds": max(0.0, time.time() - oldest) if oldest else 0.0,
+                "syncing": self.syncing,
+            }
+            status.update(self.stats)
+        return status
+
+    def _write_status(self) -> None:
+        """상태 파일을 원자적으로 저장합니다."""
+        status = self.status()
+        tmp_path = self.status_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.status_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.status_path)
+        except OSError as e:
+            print(f"감시 상태 저장 실패: {e}")
+
+    def _collect(self) -> None:
+        """감지 스레드: 바뀐 파일을 대기 목록에 모읍니다."""
+        while not self._stop.is_set():
+            changed = self.source.wait(0.5)
+            if changed is not None and not changed:
+                continue
+            now = time.monotonic()
+            wall = time.time()
+            with self._condition:
+                first = not self.pending and not self.full_check
+                if changed is None:
+                    self.full_check = True
+                else:
+                    for path in changed:
+                        self.pending.setdefault(path, (now, wall))
+                self.last_event = now
+                self.stats["last_change_at"] = wall
+                self._condition.notify_all()
+            if first:
+                # 대기 중인 변경이 생겼음을 바로 알림 (검색 서버의 지연 시간 보고용)
+                self._write_status()
+
+    def _due(self, now: float) -> Optional[float]:
+        """모인 변경을 반영할 시각까지 남은 시간(초). 대기 중인 변경이 없으면 None"""
+        if not self.pending and not self.full_check:
+            return None
+        oldest = min((mono for mono, _ in self.pending.values()), default=self.last_event)
+        due = max(min(self.last_event + self.debounce, oldest + self.max_delay), self.retry_at)
+        return max(0.0, due - now)
+
+    def sync(self, changed_paths: List[str] = None) -> Dict:
+        """
+        변경을 인덱스에 반영합니다.
+
+        Args:
+            changed_paths (List[str]): 바뀐 파일 경로 (None이면 모든 파일 쌍을 mtime/해시로 확인)
+
+        Returns:
+            Dict: embed_project 결과 ({"updated", "skipped", "removed_chunks"})
+        """
+        started = time.perf_counter()
+        result = self.embedder.embed_project(
+            self.project_dir,
+            discovery_options=self.discovery_options,
+            changed_paths=changed_paths,
+            verbose=False,
+            **self.embed_options
+        )
+        seconds = time.perf_counter() - started
+        with self._condition:
+            self.stats["syncs"] += 1
+            self.stats["updated_files"] += result["updated"]
+            self.stats["removed_chunks"] += result["removed_chunks"]
+            self.stats["last_sync_at"] = time.time()
+            self.stats["last_sync_seconds"] = seconds
+        return result
+
+    def _flush(self) -> None:
+        """모인 변경을 꺼내 반영합니다. 실패하면 다시 대기 목록에 넣고 max_delay 뒤에 재시도합니다."""
+        with self._condition:
+            pending = self.pending
+            full_check = self.full_check
+            self.pending = {}
+            self.full_check = False
+            self.syncing = True
+        oldest = min((wall for _, wall in pending.values()), default=None)
+        try:
+            result = self.sync(None if full_check else sorted(pending))
+        except Exception as e:
+            print(f"[감시] 반영 실패: {e} ({self.max_delay}초 뒤 재시도)")
+            with self._condition:
+                self.stats["failed_syncs"] += 1
+                for path, seen in pending.items():
+                    self.pending.setdefault(path, seen)
+                self.full_check = self.full_check or full_check
+                self.retry_at = time.monotonic() + self.max_delay
+            return
+        finally:
+            with self._condition:
+                self.syncing = False
+            self._write_status()
+        with self._condition:
+            self.stats["changed_files"] += len(pending)
+            remaining = len(self.pending)
+        lag = time.time() - oldest if oldest else 0.0
+        scope = "전체 확인" if full_check else f"변경 파일 {len(pending)}개"
+        print(
+            f"[감시] {scope}: 파일 쌍 갱신 {result['updated']}개, 삭제된 청크 {result['removed_chunks']}개, "
+            f"{self.stats['last_sync_seconds']:.2f}초 (반영 지연 {lag:.2f}초, 대기 {remaining}개)"
+        )
+
+    def run(self, initial_sync: bool = True) -> None:
+        """
+        stop()이 호출되거나 Ctrl+C를 누를 때까지 감시합니다.
+
+        Args:
+            initial_sync (bool): 감시를 시작하기 전에 모든 파일 쌍을 한 번 확인할지 여부
+        """
+        collector = threading.Thread(target=self._collect, name="index-watch", daemon=True)
+        collector.start()
+        try:
+            if initial_sync:
+                # 감시 시작 전에 바뀐 파일 반영 (감지 스레드가 먼저 떠 있어 그 사이 변경도 놓치지 않음)
+                result = self.sync()
+                print(f"[감시] 시작 확인: 파일 쌍 갱신 {result['updated']}개, 변경 없음 {result['skipped']}개, 삭제된 청크 {result['removed_chunks']}개")
+            self._write_status()
+            print(f"[감시] '{self.project_dir}' 감시 중 ({self.source.name}, 디바운스 {self.debounce}초). Ctrl+C로 종료")
+            while not self._stop.is_set():
+                with self._condition:
+                    wait = self._due(time.monotonic())
+                    if wait is None or wait > 0:
+                        self._condition.wait(0.5 if wait is None else min(wait, 0.5))
+                        continue
+                self._flush()
+        except KeyboardInterrupt:
+            print("\n[감시] 종료합니다.")
+        finally:
+            self._stop.set()
+            # 감지 스레드가 끝난 뒤 닫아 inotify 파일 디스크립터를 읽는 중에 닫지 않음
+            collector.join(timeout=self.source.interval + 1.0 if self.source.name == 'poll' else 2.0)
+            self.source.close()
+            self._write_status()
+
+    def stop(self) -> None:
+        """다른 스레드에서 감시를 멈춥니다."""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()